@@ -101,12 +101,19 @@ echo "Tmux plugins installed"
 echo "Skipping LazyVim initialization (run manually if needed)"
 
 # ============================================
-# SETUP HOURLY REFLECTION CRON JOB
+# MESSAGE QUEUE BACKEND
 # ============================================
-echo "Setting up hourly reflection cron job..."
-CRON_JOB="0 * * * * /opt/scripts/claude/reflection_cron.sh"
-echo "$CRON_JOB" | crontab -u dev -
-echo "Cron job configured"
+# files (message_queue/*.msg) or sqlite (mind-queue)
+MIND_QUEUE_BACKEND="${MIND_QUEUE_BACKEND:-files}"
+# Login shells (the Claude session's mind-queue) pick the same backend
+echo "export MIND_QUEUE_BACKEND=$MIND_QUEUE_BACKEND" > /etc/profile.d/mind-queue.sh
+
+# ============================================
+# CLAUDE WORKER POOL
+# ============================================
+# Number of Claude sessions draining the queue (1: the single claude-mind session)
+MIND_WORKERS="${MIND_WORKERS:-1}"
+echo "export MIND_WORKERS=$MIND_WORKERS" >> /etc/profile.d/mind-queue.sh
 
 # ============================================
 # START TELEGRAM BOT (if configured)
@@ -116,24 +123,70 @@ echo "Bot token set: $([ -n "$TELEGRAM_BOT_TOKEN" ] && echo "yes" || echo "no")"
 echo "Chat ID set: $([ -n "$TELEGRAM_CHAT_ID" ] && echo "yes" || echo "no")"
 
 if [ -n "$TELEGRAM_BOT_TOKEN" ] && [ -n "$TELEGRAM_CHAT_ID" ]; then
+    # Webhook mode when a public URL is configured (nginx proxies it to the bot); polling otherwise
+    BOT_ARGS=""
+    if [ -n "$TELEGRAM_WEBHOOK_URL" ]; then
+        BOT_ARGS="--webhook"
+        echo "Telegram webhook: $TELEGRAM_WEBHOOK_URL"
+    fi
     echo "Starting Telegram bot..."
     # Run as dev user in background, using venv python
-    su - dev -c "cd /home/dev/workspace/mind && TELEGRAM_BOT_TOKEN='$TELEGRAM_BOT_TOKEN' TELEGRAM_CHAT_ID='$TELEGRAM_CHAT_ID' nohup /opt/venv/bin/python /opt/scripts/telegram/bot.py > telegram-bot.log 2>&1 &"
+    su - dev -c "cd /home/dev/workspace/mind && TELEGRAM_BOT_TOKEN='$TELEGRAM_BOT_TOKEN' TELEGRAM_CHAT_ID='$TELEGRAM_CHAT_ID' TELEGRAM_WEBHOOK_URL='$TELEGRAM_WEBHOOK_URL' TELEGRAM_WEBHOOK_SECRET='$TELEGRAM_WEBHOOK_SECRET' MIND_QUEUE_BACKEND='$MIND_QUEUE_BACKEND' nohup /opt/venv/bin/python /opt/scripts/telegram/bot.py $BOT_ARGS >> telegram-bot.log 2>&1 &"
     sleep 2
     echo "Telegram bot started (logs: ~/workspace/mind/telegram-bot.log)"
+
+    echo "Starting send-telegram daemon..."
+    su - dev -c "cd /home/dev/workspace/mind && TELEGRAM_BOT_TOKEN='$TELEGRAM_BOT_TOKEN' TELEGRAM_CHAT_ID='$TELEGRAM_CHAT_ID' nohup /opt/venv/bin/python /opt/scripts/telegram/send_daemon.py >> send-daemon.log 2>&1 &"
+    echo "Send daemon started (logs: ~/workspace/mind/send-daemon.log)"
 else
     echo "Telegram bot not started (TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID not set)"
 fi
 
+# ============================================
+# START SESSION BROKER
+# ============================================
+# Serializes everything typed into the Claude workers and waits for them to be idle
+echo "Starting session broker..."
+su - dev -c "cd /home/dev/workspace/mind && MIND_WORKERS='$MIND_WORKERS' nohup /opt/venv/bin/python /opt/scripts/telegram/session_broker.py serve >> session-broker.log 2>&1 &"
+echo "Session broker started (logs: ~/workspace/mind/session-broker.log)"
+
+# ============================================
+# START QUEUE WATCHER
+# ============================================
+echo "Starting message queue watcher..."
+su - dev -c "cd /home/dev/workspace/mind && MIND_QUEUE_BACKEND='$MIND_QUEUE_BACKEND' MIND_WORKERS='$MIND_WORKERS' nohup /opt/venv/bin/python /opt/scripts/telegram/queue_watcher.py >> queue-watcher.log 2>&1 &"
+echo "Queue watcher started (logs: ~/workspace/mind/queue-watcher.log)"
+
+# ============================================
+# START REFLECTION SCHEDULER
+# ============================================
+# Queues reflections (reflection_cron.sh) only when the session is up and idle
+echo "Starting reflection scheduler..."
+su - dev -c "cd /home/dev/workspace/mind && MIND_QUEUE_BACKEND='$MIND_QUEUE_BACKEND' MIND_WORKERS='$MIND_WORKERS' nohup /opt/venv/bin/python /opt/scripts/telegram/reflection_scheduler.py >> reflection-scheduler.log 2>&1 &"
+echo "Reflection scheduler started (logs: ~/workspace/mind/reflection-scheduler.log)"
+
+# ============================================
+# LOG ARCHIVAL
+# ============================================
+# Daily: compress closed conversation/journal days, rotate the logs above, apply retention
+cat > /etc/cron.d/mind-archive << 'EOF'
+17 3 * * * dev cd /home/dev/workspace/mind && /opt/venv/bin/python /opt/scripts/telegram/mind_archive.py run >> archive.log 2>&1
+EOF
+chmod 644 /etc/cron.d/mind-archive
+echo "Log archival scheduled daily (mind-archive stats)"
+
 # ============================================
 # START CLAUDE SESSION (if authenticated)
 # ============================================
 echo "Checking Claude authentication..."
 if [ -f /home/dev/.claude/.credentials.json ]; then
     echo "Claude authenticated - starting session..."
-    su - dev -c "/usr/local/bin/claude-session start"
-    sleep 3
-    echo "Claude session started"
+    # Returns once Claude has taken the startup prompt (or reports why it could not)
+    if su - dev -c "/usr/local/bin/claude-session start"; then
+        echo "Claude session started"
+    else
+        echo "Claude session did not become ready - check with 'claude-session attach'"
+    fi
 else
     echo "Claude not authenticated yet - run 'claude' to authenticate"
     echo "Then run 'claude-session start' to begin the persistent mind"
@@ -159,8 +212,9 @@ echo "  - Tunnel: cloudflared"
 echo ""
 echo "Claude Persistent Mind:"
 echo "  - Telegram bot: $([ -n "$TELEGRAM_BOT_TOKEN" ] && echo "running" || echo "not configured")"
-echo "  - Hourly reflection: enabled"
-echo "  - Claude session: $(su - dev -c 'tmux has-session -t claude-mind 2>/dev/null' && echo "running" || echo "not started")"
+echo "  - Reflection scheduler: $(pgrep -f reflection_scheduler.py >/dev/null && echo "running" || echo "not running")"
+echo "  - Queue watcher: $(pgrep -f queue_watcher.py >/dev/null && echo "running" || echo "not running")"
+echo "  - Claude sessions: $(su - dev -c 'tmux list-sessions -F "#S" 2>/dev/null' | grep -cE '^claude-mind(-[0-9]+)?$') of $MIND_WORKERS running"
 echo "  - Attach to Claude: claude-session attach"
 echo "  - Send to Claude: claude-session send \"message\""
 echo "============================================"
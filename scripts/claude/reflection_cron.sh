@@ -1,33 +1,40 @@
 #!/bin/bash
 #
-# Hourly Reflection Cron Job
-# Triggers Claude to perform a structured reflection checkpoint
+# Reflection Job
+# Triggers Claude to perform a structured reflection checkpoint.
+# Run by reflection_scheduler.py when a reflection is due (or by hand).
 #
 
 MIND_DIR="$HOME/workspace/mind"
 MESSAGE_QUEUE="$MIND_DIR/message_queue"
 LOG_FILE="$MIND_DIR/cron.log"
+PYTHON="/opt/venv/bin/python"
+QUEUE_WRITER="/opt/scripts/telegram/queue_writer.py"
+MEMORY_COMPACTOR="/opt/scripts/telegram/memory_compactor.py"
 
 # Ensure directories exist
 mkdir -p "$MESSAGE_QUEUE"
 
-# Generate timestamp for the message file
-TIMESTAMP=$(date +%Y%m%d-%H%M%S)
-MSG_FILE="$MESSAGE_QUEUE/${TIMESTAMP}-reflection.msg"
+# Keep memory.md within its size budget before the reflection re-reads it
+if ! COMPACT_OUT=$("$PYTHON" "$MEMORY_COMPACTOR" 2>&1); then
+    echo "$(date --iso-8601=seconds) - Memory compaction failed: $COMPACT_OUT" >> "$LOG_FILE"
+else
+    echo "$(date --iso-8601=seconds) - ${COMPACT_OUT##*$'\n'}" >> "$LOG_FILE"
+fi
 
 # Current hour for context
 HOUR=$(date +%H)
 DATE=$(date +"%A, %B %d, %Y")
 TIME=$(date +"%H:%M")
 
-# Create the reflection prompt
-cat > "$MSG_FILE" << EOF
-From: system (hourly reflection)
-Time: $(date --iso-8601=seconds)
+# Queue the reflection prompt through the shared atomic writer
+# (adds the From/Time headers and a unique, sortable filename in the
+# system lane, behind waiting user messages; with
+# MIND_QUEUE_BACKEND=sqlite it becomes an entry in the queue database)
+MSG_FILE=$("$PYTHON" "$QUEUE_WRITER" --from "system (scheduled reflection)" --suffix reflection --lane system << EOF
+[REFLECTION CHECKPOINT - $TIME on $DATE]
 
-[HOURLY REFLECTION CHECKPOINT - $TIME on $DATE]
-
-It's time for your hourly reflection. Please:
+It's time for your scheduled reflection. Please:
 
 1. Review your recent journal entries from today
 2. Check if there are any patterns or insights worth noting
@@ -37,8 +44,15 @@ It's time for your hourly reflection. Please:
 
 Take a moment to pause, reflect, and write your thoughts to today's journal.
 EOF
+)
+
+if [ -z "$MSG_FILE" ]; then
+    echo "$(date --iso-8601=seconds) - Failed to queue reflection" >> "$LOG_FILE"
+    echo "Error: failed to queue reflection prompt" >&2
+    exit 1
+fi
 
 # Log the cron execution
-echo "$(date --iso-8601=seconds) - Hourly reflection triggered" >> "$LOG_FILE"
+echo "$(date --iso-8601=seconds) - Reflection triggered" >> "$LOG_FILE"
 
 echo "Reflection prompt queued: $MSG_FILE"
@@ -1,13 +1,35 @@
 #!/bin/bash
 #
-# Send input to the Claude session
-# Used by Telegram bot and cron jobs
+# Send input to the Claude worker sessions
+# Used by the queue watcher, the reflection scheduler and claude-session send
 #
+# Usage: send_to_claude.sh [--session NAME | --count N] "text"
+#   --session NAME   type into that worker (default: the broker picks an idle one)
+#   --count N        wake up to N workers with the same input (queue notifications)
+#
+
+BROKER="/opt/scripts/telegram/session_broker.py"
+WORKERS=$(/opt/venv/bin/python /opt/scripts/telegram/worker_pool.py names)
 
-SESSION_NAME="claude-mind"
+TARGET=""
+COUNT=1
+while [ $# -gt 0 ]; do
+    case "$1" in
+        --session) TARGET="$2"; shift 2 ;;
+        --count) COUNT="$2"; shift 2 ;;
+        *) break ;;
+    esac
+done
 
-if ! tmux has-session -t "$SESSION_NAME" 2>/dev/null; then
-    echo "Error: Claude session is not running" >&2
+RUNNING=()
+for SESSION in ${TARGET:-$WORKERS}; do
+    if tmux has-session -t "$SESSION" 2>/dev/null; then
+        RUNNING+=("$SESSION")
+    fi
+done
+
+if [ ${#RUNNING[@]} -eq 0 ]; then
+    echo "Error: Claude session ${TARGET:+'$TARGET' }is not running" >&2
     exit 1
 fi
 
@@ -23,4 +45,19 @@ if [ -z "$INPUT" ]; then
     exit 1
 fi
 
-tmux send-keys -t "$SESSION_NAME" "$INPUT" Enter
+# The injection broker waits until Claude is idle and batches inputs, so nothing
+# is typed into a running turn; exit status 3 means it is not running or did
+# not take the input (e.g. too large), so it is typed here instead
+if [ -n "$TARGET" ]; then
+    /opt/venv/bin/python "$BROKER" send --session "$TARGET" "$INPUT"
+else
+    /opt/venv/bin/python "$BROKER" send --count "$COUNT" "$INPUT"
+fi
+STATUS=$?
+if [ "$STATUS" -ne 3 ]; then
+    exit "$STATUS"
+fi
+
+for SESSION in "${RUNNING[@]:0:$COUNT}"; do
+    tmux send-keys -t "$SESSION" "$INPUT" Enter
+done
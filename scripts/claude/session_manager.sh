@@ -1,12 +1,22 @@
 #!/bin/bash
 #
 # Claude Session Manager
-# Manages the persistent Claude session in tmux
+# Manages the persistent Claude worker sessions in tmux
+#
+# MIND_WORKERS (default 1) sets the size of the pool: one worker is the
+# claude-mind session, a pool of N is claude-mind-0 .. claude-mind-<N-1>.
+# All workers drain the same message queue (see worker_pool.py).
 #
 
-SESSION_NAME="claude-mind"
 MIND_DIR="$HOME/workspace/mind"
 SYSTEM_PROMPT="$MIND_DIR/system_prompt.md"
+PYTHON="/opt/venv/bin/python"
+TELEGRAM_SCRIPTS="/opt/scripts/telegram"
+WORKERS=$($PYTHON $TELEGRAM_SCRIPTS/worker_pool.py names)
+WORKER_COUNT=$(echo "$WORKERS" | wc -w)
+FIRST_WORKER=$(echo "$WORKERS" | head -n 1)
+# Seconds Claude may take to show each startup screen
+START_TIMEOUT="${MIND_SESSION_START_TIMEOUT:-60}"
 
 # Colors for output
 RED='\033[0;31m'
@@ -15,33 +25,88 @@ YELLOW='\033[1;33m'
 NC='\033[0m' # No Color
 
 usage() {
-    echo "Usage: $0 {start|stop|restart|status|attach|send}"
+    echo "Usage: $0 {start|stop|restart|status|attach|send|tail}"
     echo ""
     echo "Commands:"
-    echo "  start   - Start Claude session in tmux"
-    echo "  stop    - Stop Claude session"
-    echo "  restart - Restart Claude session"
-    echo "  status  - Check if session is running"
-    echo "  attach  - Attach to Claude session"
-    echo "  send    - Send input to Claude session"
+    echo "  start   - Start the Claude worker sessions in tmux"
+    echo "  stop    - Stop the Claude worker sessions"
+    echo "  restart - Restart the Claude worker sessions"
+    echo "  status  - Check the workers' health and utilization"
+    echo "  attach  - Attach to a Claude session (attach [N] for worker N)"
+    echo "  send    - Send input to Claude (send [--worker N] \"message\"; default: an idle worker)"
+    echo "  tail    - Show recent session output ([--worker N] --since 10m, --bytes N, --raw)"
     exit 1
 }
 
+probe() {
+    local session="$1"
+    shift
+    $PYTHON $TELEGRAM_SCRIPTS/session_probe.py --session "$session" "$@"
+}
+
 is_running() {
-    tmux has-session -t "$SESSION_NAME" 2>/dev/null
+    tmux has-session -t "$1" 2>/dev/null
+}
+
+any_running() {
+    for SESSION in $WORKERS; do
+        is_running "$SESSION" && return 0
+    done
+    return 1
+}
+
+# Worker session for "N" (pool index) or a session name; the first worker by default
+worker_name() {
+    if [ -z "$1" ]; then
+        echo "$FIRST_WORKER"
+    elif [[ "$1" =~ ^[0-9]+$ ]] && [ "$WORKER_COUNT" -gt 1 ]; then
+        echo "$FIRST_WORKER" | sed "s/-0\$/-$1/"
+    else
+        echo "$1"
+    fi
 }
 
 start_session() {
-    if is_running; then
-        echo -e "${YELLOW}Session '$SESSION_NAME' is already running${NC}"
+    if [ "$WORKER_COUNT" -eq 1 ] && is_running "$FIRST_WORKER"; then
+        echo -e "${YELLOW}Session '$FIRST_WORKER' is already running${NC}"
         return 0
     fi
 
-    echo -e "${GREEN}Starting Claude session...${NC}"
+    echo -e "${GREEN}Starting $WORKER_COUNT Claude worker session(s)...${NC}"
 
     # Ensure mind directory exists
     mkdir -p "$MIND_DIR/journal" "$MIND_DIR/message_queue" "$MIND_DIR/conversations"
 
+    # Keep memory.md within its size budget; older items move to mind/memory/
+    if [ -f "$MIND_DIR/memory.md" ]; then
+        $PYTHON $TELEGRAM_SCRIPTS/memory_compactor.py \
+            || echo -e "${YELLOW}Memory compaction failed; continuing${NC}"
+    fi
+
+    # Workers start side by side; each waits for its own startup screens
+    PIDS=()
+    for SESSION in $WORKERS; do
+        if is_running "$SESSION"; then
+            echo -e "${YELLOW}Session '$SESSION' is already running${NC}"
+            continue
+        fi
+        start_worker "$SESSION" &
+        PIDS+=($!)
+    done
+
+    FAILED=0
+    for PID in "${PIDS[@]}"; do
+        wait "$PID" || FAILED=1
+    done
+    [ "$FAILED" -eq 0 ] || return 1
+
+    echo "Use '$0 attach' to attach to a session"
+    echo "Use '$0 send \"message\"' to send input"
+}
+
+start_worker() {
+    local SESSION="$1"
+
     # Build the initial prompt for Claude
     INIT_PROMPT=$(cat <<'EOF'
 You are starting up as a persistent mind. Please:
@@ -49,67 +114,100 @@ You are starting up as a persistent mind. Please:
 1. Read your system prompt at ~/workspace/mind/system_prompt.md
 2. Read your memory at ~/workspace/mind/memory.md
 3. Check for any recent journal entries in ~/workspace/mind/journal/
-4. Check for pending messages in ~/workspace/mind/message_queue/
+4. Check for pending messages with `mind-queue peek` (take them with
+   `mind-queue next`, which puts messages from the user first)
 5. Begin your internal monologue loop
 
+You do not need to poll for messages after this: a "[queue] ..." line is
+typed into this session whenever new messages arrive.
+
 Start by reading your system prompt to understand your role and capabilities.
 EOF
 )
+    if [ "$WORKER_COUNT" -gt 1 ]; then
+        INIT_PROMPT="$INIT_PROMPT
 
-    # Start tmux session with Claude
-    tmux new-session -d -s "$SESSION_NAME" -x 200 -y 50
-
-    # Give tmux a moment to initialize
-    sleep 1
+You are worker $SESSION, one of $WORKER_COUNT sessions sharing the message queue.
+The others write the same journal and memory.md at the same time, so change
+them only with \`mind-note\` (see \"Working alongside other workers\" in your
+system prompt)."
+    fi
 
-    # Start Claude in the session with the system prompt
-    tmux send-keys -t "$SESSION_NAME" "cd $MIND_DIR && claude --permission-mode bypassPermissions" Enter
+    # Start tmux session with Claude (keys sent before the shell is up wait in the pty)
+    tmux new-session -d -s "$SESSION" -x 200 -y 50 -e "MIND_WORKER=$SESSION"
+    # Capture everything the pane prints into the bounded ring buffer (claude-session tail)
+    tmux pipe-pane -o -t "$SESSION" "$PYTHON $TELEGRAM_SCRIPTS/session_log.py --session $SESSION record"
+    tmux send-keys -t "$SESSION" "cd $MIND_DIR && claude --permission-mode bypassPermissions" Enter
 
-    # Wait for Claude to initialize and show the bypass permissions warning
-    sleep 3
+    # Wait for the bypass permissions warning (or the input line if it was accepted before)
+    if ! STATE=$(probe "$SESSION" wait dialog ready --timeout "$START_TIMEOUT"); then
+        start_failed "$SESSION"
+        return 1
+    fi
 
-    # Navigate to "Yes, I accept" option (Down arrow moves cursor to option 2)
-    tmux send-keys -t "$SESSION_NAME" Down
-    sleep 0.5
+    if [ "$STATE" = "dialog" ]; then
+        # Move to "Yes, I accept" (option 2), confirm once it is selected
+        tmux send-keys -t "$SESSION" Down
+        if ! probe "$SESSION" wait accepted --timeout 10 >/dev/null; then
+            start_failed "$SESSION"
+            return 1
+        fi
+        tmux send-keys -t "$SESSION" Enter
 
-    # Confirm the selection
-    tmux send-keys -t "$SESSION_NAME" Enter
+        if ! probe "$SESSION" wait ready --timeout "$START_TIMEOUT" >/dev/null; then
+            start_failed "$SESSION"
+            return 1
+        fi
+    fi
 
-    # Wait for Claude to fully start
-    sleep 5
+    # Send the initial prompt (through the broker if it runs, so queued
+    # notifications cannot be typed over it)
+    /opt/scripts/claude/send_to_claude.sh --session "$SESSION" "$INIT_PROMPT"
 
-    # Send the initial prompt
-    tmux send-keys -t "$SESSION_NAME" "$INIT_PROMPT" Enter
+    echo -e "${GREEN}Claude session started in tmux session '$SESSION'${NC}"
+}
 
-    echo -e "${GREEN}Claude session started in tmux session '$SESSION_NAME'${NC}"
-    echo "Use '$0 attach' to attach to the session"
-    echo "Use '$0 send \"message\"' to send input"
+start_failed() {
+    echo -e "${RED}Claude did not become ready in session '$1' (see above)${NC}" >&2
+    echo "The session is left running; inspect it with: $0 attach $1" >&2
 }
 
 stop_session() {
-    if ! is_running; then
-        echo -e "${YELLOW}Session '$SESSION_NAME' is not running${NC}"
+    # Every worker session, including ones left over from a larger pool
+    RUNNING=$(tmux list-sessions -F '#S' 2>/dev/null | grep -E "^${FIRST_WORKER%-0}(-[0-9]+)?\$")
+    if [ -z "$RUNNING" ]; then
+        echo -e "${YELLOW}No Claude session is running${NC}"
         return 0
     fi
 
-    echo -e "${RED}Stopping Claude session...${NC}"
-    tmux kill-session -t "$SESSION_NAME"
-    echo -e "${GREEN}Session stopped${NC}"
+    echo -e "${RED}Stopping Claude session(s)...${NC}"
+    for SESSION in $RUNNING; do
+        tmux kill-session -t "$SESSION"
+    done
+    for SESSION in $RUNNING; do
+        probe "$SESSION" stopped --timeout 10 || return 1
+    done
+    echo -e "${GREEN}Stopped: $(echo $RUNNING)${NC}"
 }
 
 restart_session() {
-    stop_session
-    sleep 2
+    stop_session || return 1
     start_session
 }
 
 check_status() {
-    if is_running; then
-        echo -e "${GREEN}Session '$SESSION_NAME' is running${NC}"
-
-        # Show some stats
-        QUEUE_COUNT=$(find "$MIND_DIR/message_queue" -name "*.msg" 2>/dev/null | wc -l)
-        echo "  Messages in queue: $QUEUE_COUNT"
+    if any_running; then
+        # One line per worker: state, share of the last 15 minutes spent working, turns, last output
+        $PYTHON $TELEGRAM_SCRIPTS/worker_pool.py status | sed 's/^/  /'
+
+        # Show some stats (live counters from the bot's metrics endpoint if it is up)
+        QUEUE_COUNT=$(curl -sf --max-time 1 "http://127.0.0.1:${MIND_METRICS_PORT:-9464}/metrics" 2>/dev/null \
+            | awk '$1 == "mind_queue_depth" { print $2 }')
+        if [ -z "$QUEUE_COUNT" ]; then
+            QUEUE_COUNT=$($PYTHON $TELEGRAM_SCRIPTS/mind_queue.py stats 2>/dev/null \
+                | sed -n 's/^ready \([0-9]*\),.*/\1/p')
+        fi
+        echo "  Messages in queue: ${QUEUE_COUNT:-unknown}"
 
         TODAY=$(date +%Y-%m-%d)
         if [ -f "$MIND_DIR/journal/$TODAY.md" ]; then
@@ -121,36 +219,54 @@ check_status() {
 
         return 0
     else
-        echo -e "${RED}Session '$SESSION_NAME' is not running${NC}"
+        echo -e "${RED}No Claude session is running ($(echo $WORKERS))${NC}"
         return 1
     fi
 }
 
 attach_session() {
-    if ! is_running; then
-        echo -e "${RED}Session '$SESSION_NAME' is not running${NC}"
+    local SESSION
+    SESSION=$(worker_name "$1")
+    if ! is_running "$SESSION"; then
+        echo -e "${RED}Session '$SESSION' is not running${NC}"
         echo "Start it with: $0 start"
         return 1
     fi
 
-    tmux attach-session -t "$SESSION_NAME"
+    tmux attach-session -t "$SESSION"
 }
 
 send_to_session() {
-    if ! is_running; then
-        echo -e "${RED}Session '$SESSION_NAME' is not running${NC}"
+    local TARGET=()
+    if [ "$1" = "--worker" ]; then
+        TARGET=(--session "$(worker_name "$2")")
+        shift 2
+    fi
+
+    if ! any_running; then
+        echo -e "${RED}No Claude session is running${NC}"
         return 1
     fi
 
-    if [ -z "$1" ]; then
-        echo "Usage: $0 send \"message\""
+    if [ -z "$*" ]; then
+        echo "Usage: $0 send [--worker N] \"message\""
         return 1
     fi
 
-    tmux send-keys -t "$SESSION_NAME" "$*" Enter
+    # Through the injection broker, so it never lands in the middle of a turn
+    /opt/scripts/claude/send_to_claude.sh "${TARGET[@]}" "$*" || return 1
     echo -e "${GREEN}Sent to Claude session${NC}"
 }
 
+tail_session() {
+    local SESSION="$FIRST_WORKER"
+    if [ "$1" = "--worker" ]; then
+        SESSION=$(worker_name "$2")
+        shift 2
+    fi
+    $PYTHON $TELEGRAM_SCRIPTS/session_log.py --session "$SESSION" tail "$@"
+}
+
 # Main
 case "${1:-}" in
     start)
@@ -166,11 +282,15 @@ case "${1:-}" in
         check_status
         ;;
     attach)
-        attach_session
+        attach_session "$2"
         ;;
     send)
         shift
-        send_to_session "$*"
+        send_to_session "$@"
+        ;;
+    tail)
+        shift
+        tail_session "$@"
         ;;
     *)
         usage
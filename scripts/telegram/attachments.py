@@ -0,0 +1,203 @@
+#!/opt/venv/bin/python
+"""
+Content-addressed store for media sent to the bot.
+
+Photos, documents, voice notes and other files are streamed from Telegram
+to disk in CHUNK_SIZE pieces, hashed on the way, and filed under their
+sha256:
+
+    attachments/ab/ab3f...9c.jpg
+
+A file that is sent again hashes to the same name and is not stored twice.
+Only a reference (kind, path, size, hash, original name) goes into the
+queue, so queue entries stay small however large the file is, and the bot's
+memory use does not grow with it either.
+
+Files arrive in attachments/.incoming/ first and are hard-linked into place
+once complete, so the session never sees a partial file.
+
+Usage:
+    attachments.py stats [--json]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import httpx
+
+try:
+    from . import queue_writer
+except ImportError:  # run directly as /opt/scripts/telegram/attachments.py
+    import queue_writer
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+ATTACHMENTS_DIR = MIND_DIR / "attachments"
+
+# Bytes read from the network (or a local Bot API server's disk) at a time
+CHUNK_SIZE = 64 * 1024
+# Larger files are refused (the cloud Bot API serves at most 20 MB anyway)
+MAX_BYTES = int(os.environ.get("MIND_ATTACHMENT_MAX_BYTES", str(100 * 1024 * 1024)))
+DOWNLOAD_TIMEOUT = float(os.environ.get("MIND_ATTACHMENT_TIMEOUT", "60"))
+
+# Message fields that carry a file, with the extension used when none is known
+MEDIA_KINDS = {
+    "photo": ".jpg",
+    "animation": ".mp4",
+    "document": "",
+    "audio": ".mp3",
+    "voice": ".ogg",
+    "video": ".mp4",
+    "video_note": ".mp4",
+}
+
+
+class AttachmentTooLarge(ValueError):
+    """The file exceeds MAX_BYTES."""
+
+
+def media_of(message) -> tuple[str, object] | None:
+    """The (kind, Telegram media object) a message carries, or None.
+
+    For photos this is the largest size Telegram offers.
+    """
+    for kind in MEDIA_KINDS:
+        media = getattr(message, kind, None)
+        if kind == "photo" and media:
+            return kind, media[-1]
+        if kind != "photo" and media is not None:
+            return kind, media
+    return None
+
+
+def suffix_for(kind: str, media) -> str:
+    """File extension for the stored copy: the original name's, else the MIME type's."""
+    name = getattr(media, "file_name", None) or ""
+    suffix = Path(name).suffix.lower()
+    if not suffix and getattr(media, "mime_type", None):
+        suffix = mimetypes.guess_extension(media.mime_type) or ""
+    suffix = suffix or MEDIA_KINDS.get(kind, "")
+    # Keep the stored name predictable: ".tar.gz" style or odd suffixes fall back to none
+    return suffix if suffix[1:].isalnum() and len(suffix) <= 10 else ""
+
+
+class AttachmentStore:
+    """Files keyed by their sha256 under one directory."""
+
+    def __init__(self, root: Path | None = None, max_bytes: int = MAX_BYTES):
+        self.root = root or ATTACHMENTS_DIR
+        self.max_bytes = max_bytes
+
+    def path_for(self, sha256: str, suffix: str = "") -> Path:
+        return self.root / sha256[:2] / f"{sha256}{suffix}"
+
+    async def ingest(self, chunks: AsyncIterator[bytes], suffix: str = "") -> dict:
+        """Write a stream into the store and return its reference.
+
+        The reference is {"sha256", "size", "path", "stored"}; stored is False
+        when an identical file was already there. Disk writes run in a worker
+        thread so a slow disk does not stall the event loop.
+        """
+        fd, tmp_path = await asyncio.to_thread(self._open_incoming)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                try:
+                    async for chunk in chunks:
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise AttachmentTooLarge(f"larger than {self.max_bytes} bytes")
+                        digest.update(chunk)
+                        await asyncio.to_thread(f.write, chunk)
+                except AttachmentTooLarge:
+                    if hasattr(chunks, "aclose"):
+                        await chunks.aclose()  # release the download now, not when collected
+                    raise
+                path, stored = await asyncio.to_thread(self._commit, f, tmp_path, digest.hexdigest(), suffix)
+        finally:
+            await asyncio.to_thread(tmp_path.unlink)
+
+        return {"sha256": digest.hexdigest(), "size": size, "path": str(path), "stored": stored}
+
+    def _open_incoming(self) -> tuple[int, Path]:
+        incoming = self.root / ".incoming"
+        incoming.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=incoming)
+        return fd, Path(tmp_name)
+
+    def _commit(self, f, tmp_path: Path, sha256: str, suffix: str) -> tuple[Path, bool]:
+        """Make a complete incoming file durable and link it into place."""
+        f.flush()
+        if queue_writer.FSYNC_POLICY != "none":
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, 0o644)
+
+        path = self.path_for(sha256, suffix)
+        path.parent.mkdir(exist_ok=True)
+        try:
+            os.link(tmp_path, path)
+            return path, True
+        except FileExistsError:
+            return path, False
+
+    def stats(self) -> dict:
+        """Number of stored files and their total size."""
+        files = [p for p in self.root.glob("??/*") if p.is_file()]
+        return {"files": len(files), "bytes": sum(p.stat().st_size for p in files)}
+
+
+async def stream_url(url: str, chunk_size: int = CHUNK_SIZE, timeout: float = DOWNLOAD_TIMEOUT) -> AsyncIterator[bytes]:
+    """Yield the body of a GET request chunk by chunk."""
+    async with httpx.AsyncClient(timeout=timeout) as client, client.stream("GET", url) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(chunk_size):
+            yield chunk
+
+
+async def stream_file(path: Path, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a local file chunk by chunk (Bot API server in --local mode)."""
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+
+async def download(telegram_file, store: AttachmentStore, suffix: str = "") -> dict:
+    """Stream a telegram.File (from bot.get_file) into the store.
+
+    python-telegram-bot's own download helpers read the whole file into
+    memory first; this never holds more than one chunk.
+    """
+    source = telegram_file.file_path
+    if not source:
+        raise ValueError("Telegram returned no file path")
+    if Path(source).is_absolute() and Path(source).is_file():
+        chunks = stream_file(Path(source))
+    else:
+        chunks = stream_url(source)
+    return await store.ingest(chunks, suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the attachment store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_stats = sub.add_parser("stats", help="number of stored files and their size")
+    p_stats.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    stats = AttachmentStore().stats()
+    if args.json:
+        print(json.dumps(stats))
+    else:
+        print(f"{stats['files']} files, {stats['bytes']} bytes in {ATTACHMENTS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
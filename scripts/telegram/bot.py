@@ -4,21 +4,60 @@ Telegram Bot for Claude Persistent Mind
 
 Polls Telegram for incoming messages and writes them to the message queue.
 Claude processes the queue and responds via send_message.py.
+
+TELEGRAM_CHAT_ID is a comma-separated allow-list of chats; updates of
+different chats are handled concurrently, each chat's in order (chats.py).
+
+Usage:
+    bot.py              # long-poll getUpdates
+    bot.py --webhook    # receive updates on TELEGRAM_WEBHOOK_URL (falls back to polling)
 """
 
 import os
 import sys
-import asyncio
+import functools
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
 
+import httpx
 from telegram import Update
+from telegram.error import TelegramError
 from telegram.ext import Application, MessageHandler, CommandHandler, filters, ContextTypes
 
+try:
+    from . import (
+        attachments,
+        chats,
+        coalescer,
+        latency_trace,
+        log_writer,
+        metrics,
+        mind_queue,
+        queue_writer,
+        session_log,
+        update_checkpoint,
+        webhook,
+    )
+except ImportError:  # run directly as /opt/scripts/telegram/bot.py
+    import attachments
+    import chats
+    import coalescer
+    import latency_trace
+    import log_writer
+    import metrics
+    import mind_queue
+    import queue_writer
+    import session_log
+    import update_checkpoint
+    import webhook
+
 # Configuration from environment
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
-ALLOWED_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
+ALLOWED_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")  # comma-separated; the first is the primary chat
+API_BASE_URL = os.environ.get("TELEGRAM_API_BASE_URL")
+API_FILE_URL = os.environ.get("TELEGRAM_API_FILE_URL")  # file downloads, when not on api.telegram.org
 
 # Paths
 MIND_DIR = Path.home() / "workspace" / "mind"
@@ -32,6 +71,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Live counters behind /status and the metrics endpoint
+stats = metrics.BotMetrics()
+
+# Per-message latency trace (received -> queued -> picked up -> replied)
+tracer = latency_trace.Tracer(latency_trace.TraceLog())
+
+# Handled update_ids, so restarts neither lose nor repeat messages
+checkpoint = update_checkpoint.UpdateCheckpoint()
+
+# Queue database when MIND_QUEUE_BACKEND=sqlite (opened in main); None writes .msg files
+message_db: mind_queue.SqliteQueue | None = None
+
+# Merges quick runs of messages from one chat into a single queue entry
+inbound = coalescer.InboundCoalescer(lambda messages: queue_batch(messages))
+
 
 def ensure_directories():
     """Create required directories if they don't exist."""
@@ -40,42 +94,81 @@ def ensure_directories():
 
 
 def is_authorized(chat_id: int) -> bool:
-    """Check if the chat ID is authorized."""
+    """Check if the chat ID is on the allow-list."""
     if not ALLOWED_CHAT_ID:
         logger.warning("TELEGRAM_CHAT_ID not set - accepting all messages")
         return True
-    return str(chat_id) == str(ALLOWED_CHAT_ID)
+    return str(chat_id) in chats.parse_chat_ids(ALLOWED_CHAT_ID)
 
 
-def queue_message(text: str, username: str) -> str:
+def queue_message(text: str, username: str, trace_id: str | None = None, chat_id: int | None = None) -> str:
     """Write message to queue and return the filename."""
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    filename = f"{timestamp}.msg"
-    filepath = MESSAGE_QUEUE_DIR / filename
-
-    content = f"From: {username}\nTime: {datetime.now().isoformat()}\n\n{text}"
-    filepath.write_text(content)
-
-    logger.info(f"Queued message: {filename}")
-    return filename
-
-
-def log_conversation(direction: str, text: str, username: str = "user"):
-    """Log message to daily conversation file."""
-    today = datetime.now().strftime("%Y-%m-%d")
-    filepath = CONVERSATIONS_DIR / f"{today}.md"
-
-    timestamp = datetime.now().strftime("%H:%M:%S")
-
-    if direction == "incoming":
-        entry = f"\n## {timestamp} - {username} (incoming)\n\n{text}\n"
+    return queue_batch([{
+        "text": text, "from": username, "time": datetime.now().isoformat(), "id": trace_id, "chat_id": chat_id,
+    }])
+
+
+def queue_batch(messages: list[dict]) -> str:
+    """Queue a coalesced burst as one entry in its chat's shard and return its name.
+
+    The name is the .msg file name, or "#<id>" on the SQLite backend.
+    """
+    chat_id = messages[0].get("chat_id")
+    chat = chats.shard(chat_id, ALLOWED_CHAT_ID)
+    if message_db is not None:
+        envelope = {"chat_id": chat_id, "messages": messages}
+        if chat:
+            envelope["chat"] = chat
+        name = mind_queue.label(message_db.enqueue(envelope))
     else:
-        entry = f"\n## {timestamp} - Claude (outgoing)\n\n{text}\n"
-
-    with open(filepath, "a") as f:
-        f.write(entry)
-
-
+        content = queue_writer.format_batch(messages, chat)
+        name = queue_writer.write_message(content, queue_dir=MESSAGE_QUEUE_DIR, now=datetime.now(), chat=chat)
+    stats.queue_depth.inc()
+    stats.queue_lanes.inc(lane="interactive")
+    for message in messages:
+        if message.get("id"):
+            tracer.queued(message["id"], name, chat)
+
+    logger.info(f"Queued message: {name}")
+    return name
+
+
+def log_conversation(direction: str, text: str, username: str = "user", chat_id: int | None = None):
+    """Log message to the chat's daily conversation file.
+
+    While the bot is running this only buffers the entry; the log writer
+    thread commits it on its next flush.
+    """
+    now = datetime.now()
+    entry = log_writer.format_entry(direction, text, username, now)
+    log_writer.log_entry(entry, now, CONVERSATIONS_DIR, direction, chats.shard(chat_id, ALLOWED_CHAT_ID))
+
+
+def timed(name: str):
+    """Record a handler's run time in the handler latency histogram."""
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            start = time.perf_counter()
+            try:
+                return await handler(update, context)
+            finally:
+                stats.handler_latency.observe(time.perf_counter() - start, handler=name)
+        return wrapper
+    return decorator
+
+
+def _ago(seconds: float | None) -> str:
+    if seconds is None:
+        return "never"
+    if seconds < 120:
+        return f"{seconds:.0f}s ago"
+    if seconds < 7200:
+        return f"{seconds / 60:.0f}m ago"
+    return f"{seconds / 3600:.1f}h ago"
+
+
+@timed("message")
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle incoming messages."""
     chat_id = update.effective_chat.id
@@ -88,17 +181,84 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     logger.info(f"Received message from {username}: {text[:50]}...")
-
-    # Queue the message for Claude
-    queue_message(text, username)
+    trace_id = tracer.received(update.message.date)
+
+    # Stage the message for Claude; a burst from this chat is queued as one entry
+    await inbound.add(chat_id, {
+        "text": text,
+        "from": username,
+        "time": datetime.now().isoformat(),
+        "id": trace_id,
+        "chat_id": chat_id,
+        "message_id": update.message.message_id,
+        "update_id": update.update_id,
+    })
 
     # Log the conversation
-    log_conversation("incoming", text, username)
+    log_conversation("incoming", text, username, chat_id)
 
     # Acknowledge receipt (optional - can be removed for more natural flow)
     # await update.message.reply_text("Message received. Claude will respond shortly.")
 
 
+@timed("media")
+async def handle_media(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handle photos, documents, voice notes and other files.
+
+    The file is streamed into the attachment store; the queue entry only
+    references it.
+    """
+    chat_id = update.effective_chat.id
+    username = update.effective_user.username or update.effective_user.first_name or "unknown"
+    message = update.message
+
+    if not is_authorized(chat_id):
+        logger.warning(f"Unauthorized media from chat_id={chat_id}, user={username}")
+        await message.reply_text("Unauthorized. This bot is private.")
+        return
+
+    found = attachments.media_of(message)
+    if found is None:
+        return
+    kind, media = found
+    trace_id = tracer.received(message.date)
+
+    try:
+        telegram_file = await context.bot.get_file(media.file_id)
+        stored = await attachments.download(
+            telegram_file, attachments.AttachmentStore(), attachments.suffix_for(kind, media))
+    except (TelegramError, httpx.HTTPError, OSError, ValueError) as e:
+        logger.error(f"Failed to save {kind} from {username}: {e}")
+        await message.reply_text(f"Couldn't save that {kind.replace('_', ' ')}: {e}")
+        return
+    logger.info(f"Received {kind} from {username}: {stored['path']} "
+                f"({stored['size']} bytes{'' if stored['stored'] else ', already stored'})")
+
+    attachment = {
+        "kind": kind,
+        "path": stored["path"],
+        "size": stored["size"],
+        "sha256": stored["sha256"],
+        "name": getattr(media, "file_name", None),
+        "mime": getattr(media, "mime_type", None),
+    }
+    text = message.caption or ""
+    await inbound.add(chat_id, {
+        "text": text,
+        "attachment": attachment,
+        "from": username,
+        "time": datetime.now().isoformat(),
+        "id": trace_id,
+        "chat_id": chat_id,
+        "message_id": message.message_id,
+        "update_id": update.update_id,
+    })
+
+    log_conversation(
+        "incoming", queue_writer.message_text({"text": text, "attachment": attachment}), username, chat_id)
+
+
+@timed("start")
 async def handle_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle /start command."""
     chat_id = update.effective_chat.id
@@ -114,54 +274,150 @@ async def handle_start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
 
 
+@timed("status")
 async def handle_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle /status command."""
+    """Handle /status command (live counters and the session log header; never scans the filesystem)."""
     chat_id = update.effective_chat.id
 
     if not is_authorized(chat_id):
         await update.message.reply_text("Unauthorized.")
         return
 
-    # Count queued messages
-    queue_count = len(list(MESSAGE_QUEUE_DIR.glob("*.msg")))
-
-    # Get today's conversation file size
-    today = datetime.now().strftime("%Y-%m-%d")
-    conv_file = CONVERSATIONS_DIR / f"{today}.md"
-    conv_size = conv_file.stat().st_size if conv_file.exists() else 0
-
+    summary = stats.summary()
+    session = session_log.read_header()
+    if session and session["last_output"]:
+        now = time.time()
+        last_turn = f" (last {_ago(now - session['last_turn'])})" if session["last_turn"] else ""
+        session_line = f"output {_ago(now - session['last_output'])}, {session['turns']} turns{last_turn}"
+    else:
+        session_line = "no output captured"
+    lanes = ", ".join(f"{lane} {n}" for lane, n in summary["queue_lanes"].items())
     await update.message.reply_text(
         f"Status:\n"
-        f"- Messages in queue: {queue_count}\n"
-        f"- Today's conversation log: {conv_size} bytes"
+        f"- Messages in queue: {summary['queue_depth']} ({lanes})\n"
+        f"- Messages in/out: {summary['incoming']}/{summary['outgoing']}\n"
+        f"- Written to conversation log: {summary['log_bytes']} bytes\n"
+        f"- Last activity: {_ago(summary['last_activity_ago'])}\n"
+        f"- Message handling: {summary['message_latency'] * 1000:.1f} ms average\n"
+        f"- Session: {session_line}\n"
+        f"- Uptime: {_ago(summary['uptime']).removesuffix(' ago')}"
     )
 
 
+def build_application() -> Application:
+    """Create the Application with all handlers (shared by polling and webhook mode).
+
+    Updates of different chats run concurrently, each chat's in order.
+    """
+    builder = Application.builder().token(BOT_TOKEN).concurrent_updates(
+        chats.ChatUpdateProcessor(checkpoint=checkpoint))
+    if API_BASE_URL:
+        builder = builder.base_url(API_BASE_URL)
+    if API_FILE_URL:
+        builder = builder.base_file_url(API_FILE_URL)
+    app = builder.build()
+
+    app.add_handler(CommandHandler("start", handle_start))
+    app.add_handler(CommandHandler("status", handle_status))
+    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
+    app.add_handler(MessageHandler(
+        filters.PHOTO | filters.Document.ALL | filters.AUDIO | filters.VOICE | filters.VIDEO | filters.VIDEO_NOTE
+        | filters.ANIMATION,
+        handle_media,
+    ))
+    update_checkpoint.install(app, checkpoint)
+    return app
+
+
+def run_updates(use_webhook: bool):
+    """Receive updates until SIGTERM/SIGINT, by webhook if asked and possible."""
+    application = build_application()
+    if use_webhook and not webhook.WEBHOOK_URL:
+        logger.warning("--webhook given but TELEGRAM_WEBHOOK_URL is not set; polling instead")
+    elif use_webhook:
+        try:
+            webhook.run(application)
+            return
+        except (TelegramError, OSError) as e:
+            logger.warning(f"Webhook mode unavailable ({e}); falling back to polling")
+
+    logger.info("Bot started, polling for messages...")
+    # Updates sent while the bot was down are delivered now; the checkpoint skips repeats
+    application.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=False)
+
+
 def main():
     """Start the bot."""
+    global message_db
     if not BOT_TOKEN:
         logger.error("TELEGRAM_BOT_TOKEN environment variable not set")
         sys.exit(1)
 
     ensure_directories()
+    if mind_queue.BACKEND == "sqlite":
+        message_db = mind_queue.SqliteQueue()
+        logger.info(f"Queueing into {message_db.path}")
+    # Messages staged when the bot last stopped (crash mid-burst)
+    inbound.flush_staged()
 
     logger.info("Starting Telegram bot...")
-    if ALLOWED_CHAT_ID:
-        logger.info(f"Authorized chat ID: {ALLOWED_CHAT_ID}")
+    try:
+        allowed = chats.parse_chat_ids(ALLOWED_CHAT_ID)
+    except ValueError as e:
+        logger.error(f"Invalid TELEGRAM_CHAT_ID: {e}")
+        sys.exit(1)
+    if allowed:
+        logger.info(f"Authorized chat IDs: {', '.join(allowed)} (primary {allowed[0]})")
     else:
         logger.warning("No TELEGRAM_CHAT_ID set - bot will accept messages from anyone!")
 
-    # Create application
-    app = Application.builder().token(BOT_TOKEN).build()
-
-    # Add handlers
-    app.add_handler(CommandHandler("start", handle_start))
-    app.add_handler(CommandHandler("status", handle_status))
-    app.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
-
-    # Start polling
-    logger.info("Bot started, polling for messages...")
-    app.run_polling(allowed_updates=Update.ALL_TYPES, drop_pending_updates=True)
+    # Single writer for conversations/, shared with send-telegram via a local socket.
+    # Outgoing entries are how the tracer learns that a reply went out.
+    def on_entry(direction: str, nbytes: int, day: str):
+        stats.record_message(direction, nbytes)
+        tracer.on_entry(direction, nbytes, day)
+
+    conversation_log = log_writer.ConversationLog(CONVERSATIONS_DIR, on_entry=on_entry)
+    conversation_log.start()
+    try:
+        log_server = log_writer.LogSocketServer(conversation_log)
+        log_server.start()
+    except OSError as e:
+        logger.warning(f"Conversation log socket unavailable ({e}); send-telegram will append directly")
+        log_server = None
+
+    # Live queue depth (rescans only when files come and go) and the metrics endpoint.
+    # The same watch tells the tracer when the session reads a queued message.
+    tracer.adopt(MESSAGE_QUEUE_DIR)
+    depth_tracker = metrics.QueueDepthTracker(
+        MESSAGE_QUEUE_DIR, stats.queue_depth, on_picked_up=tracer.picked_up,
+        source=mind_queue.DatabaseWatcher(message_db) if message_db is not None else None,
+        lane_gauge=stats.queue_lanes,
+    )
+    tracer.reply_to_unread = depth_tracker.polling
+    depth_tracker.start()
+    metrics_server = None
+    if metrics.METRICS_PORT:
+        try:
+            metrics_server = metrics.MetricsServer(stats.registry)
+            metrics_server.start()
+            logger.info(f"Metrics at http://{metrics.METRICS_HOST}:{metrics.METRICS_PORT}/metrics")
+        except OSError as e:
+            logger.warning(f"Metrics endpoint unavailable ({e})")
+
+    try:
+        run_updates("--webhook" in sys.argv[1:])
+    finally:
+        # Both modes return on SIGTERM/SIGINT; drain everything still buffered
+        inbound.flush_staged()
+        if metrics_server is not None:
+            metrics_server.stop()
+        depth_tracker.stop()
+        if log_server is not None:
+            log_server.stop()
+        conversation_log.close()
+        if message_db is not None:
+            message_db.close()
 
 
 if __name__ == "__main__":
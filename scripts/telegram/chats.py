@@ -0,0 +1,143 @@
+#!/opt/venv/bin/python
+"""
+Chat allow-list and per-chat update scheduling for the bot.
+
+TELEGRAM_CHAT_ID is a comma-separated allow-list of chat ids (people and
+group chats). The first one is the primary chat: send-telegram replies there
+by default and its history stays in conversations/YYYY-MM-DD.md and untagged
+queue entries, exactly as with a single chat. Every other chat is a shard:
+its queue entries carry a "+<chat id>" tag (see queue_writer) and its
+conversation log lives in conversations/chat-<chat id>/.
+
+ChatUpdateProcessor lets the Application handle updates concurrently while
+keeping each chat's updates in order: a chat never has more than one update
+in its handlers, and chats with waiting updates take turns, so one busy chat
+cannot hold up the others.
+"""
+
+import asyncio
+import os
+from collections import deque
+from collections.abc import Awaitable
+from typing import Any
+
+from telegram.ext import BaseUpdateProcessor
+
+# Updates handled at the same time (each from a different chat)
+CONCURRENCY = int(os.environ.get("MIND_BOT_CONCURRENCY", "4"))
+
+# Updates the Application may hand over before it waits for one to finish
+MAX_PENDING = int(os.environ.get("MIND_BOT_MAX_PENDING", "256"))
+
+
+def parse_chat_ids(value: str | None) -> list[str]:
+    """Chat ids of a TELEGRAM_CHAT_ID value, in order ("123, -100456" -> ["123", "-100456"])."""
+    ids = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.lstrip("-").isdigit():
+            raise ValueError(f"Not a chat id: {part!r}")
+        if part not in ids:
+            ids.append(part)
+    return ids
+
+
+def primary_chat(allowed: str | None) -> str | None:
+    """The first chat of an allow-list (the default for replies), or None if it is empty."""
+    ids = parse_chat_ids(allowed)
+    return ids[0] if ids else None
+
+
+def shard(chat_id: int | str | None, allowed: str | None) -> str:
+    """Queue and log shard of a chat: "" for the primary chat (or no chat), else the chat id."""
+    if chat_id is None:
+        return ""
+    chat = str(chat_id)
+    return "" if chat == primary_chat(allowed) else chat
+
+
+class ChatUpdateProcessor(BaseUpdateProcessor):
+    """Runs updates of different chats concurrently, each chat's in arrival order.
+
+    Every chat has a FIFO of waiting updates. Up to `workers` chats run one
+    update each; when a chat's update finishes and it has more waiting, it
+    goes to the back of the ring, behind every other chat that is waiting.
+    Updates without a chat (e.g. poll answers) share one slot.
+
+    If a checkpoint is given, updates are registered with it while in flight
+    so it never confirms an update_id past one that is still being handled.
+    """
+
+    def __init__(self, workers: int = CONCURRENCY, max_pending: int = MAX_PENDING, checkpoint=None):
+        super().__init__(max(max_pending, workers))
+        self.workers = max(1, workers)
+        self.checkpoint = checkpoint
+        self._queues: dict[Any, deque[tuple[Awaitable[Any], asyncio.Future]]] = {}
+        self._ring: deque[Any] = deque()  # chats with waiting updates and none running, in turn order
+        self._running = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    @staticmethod
+    def chat_key(update: object):
+        chat = getattr(update, "effective_chat", None)
+        return chat.id if chat is not None else None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        update_id = getattr(update, "update_id", None)
+        if self.checkpoint is not None and update_id is not None:
+            self.checkpoint.begin(update_id)
+        try:
+            key = self.chat_key(update)
+            future = asyncio.get_running_loop().create_future()
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = self._queues[key] = deque()
+                self._ring.append(key)
+            queue.append((coroutine, future))
+            self._dispatch()
+            await future
+        finally:
+            if self.checkpoint is not None and update_id is not None:
+                self.checkpoint.end(update_id)
+
+    def _dispatch(self):
+        while self._running < self.workers and self._ring:
+            key = self._ring.popleft()
+            coroutine, future = self._queues[key].popleft()
+            self._running += 1
+            task = asyncio.get_running_loop().create_task(self._run(key, coroutine, future))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key, coroutine: Awaitable[Any], future: asyncio.Future):
+        try:
+            await coroutine
+        except BaseException as e:  # handed to the waiting do_process_update
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(None)
+        finally:
+            self._running -= 1
+            if self._queues[key]:
+                self._ring.append(key)
+            else:
+                del self._queues[key]
+            self._dispatch()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        # Anything never started is dropped; the checkpoint has not confirmed it
+        for queue in self._queues.values():
+            for coroutine, future in queue:
+                getattr(coroutine, "close", lambda: None)()
+                future.cancel()
+            queue.clear()
+        for key in self._ring:
+            del self._queues[key]
+        self._ring.clear()
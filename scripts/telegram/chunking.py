@@ -0,0 +1,178 @@
+"""
+Long reply handling for send-telegram.
+
+Telegram rejects messages over 4096 characters. split_message() breaks long
+text on paragraph boundaries, never inside a fenced code block unless the
+block alone is too long (then the fence is closed and reopened around the
+cut). StreamingReply sends the first part of a reply as soon as it arrives
+and edits that message in place as more text streams in, moving on to a new
+message whenever the current one fills up.
+"""
+
+import time
+from collections.abc import Callable
+
+# Telegram's limit, counted in UTF-16 code units
+TELEGRAM_LIMIT = 4096
+
+# Room kept free for fence lines added when a code block is cut
+_FENCE_RESERVE = 64
+
+# Minimum seconds between edits of a streaming message
+EDIT_INTERVAL = 1.0
+
+
+def text_length(text: str) -> int:
+    """Length of text as Telegram counts it (UTF-16 code units)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _is_fence(line: str) -> bool:
+    return line.lstrip().startswith("```")
+
+
+def _blocks(text: str) -> list[str]:
+    """Split text into paragraphs, keeping each fenced code block whole."""
+    blocks, current = [], []
+    in_fence = False
+    for line in text.split("\n"):
+        if _is_fence(line):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+            continue
+        current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def _hard_wrap(line: str, width: int) -> list[str]:
+    if text_length(line) <= width:
+        return [line]
+    pieces = []
+    while text_length(line) > width:
+        cut = width
+        while text_length(line[:cut]) > width:
+            cut -= 1
+        pieces.append(line[:cut])
+        line = line[cut:]
+    pieces.append(line)
+    return pieces
+
+
+def _split_block(block: str, limit: int) -> list[str]:
+    """Split one oversized paragraph or code block on line boundaries."""
+    pieces: list[str] = []
+    current = ""
+    opener: str | None = None  # fence line of the code block we are inside
+
+    for raw_line in block.split("\n"):
+        # Pieces of a hard-wrapped line continue it rather than start new lines
+        for i, line in enumerate(_hard_wrap(raw_line, limit - _FENCE_RESERVE)):
+            sep = "\n" if current and i == 0 else ""
+            reserve = 4 if opener else 0  # "\n```"
+            if current and text_length(current + sep + line) + reserve > limit:
+                pieces.append(current + ("\n```" if opener else ""))
+                current, sep = (opener, "\n") if opener else ("", "")
+            current += sep + line
+        if _is_fence(raw_line):
+            opener = None if opener else raw_line.strip()
+
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_message(text: str, limit: int = TELEGRAM_LIMIT) -> list[str]:
+    """Split text into chunks Telegram accepts, preferring paragraph breaks."""
+    if text_length(text) <= limit:
+        return [text]
+
+    chunks: list[str] = []
+    current = ""
+    for block in _blocks(text):
+        candidate = f"{current}\n\n{block}" if current else block
+        if text_length(candidate) <= limit:
+            current = candidate
+            continue
+
+        if current:
+            chunks.append(current)
+            current = ""
+        if text_length(block) <= limit:
+            current = block
+        else:
+            pieces = _split_block(block, limit)
+            chunks.extend(pieces[:-1])
+            current = pieces[-1]
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class StreamingReply:
+    """Progressively sends text to one chat, editing messages in place.
+
+    All sends and edits go through an OutboundScheduler, so streaming stays
+    within the flood limits.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        chat_id,
+        edit_interval: float = EDIT_INTERVAL,
+        limit: int = TELEGRAM_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.scheduler = scheduler
+        self.chat_id = chat_id
+        self.edit_interval = edit_interval
+        self.limit = limit
+        self._clock = clock
+        self.text = ""            # everything received so far
+        self.messages_sent = 0
+        self._pending = ""        # text belonging to the message being edited
+        self._shown = ""          # what that message currently displays
+        self._message_id = None
+        self._last_update = float("-inf")
+
+    async def append(self, delta: str):
+        """Add streamed text; sends or edits when the throttle allows."""
+        self.text += delta
+        self._pending += delta
+        if self._clock() - self._last_update >= self.edit_interval:
+            await self._sync()
+
+    async def finish(self) -> str:
+        """Flush everything still pending and return the full text."""
+        await self._sync()
+        return self.text
+
+    async def _sync(self):
+        if not self._pending.strip():
+            return
+
+        chunks = split_message(self._pending, self.limit)
+        for chunk in chunks[:-1]:
+            await self._show(chunk)
+            self._message_id = None  # that message is full; start a new one
+            self._shown = ""
+        self._pending = chunks[-1]
+        await self._show(self._pending)
+        self._last_update = self._clock()
+
+    async def _show(self, text: str):
+        if self._message_id is None:
+            message = await self.scheduler.send(self.chat_id, text)
+            self._message_id = message.message_id
+            self.messages_sent += 1
+        elif text != self._shown:
+            await self.scheduler.send(
+                self.chat_id, text, method="edit_message_text", message_id=self._message_id
+            )
+        self._shown = text
@@ -0,0 +1,181 @@
+#!/opt/venv/bin/python
+"""
+Inbound burst coalescing for the bot.
+
+People often type one thought as several quick Telegram messages. Instead of
+queueing each as its own .msg (one model turn each), messages from the same
+chat are held until the chat has been quiet for MIND_COALESCE_WINDOW seconds
+(or the burst is MIND_COALESCE_MAX_WAIT old) and then queued as one entry
+that keeps every original timestamp.
+
+Each chat also has a token bucket for queue entries (MIND_INBOUND_RATE per
+second, bursts of MIND_INBOUND_BURST). When it is empty, a finished burst is
+not queued yet; further messages spill into it until a token is available.
+
+Held messages are staged on disk (state/inbound/<chat>.jsonl) before the
+handler returns, so nothing is lost if the bot stops mid-burst: staged
+messages are queued at the next start (and on a clean shutdown).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+try:
+    from . import outbound, queue_writer
+except ImportError:  # run directly from /opt/scripts/telegram/
+    import outbound
+    import queue_writer
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+STAGING_DIR = MIND_DIR / "state" / "inbound"
+
+# Seconds of quiet that end a burst (0 queues every message at once)
+COALESCE_WINDOW = float(os.environ.get("MIND_COALESCE_WINDOW", "3"))
+# Longest a burst is held while messages keep arriving
+COALESCE_MAX_WAIT = float(os.environ.get("MIND_COALESCE_MAX_WAIT", "15"))
+
+# Queue entries per chat (per second, burst); a rate of 0 disables the bucket
+INBOUND_RATE = float(os.environ.get("MIND_INBOUND_RATE", "0.2"))
+INBOUND_BURST = float(os.environ.get("MIND_INBOUND_BURST", "3"))
+
+logger = logging.getLogger(__name__)
+
+
+class _Burst:
+    def __init__(self, now: float):
+        self.first = now
+        self.last = now
+        self.count = 0
+
+
+class InboundCoalescer:
+    """Merges consecutive messages per chat into single queue entries.
+
+    write_entry is called (in a worker thread) with the list of staged
+    messages and must queue them as one entry, returning its file name.
+    """
+
+    def __init__(
+        self,
+        write_entry: Callable[[list[dict]], str],
+        staging_dir: Path | None = None,
+        window: float = COALESCE_WINDOW,
+        max_wait: float = COALESCE_MAX_WAIT,
+        rate: float = INBOUND_RATE,
+        burst: float = INBOUND_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.write_entry = write_entry
+        self.staging_dir = staging_dir or STAGING_DIR
+        self.window = window
+        self.max_wait = max_wait
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._bursts: dict[str, _Burst] = {}
+        self._buckets: dict[str, outbound.TokenBucket] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._timers: dict[str, asyncio.Task] = {}
+
+    def pending(self) -> int:
+        """Messages held in unfinished bursts."""
+        return sum(b.count for b in self._bursts.values())
+
+    async def add(self, chat_id, message: dict):
+        """Stage one message ({"text", "from", "time", "id"}) for chat_id."""
+        chat = str(chat_id)
+        lock = self._locks.setdefault(chat, asyncio.Lock())
+        async with lock:
+            await asyncio.to_thread(self._stage, chat, message)
+            now = self._clock()
+            burst = self._bursts.setdefault(chat, _Burst(now))
+            burst.last = now
+            burst.count += 1
+            if self._due(chat) <= 0:
+                await self._flush(chat)
+            elif chat not in self._timers:
+                self._timers[chat] = asyncio.create_task(self._wait_and_flush(chat))
+
+    def _staging_path(self, chat: str) -> Path:
+        return self.staging_dir / f"{chat}.jsonl"
+
+    def _stage(self, chat: str, message: dict):
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._staging_path(chat), "a", encoding="utf-8") as f:
+            f.write(json.dumps(message) + "\n")
+            f.flush()
+            if queue_writer.FSYNC_POLICY != "none":
+                os.fsync(f.fileno())
+
+    def _bucket(self, chat: str) -> outbound.TokenBucket | None:
+        if self.rate <= 0:
+            return None
+        if chat not in self._buckets:
+            self._buckets[chat] = outbound.TokenBucket(self.rate, self.burst, self._clock)
+        return self._buckets[chat]
+
+    def _due(self, chat: str) -> float:
+        """Seconds until the chat's burst may be queued."""
+        burst = self._bursts[chat]
+        now = self._clock()
+        ready = max(0.0, min(burst.last + self.window, burst.first + self.max_wait) - now)
+        bucket = self._bucket(chat)
+        return max(ready, bucket.wait_time() if bucket else 0.0)
+
+    async def _wait_and_flush(self, chat: str):
+        while chat in self._bursts:  # flush_staged() may have taken the burst
+            delay = self._due(chat)
+            if delay > 0:
+                await self._sleep(delay)
+                continue
+            async with self._locks[chat]:
+                if self._due(chat) > 0:
+                    continue  # a message arrived meanwhile and extended the burst
+                await self._flush(chat)
+                return
+
+    async def _flush(self, chat: str):
+        """Queue the chat's staged messages as one entry (caller holds the lock)."""
+        self._bursts.pop(chat, None)
+        timer = self._timers.pop(chat, None)
+        if timer is not None and timer is not asyncio.current_task():
+            timer.cancel()
+        bucket = self._bucket(chat)
+        if bucket is not None:
+            bucket.consume()
+        await asyncio.to_thread(self._flush_file, self._staging_path(chat))
+
+    def _flush_file(self, path: Path) -> str | None:
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return None
+        messages = []
+        for line in lines:
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping torn line in {path}")
+        filename = self.write_entry(messages) if messages else None
+        path.unlink()
+        if len(messages) > 1:
+            logger.info(f"Coalesced {len(messages)} messages into {filename}")
+        return filename
+
+    def flush_staged(self) -> int:
+        """Queue every staged burst now (start-up and shutdown, no event loop needed)."""
+        flushed = 0
+        for path in sorted(self.staging_dir.glob("*.jsonl")):
+            if self._flush_file(path):
+                flushed += 1
+        self._bursts.clear()
+        self._timers.clear()
+        return flushed
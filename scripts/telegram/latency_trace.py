@@ -0,0 +1,304 @@
+#!/opt/venv/bin/python
+"""
+End-to-end latency tracing from Telegram receipt to reply.
+
+Every inbound message gets a trace ID, written into its .msg file as an
+"Id:" header (a coalesced burst lists every ID it holds). The bot appends
+one JSON line per stage to traces/YYYY-MM-DD.jsonl (append-only, never
+rewritten):
+
+    received    the update reached the bot ("sent" holds Telegram's timestamp)
+    queued      the .msg file is in message_queue/
+    picked_up   the .msg file was first read (or removed) by the session
+    replied     the next send-telegram reply went out
+
+send-telegram does not know which message it answers, so a reply is
+attributed to every message of the same chat that had been picked up and not
+yet answered. Messages still unanswered after TRACE_TIMEOUT are dropped
+(they never get a "replied" stage).
+
+Usage:
+    mind-latency                       # p50/p95/p99 per stage, last 7 days
+    mind-latency --days 30
+    mind-latency --since 2025-01-01
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+try:
+    from . import queue_writer
+except ImportError:  # run directly as /opt/scripts/telegram/latency_trace.py
+    import queue_writer
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+TRACE_DIR = MIND_DIR / "traces"
+
+# Reported intervals: (name, from stage, to stage)
+INTERVALS = (
+    ("telegram", "sent", "received"),
+    ("queue", "received", "queued"),
+    ("wait", "queued", "picked_up"),
+    ("respond", "picked_up", "replied"),
+    ("total", "sent", "replied"),  # what the user waits
+)
+PERCENTILES = (50, 95, 99)
+
+# Seconds a queued message waits for its reply before the tracer forgets it
+TRACE_TIMEOUT = float(os.environ.get("MIND_TRACE_TIMEOUT", str(24 * 3600)))
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def chat_of_day(day: str) -> str:
+    """Chat shard of a conversation log day key ("chat-123/2025-01-15" -> "123", primary -> "")."""
+    folder, _, _ = day.rpartition("/")
+    return folder.removeprefix("chat-")
+
+
+def read_trace_ids(path: Path) -> list[str]:
+    """Return the IDs in a queue file's Id header, if it has one."""
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.strip():
+                    break
+                if line.startswith("Id: "):
+                    return line[4:].split()
+    except OSError:
+        pass
+    return []
+
+
+class TraceLog:
+    """Append-only JSON-lines log of trace events, one file per day."""
+
+    def __init__(self, trace_dir: Path | None = None):
+        self.trace_dir = trace_dir or TRACE_DIR
+
+    def record(self, trace_id: str, stage: str, at: float, **fields):
+        event = {"id": trace_id, "stage": stage, "t": round(at, 6), **fields}
+        line = (json.dumps(event, separators=(",", ":")) + "\n").encode("utf-8")
+        path = self.trace_dir / f"{datetime.fromtimestamp(at):%Y-%m-%d}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One O_APPEND write per event keeps lines whole across threads
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+
+
+class Tracer:
+    """Follows inbound messages through the queue and records each stage.
+
+    Lives in the bot: handle_message reports receipt and queueing, the queue
+    tracker reports files being read or removed, and outgoing conversation
+    log entries mark replies to their chat. With reply_to_unread (used when
+    the queue is polled and reads cannot be seen) a reply also answers
+    messages that were never seen being picked up.
+    """
+
+    def __init__(
+        self,
+        log: TraceLog,
+        clock: Callable[[], float] = time.time,
+        reply_to_unread: bool = False,
+        timeout: float = TRACE_TIMEOUT,
+    ):
+        self.log = log
+        self.reply_to_unread = reply_to_unread
+        self.timeout = timeout
+        self._clock = clock
+        self._files: dict[str, list[str]] = {}  # queue file name -> trace ids
+        # trace id -> [chat, picked up, queued at], in arrival order
+        self._awaiting: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def received(self, sent_at: datetime | None = None) -> str:
+        trace_id = new_trace_id()
+        fields = {"sent": round(sent_at.timestamp(), 3)} if isinstance(sent_at, datetime) else {}
+        self.log.record(trace_id, "received", self._clock(), **fields)
+        return trace_id
+
+    def queued(self, trace_id: str, filename: str, chat: str = ""):
+        """Note a message queued as filename; chat is its shard ("" for the primary chat)."""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            self._files.setdefault(filename, []).append(trace_id)
+            self._awaiting[trace_id] = [chat, False, now]
+        self.log.record(trace_id, "queued", now, file=filename)
+
+    def adopt(self, queue_dir: Path):
+        """Resume tracing messages queued before a restart."""
+        now = self._clock()
+        for path in sorted(queue_dir.glob("*.msg")):
+            trace_ids = read_trace_ids(path)
+            with self._lock:
+                for trace_id in trace_ids:
+                    self._files.setdefault(path.name, []).append(trace_id)
+                    chat = queue_writer.chat_of(path.name)
+                    self._awaiting.setdefault(trace_id, [chat, False, now])
+
+    def picked_up(self, filename: str):
+        """Note the first read or removal of a queue file (repeats are ignored)."""
+        with self._lock:
+            trace_ids = [
+                t for t in self._files.pop(filename, [])
+                if t in self._awaiting and not self._awaiting[t][1]
+            ]
+            for trace_id in trace_ids:
+                self._awaiting[trace_id][1] = True
+        now = self._clock()
+        for trace_id in trace_ids:
+            self.log.record(trace_id, "picked_up", now)
+
+    def replied(self, chat: str | None = None):
+        """Mark the picked up messages of chat (None: of every chat) as answered."""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            answered = [
+                t for t, (for_chat, seen, _) in self._awaiting.items()
+                if (chat is None or for_chat == chat) and (seen or self.reply_to_unread)
+            ]
+            for trace_id in answered:
+                del self._awaiting[trace_id]
+        for trace_id in answered:
+            self.log.record(trace_id, "replied", now)
+
+    def on_entry(self, direction: str, _nbytes: int, day: str = ""):
+        """ConversationLog hook: an outgoing entry means a reply was sent to the day file's chat."""
+        if direction == "outgoing":
+            self.replied(chat_of_day(day))
+
+    def _expire(self, now: float):
+        """Forget messages queued more than timeout ago (caller holds the lock)."""
+        expired = []
+        for trace_id, (_, _, since) in self._awaiting.items():
+            if now - since <= self.timeout:
+                break  # arrival order: the rest are newer
+            expired.append(trace_id)
+        if not expired:
+            return
+        for trace_id in expired:
+            del self._awaiting[trace_id]
+        self._files = {
+            name: trace_ids for name, trace_ids in self._files.items()
+            if any(t in self._awaiting for t in trace_ids)
+        }
+
+
+def load_traces(trace_dir: Path, since: date | None = None) -> dict[str, dict]:
+    """Merge trace events into {id: {stage: time, ...}} for messages received since the given day."""
+    traces: dict[str, dict] = defaultdict(dict)
+    # A message received late on one day can be answered on the next
+    first_file = f"{since - timedelta(days=1):%Y-%m-%d}" if since else ""
+    for path in sorted(trace_dir.glob("*.jsonl")):
+        if path.stem < first_file:
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                    trace = traces[event["id"]]
+                    trace.setdefault(event["stage"], event["t"])
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn or foreign line
+                if "sent" in event:
+                    trace.setdefault("sent", event["sent"])
+
+    return {
+        trace_id: trace for trace_id, trace in traces.items()
+        if "received" in trace and (since is None or date.fromtimestamp(trace["received"]) >= since)
+    }
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(traces: dict[str, dict]) -> dict[str, dict[str, list[float]]]:
+    """Group interval durations by received day (plus an "all" row), sorted."""
+    by_day: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+    for trace in traces.values():
+        day = f"{date.fromtimestamp(trace['received'])}"
+        for name, start, end in INTERVALS:
+            began = trace.get(start)
+            if began is None and name == "total":
+                began = trace["received"]  # no Telegram timestamp: count from receipt
+            if began is None or end not in trace:
+                continue
+            duration = max(0.0, trace[end] - began)
+            by_day[day][name].append(duration)
+            by_day["all"][name].append(duration)
+    for stages in by_day.values():
+        for values in stages.values():
+            values.sort()
+    return by_day
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    if seconds < 120:
+        return f"{seconds:.1f}s"
+    if seconds < 7200:
+        return f"{seconds / 60:.1f}m"
+    return f"{seconds / 3600:.1f}h"
+
+
+def format_report(summary: dict[str, dict[str, list[float]]]) -> str:
+    header = f"{'day':<12}{'stage':<10}{'count':>7}" + "".join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+    lines = [header]
+    days = sorted(d for d in summary if d != "all") + (["all"] if "all" in summary else [])
+    for day in days:
+        for name, _, _ in INTERVALS:
+            values = summary[day].get(name)
+            if not values:
+                continue
+            cells = "".join(f"{format_duration(percentile(values, p)):>9}" for p in PERCENTILES)
+            lines.append(f"{day:<12}{name:<10}{len(values):>7}{cells}")
+    return "\n".join(lines)
+
+
+def parse_day(value: str) -> date:
+    """A YYYY-MM-DD argument as a date."""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a day like 2025-01-15, got {value!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report message latency per stage and per day")
+    parser.add_argument("--days", type=int, default=7, help="report the last N days (default 7)")
+    parser.add_argument("--since", type=parse_day, metavar="YYYY-MM-DD", help="report messages received since this day")
+    args = parser.parse_args()
+
+    since = args.since or date.today() - timedelta(days=args.days - 1)
+    traces = load_traces(TRACE_DIR, since)
+    if not traces:
+        print("No traced messages", file=sys.stderr)
+        sys.exit(1)
+    print(format_report(summarize(traces)))
+
+
+if __name__ == "__main__":
+    main()
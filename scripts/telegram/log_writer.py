@@ -0,0 +1,234 @@
+#!/opt/venv/bin/python
+"""
+Single-writer, group-committing conversation log.
+
+bot.py owns the writer: entries are appended to an in-memory buffer (never
+blocking the caller) and a background thread writes everything that
+accumulated once per flush interval, one write per day file. Other processes
+(send_daemon.py, send_message.py) hand their entries to the bot over a local
+Unix socket; when no writer is running, entries are appended directly under
+an exclusive file lock so concurrent writers still never interleave.
+
+Entries are keyed by day file relative to conversations/: "YYYY-MM-DD" for
+the primary chat, "chat-<id>/YYYY-MM-DD" for the others (see chats.py).
+"""
+
+import collections
+import fcntl
+import json
+import logging
+import os
+import re
+import socket
+import socketserver
+import threading
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from . import unix_socket
+except ImportError:  # run directly as /opt/scripts/telegram/log_writer.py
+    import unix_socket
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+CONVERSATIONS_DIR = MIND_DIR / "conversations"
+RUN_DIR = MIND_DIR / "run"
+SOCKET_PATH = Path(os.environ.get("MIND_LOG_SOCKET", RUN_DIR / "conversation-log.sock"))
+
+# Day file keys accepted from the socket ("2025-01-15", "chat-123/2025-01-15")
+DAY_KEY = re.compile(r"^(?:chat--?\d+/)?\d{4}-\d{2}-\d{2}$")
+
+# Group commit interval in seconds
+FLUSH_INTERVAL = float(os.environ.get("MIND_LOG_FLUSH_INTERVAL", "0.2"))
+
+logger = logging.getLogger(__name__)
+
+# The writer running in this process, if any (set by ConversationLog.start)
+_active_log: "ConversationLog | None" = None
+
+
+def format_entry(direction: str, text: str, username: str = "user", now: datetime | None = None) -> str:
+    """Render one conversation log entry."""
+    now = now or datetime.now()
+    timestamp = now.strftime("%H:%M:%S")
+
+    if direction == "incoming":
+        return f"\n## {timestamp} - {username} (incoming)\n\n{text}\n"
+    return f"\n## {timestamp} - Claude (outgoing)\n\n{text}\n"
+
+
+def append_entries(conversations_dir: Path, entries: list[tuple[str, str]]) -> int:
+    """Append (day, entry) pairs to their day files and return bytes written.
+
+    day is a key relative to conversations_dir (see DAY_KEY).
+
+    Entries for the same day are joined into a single write made under an
+    exclusive lock, so concurrent writers never interleave.
+    """
+    by_day: dict[str, list[str]] = {}
+    for day, entry in entries:
+        by_day.setdefault(day, []).append(entry)
+
+    written = 0
+    for day, day_entries in by_day.items():
+        data = "".join(day_entries)
+        path = conversations_dir / f"{day}.md"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(data)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        written += len(data.encode("utf-8"))
+    return written
+
+
+class ConversationLog:
+    """In-process buffer drained by one background writer thread.
+
+    on_entry, if given, is called with (direction, size in bytes, day) for
+    every submitted entry whose direction is known, e.g. to keep live
+    counters.
+    """
+
+    def __init__(
+        self,
+        conversations_dir: Path | None = None,
+        flush_interval: float = FLUSH_INTERVAL,
+        on_entry: Callable[[str, int, str], None] | None = None,
+    ):
+        self.conversations_dir = conversations_dir or CONVERSATIONS_DIR
+        self.flush_interval = flush_interval
+        self.on_entry = on_entry
+        self.bytes_written = 0
+        self._pending: collections.deque[tuple[str, str]] = collections.deque()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def submit(self, day: str, entry: str, direction: str | None = None):
+        """Queue an entry for the next group commit (never blocks on I/O)."""
+        self._pending.append((day, entry))
+        if self.on_entry is not None and direction:
+            self.on_entry(direction, len(entry.encode("utf-8")), day)
+
+    def flush(self) -> int:
+        """Write everything submitted so far and return the number of entries.
+
+        If a day's file cannot be written, its entries and those of the days
+        after it go back to the front of the queue for the next flush, and
+        the OSError is raised.
+        """
+        with self._flush_lock:
+            batch = []
+            while self._pending:
+                batch.append(self._pending.popleft())
+            days = list(dict.fromkeys(day for day, _ in batch))
+            for i, day in enumerate(days):
+                try:
+                    self.bytes_written += append_entries(
+                        self.conversations_dir, [record for record in batch if record[0] == day])
+                except OSError:
+                    unwritten = [record for record in batch if record[0] in days[i:]]
+                    self._pending.extendleft(reversed(unwritten))
+                    raise
+            return len(batch)
+
+    def start(self):
+        """Start the writer thread and route this process's entries through it."""
+        global _active_log
+        self._thread = threading.Thread(target=self._run, name="conversation-log", daemon=True)
+        self._thread.start()
+        _active_log = self
+
+    def close(self):
+        """Stop the writer thread after draining every pending entry."""
+        global _active_log
+        if _active_log is self:
+            _active_log = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                logger.error(f"Conversation log flush failed: {e}")
+
+
+class _EntryHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                record = json.loads(line)
+                if not DAY_KEY.match(record["day"]):
+                    raise ValueError(record["day"])
+                self.server.conversation_log.submit(record["day"], record["entry"], record.get("direction"))
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Dropping malformed conversation log record")
+
+
+class LogSocketServer(socketserver.ThreadingUnixStreamServer):
+    """Accepts entries from other processes and feeds them into a ConversationLog."""
+
+    daemon_threads = True
+
+    def __init__(self, conversation_log: ConversationLog, socket_path: Path | None = None):
+        self.conversation_log = conversation_log
+        self.socket_path = socket_path or SOCKET_PATH
+        super().__init__(str(self.socket_path), _EntryHandler, bind_and_activate=False)
+        self.socket.close()
+        self.socket = unix_socket.bind_private_unix_socket(self.socket_path, self.request_queue_size)
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="conversation-log-socket", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+
+
+def _send_to_socket(day: str, entry: str, socket_path: Path, direction: str | None = None) -> bool:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+        record = {"day": day, "entry": entry, "direction": direction}
+        sock.sendall(json.dumps(record).encode("utf-8") + b"\n")
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def log_entry(
+    entry: str,
+    now: datetime | None = None,
+    conversations_dir: Path | None = None,
+    direction: str | None = None,
+    chat: str = "",
+):
+    """Route an entry to the single writer.
+
+    Uses the in-process writer if this process runs one, else the bot's log
+    socket, else a direct locked append. direction ("incoming"/"outgoing")
+    feeds the writer's live counters; chat is the chat shard (chats.shard).
+    """
+    now = now or datetime.now()
+    day = f"chat-{chat}/{now:%Y-%m-%d}" if chat else now.strftime("%Y-%m-%d")
+
+    if _active_log is not None:
+        _active_log.submit(day, entry, direction)
+    elif not _send_to_socket(day, entry, SOCKET_PATH, direction):
+        append_entries(conversations_dir or CONVERSATIONS_DIR, [(day, entry)])
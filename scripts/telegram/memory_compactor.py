@@ -0,0 +1,374 @@
+#!/opt/venv/bin/python
+"""
+Keeps memory.md within a fixed size budget.
+
+memory.md is re-read at every startup and every reflection the reflection
+scheduler runs, so it is the hot tier and must not grow without bound. Each
+run parses its "## " sections into items (a top-level bullet with its
+continuation lines, or a paragraph) and moves items out, stalest first, until
+the file fits:
+
+    hot   memory.md                  items still in active use
+    warm  memory/warm.md             recently archived items, one file
+    cold  memory/cold/YYYY-MM.md     warm overflow, one file per month
+
+An item's age is the newest YYYY-MM-DD date written in it, or else the day
+compaction first saw that exact text (editing an item makes it fresh again).
+Items older than the stale limit leave the hot tier even when it fits.
+Section comments, "###" sub-headings and items containing "[pinned]" always
+stay. A regenerated "## Archived Memory" section in memory.md points at the
+warm and cold files.
+
+Everything that rewrites memory.md (this compactor and `mind-note remember`)
+holds memory_lock() while it reads and replaces the file, so worker sessions
+writing at the same time never lose each other's edits.
+
+Usage:
+    memory_compactor.py [--budget BYTES | --budget-tokens N] [--stale-days N] [--dry-run]
+"""
+
+import argparse
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import re
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+MEMORY_FILE = MIND_DIR / "memory.md"
+MEMORY_DIR = MIND_DIR / "memory"
+
+# Budgets in bytes (tokens are estimated as bytes / 4)
+HOT_BUDGET = int(os.environ.get("MIND_MEMORY_BUDGET", "8000"))
+WARM_BUDGET = int(os.environ.get("MIND_MEMORY_WARM_BUDGET", "32000"))
+STALE_DAYS = int(os.environ.get("MIND_MEMORY_STALE_DAYS", "90"))
+BYTES_PER_TOKEN = 4
+
+ARCHIVE_SECTION = "Archived Memory"
+PIN_MARKER = "[pinned]"
+
+_BULLET = re.compile(r"^(?:[-*+]|\d+[.)])\s")
+_DATE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+
+def item_key(text: str) -> str:
+    """Stable identity of an item's text (whitespace-insensitive)."""
+    return hashlib.sha1(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+class Item:
+    """One memory item: its lines and whether a blank line followed it."""
+
+    def __init__(self, lines: list[str], gap: bool = False, fixed: bool = False):
+        self.lines = lines
+        self.gap = gap
+        self.fixed = fixed  # comments and sub-headings never move
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+    @property
+    def key(self) -> str:
+        return item_key(self.text)
+
+    @property
+    def movable(self) -> bool:
+        return not self.fixed and PIN_MARKER not in self.text
+
+    def written_date(self) -> date | None:
+        """Newest YYYY-MM-DD date mentioned in the item, if any."""
+        found = []
+        for y, m, d in _DATE.findall(self.text):
+            try:
+                found.append(date(int(y), int(m), int(d)))
+            except ValueError:
+                continue
+        return max(found, default=None)
+
+
+class MemoryDocument:
+    """A markdown file made of a preamble and "## " sections of items."""
+
+    def __init__(self, preamble: list[str], sections: dict[str, list[Item]]):
+        self.preamble = preamble
+        self.sections = sections
+
+    @classmethod
+    def parse(cls, text: str) -> "MemoryDocument":
+        preamble: list[str] = []
+        sections: dict[str, list[Item]] = {}
+        items: list[Item] | None = None
+        current: Item | None = None
+        in_comment = False
+
+        for line in text.splitlines():
+            if line.startswith("## ") and not in_comment:
+                items = sections.setdefault(line[3:].strip(), [])
+                current = None
+                continue
+            if items is None:
+                preamble.append(line)
+                continue
+
+            if in_comment or line.lstrip().startswith("<!--"):
+                in_comment = "-->" not in line
+                if current is not None and current.fixed and not current.gap:
+                    current.lines.append(line)
+                else:
+                    current = Item([line], fixed=True)
+                    items.append(current)
+                continue
+            if not line.strip():
+                if current is not None:
+                    current.gap = True
+                continue
+
+            starts_item = (
+                current is None
+                or current.gap
+                or current.fixed
+                or line.startswith("#")
+                or _BULLET.match(line) is not None
+            )
+            if starts_item:
+                current = Item([line], fixed=line.startswith("#"))
+                items.append(current)
+            else:
+                current.lines.append(line)
+
+        while preamble and not preamble[-1].strip():
+            preamble.pop()
+        return cls(preamble, sections)
+
+    def render(self) -> str:
+        out = list(self.preamble)
+        for name, items in self.sections.items():
+            if out:
+                out.append("")
+            out.extend([f"## {name}", ""])
+            for item in items:
+                out.extend(item.lines)
+                if item.gap:
+                    out.append("")
+            while out and not out[-1].strip():
+                out.pop()
+        return "\n".join(out) + "\n"
+
+    def movable_items(self):
+        """(section, item) pairs that may leave this tier."""
+        for name, items in self.sections.items():
+            for item in items:
+                if item.movable:
+                    yield name, item
+
+    def remove(self, section: str, item: Item):
+        self.sections[section].remove(item)
+
+    def add(self, section: str, item: Item):
+        """Append an item to a section unless the same text is already there."""
+        items = self.sections.setdefault(section, [])
+        if any(existing.key == item.key for existing in items):
+            return
+        if items and not items[-1].gap and not _BULLET.match(item.lines[0]):
+            items[-1].gap = True  # keep paragraphs apart
+        items.append(Item(list(item.lines), gap=item.gap))
+
+    def count(self) -> int:
+        return sum(1 for _ in self.movable_items())
+
+
+def _size(doc: MemoryDocument) -> int:
+    return len(doc.render().encode("utf-8"))
+
+
+def _load(path: Path, title: str) -> MemoryDocument:
+    if path.exists():
+        return MemoryDocument.parse(path.read_text())
+    return MemoryDocument([f"# {title}"], {})
+
+
+@contextlib.contextmanager
+def memory_lock(memory_file: Path | None = None):
+    """Hold the exclusive lock that serializes rewrites of memory.md."""
+    memory_file = memory_file or MEMORY_FILE
+    memory_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(memory_file.with_name(f".{memory_file.name}.lock"), "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+class MemoryCompactor:
+    """Moves memory items between the hot, warm and cold tiers."""
+
+    def __init__(
+        self,
+        memory_file: Path | None = None,
+        memory_dir: Path | None = None,
+        hot_budget: int = HOT_BUDGET,
+        warm_budget: int = WARM_BUDGET,
+        stale_days: int = STALE_DAYS,
+    ):
+        self.memory_file = memory_file or MEMORY_FILE
+        self.memory_dir = memory_dir or MEMORY_DIR
+        self.hot_budget = hot_budget
+        self.warm_budget = warm_budget
+        self.stale_days = stale_days
+        self.warm_file = self.memory_dir / "warm.md"
+        self.cold_dir = self.memory_dir / "cold"
+        self.state_file = self.memory_dir / "state.json"
+
+    def _load_state(self) -> dict:
+        try:
+            state = json.loads(self.state_file.read_text())
+        except (OSError, ValueError):
+            state = {}
+        state.setdefault("hot", {})
+        state.setdefault("warm", {})
+        return state
+
+    def _age_date(self, item: Item, seen: dict, today: date) -> date:
+        written = item.written_date()
+        if written is not None:
+            return written
+        return date.fromisoformat(seen.get(item.key, today.isoformat()))
+
+    def _evict(self, doc: MemoryDocument, budget: int, dates: dict, stale_before: date | None) -> list:
+        """Remove items from doc, oldest first, until stale ones are gone and it fits."""
+        candidates = sorted(doc.movable_items(), key=lambda pair: dates[pair[1].key])
+        moved = []
+        for section, item in candidates:
+            is_stale = stale_before is not None and dates[item.key] < stale_before
+            if not is_stale and _size(doc) <= budget:
+                break
+            doc.remove(section, item)
+            moved.append((section, item))
+        return moved
+
+    def _archive_index(self) -> list[Item]:
+        """Pointer lines for the "## Archived Memory" section."""
+        lines = [Item([
+            "<!-- Maintained by memory compaction; older items live in these files. "
+            "Search them with mind-search or grep. -->"
+        ], gap=True, fixed=True)]
+        files = ([self.warm_file] if self.warm_file.exists() else []) + sorted(self.cold_dir.glob("*.md"))
+        mind_dir = self.memory_file.parent
+        for path in files:
+            doc = MemoryDocument.parse(path.read_text())
+            sections = ", ".join(name for name, items in doc.sections.items() if items)
+            rel = path.relative_to(mind_dir) if path.is_relative_to(mind_dir) else path
+            lines.append(Item([f"- {rel}: {doc.count()} items ({sections})"], fixed=True))
+        return lines
+
+    def compact(self, today: date | None = None, dry_run: bool = False) -> dict:
+        """Run one compaction pass and return what was moved."""
+        with memory_lock(self.memory_file):
+            return self._compact(today, dry_run)
+
+    def _compact(self, today: date | None, dry_run: bool) -> dict:
+        today = today or date.today()
+        stat = self.memory_file.stat()
+        hot = MemoryDocument.parse(self.memory_file.read_text())
+        hot.sections.pop(ARCHIVE_SECTION, None)
+        before = stat.st_size
+
+        state = self._load_state()
+        # Remember when each hot item was first seen; forget items that are gone
+        hot_seen = {item.key: state["hot"].get(item.key, today.isoformat()) for _, item in hot.movable_items()}
+        dates = {item.key: self._age_date(item, hot_seen, today) for _, item in hot.movable_items()}
+
+        # Leave room for the pointer section that is added back afterwards
+        index_room = len(MemoryDocument([], {ARCHIVE_SECTION: self._archive_index()}).render().encode()) + 200
+        to_warm = self._evict(hot, self.hot_budget - index_room, dates,
+                              today - timedelta(days=self.stale_days))
+
+        warm = _load(self.warm_file, "Warm Memory")
+        warm_seen = dict(state["warm"])
+        for section, item in to_warm:
+            warm.add(section, item)
+            warm_seen.setdefault(item.key, today.isoformat())
+            hot_seen.pop(item.key, None)
+        warm_dates = {item.key: date.fromisoformat(warm_seen.get(item.key, today.isoformat()))
+                      for _, item in warm.movable_items()}
+        to_cold = self._evict(warm, self.warm_budget, warm_dates, None)
+
+        result = {
+            "before": before,
+            "to_warm": [item.text for _, item in to_warm],
+            "to_cold": [item.text for _, item in to_cold],
+        }
+        if dry_run or not (to_warm or to_cold or state["hot"] != hot_seen):
+            result["after"] = before
+            return result
+
+        current = self.memory_file.stat()
+        if (current.st_mtime_ns, current.st_size) != (stat.st_mtime_ns, stat.st_size):
+            # Edited while we worked; leave it alone and try again next run
+            result["after"] = current.st_size
+            result["skipped"] = True
+            return result
+
+        if to_cold:
+            cold_file = self.cold_dir / f"{today:%Y-%m}.md"
+            cold = _load(cold_file, f"Cold Memory {today:%Y-%m}")
+            for section, item in to_cold:
+                cold.add(section, item)
+                warm_seen.pop(item.key, None)
+            _write_atomic(cold_file, cold.render())
+        if to_warm or to_cold:
+            _write_atomic(self.warm_file, warm.render())
+
+        live_warm = {item.key for _, item in warm.movable_items()}
+        state = {"hot": hot_seen, "warm": {k: v for k, v in warm_seen.items() if k in live_warm}}
+        _write_atomic(self.state_file, json.dumps(state, indent=1, sort_keys=True))
+
+        if to_warm or to_cold:
+            hot.sections[ARCHIVE_SECTION] = self._archive_index()
+            _write_atomic(self.memory_file, hot.render())
+
+        result["after"] = self.memory_file.stat().st_size
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keep memory.md within its size budget")
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument("--budget", type=int, help=f"hot tier size in bytes (default {HOT_BUDGET})")
+    budget.add_argument("--budget-tokens", type=int, help="hot tier size in (estimated) tokens")
+    parser.add_argument("--stale-days", type=int, default=STALE_DAYS)
+    parser.add_argument("--dry-run", action="store_true", help="show what would move without writing")
+    args = parser.parse_args()
+
+    hot_budget = args.budget or (args.budget_tokens * BYTES_PER_TOKEN if args.budget_tokens else HOT_BUDGET)
+    compactor = MemoryCompactor(hot_budget=hot_budget, stale_days=args.stale_days)
+    if not compactor.memory_file.exists():
+        print(f"No memory file at {compactor.memory_file}", file=sys.stderr)
+        sys.exit(1)
+
+    result = compactor.compact(dry_run=args.dry_run)
+    for text in result["to_warm"]:
+        print(f"warm <- {text.splitlines()[0][:80]}")
+    for text in result["to_cold"]:
+        print(f"cold <- {text.splitlines()[0][:80]}")
+    note = " (memory.md changed meanwhile; not rewritten)" if result.get("skipped") else ""
+    print(f"memory.md: {result['before']} -> {result['after']} bytes, "
+          f"{len(result['to_warm'])} to warm, {len(result['to_cold'])} to cold{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/opt/venv/bin/python
+"""
+Live counters for the bot, served by /status and a local metrics endpoint.
+
+Everything here is updated when something happens (a message is queued, a
+conversation entry is logged, a handler finishes) so reading it never
+touches the filesystem. MetricsServer exposes the values over HTTP in the
+Prometheus text format on 127.0.0.1 only.
+
+The queue depth is kept current by QueueDepthTracker, which rescans
+message_queue/ only when inotify reports a file appearing or disappearing
+(or on the polling interval where inotify is unavailable).
+"""
+
+import bisect
+import http.server
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+try:
+    from . import queue_watcher, queue_writer
+except ImportError:  # run directly from /opt/scripts/telegram/
+    import queue_watcher
+    import queue_writer
+
+# Local HTTP endpoint (0 disables it)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = int(os.environ.get("MIND_METRICS_PORT", "9464"))
+
+# Handler latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_text(labels: tuple[tuple[str, str], ...], extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[tuple(sorted(labels.items()))] = value
+
+
+class Histogram:
+    """Observations counted into fixed cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(tuple(sorted(labels.items())))
+        return series[2] if series else 0
+
+    def mean(self, **labels) -> float:
+        series = self._series.get(tuple(sorted(labels.items())))
+        return series[1] / series[2] if series and series[2] else 0.0
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                cumulative = 0
+                for bound, n in zip(self.buckets + (float("inf"),), counts, strict=True):
+                    cumulative += n
+                    out.append((f"{self.name}_bucket", key, cumulative, f'le="{_number(bound)}"'))
+                out.append((f"{self.name}_sum", key, total))
+                out.append((f"{self.name}_count", key, count))
+        return out
+
+
+class Registry:
+    """A set of metrics rendered together."""
+
+    def __init__(self):
+        self.metrics: list = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample in metric.samples():
+                name, labels, value = sample[:3]
+                extra = sample[3] if len(sample) > 3 else ""
+                lines.append(f"{name}{_label_text(labels, extra)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class BotMetrics:
+    """The bot's live counters."""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self._clock = clock
+        self.registry = Registry()
+        self.started = self.registry.register(Gauge(
+            "mind_bot_start_time_seconds", "Unix time the bot started."))
+        self.queue_depth = self.registry.register(Gauge(
+            "mind_queue_depth", "Messages waiting in message_queue/."))
+        self.queue_lanes = self.registry.register(Gauge(
+            "mind_queue_lane_depth", "Messages waiting, by priority lane."))
+        self.messages = self.registry.register(Counter(
+            "mind_messages_total", "Conversation messages logged, by direction."))
+        self.log_bytes = self.registry.register(Counter(
+            "mind_conversation_log_bytes_total", "Bytes appended to the conversation log."))
+        self.last_activity = self.registry.register(Gauge(
+            "mind_last_activity_time_seconds", "Unix time of the last logged message."))
+        self.handler_latency = self.registry.register(Histogram(
+            "mind_handler_duration_seconds", "Time spent in Telegram update handlers."))
+        self.started.set(clock())
+        self.queue_depth.set(0)
+        for lane in queue_writer.LANES:
+            self.queue_lanes.set(0, lane=lane)
+
+    def record_message(self, direction: str, nbytes: int):
+        """Count one conversation entry (called as it is logged)."""
+        self.messages.inc(direction=direction)
+        self.log_bytes.inc(nbytes)
+        self.last_activity.set(self._clock())
+
+    def summary(self) -> dict:
+        """Current values for /status (constant time)."""
+        last = self.last_activity.value()
+        return {
+            "queue_depth": int(self.queue_depth.value()),
+            "queue_lanes": {lane: int(self.queue_lanes.value(lane=lane)) for lane in queue_writer.LANES},
+            "incoming": int(self.messages.value(direction="incoming")),
+            "outgoing": int(self.messages.value(direction="outgoing")),
+            "log_bytes": int(self.log_bytes.value()),
+            "last_activity_ago": self._clock() - last if last else None,
+            "uptime": self._clock() - self.started.value(),
+            "message_latency": self.handler_latency.mean(handler="message"),
+        }
+
+
+class QueueDepthTracker:
+    """Keeps a gauge equal to the number of pending queue files.
+
+    on_picked_up, if given, is called with the name of each queue file the
+    first time it is read or when it leaves the queue.
+
+    source replaces the directory with any watcher that also has pending()
+    (mind_queue.DatabaseWatcher); it is polled like the scandir fallback.
+
+    lane_gauge, if given, is kept equal to the pending count per lane.
+    """
+
+    def __init__(
+        self,
+        queue_dir: Path,
+        gauge: Gauge,
+        backend: str = "auto",
+        on_picked_up: Callable[[str], None] | None = None,
+        source=None,
+        lane_gauge: Gauge | None = None,
+    ):
+        self.queue_dir = queue_dir
+        self.gauge = gauge
+        self.lane_gauge = lane_gauge
+        self.on_picked_up = on_picked_up
+        self.source = source
+        if source is not None:
+            self._watcher = source
+        else:
+            mask = queue_watcher.NEW_FILE_EVENTS | queue_watcher.IN_DELETE | queue_watcher.IN_MOVED_FROM
+            if on_picked_up is not None:
+                mask |= queue_watcher.IN_ACCESS
+            self._watcher = queue_watcher.make_watcher(queue_dir, backend, mask=mask)
+        # The scandir fallback does not report removals, so it rescans every poll
+        self.polling = not isinstance(self._watcher, queue_watcher.InotifyWatcher)
+        self._pending: set[str] = set()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def sync(self):
+        if self.source is not None:
+            pending = set(self.source.pending())
+        else:
+            pending = set(queue_watcher.pending_messages(self.queue_dir))
+        self.gauge.set(len(pending))
+        if self.lane_gauge is not None:
+            counts = dict.fromkeys(queue_writer.LANES, 0)
+            for name in pending:
+                counts[queue_writer.lane_of(name)] += 1
+            for lane, count in counts.items():
+                self.lane_gauge.set(count, lane=lane)
+        if self.on_picked_up is not None:
+            for name in sorted(self._pending - pending):
+                self.on_picked_up(name)
+        self._pending = pending
+
+    def start(self):
+        self.sync()
+        self._thread = threading.Thread(target=self._run, name="queue-depth", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._watcher.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.polling:
+                self._watcher.wait(1.0)
+                self.sync()
+                continue
+            events = self._watcher.read_events(1.0)
+            for mask, name in events:
+                if mask & queue_watcher.IN_ACCESS and self.on_picked_up is not None:
+                    self.on_picked_up(name)
+            # Reads alone do not change the depth
+            if any(not mask & queue_watcher.IN_ACCESS for mask, _ in events):
+                self.sync()
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scraped every few seconds; not worth a log line each
+
+
+class MetricsServer(http.server.ThreadingHTTPServer):
+    """Serves a Registry at http://127.0.0.1:<port>/metrics."""
+
+    daemon_threads = True
+
+    def __init__(self, registry: Registry, port: int = METRICS_PORT, host: str = METRICS_HOST):
+        self.registry = registry
+        super().__init__((host, port), _MetricsHandler)
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,389 @@
+#!/opt/venv/bin/python
+"""
+Compressed archival and retention for the mind's day files and daemon logs.
+
+conversations/, journal/ and the nohup logs in the mind directory
+(telegram-bot.log, cron.log, ...) would otherwise grow without limit on the
+volume. A daily run (cron.d, see entrypoint.sh):
+
+- moves day files older than MIND_ARCHIVE_AFTER_DAYS (default 7) into
+  monthly archives: archive/conversations/2025-01.gz holds one gzip member
+  per day, and archive/conversations/2025-01.json maps each day file to its
+  member's offset, so one day is read without decompressing the month
+- rotates daemon logs over MIND_LOG_ROTATE_BYTES the same way
+  (copy-truncate; the daemons append with >>, so they keep writing at the
+  new end) into archive/logs/<name>/YYYY-MM.gz
+- drops log archives older than MIND_LOG_RETENTION_DAYS and, oldest first,
+  beyond MIND_LOG_QUOTA_BYTES. Conversation and journal history is kept
+  unless MIND_HISTORY_RETENTION_DAYS is set
+
+The conversation log of each chat other than the primary one
+(conversations/chat-<id>/, see chats.py) is a day-file source of its own.
+
+Readers never need to know where a day lives: iter_files() and read_file()
+stream archived and live files alike, and mind-search indexes both.
+
+A member is appended and fsynced, then the month's index is replaced
+atomically, and only then is the live file removed; a run interrupted at
+any point leaves every day readable and is finished by the next run.
+
+Usage:
+    mind-archive run [--dry-run]
+    mind-archive cat conversations [--since 2025-01-01] [--until 2025-01-31]
+    mind-archive cat conversations/chat-<id>
+    mind-archive cat logs/telegram-bot
+    mind-archive stats [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+ARCHIVE_DIR = MIND_DIR / "archive"
+
+# Day-file sources (directories of YYYY-MM-DD.md) and the daemon logs in MIND_DIR
+SOURCES = ("conversations", "journal")
+LOG_FILES = (
+    "telegram-bot.log", "send-daemon.log", "session-broker.log", "queue-watcher.log",
+    "reflection-scheduler.log", "cron.log", "archive.log",
+)
+
+# Day files this many days old (or older) are archived; today and recent days stay live
+ARCHIVE_AFTER_DAYS = int(os.environ.get("MIND_ARCHIVE_AFTER_DAYS", "7"))
+# Logs larger than this are rotated into the archive
+LOG_ROTATE_BYTES = int(os.environ.get("MIND_LOG_ROTATE_BYTES", str(1024 * 1024)))
+# Retention (0 keeps forever) and the disk quota for archived logs
+LOG_RETENTION_DAYS = int(os.environ.get("MIND_LOG_RETENTION_DAYS", "90"))
+LOG_QUOTA_BYTES = int(os.environ.get("MIND_LOG_QUOTA_BYTES", str(256 * 1024 * 1024)))
+HISTORY_RETENTION_DAYS = int(os.environ.get("MIND_HISTORY_RETENTION_DAYS", "0"))
+
+CHUNK_SIZE = 64 * 1024
+DAY_FILE = re.compile(r"^(\d{4}-\d{2}-\d{2})\.md$")
+
+
+def _fsync_directory(directory: Path):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Archive:
+    """Monthly multi-member gzip archives under one directory.
+
+    A source is a sub-directory ("conversations", "logs/telegram-bot"); each
+    month is YYYY-MM.gz plus YYYY-MM.json, the index of its members:
+    {name: {"offset", "length", "size", "mtime"}}.
+    """
+
+    def __init__(self, root: Path | None = None):
+        self.root = root or ARCHIVE_DIR
+
+    def months(self, source: str) -> list[str]:
+        return sorted(p.stem for p in (self.root / source).glob("????-??.json"))
+
+    def index(self, source: str, month: str) -> dict:
+        try:
+            return json.loads((self.root / source / f"{month}.json").read_text())
+        except FileNotFoundError:
+            return {}
+
+    def members(self, source: str) -> dict[str, str]:
+        """Every archived name of a source, mapped to its month."""
+        return {name: month for month in self.months(source) for name in self.index(source, month)}
+
+    def append(self, source: str, month: str, name: str, path: Path, size: int | None = None) -> dict:
+        """Compress the first size bytes of path (default: all) into the month as name."""
+        directory = self.root / source
+        directory.mkdir(parents=True, exist_ok=True)
+        archive_path = directory / f"{month}.gz"
+        size = path.stat().st_size if size is None else size
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 31)  # wbits 31: gzip framing
+
+        with open(path, "rb") as src, open(archive_path, "ab") as out:
+            offset = out.seek(0, os.SEEK_END)
+            remaining = size
+            while remaining > 0 and (chunk := src.read(min(CHUNK_SIZE, remaining))):
+                remaining -= len(chunk)
+                out.write(compressor.compress(chunk))
+            out.write(compressor.flush())
+            out.flush()
+            os.fsync(out.fileno())
+            length = out.tell() - offset
+
+        entry = {"offset": offset, "length": length, "size": size - remaining, "mtime": path.stat().st_mtime}
+        index = self.index(source, month)
+        index[name] = entry
+        tmp = directory / f".{month}.json.tmp"
+        tmp.write_text(json.dumps(index, indent=1, sort_keys=True))
+        os.replace(tmp, directory / f"{month}.json")
+        _fsync_directory(directory)
+        return entry
+
+    def iter_chunks(self, source: str, name: str, month: str | None = None) -> Iterator[bytes]:
+        """Stream one archived member, decompressing CHUNK_SIZE at a time."""
+        month = month or self.members(source)[name]
+        entry = self.index(source, month)[name]
+        decompressor = zlib.decompressobj(31)
+        with open(self.root / source / f"{month}.gz", "rb") as f:
+            f.seek(entry["offset"])
+            remaining = entry["length"]
+            while remaining > 0 and (chunk := f.read(min(CHUNK_SIZE, remaining))):
+                remaining -= len(chunk)
+                if data := decompressor.decompress(chunk):
+                    yield data
+        if data := decompressor.flush():
+            yield data
+
+    def remove_month(self, source: str, month: str) -> int:
+        """Delete a month's archive; returns the bytes freed."""
+        freed = 0
+        for path in (self.root / source / f"{month}.gz", self.root / source / f"{month}.json"):
+            try:
+                freed += path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        return freed
+
+    def size(self, source: str) -> int:
+        return sum(p.stat().st_size for p in (self.root / source).glob("????-??.*"))
+
+
+def _live_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def _day_of(name: str) -> str:
+    """The YYYY-MM-DD a member belongs to ("2025-01-14.md", "telegram-bot.20250114-031700.log")."""
+    match = DAY_FILE.match(name) or re.search(r"\.(\d{4})(\d{2})(\d{2})-\d{6}\.log$", name)
+    if not match:
+        return ""
+    return match.group(1) if len(match.groups()) == 1 else "-".join(match.groups())
+
+
+def iter_files(
+    source: str,
+    since: str | None = None,
+    until: str | None = None,
+    mind_dir: Path | None = None,
+    archive: Archive | None = None,
+) -> Iterator[tuple[str, Iterator[bytes]]]:
+    """(name, chunk stream) for each file of a source in order, archived or live.
+
+    source is a day-file source ("journal") or "logs/<name>", whose rotated
+    pieces come first and the live log last. since/until (YYYY-MM-DD,
+    inclusive) select days.
+    """
+    mind_dir = mind_dir or MIND_DIR
+    archive = archive or Archive(mind_dir / "archive")
+    archived = archive.members(source)
+    if source.startswith("logs/"):
+        live_path = mind_dir / f"{source.removeprefix('logs/')}.log"
+        live = {f"{live_path.stem}.{datetime.now():%Y%m%d-%H%M%S}.log": live_path} if live_path.exists() else {}
+    else:
+        live = {p.name: p for p in (mind_dir / source).glob("*.md") if DAY_FILE.match(p.name)}
+
+    for name in sorted(archived.keys() | live.keys()):
+        day = _day_of(name)
+        if (since and day < since) or (until and day > until):
+            continue
+        if name in live:  # a live file wins over a copy left by an interrupted run
+            yield name, _live_chunks(live[name])
+        else:
+            yield name, archive.iter_chunks(source, name, archived[name])
+
+
+def read_file(source: str, name: str, mind_dir: Path | None = None) -> bytes:
+    """The whole content of one day file, wherever it lives."""
+    mind_dir = mind_dir or MIND_DIR
+    path = mind_dir / source / name
+    if path.exists():
+        return path.read_bytes()
+    archive = Archive(mind_dir / "archive")
+    return b"".join(archive.iter_chunks(source, name))
+
+
+def archive_days(source: str, today: date, mind_dir: Path, archive: Archive, dry_run: bool = False) -> list[str]:
+    """Move closed day files of a source into the archive; returns their names."""
+    cutoff = (today - timedelta(days=ARCHIVE_AFTER_DAYS)).isoformat()
+    archived = archive.members(source)
+    moved = []
+    for path in sorted((mind_dir / source).glob("*.md")):
+        match = DAY_FILE.match(path.name)
+        if not match or match.group(1) > cutoff:
+            continue
+        moved.append(path.name)
+        if dry_run:
+            continue
+        stat = path.stat()
+        month = match.group(1)[:7]
+        entry = archive.index(source, month).get(path.name) if path.name in archived else None
+        if entry is None or entry["size"] != stat.st_size:
+            archive.append(source, month, path.name, path)
+        path.unlink()
+    return moved
+
+
+def rotate_log(path: Path, now: datetime, archive: Archive, dry_run: bool = False) -> bool:
+    """Copy-truncate a log into the archive once it is over LOG_ROTATE_BYTES."""
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return False
+    if size < LOG_ROTATE_BYTES:
+        return False
+    if not dry_run:
+        name = f"{path.stem}.{now:%Y%m%d-%H%M%S}.log"
+        archive.append(f"logs/{path.stem}", f"{now:%Y-%m}", name, path, size)
+        # Lines written after the copy was taken go with the truncation, as with logrotate
+        with open(path, "r+b") as f:
+            f.truncate(0)
+    return True
+
+
+def day_sources(mind_dir: Path | None = None, archive: Archive | None = None) -> list[str]:
+    """SOURCES plus a "conversations/chat-<id>" source per other chat, live or archived."""
+    mind_dir = mind_dir or MIND_DIR
+    archive = archive or Archive(mind_dir / "archive")
+    chats = {
+        p.relative_to(root).as_posix()
+        for root in (mind_dir, archive.root)
+        for p in (root / "conversations").glob("chat-*")
+        if p.is_dir()
+    }
+    return [*SOURCES, *sorted(chats)]
+
+
+def enforce_retention(today: date, archive: Archive, dry_run: bool = False) -> list[str]:
+    """Drop archive months past retention or over the log quota; returns "source/month" names."""
+    dropped = []
+
+    def expired(month: str, days: int) -> bool:
+        year, mon = map(int, month.split("-"))
+        month_end = date(year + mon // 12, mon % 12 + 1, 1) - timedelta(days=1)
+        return days > 0 and (today - month_end).days > days
+
+    logs = sorted(p.relative_to(archive.root).as_posix() for p in (archive.root / "logs").glob("*") if p.is_dir())
+    history = day_sources(archive.root.parent, archive)
+    sources = [(s, HISTORY_RETENTION_DAYS) for s in history] + [(s, LOG_RETENTION_DAYS) for s in logs]
+    for source, days in sources:
+        for month in archive.months(source):
+            if expired(month, days):
+                dropped.append(f"{source}/{month}")
+                if not dry_run:
+                    archive.remove_month(source, month)
+
+    if LOG_QUOTA_BYTES > 0:
+        months = sorted((month, source) for source in logs for month in archive.months(source)
+                        if f"{source}/{month}" not in dropped)
+        total = sum(archive.size(source) for source in logs)
+        for month, source in months:
+            if total <= LOG_QUOTA_BYTES or month == f"{today:%Y-%m}":
+                break
+            dropped.append(f"{source}/{month}")
+            size = sum(p.stat().st_size for p in (archive.root / source).glob(f"{month}.*"))
+            total -= size
+            if not dry_run:
+                archive.remove_month(source, month)
+    return dropped
+
+
+def run(now: datetime | None = None, mind_dir: Path | None = None, dry_run: bool = False) -> dict:
+    """One archival pass; returns what was (or, with dry_run, would be) done."""
+    now = now or datetime.now()
+    mind_dir = mind_dir or MIND_DIR
+    archive = Archive(mind_dir / "archive")
+    summary = {"archived": {}, "rotated": [], "dropped": []}
+    for source in day_sources(mind_dir, archive):
+        if moved := archive_days(source, now.date(), mind_dir, archive, dry_run):
+            summary["archived"][source] = moved
+    for log in LOG_FILES:
+        if rotate_log(mind_dir / log, now, archive, dry_run):
+            summary["rotated"].append(log)
+    summary["dropped"] = enforce_retention(now.date(), archive, dry_run)
+    return summary
+
+
+def stats(mind_dir: Path | None = None) -> dict:
+    """Live and archived bytes per source (archived: on disk and uncompressed)."""
+    mind_dir = mind_dir or MIND_DIR
+    archive = Archive(mind_dir / "archive")
+    result = {}
+    logs = [f"logs/{Path(log).stem}" for log in LOG_FILES]
+    for source in (*day_sources(mind_dir, archive), *logs):
+        if source.startswith("logs/"):
+            live_files = [mind_dir / f"{source.removeprefix('logs/')}.log"]
+        else:
+            live_files = list((mind_dir / source).glob("*.md"))
+        members = [entry for month in archive.months(source) for entry in archive.index(source, month).values()]
+        result[source] = {
+            "live_bytes": sum(p.stat().st_size for p in live_files if p.exists()),
+            "archived_files": len(members),
+            "archived_bytes": sum(m["size"] for m in members),
+            "compressed_bytes": archive.size(source),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive, read and prune the mind's day files and logs.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_run = sub.add_parser("run", help="archive closed days, rotate logs, apply retention")
+    p_run.add_argument("--dry-run", action="store_true", help="only report what would be done")
+    p_cat = sub.add_parser("cat", help="stream a source across archived and live files")
+    p_cat.add_argument("source", help="conversations, conversations/chat-<id>, journal or logs/<name>")
+    p_cat.add_argument("--since", metavar="YYYY-MM-DD")
+    p_cat.add_argument("--until", metavar="YYYY-MM-DD")
+    p_stats = sub.add_parser("stats", help="live and archived sizes per source")
+    p_stats.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        start = time.monotonic()
+        summary = run(dry_run=args.dry_run)
+        verb = "Would archive" if args.dry_run else "Archived"
+        days = sum(len(names) for names in summary["archived"].values())
+        print(f"{datetime.now().isoformat(timespec='seconds')} - {verb} {days} day files, "
+              f"rotated {len(summary['rotated'])} logs, dropped {len(summary['dropped'])} archive months "
+              f"({time.monotonic() - start:.1f}s)")
+        for item in summary["dropped"]:
+            print(f"  dropped {item}")
+        return
+
+    if args.command == "cat":
+        if args.source not in day_sources() and not args.source.startswith("logs/"):
+            parser.error(f"unknown source {args.source!r} (expected {', '.join(day_sources())} or logs/<name>)")
+        out = sys.stdout.buffer
+        for _, chunks in iter_files(args.source, args.since, args.until):
+            for chunk in chunks:
+                out.write(chunk)
+        out.flush()
+        return
+
+    result = stats()
+    if args.json:
+        print(json.dumps(result))
+        return
+    for source, s in result.items():
+        if not s["live_bytes"] and not s["archived_files"]:
+            continue
+        ratio = f", {s['archived_bytes'] / s['compressed_bytes']:.1f}x" if s["compressed_bytes"] else ""
+        print(f"{source}: {s['live_bytes']} bytes live, {s['archived_files']} archived "
+              f"({s['archived_bytes']} bytes in {s['compressed_bytes']}{ratio})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/opt/venv/bin/python
+"""
+Safe writes to the journal and memory.md: mind-note.
+
+With a pool of worker sessions (worker_pool.py) several Claude sessions may
+write at the same time, and an editor-style read-modify-write of a shared
+file silently drops whatever another worker wrote in between. mind-note
+makes each write one small locked operation instead:
+
+    journal   appends a "## HH:MM - <worker>" entry to journal/YYYY-MM-DD.md
+              with a single write under an exclusive lock (log_writer)
+    remember  adds an item to a "## " section of memory.md, or replaces the
+              item containing --replace text, holding memory_lock() around
+              the read and the atomic replace (memory_compactor)
+
+The worker name comes from MIND_WORKER, which session_manager.sh sets in
+every worker's tmux session.
+
+Usage:
+    mind-note journal "text"                     # text from stdin if omitted
+    mind-note remember "- item" [--section "Ideas to Explore"] [--replace OLD]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from . import log_writer, memory_compactor
+except ImportError:  # run directly as /opt/scripts/telegram/mind_note.py
+    import log_writer
+    import memory_compactor
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+JOURNAL_DIR = MIND_DIR / "journal"
+
+# Section for items added without --section
+DEFAULT_SECTION = "Important Context"
+
+
+def format_journal_entry(text: str, worker: str = "", now: datetime | None = None) -> str:
+    """Render one journal entry (the heading mind-search indexes)."""
+    now = now or datetime.now()
+    heading = f"{now:%H:%M} - {worker}" if worker else f"{now:%H:%M}"
+    return f"\n## {heading}\n\n{text.strip()}\n"
+
+
+def journal(text: str, worker: str | None = None, now: datetime | None = None) -> Path:
+    """Append an entry to today's journal and return the day file."""
+    now = now or datetime.now()
+    worker = os.environ.get("MIND_WORKER", "") if worker is None else worker
+    day = f"{now:%Y-%m-%d}"
+    log_writer.append_entries(JOURNAL_DIR, [(day, format_journal_entry(text, worker, now))])
+    return JOURNAL_DIR / f"{day}.md"
+
+
+def remember(text: str, section: str = DEFAULT_SECTION, replace: str | None = None,
+             memory_file: Path | None = None) -> bool:
+    """Add an item to a memory.md section, or replace the one item containing `replace`.
+
+    Returns False if the same item was already there. Raises ValueError when
+    `replace` matches no item or more than one.
+    """
+    memory_file = memory_file or memory_compactor.MEMORY_FILE
+    lines = text.strip().splitlines()
+    if not lines:
+        raise ValueError("Nothing to remember")
+
+    with memory_compactor.memory_lock(memory_file):
+        if memory_file.exists():
+            doc = memory_compactor.MemoryDocument.parse(memory_file.read_text())
+        else:
+            doc = memory_compactor.MemoryDocument(["# Persistent Memory"], {})
+        new = memory_compactor.Item(lines)
+
+        if replace is not None:
+            matches = [
+                (items, i) for items in doc.sections.values()
+                for i, item in enumerate(items) if not item.fixed and replace in item.text
+            ]
+            if len(matches) != 1:
+                raise ValueError(f"{len(matches)} memory items contain {replace!r} (expected exactly one)")
+            items, i = matches[0]
+            new.gap = items[i].gap
+            items[i] = new
+        else:
+            if any(item.key == new.key for item in doc.sections.get(section, [])):
+                return False
+            doc.add(section, new)
+
+        tmp = memory_file.with_name(f".{memory_file.name}.note")
+        tmp.write_text(doc.render())
+        os.replace(tmp, memory_file)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write to the journal or memory.md without clobbering other workers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_journal = sub.add_parser("journal", help="append an entry to today's journal")
+    p_journal.add_argument("text", nargs="*")
+    p_remember = sub.add_parser("remember", help="add or replace an item in memory.md")
+    p_remember.add_argument("text", nargs="*")
+    p_remember.add_argument("--section", default=DEFAULT_SECTION)
+    p_remember.add_argument("--replace", default=None, metavar="OLD", help="replace the item containing OLD")
+    args = parser.parse_args()
+
+    text = " ".join(args.text) if args.text else sys.stdin.read()
+    if not text.strip():
+        print("Error: nothing to write", file=sys.stderr)
+        sys.exit(2)
+
+    if args.command == "journal":
+        print(journal(text))
+        return
+
+    try:
+        added = remember(text, args.section, args.replace)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    if not added:
+        print("Already in memory.md", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,590 @@
+#!/opt/venv/bin/python
+"""
+The mind's message queue as the session consumes it: mind-queue.
+
+With MIND_QUEUE_BACKEND=sqlite the queue is a WAL-mode database instead of
+the message_queue/ directory. Every entry is one row holding a JSON envelope:
+
+    {"chat_id": 12345, "chat": "", "kind": "reflection",
+     "messages": [{"text": ..., "from": ..., "time": ..., "id": ...,
+                   "message_id": ..., "update_id": ...}]}
+
+"chat" is the chat shard (chats.py; empty or missing for the primary chat).
+A consumer claims the next entry (in lane order, see queue_writer.lane_rank,
+with the chats of a lane taking turns, least recently served first), which
+hides it for a visibility timeout, and acks it when done. An entry that
+is never acked (the session crashed mid-reply) becomes visible again when
+its lease runs out; nack makes it visible again at once or after a delay.
+Entries claimed MIND_QUEUE_MAX_ATTEMPTS times without an ack are parked as
+failed and shown by `stats`.
+
+On the default file backend the same commands work on message_queue/: next
+moves the next file in lane order into message_queue/claimed/ under a lease
+(so worker sessions sharing the queue never take the same file), ack deletes
+it, and nack or an expired lease moves it back, or into message_queue/failed/
+once it has been claimed MIND_QUEUE_MAX_ATTEMPTS times.
+
+Usage:
+    mind-queue next [--timeout 600] [--json]   # claim the next entry and print it
+    mind-queue ack RECEIPT                     # done with a claimed entry
+    mind-queue nack RECEIPT [--delay 60]       # give it back
+    mind-queue peek [--limit 10] [--json]      # list waiting entries without claiming
+    mind-queue stats [--json]
+"""
+
+import argparse
+import json
+import os
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from . import queue_watcher, queue_writer
+except ImportError:  # run directly as /opt/scripts/telegram/mind_queue.py
+    import queue_watcher
+    import queue_writer
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+QUEUE_DB = Path(os.environ.get("MIND_QUEUE_DB", MIND_DIR / "message_queue.db"))
+
+# "files" (message_queue/*.msg, the default) or "sqlite" (QUEUE_DB)
+BACKEND = os.environ.get("MIND_QUEUE_BACKEND", "files")
+
+# Seconds a claimed entry stays hidden before it is handed out again
+VISIBILITY_TIMEOUT = float(os.environ.get("MIND_QUEUE_VISIBILITY", "600"))
+MAX_ATTEMPTS = int(os.environ.get("MIND_QUEUE_MAX_ATTEMPTS", "5"))
+
+# Lease prefix of a file nacked with a delay (claimed leases are plain hex)
+DELAYED = "delay"
+
+# How often the queue watcher and the bot's depth gauge look for changes
+POLL_INTERVAL = float(os.environ.get("MIND_QUEUE_POLL_INTERVAL", "0.5"))
+
+# MIND_QUEUE_FSYNC maps onto SQLite's synchronous setting
+_SYNCHRONOUS = {"none": "OFF", "file": "NORMAL", "full": "FULL"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    visible_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease TEXT,
+    envelope TEXT NOT NULL,
+    chat TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS messages_order ON messages (priority, id, visible_at, attempts);
+CREATE INDEX IF NOT EXISTS messages_chat ON messages (priority, chat, id);
+CREATE TABLE IF NOT EXISTS served (
+    chat TEXT PRIMARY KEY,
+    served_at REAL NOT NULL
+);
+"""
+
+
+def label(entry_id: int, lane: str = "interactive") -> str:
+    """Name an entry the way file names identify .msg entries (tracer, notifications)."""
+    return f"#{entry_id}" if lane == "interactive" else f"#{entry_id}@{lane}"
+
+
+def render(envelope: dict) -> str:
+    """Format an envelope exactly like the equivalent .msg file."""
+    return queue_writer.format_batch(envelope["messages"], envelope.get("chat", ""))
+
+
+class SqliteQueue:
+    """One connection to the queue database (safe to share between threads)."""
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        visibility_timeout: float = VISIBILITY_TIMEOUT,
+        max_attempts: int = MAX_ATTEMPTS,
+        fsync: str | None = None,
+    ):
+        self.path = path or QUEUE_DB
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit; claims take the write lock explicitly with BEGIN IMMEDIATE
+        self.db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(f"PRAGMA synchronous={_SYNCHRONOUS[fsync or queue_writer.FSYNC_POLICY]}")
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(messages)")]
+        if columns and "chat" not in columns:  # database from before chat shards
+            self.db.execute("ALTER TABLE messages ADD COLUMN chat TEXT NOT NULL DEFAULT ''")
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.db.close()
+
+    def enqueue(self, envelope: dict, lane: str = "interactive") -> int:
+        """Add an entry to a lane and return its id."""
+        if lane not in queue_writer.LANES:
+            raise ValueError(f"Unknown lane: {lane!r} (expected one of {queue_writer.LANES})")
+        now = time.time()
+        with self._lock:
+            cursor = self.db.execute(
+                "INSERT INTO messages (priority, enqueued_at, visible_at, envelope, chat) VALUES (?, ?, ?, ?, ?)",
+                (queue_writer.LANES.index(lane), now, now, json.dumps(envelope), envelope.get("chat", "")),
+            )
+        return cursor.lastrowid
+
+    def _served(self) -> dict[str, float]:
+        return dict(self.db.execute("SELECT chat, served_at FROM served"))
+
+    def _next_id(self, now: float) -> tuple[int, str] | None:
+        # Only the oldest visible entry of each lane and chat can be next
+        served = self._served()
+        best = None
+        for priority, lane in enumerate(queue_writer.LANES):
+            rows = self.db.execute(
+                "SELECT MIN(id), enqueued_at, chat FROM messages"
+                " WHERE priority = ? AND visible_at <= ? AND attempts < ? GROUP BY chat",
+                (priority, now, self.max_attempts),
+            ).fetchall()
+            for entry_id, enqueued_at, chat in rows:
+                key = (queue_writer.lane_rank(lane, now - enqueued_at), served.get(chat, 0.0), entry_id, chat)
+                best = min(best, key) if best else key
+        return (best[2], best[3]) if best else None
+
+    def claim(self, visibility_timeout: float | None = None) -> dict | None:
+        """Hide the next visible entry for the visibility timeout and return it.
+
+        The result carries a "receipt" that ack()/nack() need; it stops
+        working once the lease has run out and someone else claimed the entry.
+        """
+        now = time.time()
+        lease = secrets.token_hex(4)
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                found = self._next_id(now)
+                row = None
+                if found is not None:
+                    entry_id, chat = found
+                    row = self.db.execute(
+                        "SELECT id, priority, enqueued_at, attempts, envelope FROM messages WHERE id = ?",
+                        (entry_id,),
+                    ).fetchone()
+                    timeout = self.visibility_timeout if visibility_timeout is None else visibility_timeout
+                    self.db.execute(
+                        "UPDATE messages SET visible_at = ?, lease = ?, attempts = attempts + 1 WHERE id = ?",
+                        (now + timeout, lease, row[0]),
+                    )
+                    # The chat goes to the back of the line for its next entry
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO served (chat, served_at) VALUES (?, ?)", (chat, now))
+                self.db.execute("COMMIT")
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        entry_id, priority, enqueued_at, attempts, envelope = row
+        return {
+            "id": entry_id,
+            "receipt": f"{entry_id}.{lease}",
+            "lane": queue_writer.LANES[priority],
+            "enqueued_at": enqueued_at,
+            "attempts": attempts + 1,
+            "envelope": json.loads(envelope),
+        }
+
+    @staticmethod
+    def _parse_receipt(receipt: str) -> tuple[int, str]:
+        entry_id, _, lease = receipt.partition(".")
+        try:
+            return int(entry_id), lease
+        except ValueError:
+            raise ValueError(f"Not a queue receipt: {receipt!r}") from None
+
+    def ack(self, receipt: str) -> bool:
+        """Remove a claimed entry; False if the lease was lost."""
+        entry_id, lease = self._parse_receipt(receipt)
+        with self._lock:
+            cursor = self.db.execute("DELETE FROM messages WHERE id = ? AND lease = ?", (entry_id, lease))
+        return cursor.rowcount == 1
+
+    def nack(self, receipt: str, delay: float = 0) -> bool:
+        """Make a claimed entry visible again after delay seconds; False if the lease was lost."""
+        entry_id, lease = self._parse_receipt(receipt)
+        with self._lock:
+            cursor = self.db.execute(
+                "UPDATE messages SET visible_at = ?, lease = NULL WHERE id = ? AND lease = ?",
+                (time.time() + delay, entry_id, lease),
+            )
+        return cursor.rowcount == 1
+
+    def ready(self) -> list[tuple[int, str]]:
+        """(id, lane) of every entry waiting to be claimed, in claim order."""
+        now = time.time()
+        with self._lock:
+            rows = self.db.execute(
+                "SELECT id, priority, enqueued_at, chat FROM messages WHERE visible_at <= ? AND attempts < ?",
+                (now, self.max_attempts),
+            ).fetchall()
+            served = self._served()
+        ranked = sorted(
+            (queue_writer.lane_rank(queue_writer.LANES[priority], now - enqueued_at), entry_id, priority, chat)
+            for entry_id, priority, enqueued_at, chat in rows
+        )
+        return queue_writer.fair_order(
+            [(rank, chat, (entry_id, queue_writer.LANES[priority])) for rank, entry_id, priority, chat in ranked],
+            served,
+        )
+
+    def peek(self, limit: int = 10) -> list[dict]:
+        """Return the entries claim() would hand out next, without claiming them."""
+        ids = [entry_id for entry_id, _ in self.ready()[:limit]]
+        with self._lock:
+            rows = {
+                row[0]: row for row in self.db.execute(
+                    f"SELECT id, priority, enqueued_at, attempts, envelope FROM messages"
+                    f" WHERE id IN ({','.join('?' * len(ids))})",
+                    ids,
+                )
+            }
+        return [
+            {"id": i, "lane": queue_writer.LANES[p], "enqueued_at": t, "attempts": a, "envelope": json.loads(e)}
+            for i, p, t, a, e in (rows[i] for i in ids if i in rows)
+        ]
+
+    def last_id(self) -> int:
+        """Highest id ever handed out (0 for a new queue)."""
+        with self._lock:
+            row = self.db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'messages'").fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            ready, claimed, delayed, failed, oldest = self.db.execute(
+                "SELECT"
+                " COALESCE(SUM(visible_at <= :now AND attempts < :max), 0),"
+                " COALESCE(SUM(visible_at > :now AND lease IS NOT NULL AND attempts < :max), 0),"
+                " COALESCE(SUM(visible_at > :now AND lease IS NULL AND attempts < :max), 0),"
+                " COALESCE(SUM(attempts >= :max), 0),"
+                " MIN(CASE WHEN attempts < :max THEN enqueued_at END)"
+                " FROM messages",
+                {"now": now, "max": self.max_attempts},
+            ).fetchone()
+            by_lane = dict(self.db.execute(
+                "SELECT priority, COUNT(*) FROM messages WHERE visible_at <= ? AND attempts < ? GROUP BY priority",
+                (now, self.max_attempts),
+            ).fetchall())
+        return {
+            "ready": ready,
+            "lanes": {lane: by_lane.get(p, 0) for p, lane in enumerate(queue_writer.LANES)},
+            "claimed": claimed,
+            "delayed": delayed,
+            "failed": failed,
+            "oldest_age": now - oldest if oldest is not None else None,
+        }
+
+
+class DatabaseWatcher:
+    """Watcher for queue_watcher.watch() and the bot's depth gauge on the SQLite backend.
+
+    wait() reports entries enqueued since the last call, pending() the ones
+    waiting to be claimed; both use label() names.
+    """
+
+    def __init__(self, queue: SqliteQueue, interval: float = POLL_INTERVAL):
+        self.queue = queue
+        self.interval = interval
+        self._last_id = queue.last_id()
+
+    def wait(self, timeout: float) -> list[str]:
+        time.sleep(min(timeout, self.interval))
+        last = self.queue.last_id()
+        new = [label(i) for i in range(self._last_id + 1, last + 1)]
+        self._last_id = last
+        return new
+
+    def pending(self) -> list[str]:
+        return [label(entry_id, lane) for entry_id, lane in self.queue.ready()]
+
+    def close(self):
+        pass
+
+
+class FileQueue:
+    """mind-queue on the file backend (message_queue/).
+
+    claim() renames the next file in lane order to claimed/<name>:<lease>,
+    which takes it out of every listing of the queue; the rename is atomic,
+    so when two workers race for a file one of them moves on to the next.
+    The claimed file's mtime is when its lease runs out, and files past it
+    are moved back by the next claim(), peek() or stats(). ack() deletes a
+    claimed file and sends its chat to the back of the line.
+
+    Each claim appends a byte to claimed/.attempts/<name>, so the file's
+    size is the number of claims. An entry given back (by nack or an
+    expired lease) after max_attempts claims goes to failed/ instead.
+    """
+
+    def __init__(
+        self,
+        queue_dir: Path | None = None,
+        visibility_timeout: float = VISIBILITY_TIMEOUT,
+        max_attempts: int = MAX_ATTEMPTS,
+    ):
+        self.queue_dir = queue_dir or queue_writer.MESSAGE_QUEUE_DIR
+        self.claimed_dir = self.queue_dir / "claimed"
+        self.attempts_dir = self.claimed_dir / ".attempts"
+        self.failed_dir = self.queue_dir / "failed"
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _parse_receipt(receipt: str) -> tuple[str, str]:
+        """(file name, lease) of a receipt; a bare file name has no lease."""
+        name, _, lease = receipt.partition(":")
+        if "/" in receipt or not queue_watcher.is_queue_file(name) or (lease and not lease.isalnum()):
+            raise ValueError(f"Not a queue receipt: {receipt!r}")
+        return name, lease
+
+    def _count_attempt(self, name: str) -> int:
+        """Record one more claim of name and return how many there have been."""
+        self.attempts_dir.mkdir(exist_ok=True)
+        fd = os.open(self.attempts_dir / name, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, b".")
+            return os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+    def _attempts(self, name: str) -> int:
+        try:
+            return (self.attempts_dir / name).stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _give_back(self, claimed: Path, name: str) -> bool:
+        """Return a claimed file to the queue, or park it in failed/ if its attempts are used up."""
+        if self._attempts(name) < self.max_attempts:
+            os.rename(claimed, self.queue_dir / name)
+            return False
+        self.failed_dir.mkdir(exist_ok=True)
+        os.rename(claimed, self.failed_dir / name)
+        (self.attempts_dir / name).unlink(missing_ok=True)
+        return True
+
+    def release_expired(self, now: float | None = None) -> int:
+        """Move claimed files whose lease ran out back into the queue (or failed/); return how many."""
+        now = time.time() if now is None else now
+        try:
+            with os.scandir(self.claimed_dir) as entries:
+                expired = [e for e in entries if ":" in e.name and e.stat().st_mtime <= now]
+        except FileNotFoundError:
+            return 0
+        released = 0
+        for entry in expired:
+            try:
+                self._give_back(Path(entry.path), entry.name.partition(":")[0])
+            except FileNotFoundError:
+                continue  # acked or released by someone else meanwhile
+            released += 1
+        return released
+
+    def claim(self, visibility_timeout: float | None = None) -> dict | None:
+        self.release_expired()
+        timeout = self.visibility_timeout if visibility_timeout is None else visibility_timeout
+        self.claimed_dir.mkdir(exist_ok=True)
+        for name in queue_watcher.pending_messages(self.queue_dir):
+            source = self.queue_dir / name
+            receipt = f"{name}:{secrets.token_hex(4)}"
+            claimed = self.claimed_dir / receipt
+            deadline = time.time() + timeout
+            try:
+                # Stamp the lease first, so it is never seen claimed but already expired
+                os.utime(source, (deadline, deadline))
+                os.rename(source, claimed)
+            except FileNotFoundError:
+                continue  # claimed by another worker since the listing
+            attempts = self._count_attempt(name)
+            content = claimed.read_text(encoding="utf-8")
+            return {
+                "id": name, "receipt": receipt, "lane": queue_writer.lane_of(name),
+                "attempts": attempts, "content": content,
+            }
+        return None
+
+    def ack(self, receipt: str) -> bool:
+        name, lease = self._parse_receipt(receipt)
+        try:
+            (self.claimed_dir / receipt if lease else self.queue_dir / name).unlink()
+        except FileNotFoundError:
+            return False
+        (self.attempts_dir / name).unlink(missing_ok=True)
+        queue_writer.record_served(self.queue_dir, queue_writer.chat_of(name), time.time())
+        return True
+
+    def nack(self, receipt: str, delay: float = 0) -> bool:
+        """Give a claimed file back now or after delay seconds; False if the lease was lost.
+
+        A delayed file stays in claimed/ under a new lease that nobody holds,
+        so the old receipt can no longer ack it.
+        """
+        name, lease = self._parse_receipt(receipt)
+        if not lease:
+            return (self.queue_dir / name).exists()
+        claimed = self.claimed_dir / receipt
+        try:
+            if delay > 0 and self._attempts(name) < self.max_attempts:
+                visible = time.time() + delay
+                os.utime(claimed, (visible, visible))
+                os.rename(claimed, self.claimed_dir / f"{name}:{DELAYED}{secrets.token_hex(4)}")
+            else:
+                self._give_back(claimed, name)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def peek(self, limit: int = 10) -> list[dict]:
+        self.release_expired()
+        entries = []
+        for name in queue_watcher.pending_messages(self.queue_dir)[:limit]:
+            try:
+                content = (self.queue_dir / name).read_text(encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            entries.append({"id": name, "lane": queue_writer.lane_of(name), "content": content})
+        return entries
+
+    def stats(self) -> dict:
+        self.release_expired()
+        names = queue_watcher.pending_messages(self.queue_dir)
+        lanes = dict.fromkeys(queue_writer.LANES, 0)
+        for name in names:
+            lanes[queue_writer.lane_of(name)] += 1
+        written = [t for t in map(queue_writer.name_time, names) if t is not None]
+        oldest = (datetime.now() - min(written)).total_seconds() if written else None
+        try:
+            with os.scandir(self.claimed_dir) as entries:
+                leases = [e.name.partition(":")[2] for e in entries if ":" in e.name]
+        except FileNotFoundError:
+            leases = []
+        delayed = sum(1 for lease in leases if lease.startswith(DELAYED))
+        try:
+            with os.scandir(self.failed_dir) as entries:
+                failed = sum(1 for e in entries if queue_watcher.is_queue_file(e.name))
+        except FileNotFoundError:
+            failed = 0
+        return {
+            "ready": len(names), "lanes": lanes, "claimed": len(leases) - delayed, "delayed": delayed,
+            "failed": failed, "oldest_age": oldest,
+        }
+
+
+def enqueue_text(
+    text: str, sender: str, kind: str = "", lane: str = "interactive", queue: SqliteQueue | None = None
+) -> int:
+    """Queue a plain-text entry (queue_writer.py --from ... on the SQLite backend)."""
+    envelope = {"messages": [{"text": text, "from": sender, "time": datetime.now().isoformat()}]}
+    if kind:
+        envelope["kind"] = kind
+    own = queue is None
+    queue = queue or SqliteQueue()
+    try:
+        return queue.enqueue(envelope, lane)
+    finally:
+        if own:
+            queue.close()
+
+
+def _content(entry: dict) -> str:
+    return entry["content"] if "content" in entry else render(entry["envelope"])
+
+
+def _summary(entry: dict) -> str:
+    headers, _, body = _content(entry).partition("\n\n")
+    fields = dict(line.split(": ", 1) for line in headers.splitlines() if ": " in line)
+    lines = body.strip().splitlines()
+    preview = lines[0][:60] if lines else ""
+    count = int(fields.get("Messages", 1))
+    more = f" (+{count - 1} more)" if count > 1 else ""
+    name = label(entry["id"]) if isinstance(entry["id"], int) else entry["id"]
+    return f"{name}  {entry['lane']}  {fields.get('Time', '?')}  {fields.get('From', '?')}: {preview}{more}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Work with the mind's message queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_next = sub.add_parser("next", help="claim the next entry and print it")
+    p_next.add_argument("--timeout", type=float, default=None, help="seconds before it is handed out again")
+    p_next.add_argument("--json", action="store_true")
+    p_ack = sub.add_parser("ack", help="remove a claimed entry")
+    p_ack.add_argument("receipt")
+    p_nack = sub.add_parser("nack", help="give a claimed entry back")
+    p_nack.add_argument("receipt")
+    p_nack.add_argument("--delay", type=float, default=0, help="seconds before it is visible again")
+    p_peek = sub.add_parser("peek", help="list waiting entries without claiming them")
+    p_peek.add_argument("--limit", type=int, default=10)
+    p_peek.add_argument("--json", action="store_true")
+    p_stats = sub.add_parser("stats", help="entry counts")
+    p_stats.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    queue = SqliteQueue() if BACKEND == "sqlite" else FileQueue()
+    try:
+        if args.command == "next":
+            entry = queue.claim(args.timeout)
+            if entry is None:
+                print("No messages waiting", file=sys.stderr)
+                sys.exit(1)
+            if args.json:
+                print(json.dumps(entry))
+            else:
+                print(f"Receipt: {entry['receipt']}\n{_content(entry)}")
+
+        elif args.command in ("ack", "nack"):
+            try:
+                done = queue.ack(args.receipt) if args.command == "ack" else queue.nack(args.receipt, args.delay)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(2)
+            if not done:
+                print(f"Error: lease {args.receipt} expired or unknown", file=sys.stderr)
+                sys.exit(1)
+
+        elif args.command == "peek":
+            entries = queue.peek(args.limit)
+            if args.json:
+                print(json.dumps(entries))
+            else:
+                for entry in entries:
+                    print(_summary(entry))
+                if not entries:
+                    print("No messages waiting", file=sys.stderr)
+
+        elif args.command == "stats":
+            stats = queue.stats()
+            if args.json:
+                print(json.dumps(stats))
+            else:
+                oldest = stats["oldest_age"]
+                print(
+                    f"ready {stats['ready']}, claimed {stats['claimed']}, delayed {stats['delayed']}, "
+                    f"failed {stats['failed']}"
+                    + (f", oldest {oldest:.0f}s" if oldest is not None else "")
+                )
+                print("lanes: " + ", ".join(f"{lane} {n}" for lane, n in stats["lanes"].items()))
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
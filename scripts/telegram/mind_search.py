@@ -0,0 +1,316 @@
+#!/opt/venv/bin/python
+"""
+Full-text search over the mind's conversations and journal.
+
+Keeps an SQLite FTS5 index with one row per "## HH:MM" entry of
+conversations/*.md (and each other chat's conversations/chat-<id>/*.md) and
+journal/*.md, including days mind_archive.py has moved into archive/.
+
+Every query first refreshes the index incrementally: each file's size and
+mtime are compared with the watermark stored for it, and only the bytes
+appended since the last refresh are parsed (from the start of the last
+entry, which may have grown). Files that shrank or were rewritten are
+re-parsed whole; a day that was archived keeps its entries. A full rebuild
+parses live files in parallel across a process pool.
+
+Usage:
+    mind-search "query"                    # FTS5 syntax: words, "phrases", OR, NOT, prefix*
+    mind-search "query" --source journal --since 2025-01-01 --limit 5
+    mind-search --rebuild [--jobs N]       # re-index everything from scratch
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from . import mind_archive
+except ImportError:  # run directly as /opt/scripts/telegram/mind_search.py
+    import mind_archive
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+SOURCES = ("conversations", "journal")
+INDEX_PATH = Path(os.environ.get("MIND_SEARCH_DB", MIND_DIR / "index" / "search.db"))
+
+# Below this many files a rebuild is not worth starting worker processes
+PARALLEL_THRESHOLD = 16
+
+# "## 14:05" (journal) or "## 14:05:09 - user (incoming)" (conversations)
+ENTRY_HEADING = re.compile(rb"^## (\d{1,2}:\d{2}(?::\d{2})?)\b(.*)$", re.MULTILINE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tail_offset INTEGER NOT NULL,
+    tail_digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    day TEXT NOT NULL,
+    time TEXT NOT NULL,
+    heading TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_path ON entries (path, offset);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    heading, body, content='entries', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts (rowid, heading, body) VALUES (new.id, new.heading, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts (entries_fts, rowid, heading, body)
+    VALUES ('delete', old.id, old.heading, old.body);
+END;
+"""
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_entries(data: bytes, base_offset: int = 0) -> list[tuple[int, str, str, str]]:
+    """Split markdown into (offset, time, heading, body) entries.
+
+    Text before the first "## HH:MM" heading (e.g. a title) becomes an entry
+    with an empty time. Offsets are absolute byte positions in the file.
+    """
+    entries = []
+    starts = [(m.start(), m) for m in ENTRY_HEADING.finditer(data)]
+    if not starts or starts[0][0] > 0:
+        preamble = data[:starts[0][0]] if starts else data
+        if preamble.strip():
+            entries.append((base_offset, "", "", preamble.decode("utf-8", "replace").strip()))
+
+    for i, (start, match) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(data)
+        body = data[match.end():end].decode("utf-8", "replace").strip()
+        heading = match.group(2).decode("utf-8", "replace").strip(" -")
+        entries.append((base_offset + start, match.group(1).decode(), heading, body))
+    return entries
+
+
+def scan_file(path: Path, offset: int = 0) -> dict:
+    """Parse path from offset; returns the entries plus the new watermark."""
+    with open(path, "rb") as f:
+        stat = os.fstat(f.fileno())
+        f.seek(offset)
+        data = f.read()
+    return scan_data(data, offset, stat.st_mtime_ns)
+
+
+def scan_data(data: bytes, offset: int, mtime_ns: int) -> dict:
+    """Parse file content that starts at offset (see scan_file)."""
+    entries = parse_entries(data, offset)
+    # The last entry may still grow, so the next refresh re-parses it
+    tail_offset = entries[-1][0] if entries else offset
+    return {
+        "size": offset + len(data),
+        "mtime_ns": mtime_ns,
+        "tail_offset": tail_offset,
+        "tail_digest": _digest(data[tail_offset - offset:]),
+        "entries": entries,
+    }
+
+
+def _source_files(mind_dir: Path) -> dict[str, str]:
+    """Map each indexed file (relative path) to its source name."""
+    files = {}
+    for directory in mind_archive.day_sources(mind_dir, mind_archive.Archive(mind_dir / "archive")):
+        for path in (mind_dir / directory).glob("*.md"):
+            files[f"{directory}/{path.name}"] = directory.split("/", 1)[0]
+    return files
+
+
+def _archived_files(mind_dir: Path) -> dict[str, tuple[str, dict]]:
+    """Map each archived day file (relative path) to its source and archive entry."""
+    archive = mind_archive.Archive(mind_dir / "archive")
+    files = {}
+    for directory in mind_archive.day_sources(mind_dir, archive):
+        for month in archive.months(directory):
+            for name, entry in archive.index(directory, month).items():
+                files[f"{directory}/{name}"] = (directory.split("/", 1)[0], entry)
+    return files
+
+
+def _scan_archived(mind_dir: Path, rel: str, entry: dict) -> dict:
+    source, name = rel.rsplit("/", 1)
+    data = mind_archive.read_file(source, name, mind_dir)
+    return scan_data(data, 0, int(entry["mtime"] * 1e9))
+
+
+class MindIndex:
+    """The FTS5 index of one mind directory."""
+
+    def __init__(self, mind_dir: Path | None = None, index_path: Path | None = None):
+        self.mind_dir = mind_dir or MIND_DIR
+        self.index_path = index_path or INDEX_PATH
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.index_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def _store(self, rel: str, source: str, scan: dict, from_offset: int):
+        day = Path(rel).stem
+        self.db.execute("DELETE FROM entries WHERE path = ? AND offset >= ?", (rel, from_offset))
+        self.db.executemany(
+            "INSERT INTO entries (path, offset, source, day, time, heading, body) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(rel, off, source, day, t, heading, body) for off, t, heading, body in scan["entries"]],
+        )
+        self.db.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, tail_offset, tail_digest) VALUES (?, ?, ?, ?, ?)",
+            (rel, scan["size"], scan["mtime_ns"], scan["tail_offset"], scan["tail_digest"]),
+        )
+
+    def _appended_only(self, path: Path, size: int, tail_offset: int, tail_digest: str) -> bool:
+        """True if the bytes indexed last time are unchanged (the file only grew)."""
+        with open(path, "rb") as f:
+            f.seek(tail_offset)
+            return _digest(f.read(size - tail_offset)) == tail_digest
+
+    def refresh(self) -> int:
+        """Bring the index up to date; returns the number of files re-parsed."""
+        files = _source_files(self.mind_dir)
+        archived = {rel: a for rel, a in _archived_files(self.mind_dir).items() if rel not in files}
+        known = {row[0]: row[1:] for row in self.db.execute(
+            "SELECT path, size, mtime_ns, tail_offset, tail_digest FROM files")}
+        updated = 0
+
+        with self.db:
+            for rel in known.keys() - files.keys() - archived.keys():  # deleted files
+                self.db.execute("DELETE FROM entries WHERE path = ?", (rel,))
+                self.db.execute("DELETE FROM files WHERE path = ?", (rel,))
+
+            for rel, (source, entry) in archived.items():
+                if rel in known and known[rel][0] == entry["size"]:
+                    continue  # indexed before it was archived
+                self._store(rel, source, _scan_archived(self.mind_dir, rel, entry), 0)
+                updated += 1
+
+            for rel, source in files.items():
+                path = self.mind_dir / rel
+                try:
+                    stat = path.stat()
+                    if rel in known:
+                        size, mtime_ns, tail_offset, tail_digest = known[rel]
+                        if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+                            continue
+                        if stat.st_size < size or not self._appended_only(path, size, tail_offset, tail_digest):
+                            tail_offset = 0  # rewritten: start over
+                    else:
+                        tail_offset = 0
+                    self._store(rel, source, scan_file(path, tail_offset), tail_offset)
+                except FileNotFoundError:
+                    continue  # removed while we were looking
+                updated += 1
+        return updated
+
+    def rebuild(self, jobs: int | None = None) -> int:
+        """Re-index every file from scratch; returns the number of files."""
+        files = _source_files(self.mind_dir)
+        archived = {rel: a for rel, a in _archived_files(self.mind_dir).items() if rel not in files}
+        paths = [self.mind_dir / rel for rel in files]
+        if jobs != 1 and len(paths) >= PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                scans = list(pool.map(scan_file, paths, chunksize=8))
+        else:
+            scans = [scan_file(p) for p in paths]
+        scans += [_scan_archived(self.mind_dir, rel, entry) for rel, (_, entry) in archived.items()]
+        files.update({rel: source for rel, (source, _) in archived.items()})
+
+        # Dropping is much faster than deleting row by row through the triggers
+        self.db.executescript("DROP TABLE IF EXISTS entries_fts; DROP TABLE IF EXISTS entries;"
+                              " DROP TABLE IF EXISTS files;" + SCHEMA)
+        with self.db:
+            for (rel, source), scan in zip(files.items(), scans, strict=True):
+                self._store(rel, source, scan, 0)
+        self.db.execute("INSERT INTO entries_fts (entries_fts) VALUES ('optimize')")
+        return len(files)
+
+    def search(self, query: str, limit: int = 20, source: str | None = None, since: str | None = None) -> list[dict]:
+        """Best-matching entries for an FTS5 query, most relevant first."""
+        sql = (
+            "SELECT e.source, e.day, e.time, e.heading,"
+            " snippet(entries_fts, 1, '[', ']', '…', 16)"
+            " FROM entries_fts JOIN entries e ON e.id = entries_fts.rowid"
+            " WHERE entries_fts MATCH ?"
+        )
+        params: list = []
+        if source:
+            sql += " AND e.source = ?"
+            params.append(source)
+        if since:
+            sql += " AND e.day >= ?"
+            params.append(since)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+
+        try:
+            rows = self.db.execute(sql, [query, *params]).fetchall()
+        except sqlite3.OperationalError:
+            # Not valid FTS5 syntax: search for the words literally
+            literal = " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+            rows = self.db.execute(sql, [literal, *params]).fetchall()
+
+        return [
+            {"source": s, "day": d, "time": t, "heading": h, "snippet": snip}
+            for s, d, t, h, snip in rows
+        ]
+
+
+def format_result(result: dict) -> str:
+    when = f"{result['day']} {result['time']}".strip()
+    heading = f" - {result['heading']}" if result["heading"] else ""
+    snippet = " ".join(result["snippet"].split())
+    return f"{when} [{result['source']}]{heading}\n    {snippet}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search conversations and journal entries")
+    parser.add_argument("query", nargs="*", help="FTS5 query")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--source", choices=SOURCES)
+    parser.add_argument("--since", metavar="YYYY-MM-DD")
+    parser.add_argument("--rebuild", action="store_true", help="re-index everything from scratch")
+    parser.add_argument("--jobs", type=int, help="worker processes for --rebuild")
+    args = parser.parse_args()
+
+    if not args.query and not args.rebuild:
+        parser.error("a query is required")
+
+    index = MindIndex()
+    try:
+        if args.rebuild:
+            count = index.rebuild(args.jobs)
+            print(f"Indexed {count} files", file=sys.stderr)
+        else:
+            index.refresh()
+
+        if args.query:
+            results = index.search(" ".join(args.query), args.limit, args.source, args.since)
+            for result in results:
+                print(format_result(result))
+            if not results:
+                print("No matches", file=sys.stderr)
+                sys.exit(1)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
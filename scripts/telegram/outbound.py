@@ -0,0 +1,172 @@
+"""
+Rate-limit-aware outbound message scheduler.
+
+Telegram allows roughly one message per second per chat (with short bursts)
+and about thirty per second per bot. OutboundScheduler keeps a FIFO queue per
+chat, paces sends with per-chat and global token buckets, and when Telegram
+still answers with RetryAfter it pauses every chat for the requested time and
+retries the same message instead of dropping it.
+"""
+
+import asyncio
+import collections
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from typing import Any
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+# Limits (messages per second)
+GLOBAL_RATE = float(os.environ.get("TELEGRAM_GLOBAL_RATE", "30"))
+CHAT_RATE = float(os.environ.get("TELEGRAM_CHAT_RATE", "1"))
+CHAT_BURST = float(os.environ.get("TELEGRAM_CHAT_BURST", "3"))
+MAX_RETRIES = int(os.environ.get("TELEGRAM_MAX_RETRIES", "5"))
+
+# Backoff for transient network errors (seconds, doubled per attempt)
+NETWORK_BACKOFF = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Classic token bucket: refills at rate tokens/s up to capacity."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 if available now)."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self._refill()
+        self.tokens -= 1
+
+
+def _seconds(retry_after: int | float | timedelta) -> float:
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+class OutboundScheduler:
+    """Sends messages through a Bot without tripping Telegram's flood limits."""
+
+    def __init__(
+        self,
+        bot,
+        global_rate: float = GLOBAL_RATE,
+        chat_rate: float = CHAT_RATE,
+        chat_burst: float = CHAT_BURST,
+        max_retries: int = MAX_RETRIES,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.bot = bot
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self._clock = clock
+        self._sleep = sleep
+        self._global = TokenBucket(global_rate, global_rate, clock)
+        self._global_lock = asyncio.Lock()
+        self._chat_buckets: dict[Any, TokenBucket] = {}
+        self._queues: dict[Any, collections.deque] = {}
+        self._workers: dict[Any, asyncio.Task] = {}
+        self._paused_until = 0.0
+
+    def depth(self) -> int:
+        """Number of messages waiting to be sent (including in-flight ones)."""
+        return sum(len(q) for q in self._queues.values())
+
+    def depths(self) -> dict[str, int]:
+        """Queue depth per chat."""
+        return {str(chat_id): len(q) for chat_id, q in self._queues.items()}
+
+    async def send(self, chat_id, text: str, method: str = "send_message", **kwargs):
+        """Queue a message for chat_id and wait until it has been sent.
+
+        Messages for the same chat are sent strictly in the order they were
+        queued. Returns whatever the Bot method returned; raises if the message
+        could not be delivered.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(chat_id, collections.deque()).append((method, text, kwargs, future))
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._run_chat(chat_id))
+        return await future
+
+    async def _acquire(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, self._clock)
+
+        while True:
+            wait = max(self._paused_until - self._clock(), bucket.wait_time())
+            if wait > 0:
+                await self._sleep(wait)
+                continue
+
+            # The global bucket is shared, so chats take turns in lock order
+            async with self._global_lock:
+                global_wait = self._global.wait_time()
+                if global_wait > 0:
+                    await self._sleep(global_wait)
+                self._global.consume()
+            bucket.consume()
+            return
+
+    async def _run_chat(self, chat_id):
+        queue = self._queues[chat_id]
+        try:
+            while queue:
+                method, text, kwargs, future = queue[0]
+                if not future.cancelled():
+                    try:
+                        future.set_result(await self._deliver(chat_id, method, text, kwargs))
+                    except Exception as e:
+                        if not future.cancelled():
+                            future.set_exception(e)
+                queue.popleft()
+        finally:
+            del self._workers[chat_id]
+            if not queue:
+                del self._queues[chat_id]
+
+    async def _deliver(self, chat_id, method: str, text: str, kwargs: dict):
+        attempt = 0
+        while True:
+            await self._acquire(chat_id)
+            try:
+                return await getattr(self.bot, method)(chat_id=chat_id, text=text, **kwargs)
+            except RetryAfter as e:
+                delay = _seconds(e.retry_after)
+                self._paused_until = max(self._paused_until, self._clock() + delay)
+                logger.warning(f"Flood limit hit for chat {chat_id}, retrying in {delay:.0f}s")
+            except BadRequest:
+                raise  # the message itself is invalid; retrying cannot help
+            except TimedOut:
+                raise  # Telegram may have delivered it; resending could duplicate
+            except NetworkError as e:
+                delay = NETWORK_BACKOFF * 2 ** attempt
+                logger.warning(f"Network error sending to chat {chat_id} ({e}), retrying in {delay:.0f}s")
+                await self._sleep(delay)
+
+            attempt += 1
+            if attempt > self.max_retries:
+                raise RuntimeError(f"Giving up on message to chat {chat_id} after {attempt} attempts")
@@ -0,0 +1,326 @@
+#!/opt/venv/bin/python
+"""
+Queue watcher daemon for the Claude persistent mind.
+
+Watches message_queue/ for new .msg files and nudges the Claude worker
+sessions through send_to_claude.sh, so messages are picked up as soon as they
+land instead of whenever a session happens to list the directory. With a
+pool of workers (worker_pool.py) as many workers are nudged as there are
+entries waiting, up to the pool size; each claims its own entry.
+
+Uses inotify on Linux and falls back to polling with os.scandir elsewhere.
+Bursts of files are debounced into a single notification. With
+MIND_QUEUE_BACKEND=sqlite it polls the queue database (mind_queue.py) instead.
+
+Usage:
+    queue_watcher.py [--debounce 1.0] [--backend auto|inotify|scandir]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import signal
+import struct
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from . import queue_writer, worker_pool
+except ImportError:  # run directly as /opt/scripts/telegram/queue_watcher.py
+    import queue_writer
+    import worker_pool
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+MESSAGE_QUEUE_DIR = MIND_DIR / "message_queue"
+SEND_TO_CLAUDE = Path("/opt/scripts/claude/send_to_claude.sh")
+
+# Tuning
+DEBOUNCE_SECONDS = float(os.environ.get("MIND_WATCH_DEBOUNCE", "1.0"))
+POLL_INTERVAL = float(os.environ.get("MIND_WATCH_POLL_INTERVAL", "2.0"))
+
+# inotify constants (linux/inotify.h)
+IN_ACCESS = 0x00000001
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+NEW_FILE_EVENTS = IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Logging
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+
+def is_queue_file(name: str) -> bool:
+    """Return True for finished queue entries (not hidden temp files)."""
+    return name.endswith(".msg") and not name.startswith(".")
+
+
+def pending_messages(queue_dir: Path) -> list[str]:
+    """Return the names of all pending queue files in the order to process them.
+
+    That is lane order (interactive first), oldest first within a lane, with
+    lower-lane files that have waited too long moved up (queue_writer.lane_rank),
+    and the chats of a lane taking turns (queue_writer.fair_order).
+    """
+    try:
+        with os.scandir(queue_dir) as entries:
+            names = [e.name for e in entries if is_queue_file(e.name) and e.is_file()]
+    except FileNotFoundError:
+        return []
+
+    now = datetime.now()
+
+    def order(name: str):
+        lane = queue_writer.lane_of(name)
+        if lane == "interactive":
+            return (0, name)
+        written = queue_writer.name_time(name)
+        age = (now - written).total_seconds() if written else 0.0
+        return (queue_writer.lane_rank(lane, age), name)
+
+    ranked = sorted((order(name), name) for name in names)
+    return queue_writer.fair_order(
+        [(rank, queue_writer.chat_of(name), name) for (rank, _), name in ranked],
+        queue_writer.read_served(queue_dir),
+    )
+
+
+class ScandirWatcher:
+    """Portable watcher that diffs directory listings every poll interval."""
+
+    def __init__(self, queue_dir: Path, interval: float = POLL_INTERVAL):
+        self.queue_dir = queue_dir
+        self.interval = interval
+        self._seen = set(pending_messages(queue_dir))
+
+    def wait(self, timeout: float) -> list[str]:
+        """Block up to timeout seconds and return newly appeared queue files."""
+        time.sleep(min(timeout, self.interval))
+        current = set(pending_messages(self.queue_dir))
+        new = sorted(current - self._seen)
+        self._seen = current
+        return new
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux watcher driven by inotify events on the queue directory."""
+
+    def __init__(self, queue_dir: Path, mask: int = NEW_FILE_EVENTS):
+        libc = _load_libc()
+        if libc is None:
+            raise OSError("inotify is not available on this platform")
+
+        self.queue_dir = queue_dir
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(queue_dir), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {queue_dir}")
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def wait(self, timeout: float) -> list[str]:
+        """Block up to timeout seconds and return queue files named in events."""
+        return sorted({name for _, name in self.read_events(timeout)})
+
+    def read_events(self, timeout: float) -> list[tuple[int, str]]:
+        """Block up to timeout seconds and return (mask, name) for queue file events."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+
+        events = []
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            events.extend(_parse_masked_events(data))
+        return [(mask, name) for mask, name in events if is_queue_file(name)]
+
+    def close(self):
+        os.close(self._fd)
+
+
+def _load_libc():
+    path = ctypes.util.find_library("c")
+    if not path:
+        return None
+    libc = ctypes.CDLL(path, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+def _parse_masked_events(data: bytes) -> list[tuple[int, str]]:
+    """Decode a buffer of struct inotify_event records into (mask, file name)."""
+    events = []
+    offset = 0
+    while offset + _EVENT_HEADER.size <= len(data):
+        _wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+        offset += _EVENT_HEADER.size
+        raw = data[offset:offset + length].rstrip(b"\0")
+        offset += length
+        if raw:
+            events.append((mask, os.fsdecode(raw)))
+    return events
+
+
+def make_watcher(queue_dir: Path, backend: str = "auto", mask: int = NEW_FILE_EVENTS):
+    """Create the best available watcher for the requested backend.
+
+    mask selects the inotify events to report; the scandir fallback only
+    ever reports new files.
+    """
+    if backend in ("auto", "inotify"):
+        try:
+            return InotifyWatcher(queue_dir, mask)
+        except OSError as e:
+            if backend == "inotify":
+                raise
+            logger.warning(f"inotify unavailable ({e}), falling back to scandir polling")
+    return ScandirWatcher(queue_dir)
+
+
+def format_notification(pending: list[str], database: bool = False) -> str:
+    """Build the line injected into the Claude session (pending is in processing order)."""
+    count = len(pending)
+    noun = "message" if count == 1 else "messages"
+    where = "" if database else " in ~/workspace/mind/message_queue/"
+    return (
+        f"[queue] {count} new {noun} waiting{where} (next: {pending[0]}). "
+        f"Please process them now with mind-queue next / mind-queue ack."
+    )
+
+
+def notify_session(text: str, count: int = 1) -> bool:
+    """Send a notification line to count worker sessions (idle ones first)."""
+    try:
+        result = subprocess.run(
+            [str(SEND_TO_CLAUDE), "--count", str(count), text],
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.error(f"Failed to run {SEND_TO_CLAUDE}: {e}")
+        return False
+
+    if result.returncode != 0:
+        logger.warning(f"Session notification failed: {result.stderr.strip()}")
+        return False
+    return True
+
+
+def watch(
+    queue_dir: Path,
+    watcher,
+    notify: Callable[[str, int], bool] = notify_session,
+    debounce: float = DEBOUNCE_SECONDS,
+    stop: threading.Event | None = None,
+    pending_fn: Callable[[], list[str]] | None = None,
+    workers: int | None = None,
+):
+    """Notify the workers whenever new queue files appear, until stop is set.
+
+    pending_fn lists waiting entries when they are not files in queue_dir
+    (the SQLite backend passes DatabaseWatcher.pending). Each notification
+    goes to one worker per waiting entry, at most `workers` (MIND_WORKERS).
+    """
+    stop = stop or threading.Event()
+    workers = workers or worker_pool.WORKERS
+    database = pending_fn is not None
+    pending_fn = pending_fn or (lambda: pending_messages(queue_dir))
+
+    pending = pending_fn()
+    if pending:
+        notify(format_notification(pending, database), min(len(pending), workers))
+
+    while not stop.is_set():
+        if not watcher.wait(1.0):
+            continue
+
+        # Collect the rest of the burst before notifying once
+        deadline = time.monotonic() + debounce
+        while not stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            watcher.wait(remaining)
+
+        pending = pending_fn()
+        if pending:
+            logger.info(f"{len(pending)} pending message(s), notifying session")
+            notify(format_notification(pending, database), min(len(pending), workers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notify the Claude session about new queue messages.")
+    parser.add_argument("--queue-dir", type=Path, default=None, help="Override the queue directory")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE_SECONDS, help="Seconds to coalesce a burst")
+    parser.add_argument("--backend", choices=("auto", "inotify", "scandir"), default="auto")
+    args = parser.parse_args()
+
+    queue_dir = args.queue_dir or MESSAGE_QUEUE_DIR
+    queue_dir.mkdir(parents=True, exist_ok=True)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    try:
+        from . import mind_queue
+    except ImportError:  # run directly as /opt/scripts/telegram/queue_watcher.py
+        import mind_queue
+
+    if mind_queue.BACKEND == "sqlite":
+        database = mind_queue.SqliteQueue()
+        watcher = mind_queue.DatabaseWatcher(database)
+        logger.info(f"Watching {database.path}")
+        try:
+            watch(queue_dir, watcher, debounce=args.debounce, stop=stop, pending_fn=watcher.pending)
+        finally:
+            database.close()
+        logger.info("Queue watcher stopped")
+        return
+
+    try:
+        watcher = make_watcher(queue_dir, args.backend)
+    except OSError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    logger.info(f"Watching {queue_dir} with {type(watcher).__name__}")
+    try:
+        watch(queue_dir, watcher, debounce=args.debounce, stop=stop)
+    finally:
+        watcher.close()
+    logger.info("Queue watcher stopped")
+
+
+if __name__ == "__main__":
+    main()
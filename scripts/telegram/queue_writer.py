@@ -0,0 +1,318 @@
+#!/opt/venv/bin/python
+"""
+Atomic, collision-free writer for the mind message queue.
+
+Every producer (bot.py, reflection_cron.sh) goes through this module so that
+queue files always have unique names that sort in arrival order and are never
+visible half-written.
+
+File names look like:
+    YYYYMMDD-HHMMSS-ffffff-SSSS-PID[-suffix][+chat][@lane].msg
+
+Entries belong to a priority lane (no tag means interactive) and a chat
+shard (no tag means the primary chat, see chats.py). Consumers take them in
+lane order rather than name order, with the chats of a lane taking turns;
+see lane_rank() and fair_order().
+
+With MIND_QUEUE_BACKEND=sqlite the CLI queues into mind_queue.py's database
+instead (unless --queue-dir names a directory).
+
+Usage:
+    echo "body" | queue_writer.py --from "system (hourly reflection)" --suffix reflection --lane system
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+MESSAGE_QUEUE_DIR = MIND_DIR / "message_queue"
+
+# fsync policy:
+#   none - rely on the page cache (fastest, may lose the newest files on power loss)
+#   file - fsync each file before it is renamed into place (default)
+#   full - also fsync the queue directory so the rename itself is durable
+FSYNC_POLICIES = ("none", "file", "full")
+FSYNC_POLICY = os.environ.get("MIND_QUEUE_FSYNC", "file")
+
+# Priority lanes, most urgent first. An entry that has waited LANE_MAX_WAIT
+# seconds in a lower lane is served like an interactive one, so user messages
+# go first but the lower lanes never starve.
+LANES = ("interactive", "system", "background")
+LANE_MAX_WAIT = {
+    "interactive": 0.0,
+    "system": float(os.environ.get("MIND_QUEUE_SYSTEM_MAX_WAIT", "300")),
+    "background": float(os.environ.get("MIND_QUEUE_BACKGROUND_MAX_WAIT", "1800")),
+}
+
+# Which chat shard a consumer served last, for fair_order() (hidden, so never a queue entry)
+SERVED_FILE = ".served.json"
+
+_CHAT_TAG = re.compile(r"\+(-?\d+)(?:@\w+)?(?:\.msg)?$")
+
+_name_lock = threading.Lock()
+_last_stamp: datetime | None = None
+_sequence = 0
+
+
+def next_message_name(
+    now: datetime | None = None, suffix: str = "", lane: str = "interactive", chat: str = ""
+) -> str:
+    """Return a unique queue file name that sorts after every earlier name.
+
+    The timestamp never goes backwards within a process; messages sharing a
+    microsecond get an increasing sequence number, and the PID separates
+    concurrent writer processes.
+    """
+    global _last_stamp, _sequence
+
+    now = now or datetime.now()
+
+    with _name_lock:
+        if _last_stamp is None or now > _last_stamp:
+            _last_stamp = now
+            _sequence = 0
+        else:
+            _sequence += 1
+        stamp, sequence = _last_stamp, _sequence
+
+    name = f"{stamp:%Y%m%d-%H%M%S-%f}-{sequence:04d}-{os.getpid()}"
+    if suffix:
+        name += f"-{suffix}"
+    if chat:
+        name += f"+{chat}"
+    if lane != "interactive":
+        name += f"@{lane}"
+    return f"{name}.msg"
+
+
+def lane_of(name: str) -> str:
+    """Lane of a queue entry name ("...@system.msg", "#42@system"); untagged is interactive."""
+    _, tagged, lane = name.removesuffix(".msg").rpartition("@")
+    return lane if tagged and lane in LANES else "interactive"
+
+
+def chat_of(name: str) -> str:
+    """Chat shard of a queue entry name ("...+-100123@system.msg"); untagged is the primary chat ("")."""
+    match = _CHAT_TAG.search(name)
+    return match.group(1) if match else ""
+
+
+def name_time(name: str) -> datetime | None:
+    """When a queue file was written, from its name (None for foreign names)."""
+    try:
+        return datetime.strptime(name[:22], "%Y%m%d-%H%M%S-%f")
+    except ValueError:
+        return None
+
+
+def lane_rank(lane: str, age: float) -> int:
+    """Where an entry of this lane and age (seconds) sorts; lower goes first.
+
+    Entries with equal rank are taken oldest first.
+    """
+    if age >= LANE_MAX_WAIT[lane]:
+        return 0
+    return LANES.index(lane)
+
+
+def fair_order(entries: list[tuple[int, str, object]], served: dict[str, float] | None = None) -> list:
+    """Order (rank, chat, item) triples, given oldest first, so chats take turns.
+
+    Lower ranks still go first. Within a rank every chat's oldest entry comes
+    before any chat's second, and so on; chats served least recently (served
+    maps chat -> time of its last ack) go first in each round. Each chat's own
+    entries keep their order.
+    """
+    served = served or {}
+    turns: dict[tuple[int, str], int] = {}
+    keyed = []
+    for position, (rank, chat, item) in enumerate(entries):
+        turn = turns.get((rank, chat), 0)
+        turns[rank, chat] = turn + 1
+        keyed.append(((rank, turn, served.get(chat, 0.0), position), item))
+    keyed.sort(key=lambda k: k[0])
+    return [item for _, item in keyed]
+
+
+def read_served(queue_dir: Path) -> dict[str, float]:
+    """When each chat shard of a queue directory last had an entry acked."""
+    try:
+        served = json.loads((queue_dir / SERVED_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    return served if isinstance(served, dict) else {}
+
+
+def record_served(queue_dir: Path, chat: str, when: float):
+    """Note that an entry of chat was just acked (best effort: it only steers fairness)."""
+    served = read_served(queue_dir)
+    served[chat] = when
+    tmp = queue_dir / f"{SERVED_FILE}.{os.getpid()}.tmp"
+    try:
+        tmp.write_text(json.dumps(served))
+        os.replace(tmp, queue_dir / SERVED_FILE)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+
+
+def format_message(
+    text: str, sender: str, now: datetime | None = None, message_id: str | None = None, chat: str = ""
+) -> str:
+    """Render a queue entry with the standard From/Time (and optional Id and Chat) headers.
+
+    Chat names a chat other than the primary one, which replies must go to
+    (send-telegram --chat).
+    """
+    now = now or datetime.now()
+    headers = f"From: {sender}\nTime: {now.isoformat()}\n"
+    if chat:
+        headers += f"Chat: {chat}\n"
+    if message_id:
+        headers += f"Id: {message_id}\n"
+    return f"{headers}\n{text}"
+
+
+def message_text(message: dict) -> str:
+    """A message's text, plus a reference line for its attachment if it has one.
+
+    The attachment dict (see attachments.py) carries "kind", "path", "size"
+    and optionally the original "name"; the file itself stays in the store.
+    """
+    attachment = message.get("attachment")
+    if not attachment:
+        return message["text"]
+    details = [attachment["name"]] if attachment.get("name") else []
+    details.append(f"{attachment['size']} bytes")
+    line = f"[{attachment['kind']}: {attachment['path']} ({', '.join(details)})]"
+    return f"{line}\n{message['text']}" if message["text"] else line
+
+
+def format_batch(messages: list[dict], chat: str = "") -> str:
+    """Render several messages from one sender as a single queue entry.
+
+    Each message is a dict with "text", "from", "time" (ISO format) and
+    optionally "id" and "attachment". A single message is rendered exactly
+    like format_message(); a burst keeps every original timestamp in the body.
+    """
+    first = messages[0]
+    ids = [m["id"] for m in messages if m.get("id")]
+    if len(messages) == 1:
+        return format_message(
+            message_text(first), first["from"], datetime.fromisoformat(first["time"]), first.get("id"), chat)
+
+    headers = f"From: {first['from']}\nTime: {first['time']}\n"
+    if chat:
+        headers += f"Chat: {chat}\n"
+    if ids:
+        headers += f"Id: {' '.join(ids)}\n"
+    headers += f"Messages: {len(messages)}\n"
+    body = "\n\n".join(f"[{datetime.fromisoformat(m['time']):%H:%M:%S}] {message_text(m)}" for m in messages)
+    return f"{headers}\n{body}"
+
+
+def _fsync_directory(directory: Path):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_message(
+    content: str,
+    queue_dir: Path | None = None,
+    now: datetime | None = None,
+    suffix: str = "",
+    fsync: str | None = None,
+    lane: str = "interactive",
+    chat: str = "",
+) -> str:
+    """Atomically write content into the queue and return the filename.
+
+    The data is written to a hidden temp file first and then hard-linked to
+    its final name, so readers globbing ``*.msg`` only ever see complete files
+    and an existing file is never overwritten.
+    """
+    queue_dir = queue_dir or MESSAGE_QUEUE_DIR
+    policy = fsync or FSYNC_POLICY
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f"Unknown fsync policy: {policy!r} (expected one of {FSYNC_POLICIES})")
+    if lane not in LANES:
+        raise ValueError(f"Unknown lane: {lane!r} (expected one of {LANES})")
+    if chat and not re.fullmatch(r"-?\d+", chat):
+        raise ValueError(f"Not a chat id: {chat!r}")
+
+    queue_dir.mkdir(parents=True, exist_ok=True)
+
+    filename = next_message_name(now, suffix, lane, chat)
+    tmp_path = queue_dir / f".{filename}.tmp"
+
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
+        f.flush()
+        if policy != "none":
+            os.fsync(f.fileno())
+
+    try:
+        while True:
+            try:
+                os.link(tmp_path, queue_dir / filename)
+                break
+            except FileExistsError:
+                filename = next_message_name(now, suffix, lane, chat)
+    finally:
+        tmp_path.unlink()
+
+    if policy == "full":
+        _fsync_directory(queue_dir)
+
+    return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a message into the mind message queue.")
+    parser.add_argument("text", nargs="*", help="Message body (read from stdin if omitted)")
+    parser.add_argument("--from", dest="sender", default="system", help="Value of the From header")
+    parser.add_argument("--suffix", default="", help="Optional filename suffix, e.g. 'reflection'")
+    parser.add_argument("--lane", choices=LANES, default="system", help="Priority lane (default: system)")
+    parser.add_argument("--queue-dir", type=Path, default=None, help="Override the queue directory")
+    parser.add_argument("--fsync", choices=FSYNC_POLICIES, default=None, help="Override MIND_QUEUE_FSYNC")
+    args = parser.parse_args()
+
+    text = " ".join(args.text) if args.text else sys.stdin.read()
+    if not text.strip():
+        print("Error: Empty message", file=sys.stderr)
+        sys.exit(1)
+
+    if args.queue_dir is None:
+        try:
+            from . import mind_queue
+        except ImportError:  # run directly as /opt/scripts/telegram/queue_writer.py
+            import mind_queue
+        if mind_queue.BACKEND == "sqlite":
+            entry_id = mind_queue.enqueue_text(text, args.sender, kind=args.suffix, lane=args.lane)
+            print(f"{mind_queue.QUEUE_DB}{mind_queue.label(entry_id, args.lane)}")
+            return
+
+    now = datetime.now()
+    filename = write_message(
+        format_message(text, args.sender, now),
+        queue_dir=args.queue_dir,
+        now=now,
+        suffix=args.suffix,
+        lane=args.lane,
+        fsync=args.fsync,
+    )
+    print((args.queue_dir or MESSAGE_QUEUE_DIR) / filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+#!/opt/venv/bin/python
+"""
+Reflection scheduler for the Claude persistent mind.
+
+Replaces the fixed `0 * * * *` cron line. Once a minute it decides whether
+the next reflection is due and, if so, runs reflection_cron.sh (memory
+compaction plus the queued prompt). A due reflection waits while:
+
+- no Claude worker session is up (a prompt nobody reads only goes stale;
+  ticks missed meanwhile collapse into one reflection when one is back)
+- messages from the user are waiting (they go first; the reflection follows
+  once the interactive lane is empty)
+- the previous reflection prompt is still in the queue
+
+The interval adapts to activity: after a reflection with no conversation
+since the one before, the next gap doubles (up to MIND_REFLECT_MAX_INTERVAL);
+any new conversation entry brings it back to MIND_REFLECT_INTERVAL.
+
+State (last reflection, current interval, the queued prompt) lives in
+state/reflection.json so a restart neither fires early nor forgets.
+
+Usage:
+    reflection_scheduler.py [--once]
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+try:
+    from . import queue_watcher, queue_writer, worker_pool
+except ImportError:  # run directly as /opt/scripts/telegram/reflection_scheduler.py
+    import queue_watcher
+    import queue_writer
+    import worker_pool
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+MESSAGE_QUEUE_DIR = MIND_DIR / "message_queue"
+CONVERSATIONS_DIR = MIND_DIR / "conversations"
+STATE_PATH = MIND_DIR / "state" / "reflection.json"
+REFLECTION_SCRIPT = Path("/opt/scripts/claude/reflection_cron.sh")
+
+# Seconds between reflections while the user is active, and the idle ceiling
+BASE_INTERVAL = float(os.environ.get("MIND_REFLECT_INTERVAL", "3600"))
+MAX_INTERVAL = float(os.environ.get("MIND_REFLECT_MAX_INTERVAL", "14400"))
+CHECK_INTERVAL = float(os.environ.get("MIND_REFLECT_CHECK_INTERVAL", "60"))
+
+# Logging
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+
+def session_alive(sessions: list[str] | None = None) -> bool:
+    """Return True if any of the worker tmux sessions exists."""
+    for session in sessions or worker_pool.sessions():
+        try:
+            result = subprocess.run(["tmux", "has-session", "-t", session], capture_output=True, timeout=10)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            logger.warning(f"Could not check tmux session: {e}")
+            return False
+        if result.returncode == 0:
+            return True
+    return False
+
+
+def last_activity(conversations_dir: Path | None = None) -> float:
+    """Unix time of the newest conversation log write (0 if there is none).
+
+    Looks at the primary chat's day files and one level down into the
+    chat-<id>/ directories of the other chats (a directory's own mtime
+    does not change when a file in it is appended to).
+    """
+    conversations_dir = conversations_dir or CONVERSATIONS_DIR
+    newest = 0.0
+    try:
+        with os.scandir(conversations_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md"):
+                    newest = max(newest, entry.stat().st_mtime)
+                elif entry.name.startswith("chat-") and entry.is_dir():
+                    newest = max(newest, last_activity(Path(entry.path)))
+    except FileNotFoundError:
+        pass
+    return newest
+
+
+def queued_name(path: str) -> str:
+    """Turn queue_writer.py's output into the name the queue lists it under.
+
+    ".../message_queue/2025...-reflection@system.msg" -> the file name,
+    ".../message_queue.db#12@system" -> "#12@system".
+    """
+    name = path.strip().rsplit("/", 1)[-1]
+    _, hashed, entry = name.partition("#")
+    return f"#{entry}" if hashed else name
+
+
+def run_reflection() -> str | None:
+    """Run reflection_cron.sh and return the queue name of the prompt it wrote."""
+    try:
+        result = subprocess.run([str(REFLECTION_SCRIPT)], capture_output=True, text=True, timeout=300)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.error(f"Failed to run {REFLECTION_SCRIPT}: {e}")
+        return None
+    if result.returncode != 0:
+        logger.error(f"{REFLECTION_SCRIPT.name} failed: {result.stderr.strip()}")
+        return None
+    _, _, path = result.stdout.strip().rpartition("Reflection prompt queued: ")
+    return queued_name(path) if path else None
+
+
+class ReflectionScheduler:
+    """Decides when to queue the next reflection."""
+
+    def __init__(
+        self,
+        pending_fn: Callable[[], list[str]],
+        trigger: Callable[[], str | None] = run_reflection,
+        alive: Callable[[], bool] = session_alive,
+        activity: Callable[[], float] = last_activity,
+        state_path: Path | None = None,
+        interval: float = BASE_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.pending_fn = pending_fn
+        self.trigger = trigger
+        self.alive = alive
+        self.activity = activity
+        self.state_path = state_path or STATE_PATH
+        self.base_interval = interval
+        self.max_interval = max(interval, max_interval)
+        self.clock = clock
+        self.last: float | None = None
+        self.interval = interval
+        self.queued: str | None = None
+        self._load()
+
+    def _load(self):
+        try:
+            state = json.loads(self.state_path.read_text())
+            self.last = float(state["last"])
+            self.interval = min(max(float(state["interval"]), self.base_interval), self.max_interval)
+            self.queued = state.get("queued")
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable scheduler state {self.state_path} ({e})")
+
+    def _save(self):
+        state = {"last": self.last, "interval": self.interval, "queued": self.queued}
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.state_path)
+
+    def due(self) -> float:
+        """Unix time the next reflection is due."""
+        return self.last + self.interval
+
+    def check(self) -> str:
+        """Queue a reflection if one is due and nothing stands in the way.
+
+        Returns what happened: "queued", "not_due", "session_down", "busy"
+        (user messages waiting), "pending" (the last prompt is still queued)
+        or "failed".
+        """
+        now = self.clock()
+        if self.last is None:
+            # First start: the session is reading its startup prompt, so count from now
+            self.last = now
+            self._save()
+            return "not_due"
+
+        active = self.activity() > self.last
+        if active and self.interval > self.base_interval:
+            self.interval = self.base_interval
+            self._save()
+        if now < self.due():
+            return "not_due"
+        if not self.alive():
+            return "session_down"
+
+        pending = self.pending_fn()
+        if self.queued is not None and self.queued in pending:
+            return "pending"
+        if any(queue_writer.lane_of(name) == "interactive" for name in pending):
+            return "busy"
+
+        name = self.trigger()
+        if name is None:
+            return "failed"
+        # Nothing happened since the last reflection: wait longer for the next
+        self.interval = self.base_interval if active else min(self.interval * 2, self.max_interval)
+        self.last = now
+        self.queued = name
+        self._save()
+        logger.info(f"Queued reflection {name}; next in {self.interval / 60:.0f} min")
+        return "queued"
+
+    def run(self, stop: threading.Event, check_interval: float = CHECK_INTERVAL):
+        """Check every check_interval seconds until stop is set."""
+        last_outcome = None
+        while not stop.is_set():
+            outcome = self.check()
+            if outcome != last_outcome and outcome not in ("not_due", "queued"):
+                logger.info(f"Reflection due but deferred: {outcome}")
+            last_outcome = outcome
+            stop.wait(check_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue reflection prompts when the mind is ready for them.")
+    parser.add_argument("--once", action="store_true", help="check once and exit")
+    args = parser.parse_args()
+
+    try:
+        from . import mind_queue
+    except ImportError:  # run directly as /opt/scripts/telegram/reflection_scheduler.py
+        import mind_queue
+
+    database = None
+    if mind_queue.BACKEND == "sqlite":
+        database = mind_queue.SqliteQueue()
+        pending_fn = mind_queue.DatabaseWatcher(database).pending
+    else:
+        pending_fn = lambda: queue_watcher.pending_messages(MESSAGE_QUEUE_DIR)  # noqa: E731
+
+    scheduler = ReflectionScheduler(pending_fn)
+    try:
+        if args.once:
+            print(scheduler.check())
+            return
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        signal.signal(signal.SIGINT, lambda *_: stop.set())
+        logger.info(f"Reflection scheduler started (every {BASE_INTERVAL / 60:.0f}-{MAX_INTERVAL / 60:.0f} min)")
+        scheduler.run(stop)
+        logger.info("Reflection scheduler stopped")
+    finally:
+        if database is not None:
+            database.close()
+
+
+if __name__ == "__main__":
+    main()
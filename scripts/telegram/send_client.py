@@ -0,0 +1,211 @@
+#!/opt/venv/bin/python
+"""
+Thin send-telegram client.
+
+Hands the message to the resident send daemon (send_daemon.py) over a local
+Unix socket, so a reply costs one socket round-trip instead of a fresh
+python-telegram-bot import and TLS handshake. If the daemon is not running,
+falls back to the direct path in send_message.py.
+
+Usage:
+    send-telegram "Your message here"
+    echo "message" | send-telegram
+    long_running_command | send-telegram --stream   # edit in place as it grows
+    send-telegram --chat -100123 "message"          # another allowed chat (the queue entry's Chat:)
+    send-telegram --stats        # outbound queue depth of the daemon
+"""
+
+import asyncio
+import codecs
+import json
+import os
+import socket
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+RUN_DIR = MIND_DIR / "run"
+SOCKET_PATH = Path(os.environ.get("SEND_TELEGRAM_SOCKET", RUN_DIR / "send-telegram.sock"))
+
+# How long to wait for the daemon to confirm delivery
+REPLY_TIMEOUT = float(os.environ.get("SEND_TELEGRAM_TIMEOUT", "60"))
+
+# Longest request line the daemon reads (a whole reply, JSON-escaped: up to 6 bytes a character)
+MAX_REQUEST_BYTES = int(os.environ.get("SEND_TELEGRAM_MAX_REQUEST", str(16 * 1024 * 1024)))
+
+# The daemon's error for a longer request; it did not take the message, so the client sends directly
+TOO_LARGE = "request too large"
+
+
+def _request(request: dict, socket_path: Path) -> dict | None:
+    """Send one request to the daemon and return its reply.
+
+    Returns None if the daemon could not be reached at all.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(REPLY_TIMEOUT)
+    try:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            return None  # no daemon listening
+
+        try:
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("r", encoding="utf-8") as reader:
+                line = reader.readline()
+        except OSError as e:
+            return {"ok": False, "error": f"lost connection to send daemon: {e}"}
+    finally:
+        sock.close()
+
+    if not line:
+        return {"ok": False, "error": "send daemon closed the connection"}
+    return json.loads(line)
+
+
+def send_via_daemon(text: str, socket_path: Path | None = None, chat: str | None = None) -> bool | None:
+    """Send text through the daemon.
+
+    Returns True/False for delivered/failed, or None if the daemon could not
+    be reached at all or refused the request as too large (the caller may
+    then fall back to a direct send).
+    """
+    # Once connected, the daemon owns the message: a failure after that point
+    # is never retried directly, or a slow reply would turn into a duplicate.
+    request = {"text": text}
+    if chat is not None:
+        request["chat"] = chat
+    reply = _request(request, socket_path or SOCKET_PATH)
+    if reply is None or reply.get("error") == TOO_LARGE:
+        return None
+
+    if not reply.get("ok"):
+        print(f"Error sending message: {reply.get('error', 'unknown error')}", file=sys.stderr)
+        return False
+    return True
+
+
+def stdin_chunks() -> Iterator[str]:
+    """Yield stdin text as soon as it is available, without waiting for EOF."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = sys.stdin.fileno()
+    while True:
+        data = os.read(fd, 4096)
+        text = decoder.decode(data, final=not data)
+        if text:
+            yield text
+        if not data:
+            return
+
+
+def stream_via_daemon(
+    chunks: Iterable[str], socket_path: Path | None = None, chat: str | None = None
+) -> bool | None:
+    """Stream text to the daemon chunk by chunk.
+
+    Same return convention as send_via_daemon(); chunks are only consumed
+    once the daemon is connected, so the caller can still fall back.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(str(socket_path or SOCKET_PATH))
+        except OSError:
+            return None
+
+        try:
+            start = {"op": "stream"} if chat is None else {"op": "stream", "chat": chat}
+            sock.sendall(json.dumps(start).encode("utf-8") + b"\n")
+            for chunk in chunks:
+                sock.sendall(json.dumps({"text": chunk}).encode("utf-8") + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            sock.settimeout(REPLY_TIMEOUT)
+            with sock.makefile("r", encoding="utf-8") as reader:
+                line = reader.readline()
+        except OSError as e:
+            line = json.dumps({"ok": False, "error": f"lost connection to send daemon: {e}"})
+    finally:
+        sock.close()
+
+    reply = json.loads(line) if line else {"ok": False, "error": "send daemon closed the connection"}
+    if not reply.get("ok"):
+        print(f"Error sending message: {reply.get('error', 'unknown error')}", file=sys.stderr)
+        return False
+    return True
+
+
+def daemon_stats(socket_path: Path | None = None) -> dict | None:
+    """Return the daemon's outbound queue depth, or None if it is not running."""
+    return _request({"op": "stats"}, socket_path or SOCKET_PATH)
+
+
+def send_direct(text: str, chat: str | None = None) -> bool:
+    """Send text in-process using the original send_message.py path."""
+    try:
+        from . import send_message
+    except ImportError:  # run directly as /opt/scripts/telegram/send_client.py
+        import send_message
+
+    return asyncio.run(send_message.send_message(text, chat))
+
+
+def stream_direct(chat: str | None = None) -> bool:
+    """Stream stdin in-process using send_message.py."""
+    try:
+        from . import send_message
+    except ImportError:  # run directly as /opt/scripts/telegram/send_client.py
+        import send_message
+
+    return asyncio.run(send_message.stream_message(send_message.read_stdin_deltas(), chat))
+
+
+def main():
+    args = sys.argv[1:]
+    chat = None
+    if args[:1] == ["--chat"]:
+        if len(args) < 2:
+            print("Error: --chat needs a chat id", file=sys.stderr)
+            sys.exit(1)
+        chat, args = args[1], args[2:]
+
+    if args == ["--stats"]:
+        stats = daemon_stats()
+        if stats is None:
+            print("Send daemon is not running", file=sys.stderr)
+            sys.exit(1)
+        print(f"Outbound queue depth: {stats['depth']}")
+        for chat_id, depth in stats.get("chats", {}).items():
+            print(f"  chat {chat_id}: {depth}")
+        sys.exit(0)
+
+    if args == ["--stream"]:
+        success = stream_via_daemon(stdin_chunks(), chat=chat)
+        if success is None:
+            success = stream_direct(chat)
+        sys.exit(0 if success else 1)
+
+    # Get message from argument or stdin
+    if args:
+        message = " ".join(args)
+    elif not sys.stdin.isatty():
+        message = sys.stdin.read().strip()
+    else:
+        print("Usage: send-telegram \"message\"", file=sys.stderr)
+        print("   or: echo \"message\" | send-telegram", file=sys.stderr)
+        sys.exit(1)
+
+    if not message:
+        print("Error: Empty message", file=sys.stderr)
+        sys.exit(1)
+
+    success = send_via_daemon(message, chat=chat)
+    if success is None:
+        success = send_direct(message, chat)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
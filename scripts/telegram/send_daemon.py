@@ -0,0 +1,206 @@
+#!/opt/venv/bin/python
+"""
+Resident send-telegram daemon.
+
+Keeps one initialized Bot (and its pooled HTTP connection to the Bot API)
+alive and accepts messages from send_client.py over a local Unix socket.
+
+Sends are paced by an OutboundScheduler, so bursts of replies queue up
+(FIFO per chat) instead of hitting Telegram's flood limits. Long messages
+are split into several Telegram messages (see chunking.py).
+
+Protocol: one JSON object per line. "chat" is optional and must be on the
+TELEGRAM_CHAT_ID allow-list; without it replies go to the primary chat.
+    request:  {"text": "...", "chat": "-100123"}
+    response: {"ok": true} or {"ok": false, "error": "..."}
+
+    request:  {"op": "stream", "chat": "-100123"}, then {"text": "..."} per chunk until EOF
+    response: {"ok": true} or {"ok": false, "error": "..."}
+
+    request:  {"op": "stats"}
+    response: {"ok": true, "depth": 3, "chats": {"12345": 3}}
+
+A request line longer than SEND_TELEGRAM_MAX_REQUEST bytes is answered with
+{"ok": false, "error": "request too large"}; the client then sends directly.
+"""
+
+import asyncio
+import json
+import logging
+import signal
+import sys
+from pathlib import Path
+
+from telegram import Bot
+from telegram.request import HTTPXRequest
+
+try:
+    from . import chats, chunking, outbound, send_client, send_message, unix_socket
+except ImportError:  # run directly as /opt/scripts/telegram/send_daemon.py
+    import chats
+    import chunking
+    import outbound
+    import send_client
+    import send_message
+    import unix_socket
+
+# Logging
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+
+class SendDaemon:
+    """Sends outgoing messages through a single long-lived Bot.
+
+    chat_id is the primary chat; allowed lists every chat a client may name
+    (just the primary chat by default).
+    """
+
+    def __init__(self, bot: Bot, chat_id: str, allowed: list[str] | None = None):
+        self.bot = bot
+        self.chat_id = chat_id
+        self.allowed = allowed or [chat_id]
+        self.scheduler = outbound.OutboundScheduler(bot)
+
+    def _shard(self, chat: str | None) -> str:
+        """The log shard for a requested chat (ValueError if it is not allowed)."""
+        if chat is None or str(chat) == str(self.chat_id):
+            return ""
+        if str(chat) not in self.allowed:
+            raise ValueError(f"chat {chat} is not in TELEGRAM_CHAT_ID")
+        return str(chat)
+
+    async def deliver(self, text: str, chat: str | None = None) -> dict:
+        """Send one message and log it, keeping replies in arrival order."""
+        try:
+            shard = self._shard(chat)
+            for chunk in chunking.split_message(text):
+                await self.scheduler.send(shard or self.chat_id, chunk)
+        except Exception as e:
+            logger.error(f"Error sending message: {e}")
+            return {"ok": False, "error": str(e)}
+        send_message.log_outgoing(text, shard)
+        return {"ok": True}
+
+    async def stream(self, reader: asyncio.StreamReader, chat: str | None = None) -> dict:
+        """Send text as the client streams it in, editing the message in place."""
+        try:
+            shard = self._shard(chat)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        reply = chunking.StreamingReply(self.scheduler, shard or self.chat_id)
+        try:
+            async for line in reader:
+                await reply.append(json.loads(line)["text"])
+            text = await reply.finish()
+        except (ValueError, KeyError, TypeError):
+            text = await reply.finish()
+            if text:
+                send_message.log_outgoing(text, shard)
+            return {"ok": False, "error": "malformed request"}
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}")
+            if reply.messages_sent:
+                send_message.log_outgoing(reply.text, shard)  # part of it reached the chat
+            return {"ok": False, "error": str(e)}
+
+        if not text.strip():
+            return {"ok": False, "error": "empty message"}
+        send_message.log_outgoing(text, shard)
+        return {"ok": True}
+
+    def stats(self) -> dict:
+        """Report the outbound queue depth."""
+        return {"ok": True, "depth": self.scheduler.depth(), "chats": self.scheduler.depths()}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle one client connection (one request, one response)."""
+        try:
+            line = await unix_socket.read_request(reader)
+            if line is None:
+                reply = {"ok": False, "error": send_client.TOO_LARGE}
+            else:
+                reply = await self.handle_request(line, reader)
+
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle_request(self, line: bytes, reader: asyncio.StreamReader) -> dict:
+        """Answer one request line (a stream request goes on reading from reader)."""
+        try:
+            request = json.loads(line)
+            op = request.get("op", "send")
+            text = request["text"] if op == "send" else None
+            chat = request.get("chat")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"ok": False, "error": "malformed request"}
+
+        if op == "stats":
+            return self.stats()
+        if op == "stream":
+            return await self.stream(reader, chat)
+        if op != "send":
+            return {"ok": False, "error": f"unknown op: {op}"}
+        if not text:
+            return {"ok": False, "error": "empty message"}
+        return await self.deliver(text, chat)
+
+
+async def serve(
+    daemon: SendDaemon, socket_path: Path, stop: asyncio.Event, limit: int = send_client.MAX_REQUEST_BYTES
+):
+    """Listen on socket_path until stop is set; requests may be up to limit bytes."""
+    sock = unix_socket.bind_private_unix_socket(socket_path)
+    server = await asyncio.start_unix_server(daemon.handle_client, sock=sock, limit=limit)
+    logger.info(f"Send daemon listening on {socket_path}")
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        if socket_path.exists():
+            socket_path.unlink()
+
+
+def build_bot() -> Bot:
+    """Create a Bot whose HTTP connection pool is reused across sends."""
+    request = HTTPXRequest(connection_pool_size=4)
+    return Bot(token=send_message.BOT_TOKEN, base_url=send_message.API_BASE_URL, request=request)
+
+
+async def run(socket_path: Path):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    async with build_bot() as bot:
+        allowed = chats.parse_chat_ids(send_message.CHAT_ID)
+        daemon = SendDaemon(bot, allowed[0], allowed)
+        await serve(daemon, socket_path, stop)
+
+    logger.info("Send daemon stopped")
+
+
+def main():
+    if not send_message.BOT_TOKEN:
+        logger.error("TELEGRAM_BOT_TOKEN environment variable not set")
+        sys.exit(1)
+    if not send_message.CHAT_ID:
+        logger.error("TELEGRAM_CHAT_ID environment variable not set")
+        sys.exit(1)
+    try:
+        chats.parse_chat_ids(send_message.CHAT_ID)
+    except ValueError as e:
+        logger.error(f"Invalid TELEGRAM_CHAT_ID: {e}")
+        sys.exit(1)
+
+    asyncio.run(run(send_client.SOCKET_PATH))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,44 +2,73 @@
 """
 Send a message to Telegram from Claude.
 
+This is the direct path: one process, one Bot, one message. The
+send-telegram command normally goes through send_client.py and the resident
+send_daemon.py, and only falls back to this when the daemon is down.
+
+Long messages are split into several Telegram messages (see chunking.py).
+Replies go to the primary chat (the first of TELEGRAM_CHAT_ID) unless
+another allowed chat is named.
+
 Usage:
-    send-telegram "Your message here"
-    echo "message" | send-telegram
+    send_message.py "Your message here"
+    echo "message" | send_message.py
+    long_running_command | send_message.py --stream
 """
 
 import os
 import sys
 import asyncio
+import codecs
+from collections.abc import AsyncIterator
 from datetime import datetime
 from pathlib import Path
 
 from telegram import Bot
 
+try:
+    from . import chats, chunking, log_writer, outbound
+except ImportError:  # run directly as /opt/scripts/telegram/send_message.py
+    import chats
+    import chunking
+    import log_writer
+    import outbound
+
 # Configuration from environment
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
-CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
+CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")  # comma-separated; replies default to the first
+API_BASE_URL = os.environ.get("TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot")
 
 # Paths for logging
 MIND_DIR = Path.home() / "workspace" / "mind"
 CONVERSATIONS_DIR = MIND_DIR / "conversations"
 
 
-def log_outgoing(text: str):
-    """Log outgoing message to daily conversation file."""
-    CONVERSATIONS_DIR.mkdir(parents=True, exist_ok=True)
+def log_outgoing(text: str, chat: str = ""):
+    """Log outgoing message to the daily conversation file of a chat shard.
 
-    today = datetime.now().strftime("%Y-%m-%d")
-    filepath = CONVERSATIONS_DIR / f"{today}.md"
+    The entry goes to the bot's conversation log writer when it is running,
+    otherwise it is appended directly under a file lock.
+    """
+    now = datetime.now()
+    entry = log_writer.format_entry("outgoing", text, now=now)
+    log_writer.log_entry(entry, now, CONVERSATIONS_DIR, "outgoing", chat)
 
-    timestamp = datetime.now().strftime("%H:%M:%S")
-    entry = f"\n## {timestamp} - Claude (outgoing)\n\n{text}\n"
 
-    with open(filepath, "a") as f:
-        f.write(entry)
+def resolve_chat(chat: str | None = None) -> str:
+    """The chat to send to: the primary chat, or the named one if it is allowed.
 
+    Raises ValueError for a chat that is not on the TELEGRAM_CHAT_ID allow-list.
+    """
+    allowed = chats.parse_chat_ids(CHAT_ID)
+    if chat is None:
+        return allowed[0]
+    if str(chat) not in allowed:
+        raise ValueError(f"chat {chat} is not in TELEGRAM_CHAT_ID")
+    return str(chat)
 
-async def send_message(text: str) -> bool:
-    """Send message to Telegram."""
+
+def _check_config() -> bool:
     if not BOT_TOKEN:
         print("Error: TELEGRAM_BOT_TOKEN not set", file=sys.stderr)
         return False
@@ -48,17 +77,75 @@ async def send_message(text: str) -> bool:
         print("Error: TELEGRAM_CHAT_ID not set", file=sys.stderr)
         return False
 
+    return True
+
+
+async def send_message(text: str, chat: str | None = None) -> bool:
+    """Send message to Telegram, split into several messages if too long."""
+    if not _check_config():
+        return False
+
     try:
-        bot = Bot(token=BOT_TOKEN)
-        await bot.send_message(chat_id=CHAT_ID, text=text)
-        log_outgoing(text)
+        target = resolve_chat(chat)
+        bot = Bot(token=BOT_TOKEN, base_url=API_BASE_URL)
+        # Honours RetryAfter and retries transient network errors
+        scheduler = outbound.OutboundScheduler(bot)
+        for chunk in chunking.split_message(text):
+            await scheduler.send(target, chunk)
+        log_outgoing(text, chats.shard(target, CHAT_ID))
         return True
     except Exception as e:
         print(f"Error sending message: {e}", file=sys.stderr)
         return False
 
 
+async def stream_message(deltas: AsyncIterator[str], chat: str | None = None) -> bool:
+    """Send text as it arrives, editing the message in place as it grows."""
+    if not _check_config():
+        return False
+
+    reply = None
+    shard = ""
+    try:
+        target = resolve_chat(chat)
+        shard = chats.shard(target, CHAT_ID)
+        bot = Bot(token=BOT_TOKEN, base_url=API_BASE_URL)
+        reply = chunking.StreamingReply(outbound.OutboundScheduler(bot), target)
+        async for delta in deltas:
+            await reply.append(delta)
+        text = await reply.finish()
+    except Exception as e:
+        print(f"Error streaming message: {e}", file=sys.stderr)
+        if reply is not None and reply.messages_sent:
+            log_outgoing(reply.text, shard)  # part of it reached the chat
+        return False
+
+    if not text.strip():
+        print("Error: Empty message", file=sys.stderr)
+        return False
+    log_outgoing(text, shard)
+    return True
+
+
+async def read_stdin_deltas() -> AsyncIterator[str]:
+    """Yield stdin text as soon as it is available, without waiting for EOF."""
+    loop = asyncio.get_running_loop()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    fd = sys.stdin.fileno()
+    while True:
+        data = await loop.run_in_executor(None, os.read, fd, 4096)
+        text = decoder.decode(data, final=not data)
+        if text:
+            yield text
+        if not data:
+            return
+
+
 def main():
+    if sys.argv[1:] == ["--stream"]:
+        success = asyncio.run(stream_message(read_stdin_deltas()))
+        sys.exit(0 if success else 1)
+
     # Get message from argument or stdin
     if len(sys.argv) > 1:
         message = " ".join(sys.argv[1:])
@@ -0,0 +1,428 @@
+#!/opt/venv/bin/python
+"""
+Injection broker for the Claude worker sessions (claude-mind, or the pool
+claude-mind-0 .. N-1 of worker_pool.py).
+
+Everything typed into the session (queue notifications, reflection nudges,
+`claude-session send`) goes through this daemon instead of running
+`tmux send-keys` straight away. The broker:
+
+- serializes inputs, so two callers never type into the pane at once
+- waits until Claude is idle (input line shown, no "esc to interrupt",
+  screen unchanged between two polls) before submitting, so nothing lands in
+  the middle of a running turn
+- submits everything that piled up meanwhile as one bracketed paste (exact
+  duplicates, such as repeated notifications, are sent once)
+- applies backpressure: at most MIND_BROKER_MAX_PENDING inputs wait; further
+  callers block until there is room, and give up after their timeout
+
+Each worker has its own queue of inputs. An input addressed to a session
+goes to that worker; otherwise it goes to "count" workers (default 1),
+chosen idle ones first and then those with the fewest inputs waiting, so a
+queue notification wakes workers that can start on it right away.
+
+send_to_claude.sh uses it through `session_broker.py send` and falls back to
+typing directly when the broker is not running.
+
+Protocol (Unix socket, one JSON object per line, one request per connection):
+    request:  {"op": "send", "text": "...", "session": null, "count": 1, "wait": false, "timeout": 20}
+    response: {"ok": true, "pending": 2, "sessions": ["claude-mind-1"]}  (after delivery when "wait" is true)
+
+    request:  {"op": "stats"}
+    response: {"ok": true, "pending": 0, "delivered": 12, "batches": 5,
+               "sessions": {"claude-mind": {"pending": 0, "delivered": 12, "batches": 5}}}
+
+A request longer than MAX_REQUEST_BYTES gets {"ok": false, "error": "request
+too large"} and is not delivered; the client then reports the broker as not
+running, so send_to_claude.sh types the input itself.
+
+Usage:
+    session_broker.py serve
+    session_broker.py send [--session NAME | --count N] [--wait] "text"   # exit 3 if the broker did not take it
+    session_broker.py stats
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import socket
+import sys
+from pathlib import Path
+
+try:
+    from . import session_probe, unix_socket, worker_pool
+except ImportError:  # run directly as /opt/scripts/telegram/session_broker.py
+    import session_probe
+    import unix_socket
+    import worker_pool
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+RUN_DIR = MIND_DIR / "run"
+SOCKET_PATH = Path(os.environ.get("MIND_BROKER_SOCKET", RUN_DIR / "session-broker.sock"))
+
+# Inputs allowed to wait for the session before callers are held back
+MAX_PENDING = int(os.environ.get("MIND_BROKER_MAX_PENDING", "20"))
+# Seconds a caller waits for room (or, with --wait, for delivery)
+SEND_TIMEOUT = float(os.environ.get("MIND_BROKER_TIMEOUT", "20"))
+# How often the pane is captured while waiting for Claude to go idle
+POLL_INTERVAL = float(os.environ.get("MIND_BROKER_POLL_INTERVAL", "0.25"))
+# After a submission, how long to wait for Claude to show it is working
+SETTLE_SECONDS = 2.0
+# Longest request line accepted (the input text, JSON-escaped)
+MAX_REQUEST_BYTES = int(os.environ.get("MIND_BROKER_MAX_REQUEST", str(16 * 1024 * 1024)))
+
+# Error for a longer request; nothing was queued, so the caller types the input directly
+TOO_LARGE = "request too large"
+
+BUSY = re.compile(r"esc to interrupt", re.IGNORECASE)
+
+# Logging
+logging.basicConfig(
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+
+def is_idle(screen: str) -> bool:
+    """Return True if the pane shows Claude waiting for input."""
+    if BUSY.search(screen):
+        return False
+    try:
+        return session_probe.match_state(screen, ["ready"]) == "ready"
+    except session_probe.ProbeError:
+        return False
+
+
+class TmuxPane:
+    """The session's pane, driven through the tmux CLI."""
+
+    def __init__(self, session: str = session_probe.SESSION_NAME):
+        self.session = session
+
+    async def _tmux(self, *args: str, data: str | None = None) -> tuple[int, str]:
+        proc = await asyncio.create_subprocess_exec(
+            "tmux", *args,
+            stdin=asyncio.subprocess.PIPE if data is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        out, _ = await proc.communicate(data.encode("utf-8") if data is not None else None)
+        return proc.returncode, out.decode("utf-8", errors="replace")
+
+    async def capture(self) -> str | None:
+        """Visible pane text, or None if the session does not exist."""
+        code, out = await self._tmux("capture-pane", "-p", "-t", self.session)
+        return out if code == 0 else None
+
+    async def submit(self, text: str):
+        """Paste text as one bracketed paste and press Enter."""
+        buffer = f"broker-{os.getpid()}"
+        await self._tmux("load-buffer", "-b", buffer, "-", data=text)
+        await self._tmux("paste-buffer", "-p", "-d", "-b", buffer, "-t", self.session)
+        await self._tmux("send-keys", "-t", self.session, "Enter")
+
+
+class SessionBroker:
+    """Queues inputs and submits them in batches whenever the session is idle."""
+
+    def __init__(
+        self,
+        pane=None,
+        max_pending: int = MAX_PENDING,
+        poll_interval: float = POLL_INTERVAL,
+        settle: float = SETTLE_SECONDS,
+    ):
+        self.pane = pane or TmuxPane()
+        self.max_pending = max_pending
+        self.poll_interval = poll_interval
+        self.settle = settle
+        self.delivered = 0
+        self.batches = 0
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._room = asyncio.Condition()
+        self._wake = asyncio.Event()
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, text: str, wait: bool = False, timeout: float = SEND_TIMEOUT) -> dict:
+        """Queue text for the session; with wait, return only once it was typed."""
+        if await self.pane.capture() is None:
+            return {"ok": False, "error": "Claude session is not running"}
+
+        async with self._room:
+            try:
+                await asyncio.wait_for(self._room.wait_for(lambda: len(self._pending) < self.max_pending), timeout)
+            except asyncio.TimeoutError:
+                return {"ok": False, "error": f"broker busy: {len(self._pending)} inputs waiting for the session"}
+            done = asyncio.get_running_loop().create_future()
+            self._pending.append((text, done))
+            self._wake.set()
+            queued = len(self._pending)
+
+        if not wait:
+            return {"ok": True, "pending": queued}
+        try:
+            return await asyncio.wait_for(asyncio.shield(done), timeout)
+        except asyncio.TimeoutError:
+            return {"ok": False, "error": f"session still busy after {timeout:.0f}s (input stays queued)"}
+
+    async def _wait_idle(self, stop: asyncio.Event) -> bool:
+        """Poll until the pane is idle and unchanged; False if the session went away."""
+        previous = None
+        while not stop.is_set():
+            screen = await self.pane.capture()
+            if screen is None:
+                return False
+            if screen == previous and is_idle(screen):
+                return True
+            previous = screen
+            await asyncio.sleep(self.poll_interval)
+        return False
+
+    async def _settle(self):
+        """Give Claude a moment to show it took the input, so the next batch waits for the turn."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.settle
+        while loop.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            screen = await self.pane.capture()
+            if screen is None or not is_idle(screen):
+                return
+
+    @staticmethod
+    def _finish(batch: list[tuple[str, asyncio.Future]], reply: dict):
+        for _, done in batch:
+            if not done.done():
+                done.set_result(reply)
+
+    async def run(self, stop: asyncio.Event):
+        """Deliver queued inputs until stop is set."""
+        while not stop.is_set():
+            waker = asyncio.ensure_future(self._wake.wait())
+            stopper = asyncio.ensure_future(stop.wait())
+            await asyncio.wait((waker, stopper), return_when=asyncio.FIRST_COMPLETED)
+            waker.cancel()
+            stopper.cancel()
+            if stop.is_set():
+                break
+            self._wake.clear()
+
+            while self._pending and not stop.is_set():
+                if not await self._wait_idle(stop):
+                    async with self._room:
+                        batch, self._pending = self._pending, []
+                        self._room.notify_all()
+                    if not stop.is_set():
+                        logger.warning(f"Session is gone; dropping {len(batch)} pending input(s)")
+                    self._finish(batch, {"ok": False, "error": "Claude session is not running"})
+                    break
+
+                async with self._room:
+                    batch, self._pending = self._pending, []
+                    self._room.notify_all()
+                texts = list(dict.fromkeys(text for text, _ in batch))
+                try:
+                    await self.pane.submit("\n".join(texts))
+                except OSError as e:
+                    logger.error(f"Failed to type into the session: {e}")
+                    self._finish(batch, {"ok": False, "error": str(e)})
+                    continue
+                self.delivered += len(batch)
+                self.batches += 1
+                logger.info(f"Submitted {len(batch)} input(s) as one batch")
+                self._finish(batch, {"ok": True, "pending": len(self._pending)})
+                await self._settle()
+
+    def stats(self) -> dict:
+        return {"ok": True, "pending": self.pending(), "delivered": self.delivered, "batches": self.batches}
+
+
+class BrokerPool:
+    """One SessionBroker per worker session, behind a single socket."""
+
+    def __init__(self, brokers: dict[str, SessionBroker]):
+        self.brokers = brokers
+
+    @classmethod
+    def for_sessions(cls, sessions: list[str]) -> "BrokerPool":
+        return cls({session: SessionBroker(TmuxPane(session)) for session in sessions})
+
+    async def choose(self, count: int = 1) -> list[str]:
+        """Up to count running workers: idle ones first, then the least backed up."""
+        ranked = []
+        for session, broker in self.brokers.items():
+            screen = await broker.pane.capture()
+            if screen is None:
+                continue
+            ranked.append((broker.pending() > 0 or not is_idle(screen), broker.pending(), session))
+        return [session for *_, session in sorted(ranked)[:max(1, count)]]
+
+    async def submit(
+        self, text: str, session: str | None = None, count: int = 1, wait: bool = False, timeout: float = SEND_TIMEOUT
+    ) -> dict:
+        """Queue text for one named worker, or for count workers chosen by choose()."""
+        if session is not None:
+            if session not in self.brokers:
+                return {"ok": False, "error": f"unknown session: {session}"}
+            chosen = [session]
+        else:
+            chosen = await self.choose(count)
+            if not chosen:
+                return {"ok": False, "error": "Claude session is not running"}
+
+        replies = await asyncio.gather(*(self.brokers[s].submit(text, wait, timeout) for s in chosen))
+        failed = [reply for reply in replies if not reply["ok"]]
+        if failed:
+            return failed[0]
+        return {"ok": True, "pending": max(reply["pending"] for reply in replies), "sessions": chosen}
+
+    async def run(self, stop: asyncio.Event):
+        await asyncio.gather(*(broker.run(stop) for broker in self.brokers.values()))
+
+    def stats(self) -> dict:
+        per_session = {}
+        for session, broker in self.brokers.items():
+            stats = broker.stats()
+            del stats["ok"]
+            per_session[session] = stats
+        totals = {key: sum(stats[key] for stats in per_session.values()) for key in ("pending", "delivered", "batches")}
+        return {"ok": True, **totals, "sessions": per_session}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Handle one client connection (one request, one response)."""
+        try:
+            line = await unix_socket.read_request(reader)
+            if line is None:
+                reply = {"ok": False, "error": TOO_LARGE}
+            else:
+                reply = await self.handle_request(line)
+
+            writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def handle_request(self, line: bytes) -> dict:
+        """Carry out one request line and return the reply."""
+        try:
+            request = json.loads(line)
+            op = request.get("op", "send")
+            text = request["text"] if op == "send" else None
+            timeout = float(request.get("timeout", SEND_TIMEOUT))
+            count = int(request.get("count", 1))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return {"ok": False, "error": "malformed request"}
+
+        if op == "stats":
+            return self.stats()
+        if op != "send":
+            return {"ok": False, "error": f"unknown op: {op}"}
+        if not text:
+            return {"ok": False, "error": "empty input"}
+        return await self.submit(
+            text, request.get("session"), count, wait=bool(request.get("wait")), timeout=timeout)
+
+
+async def serve(pool: BrokerPool, socket_path: Path, stop: asyncio.Event, limit: int = MAX_REQUEST_BYTES):
+    """Listen on socket_path and deliver inputs until stop is set."""
+    sock = unix_socket.bind_private_unix_socket(socket_path)
+    server = await asyncio.start_unix_server(pool.handle_client, sock=sock, limit=limit)
+    logger.info(f"Session broker listening on {socket_path} for {', '.join(pool.brokers)}")
+    try:
+        async with server:
+            await pool.run(stop)
+    finally:
+        if socket_path.exists():
+            socket_path.unlink()
+
+
+def request(payload: dict, socket_path: Path | None = None, timeout: float = SEND_TIMEOUT) -> dict | None:
+    """Send one request to the broker and return its reply.
+
+    Returns None if the broker is not running or did not take the request
+    (it closed the connection without answering, or the request was too
+    large), i.e. whenever the caller should deliver the input itself.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout + 5)
+    try:
+        try:
+            sock.connect(str(socket_path or SOCKET_PATH))
+        except OSError:
+            return None
+
+        try:
+            sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+            with sock.makefile("r", encoding="utf-8") as reader:
+                line = reader.readline()
+        except OSError as e:
+            return {"ok": False, "error": f"lost connection to session broker: {e}"}
+    finally:
+        sock.close()
+
+    if not line:
+        return None
+    reply = json.loads(line)
+    if reply.get("error") == TOO_LARGE:
+        return None
+    return reply
+
+
+async def run(socket_path: Path):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await serve(BrokerPool.for_sessions(worker_pool.sessions()), socket_path, stop)
+    logger.info("Session broker stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serialize input into the Claude tmux session.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("serve", help="run the broker")
+    p_send = sub.add_parser("send", help="queue input for the session")
+    p_send.add_argument("text", nargs="+")
+    target = p_send.add_mutually_exclusive_group()
+    target.add_argument("--session", default=None, help="worker session to type into")
+    target.add_argument("--count", type=int, default=1, help="number of workers to send it to")
+    p_send.add_argument("--wait", action="store_true", help="return once the input has been typed")
+    p_send.add_argument("--timeout", type=float, default=SEND_TIMEOUT)
+    sub.add_parser("stats", help="pending and delivered counts")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(run(SOCKET_PATH))
+        return
+
+    if args.command == "send":
+        payload = {
+            "op": "send", "text": " ".join(args.text), "session": args.session, "count": args.count,
+            "wait": args.wait, "timeout": args.timeout,
+        }
+        reply = request(payload, timeout=args.timeout)
+    else:
+        reply = request({"op": "stats"})
+    if reply is None:
+        print("Session broker is not running or did not take the input", file=sys.stderr)
+        sys.exit(3)
+    if not reply.get("ok"):
+        print(f"Error: {reply.get('error', 'unknown error')}", file=sys.stderr)
+        sys.exit(1)
+    if args.command == "stats":
+        print(f"pending {reply['pending']}, delivered {reply['delivered']} in {reply['batches']} batches")
+        sessions = reply.get("sessions", {})
+        if len(sessions) > 1:
+            for session, stats in sessions.items():
+                print(f"  {session}: pending {stats['pending']}, delivered {stats['delivered']}")
+
+
+if __name__ == "__main__":
+    main()
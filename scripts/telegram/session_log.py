@@ -0,0 +1,337 @@
+#!/opt/venv/bin/python
+"""
+Bounded on-disk capture of the claude-mind session's output.
+
+session_manager.sh pipes the pane into `session_log.py record` with
+`tmux pipe-pane`. Output goes into a ring buffer of MIND_SESSION_LOG_BYTES
+(default 8 MiB), so the capture never grows, plus an index of
+(time, offset) entries written at most once a second:
+
+    session/output.ring   the last CAPACITY bytes of output; byte N of the
+                          stream lives at N % CAPACITY
+    session/output.idx    header (stream length, last output, turn count)
+                          followed by a ring of index entries
+
+`tail --since 10m` binary-searches the index and reads only the bytes
+written since then, so its cost depends on the output asked for, not on how
+long the session has been running. The header also gives /status the time of
+the last output and the number of turns (a turn starts when Claude shows
+"esc to interrupt" after being quiet).
+
+Claude redraws its spinner several times a second while it works and prints
+nothing while it waits for input, so the index doubles as an activity
+record: active_seconds() counts the index entries since a time, about one
+per second of work (worker_pool.py reports it as utilization).
+
+With a pool of workers each session has its own log in session/<name>/;
+--session selects it (the single claude-mind session keeps session/).
+
+Usage:
+    tmux pipe-pane -o -t claude-mind 'session_log.py record'
+    session_log.py [--session claude-mind-1] tail [--since 10m | --since 2025-01-15T12:00] [--bytes 4000] [--raw]
+    session_log.py [--session NAME] stats [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+SESSION_LOG_DIR = MIND_DIR / "session"
+
+# Ring sizes
+CAPACITY = int(os.environ.get("MIND_SESSION_LOG_BYTES", str(8 * 1024 * 1024)))
+INDEX_ENTRIES = int(os.environ.get("MIND_SESSION_LOG_INDEX", "100000"))
+INDEX_INTERVAL = 1.0
+
+# A turn is Claude's busy marker reappearing after this many quiet seconds
+BUSY_MARKER = b"esc to interrupt"
+TURN_GAP = 5.0
+
+_MAGIC = b"MSL1"
+# magic, capacity, index entries, entries written, stream length, last output, turns, last turn start
+_HEADER = struct.Struct("<4sQQQQdQd")
+_ENTRY = struct.Struct("<dQ")
+
+# The session whose log lives directly in SESSION_LOG_DIR (session_probe.SESSION_NAME)
+DEFAULT_SESSION = "claude-mind"
+
+_ESCAPES = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]|[\x00-\x08\x0b-\x1f\x7f]")
+
+
+def strip_escapes(text: str) -> str:
+    """Remove terminal control sequences from captured output."""
+    return _ESCAPES.sub("", text.replace("\r\n", "\n"))
+
+
+def log_dir(session: str | None = None) -> Path:
+    """Directory holding a session's ring buffer and index."""
+    if not session or session == DEFAULT_SESSION:
+        return SESSION_LOG_DIR
+    return SESSION_LOG_DIR / session
+
+
+class SessionLog:
+    """The ring buffer and its index, for one writer and any number of readers."""
+
+    def __init__(self, directory: Path | None = None, capacity: int = CAPACITY, index_entries: int = INDEX_ENTRIES):
+        self.directory = directory or SESSION_LOG_DIR
+        self.ring_path = self.directory / "output.ring"
+        self.index_path = self.directory / "output.idx"
+        self.capacity = capacity
+        self.index_entries = index_entries
+        self._ring = None
+        self._index = None
+        self.entries = 0
+        self.length = 0
+        self.last_output = 0.0
+        self.turns = 0
+        self.last_turn = 0.0
+        self._last_indexed = 0.0
+        self._last_busy = 0.0
+        self._carry = b""
+
+    # Writer
+
+    def open(self):
+        """Open for appending, continuing the existing stream if the sizes match."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Not O_APPEND: Linux pwrite() ignores the offset on append-mode files
+        self._ring = os.open(self.ring_path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._index = os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o600)
+        header = read_header(self.index_path)
+        if header and header["capacity"] == self.capacity and header["index_entries"] == self.index_entries:
+            self.entries = header["entries"]
+            self.length = header["length"]
+            self.last_output = header["last_output"] or 0.0
+            self.turns = header["turns"]
+            self.last_turn = header["last_turn"] or 0.0
+        else:
+            os.ftruncate(self._ring, 0)
+            os.ftruncate(self._index, 0)
+        os.ftruncate(self._ring, self.capacity)
+        os.ftruncate(self._index, _HEADER.size + self.index_entries * _ENTRY.size)
+        self._write_header()
+
+    def close(self):
+        for fd in (self._ring, self._index):
+            if fd is not None:
+                os.close(fd)
+        self._ring = self._index = None
+
+    def append(self, data: bytes, now: float | None = None):
+        """Add captured output to the stream."""
+        if not data:
+            return
+        now = max(now if now is not None else time.time(), self.last_output)
+        if now - self._last_indexed >= INDEX_INTERVAL or self.entries == 0:
+            slot = self.entries % self.index_entries
+            os.pwrite(self._index, _ENTRY.pack(now, self.length), _HEADER.size + slot * _ENTRY.size)
+            self.entries += 1
+            self._last_indexed = now
+
+        kept = data[-self.capacity:]
+        start = (self.length + len(data) - len(kept)) % self.capacity
+        first = kept[:self.capacity - start]
+        os.pwrite(self._ring, first, start)
+        if len(first) < len(kept):
+            os.pwrite(self._ring, kept[len(first):], 0)
+
+        # The marker can straddle two reads, so search a little of the previous one too
+        if BUSY_MARKER in self._carry + data:
+            if now - self._last_busy > TURN_GAP:
+                self.turns += 1
+                self.last_turn = now
+            self._last_busy = now
+        self._carry = data[-len(BUSY_MARKER):]
+
+        self.length += len(data)
+        self.last_output = now
+        self._write_header()
+
+    def _write_header(self):
+        header = _HEADER.pack(
+            _MAGIC, self.capacity, self.index_entries, self.entries, self.length,
+            self.last_output, self.turns, self.last_turn,
+        )
+        os.pwrite(self._index, header, 0)
+
+    # Readers
+
+    def _first_entry_at(self, header: dict, index_fd: int, since: float) -> int:
+        """Number of the first index entry at or after since (binary search)."""
+        count, size = header["entries"], header["index_entries"]
+        lo, hi = max(0, count - size), count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._entry(index_fd, mid, size)[0] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    @staticmethod
+    def _entry(index_fd: int, k: int, size: int) -> tuple[float, int]:
+        return _ENTRY.unpack(os.pread(index_fd, _ENTRY.size, _HEADER.size + (k % size) * _ENTRY.size))
+
+    def offset_at(self, since: float) -> int:
+        """Stream offset from which all output at or after since is included.
+
+        Binary search of the index; output indexed up to INDEX_INTERVAL before
+        since is included too, since it may have been written after since.
+        """
+        header = read_header(self.index_path)
+        if not header or not header["entries"]:
+            return 0
+        count, size = header["entries"], header["index_entries"]
+        with open(self.index_path, "rb") as f:
+            lo = self._first_entry_at(header, f.fileno(), since)
+            if lo == max(0, count - size):
+                return 0  # older than the index reaches: everything still in the ring
+            before, offset = self._entry(f.fileno(), lo - 1, size)
+            if since - before < INDEX_INTERVAL:
+                return offset
+            return self._entry(f.fileno(), lo, size)[1] if lo < count else header["length"]
+
+    def active_seconds(self, since: float) -> float:
+        """Roughly how many seconds since then the session spent printing output.
+
+        Each index entry stands for up to INDEX_INTERVAL of output, so this is
+        the number of entries written since then (as far back as the index reaches).
+        """
+        header = read_header(self.index_path)
+        if not header or not header["entries"]:
+            return 0.0
+        with open(self.index_path, "rb") as f:
+            first = self._first_entry_at(header, f.fileno(), since)
+        return (header["entries"] - first) * INDEX_INTERVAL
+
+    def read(self, start: int, end: int | None = None) -> bytes:
+        """Return stream bytes [start, end) that are still in the ring."""
+        header = read_header(self.index_path)
+        if not header:
+            return b""
+        capacity = header["capacity"]
+        end = header["length"] if end is None else min(end, header["length"])
+        start = max(start, end - capacity, 0)
+        if start >= end:
+            return b""
+        with open(self.ring_path, "rb") as f:
+            pos = start % capacity
+            data = os.pread(f.fileno(), min(end - start, capacity - pos), pos)
+            if len(data) < end - start:
+                data += os.pread(f.fileno(), end - start - len(data), 0)
+        # The writer may have lapped the ring while we read: drop what it overwrote
+        overwritten = read_header(self.index_path)["length"] - capacity - start
+        return data[overwritten:] if overwritten > 0 else data
+
+    def tail(self, since: float | None = None, nbytes: int | None = None) -> bytes:
+        """Output written since a time, or the last nbytes."""
+        header = read_header(self.index_path)
+        if not header:
+            return b""
+        start = self.offset_at(since) if since is not None else 0
+        if nbytes is not None:
+            start = max(start, header["length"] - nbytes)
+        return self.read(start, header["length"])
+
+
+def read_header(index_path: Path | None = None) -> dict | None:
+    """The stream counters, or None when nothing has been captured."""
+    try:
+        with open(index_path or SESSION_LOG_DIR / "output.idx", "rb") as f:
+            raw = f.read(_HEADER.size)
+    except FileNotFoundError:
+        return None
+    if len(raw) < _HEADER.size:
+        return None
+    magic, capacity, index_entries, entries, length, last_output, turns, last_turn = _HEADER.unpack(raw)
+    if magic != _MAGIC:
+        return None
+    return {
+        "capacity": capacity, "index_entries": index_entries, "entries": entries, "length": length,
+        "last_output": last_output or None, "turns": turns, "last_turn": last_turn or None,
+    }
+
+
+def parse_duration(value: str) -> float:
+    """'90s', '10m', '2h' or '1d' as seconds."""
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", value)
+    if not match:
+        raise argparse.ArgumentTypeError(f"expected a duration like 10m or 1h, got {value!r}")
+    return float(match.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+
+
+def parse_since(value: str, now: float | None = None) -> float:
+    """'90s', '10m', '2h', '1d' ago, or an ISO time, as a Unix time."""
+    now = now if now is not None else time.time()
+    try:
+        return now - parse_duration(value)
+    except argparse.ArgumentTypeError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a duration like 10m or an ISO time, got {value!r}") from None
+
+
+def record(log: SessionLog, stream=None):
+    """Copy a pipe (tmux pipe-pane) into the log until EOF."""
+    fd = (stream or sys.stdin.buffer).fileno()
+    log.open()
+    try:
+        while data := os.read(fd, 65536):
+            log.append(data)
+    finally:
+        log.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Capture and read the Claude session's output.")
+    parser.add_argument("--session", default=None, help="worker session whose log to use")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("record", help="append stdin to the ring buffer (for tmux pipe-pane)")
+    p_tail = sub.add_parser("tail", help="print recent output")
+    p_tail.add_argument("--since", type=parse_since, default=None, help="10m, 2h, or an ISO time")
+    p_tail.add_argument("--bytes", type=int, default=None, help="at most this many bytes (default 4000 without --since)")
+    p_tail.add_argument("--raw", action="store_true", help="keep terminal escape sequences")
+    p_stats = sub.add_parser("stats", help="stream length, last output and turn count")
+    p_stats.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    log = SessionLog(log_dir(args.session))
+    if args.command == "record":
+        record(log)
+        return
+
+    if args.command == "tail":
+        nbytes = args.bytes if args.bytes is not None or args.since is not None else 4000
+        data = log.tail(args.since, nbytes)
+        if args.raw:
+            sys.stdout.buffer.write(data)
+        else:
+            sys.stdout.write(strip_escapes(data.decode("utf-8", errors="replace")))
+        return
+
+    header = read_header(log.index_path)
+    if header is None:
+        print("No session output captured", file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(header))
+        return
+    last = header["last_output"]
+    ago = f", last output {time.time() - last:.0f}s ago" if last else ""
+    print(f"{header['length']} bytes captured ({min(header['length'], header['capacity'])} kept){ago}, "
+          f"{header['turns']} turns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/opt/venv/bin/python
+"""
+Readiness prober for the claude-mind tmux session.
+
+session_manager.sh used to sleep fixed amounts before pressing keys in the
+Claude UI. Instead it now asks this script to poll `tmux capture-pane` until
+the screen shows the expected state, so startup takes as long as Claude
+actually needs and a slow host gets a clear error instead of keys typed into
+the wrong screen.
+
+States (matched against the visible pane):
+
+    dialog     the bypass-permissions warning ("Yes, I accept")
+    accepted   the same dialog with "Yes, I accept" selected
+    ready      the idle input line (and no dialog), Claude is waiting for a prompt
+
+A screen showing a known failure (claude not installed, not logged in)
+stops the wait at once.
+
+Usage:
+    session_probe.py wait dialog ready [--timeout 60]   # prints the state seen
+    session_probe.py stopped [--timeout 10]             # session has exited
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+
+SESSION_NAME = "claude-mind"
+
+STATES = {
+    "dialog": re.compile(r"Yes, I accept"),
+    "accepted": re.compile(r"[❯>]\s*2\.\s*Yes, I accept"),
+    "ready": re.compile(r"bypass permissions on|\? for shortcuts|^\s*[│|]\s*>\s", re.MULTILINE),
+}
+
+FAILURES = {
+    "claude is not installed": re.compile(r"claude: (command )?not found"),
+    "claude is not logged in (run 'claude' and /login)": re.compile(r"Select login method|Invalid API key"),
+}
+
+POLL_INTERVAL = 0.1
+
+
+class ProbeError(Exception):
+    """The session reached a failure screen or never reached the wanted state."""
+
+    def __init__(self, message: str, screen: str = ""):
+        super().__init__(message)
+        self.screen = screen
+
+
+def capture_pane(session: str = SESSION_NAME) -> str | None:
+    """Return the visible text of the session's pane (None if the session is gone)."""
+    result = subprocess.run(
+        ["tmux", "capture-pane", "-p", "-t", session], capture_output=True, text=True, timeout=10
+    )
+    return result.stdout if result.returncode == 0 else None
+
+
+def match_state(screen: str, wanted: list[str]) -> str | None:
+    """Return the first wanted state the screen shows; raise ProbeError on a failure screen."""
+    for message, pattern in FAILURES.items():
+        if pattern.search(screen):
+            raise ProbeError(message, screen)
+    dialog = STATES["dialog"].search(screen)
+    for state in wanted:
+        # The dialog's own option lines can look like an input line
+        if state == "ready" and dialog:
+            continue
+        if STATES[state].search(screen):
+            return state
+    return None
+
+
+def wait_for(
+    wanted: list[str],
+    timeout: float,
+    capture: Callable[[], str | None] = capture_pane,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+    interval: float = POLL_INTERVAL,
+) -> str:
+    """Poll the pane until it shows one of the wanted states and return it."""
+    deadline = clock() + timeout
+    screen = ""
+    while True:
+        current = capture()
+        if current is None:
+            raise ProbeError("the tmux session exited", screen)
+        screen = current
+        state = match_state(screen, wanted)
+        if state is not None:
+            return state
+        if clock() >= deadline:
+            raise ProbeError(f"timed out after {timeout:.0f}s waiting for {' or '.join(wanted)}", screen)
+        sleep(interval)
+
+
+def wait_stopped(
+    timeout: float,
+    capture: Callable[[], str | None] = capture_pane,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+    interval: float = POLL_INTERVAL,
+):
+    """Poll until the session no longer exists."""
+    deadline = clock() + timeout
+    while capture() is not None:
+        if clock() >= deadline:
+            raise ProbeError(f"session still running after {timeout:.0f}s")
+        sleep(interval)
+
+
+def _last_lines(screen: str, count: int = 15) -> str:
+    lines = [line.rstrip() for line in screen.rstrip().splitlines()]
+    return "\n".join(lines[-count:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wait for the Claude tmux session to reach a state.")
+    parser.add_argument("--session", default=SESSION_NAME)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_wait = sub.add_parser("wait", help="wait until the pane shows one of the states")
+    p_wait.add_argument("states", nargs="+", choices=sorted(STATES))
+    p_wait.add_argument("--timeout", type=float, default=60)
+    p_stopped = sub.add_parser("stopped", help="wait until the session has exited")
+    p_stopped.add_argument("--timeout", type=float, default=10)
+    args = parser.parse_args()
+
+    capture = lambda: capture_pane(args.session)  # noqa: E731
+    try:
+        if args.command == "wait":
+            print(wait_for(args.states, args.timeout, capture=capture))
+        else:
+            wait_stopped(args.timeout, capture=capture)
+    except ProbeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        if e.screen.strip():
+            print(f"Last screen:\n{_last_lines(e.screen)}", file=sys.stderr)
+        sys.exit(1)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        print(f"Error: could not run tmux: {e}", file=sys.stderr)
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/opt/venv/bin/python
+"""
+Helpers shared by the local Unix-socket daemons (send_daemon.py,
+session_broker.py and the conversation log socket in log_writer.py).
+
+Each daemon listens on a socket under run/ that only its own user may
+connect to, and takes one JSON request per line.
+"""
+
+import asyncio
+import os
+import socket
+from pathlib import Path
+
+# Connections allowed to wait for accept()
+BACKLOG = 100
+
+
+def bind_private_unix_socket(path: Path, backlog: int = BACKLOG) -> socket.socket:
+    """Return a listening Unix stream socket at path, accessible to this user only.
+
+    A socket file left behind by a previous run is replaced. The file is
+    made private before the socket listens, so no other user can connect
+    in between.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        path.unlink()  # stale socket from a previous run
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.bind(str(path))
+        os.chmod(path, 0o600)
+        sock.listen(backlog)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+async def read_request(reader: asyncio.StreamReader) -> bytes | None:
+    """Read one request line, or None if it is longer than the reader's limit.
+
+    An oversized line is read to its end and dropped, so the client can
+    finish sending and still gets an answer.
+    """
+    try:
+        return await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return e.partial  # EOF before a newline
+    except asyncio.LimitOverrunError:
+        pass
+    while True:
+        chunk = await reader.read(64 * 1024)
+        if not chunk or b"\n" in chunk:
+            return None
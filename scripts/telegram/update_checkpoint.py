@@ -0,0 +1,167 @@
+#!/opt/venv/bin/python
+"""
+Durable update_id checkpoint and duplicate filter for the bot.
+
+Telegram keeps undelivered updates for 24 hours, so the bot no longer drops
+them on start. Instead every update that has been handled is recorded here:
+
+- the highest update_id handled, used on start to confirm everything up to
+  it with getUpdates(offset=...) so Telegram stops resending it
+- a bounded window of recently handled update_ids, so anything Telegram
+  redelivers anyway (handled but not yet confirmed before a crash, a
+  webhook retry) is skipped instead of being queued twice
+
+The state is a small JSON file replaced atomically after each update.
+
+Updates of different chats may be handled concurrently (chats.py), so a
+later update can finish first. Updates still in flight are registered with
+begin()/end(), and the saved last_update_id never moves past one of them:
+a restart then redelivers the slow update instead of confirming it unseen.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from pathlib import Path
+
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import Application, ApplicationHandlerStop, ContextTypes, TypeHandler
+
+# Paths
+MIND_DIR = Path.home() / "workspace" / "mind"
+CHECKPOINT_PATH = MIND_DIR / "state" / "telegram-updates.json"
+
+# Handled update_ids remembered for deduplication
+DEDUP_WINDOW = int(os.environ.get("TELEGRAM_DEDUP_WINDOW", "1000"))
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateCheckpoint:
+    """Last handled update_id plus a bounded set of recent ones, kept on disk."""
+
+    def __init__(self, path: Path | None = None, window: int = DEDUP_WINDOW):
+        self.path = path or CHECKPOINT_PATH
+        self.window = window
+        self.last_update_id: int | None = None
+        self._recent: deque[int] = deque()
+        self._recent_set: set[int] = set()
+        self._floor = -1  # ids at or below this have left the window
+        self._in_flight: set[int] = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def load(self):
+        self._loaded = True
+        try:
+            state = json.loads(self.path.read_text())
+            recent = [int(i) for i in state.get("recent", [])][-self.window:]
+            last = state.get("last_update_id")
+        except FileNotFoundError:
+            return
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable update checkpoint {self.path} ({e})")
+            return
+        self.last_update_id = int(last) if last is not None else None
+        self._recent = deque(recent)
+        self._recent_set = set(recent)
+        if len(recent) == self.window:
+            self._floor = min(recent) - 1
+
+    def is_duplicate(self, update_id: int) -> bool:
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            return update_id in self._recent_set or update_id <= self._floor
+
+    def begin(self, update_id: int):
+        """Note that update_id is being handled (not yet safe to confirm)."""
+        with self._lock:
+            self._in_flight.add(update_id)
+
+    def end(self, update_id: int):
+        """Forget an in-flight update, whether it was marked or failed."""
+        with self._lock:
+            self._in_flight.discard(update_id)
+
+    def mark(self, update_id: int):
+        """Record update_id as handled and persist the checkpoint."""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            self._in_flight.discard(update_id)
+            if update_id in self._recent_set:
+                return
+            self._recent.append(update_id)
+            self._recent_set.add(update_id)
+            while len(self._recent) > self.window:
+                evicted = self._recent.popleft()
+                self._recent_set.discard(evicted)
+                self._floor = max(self._floor, evicted)
+            if self.last_update_id is None or update_id > self.last_update_id:
+                self.last_update_id = update_id
+            self._save()
+
+    def confirmed(self) -> int | None:
+        """Highest update_id that may be confirmed: handled, with nothing older in flight."""
+        last = self.last_update_id
+        if last is not None and self._in_flight:
+            last = min(last, min(self._in_flight) - 1)
+        return last
+
+    def _save(self):
+        state = {"last_update_id": self.confirmed(), "recent": list(self._recent)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(state, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    # Application hooks
+
+    async def skip_duplicate(self, update: Update, _context: ContextTypes.DEFAULT_TYPE):
+        """Runs before every other handler; stops redelivered updates."""
+        if self.is_duplicate(update.update_id):
+            logger.info(f"Skipping redelivered update {update.update_id}")
+            raise ApplicationHandlerStop
+
+    async def commit(self, update: Update, _context: ContextTypes.DEFAULT_TYPE):
+        """Runs after every other handler; records the update as handled."""
+        await asyncio.to_thread(self.mark, update.update_id)
+
+    async def on_error(self, update: object, context: ContextTypes.DEFAULT_TYPE):
+        """Error handler: log, and leave a failed update out of the checkpoint."""
+        logger.error(f"Error handling update: {context.error}", exc_info=context.error)
+        if isinstance(update, Update):
+            raise ApplicationHandlerStop
+
+    async def resume(self, app: Application):
+        """post_init for polling: confirm everything already handled."""
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            last = self.last_update_id
+        if last is None:
+            return
+        try:
+            await app.bot.get_updates(offset=last + 1, limit=1, timeout=0)
+            logger.info(f"Resuming after update {last}")
+        except TelegramError as e:
+            # e.g. a webhook is still set; the duplicate filter covers it
+            logger.warning(f"Could not confirm updates up to {last} ({e})")
+
+
+def install(app: Application, checkpoint: UpdateCheckpoint):
+    """Wrap app's handlers with the duplicate filter and the checkpoint."""
+    app.add_handlers({
+        -1: [TypeHandler(Update, checkpoint.skip_duplicate)],
+        1: [TypeHandler(Update, checkpoint.commit)],
+    })
+    app.add_error_handler(checkpoint.on_error)
+    app.post_init = checkpoint.resume
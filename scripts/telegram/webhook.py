@@ -0,0 +1,183 @@
+#!/opt/venv/bin/python
+"""
+Webhook receiver for the Telegram bot.
+
+Instead of long-polling getUpdates, the bot can register a webhook and let
+Telegram POST each update as it happens. The container's nginx terminates
+the public side and proxies TELEGRAM_WEBHOOK_PATH to a small HTTP receiver
+on 127.0.0.1 (see scripts/nginx/telegram-webhook.conf). The receiver checks
+the X-Telegram-Bot-Api-Secret-Token header and hands each update to the
+same Application (and handlers) that polling uses.
+
+Only the tiny slice of HTTP/1.1 that nginx and the Bot API need is spoken:
+POST with a Content-Length body, keep-alive or close.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import secrets
+import signal
+from collections.abc import Awaitable, Callable
+
+from telegram import Update
+from telegram.ext import Application
+
+# Public HTTPS URL Telegram posts to (nginx forwards WEBHOOK_PATH to the receiver)
+WEBHOOK_URL = os.environ.get("TELEGRAM_WEBHOOK_URL", "")
+WEBHOOK_PATH = os.environ.get("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_HOST = "127.0.0.1"
+WEBHOOK_PORT = int(os.environ.get("TELEGRAM_WEBHOOK_PORT", "8081"))
+
+# Shared with Telegram through setWebhook; a fresh one per start if unset
+WEBHOOK_SECRET = os.environ.get("TELEGRAM_WEBHOOK_SECRET", "")
+SECRET_HEADER = "x-telegram-bot-api-secret-token"
+
+# Updates are small; anything larger is not from Telegram
+MAX_BODY = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+            405: "Method Not Allowed", 411: "Length Required", 413: "Payload Too Large"}
+
+
+class WebhookServer:
+    """Accepts update POSTs and passes the decoded JSON to on_update."""
+
+    def __init__(
+        self,
+        on_update: Callable[[dict], Awaitable[None]],
+        secret: str,
+        path: str = WEBHOOK_PATH,
+        host: str = WEBHOOK_HOST,
+        port: int = WEBHOOK_PORT,
+    ):
+        self.on_update = on_update
+        self.secret = secret
+        self.path = path
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Webhook receiver listening on http://{self.host}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the peer closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                status = await self._respond(method, target, headers, reader)
+                keep_alive = (
+                    status == 200
+                    and headers.get("connection", "").lower() != "close"
+                    and (version == "HTTP/1.1" or headers.get("connection", "").lower() == "keep-alive")
+                )
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\nContent-Length: 0\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1")
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, target: str, headers: dict, reader: asyncio.StreamReader) -> int:
+        if target.split("?", 1)[0] != self.path:
+            return 404
+        if method != "POST":
+            return 405
+        if not hmac.compare_digest(headers.get(SECRET_HEADER, "").encode(), self.secret.encode()):
+            return 403
+        try:
+            length = int(headers["content-length"])
+        except (KeyError, ValueError):
+            return 411
+        if length > MAX_BODY:
+            return 413
+        try:
+            data = json.loads(await reader.readexactly(length))
+        except ValueError:
+            return 400
+        if not isinstance(data, dict):
+            return 400
+        await self.on_update(data)
+        return 200
+
+
+async def serve(
+    app: Application,
+    url: str,
+    stop: asyncio.Event,
+    secret: str | None = None,
+    port: int = WEBHOOK_PORT,
+    drop_pending_updates: bool = False,
+):
+    """Run app on webhook updates until stop is set.
+
+    Raises if the receiver cannot listen or Telegram refuses the webhook, so
+    the caller can fall back to polling.
+    """
+    secret = secret or WEBHOOK_SECRET or secrets.token_urlsafe(32)
+
+    async def on_update(data: dict):
+        await app.update_queue.put(Update.de_json(data, app.bot))
+
+    server = WebhookServer(on_update, secret, port=port)
+    async with app:
+        await server.start()
+        try:
+            await app.bot.set_webhook(
+                url,
+                secret_token=secret,
+                allowed_updates=Update.ALL_TYPES,
+                drop_pending_updates=drop_pending_updates,
+            )
+            await app.start()
+            logger.info(f"Webhook set to {url}")
+            await stop.wait()
+        finally:
+            # Take no more updates, then handle everything already acknowledged
+            await server.stop()
+            if app.running:
+                await app.stop()
+
+
+def run(app: Application, url: str = WEBHOOK_URL, **kwargs):
+    """Blocking entry point for bot.main(); returns on SIGTERM/SIGINT."""
+    async def _main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        await serve(app, url, stop, **kwargs)
+
+    # Not asyncio.run(): the loop stays current so a polling fallback can reuse app on it
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(_main())
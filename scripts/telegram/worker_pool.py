@@ -0,0 +1,153 @@
+#!/opt/venv/bin/python
+"""
+The pool of Claude worker sessions that drain the message queue.
+
+claude-session runs MIND_WORKERS tmux sessions (default 1). A single worker
+is the claude-mind session as before; a pool of N is claude-mind-0 ..
+claude-mind-<N-1>. Every worker drains the same queue: `mind-queue next`
+claims an entry under a lease, so two workers never take the same message,
+and an entry whose worker died is handed out again when the lease runs out.
+The queue watcher nudges as many workers as there are waiting entries, and
+the session broker picks idle ones first.
+
+Workers write the journal and memory.md through mind-note, which serializes
+the writes (see mind_note.py).
+
+`status` reports every worker's health and utilization: whether its tmux
+session is up, whether Claude is idle or in a turn, its turn count and last
+output (session_log.py), inputs waiting in the broker, and the share of the
+last MIND_WORKER_WINDOW seconds (default 15 minutes) it spent working.
+
+Usage:
+    worker_pool.py names
+    worker_pool.py status [--json] [--window 15m]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+try:
+    from . import session_log, session_probe
+except ImportError:  # run directly as /opt/scripts/telegram/worker_pool.py
+    import session_log
+    import session_probe
+
+# Number of worker sessions claude-session manages
+WORKERS = max(1, int(os.environ.get("MIND_WORKERS", "1")))
+
+# Seconds of history the utilization figure covers
+WINDOW = float(os.environ.get("MIND_WORKER_WINDOW", "900"))
+
+
+def sessions(count: int | None = None) -> list[str]:
+    """tmux session names of a pool of count workers (default MIND_WORKERS)."""
+    count = WORKERS if count is None else count
+    if count <= 1:
+        return [session_probe.SESSION_NAME]
+    return [f"{session_probe.SESSION_NAME}-{i}" for i in range(count)]
+
+
+def worker_state(screen: str | None) -> str:
+    """A worker's state: "down", "busy" (in a turn), "idle" (waiting for input) or "starting"."""
+    if screen is None:
+        return "down"
+    try:
+        from . import session_broker
+    except ImportError:  # run directly as /opt/scripts/telegram/worker_pool.py
+        import session_broker
+
+    if session_broker.BUSY.search(screen):
+        return "busy"
+    return "idle" if session_broker.is_idle(screen) else "starting"
+
+
+def worker_status(session: str, screen: str | None, now: float | None = None, window: float = WINDOW) -> dict:
+    """Health and utilization of one worker, given its current pane text."""
+    now = now if now is not None else time.time()
+    log = session_log.SessionLog(session_log.log_dir(session))
+    header = session_log.read_header(log.index_path)
+    active = log.active_seconds(now - window) if header else 0.0
+    last = header["last_output"] if header else None
+    return {
+        "session": session,
+        "state": worker_state(screen),
+        "turns": header["turns"] if header else 0,
+        "last_output_age": now - last if last else None,
+        "utilization": min(1.0, active / window) if window > 0 else 0.0,
+    }
+
+
+def pool_status(count: int | None = None, window: float = WINDOW, capture=None) -> list[dict]:
+    """worker_status() of every worker, with inputs waiting for it in the broker.
+
+    capture returns a session's pane text (default session_probe.capture_pane).
+    """
+    try:
+        from . import session_broker
+    except ImportError:  # run directly as /opt/scripts/telegram/worker_pool.py
+        import session_broker
+
+    capture = capture or session_probe.capture_pane
+    now = time.time()
+    rows = []
+    for session in sessions(count):
+        try:
+            screen = capture(session)
+        except (OSError, subprocess.TimeoutExpired):
+            screen = None
+        rows.append(worker_status(session, screen, now, window))
+
+    reply = session_broker.request({"op": "stats"}, timeout=2)
+    per_session = (reply or {}).get("sessions", {})
+    for row in rows:
+        row["pending"] = per_session.get(row["session"], {}).get("pending")
+    return rows
+
+
+def format_status(rows: list[dict]) -> str:
+    """One line per worker, then the pool's average utilization."""
+    lines = []
+    for row in rows:
+        age = row["last_output_age"]
+        last = f"last output {age:.0f}s ago" if age is not None else "no output yet"
+        pending = f", {row['pending']} pending" if row.get("pending") else ""
+        lines.append(
+            f"{row['session']}: {row['state']}, {row['utilization']:.0%} busy, "
+            f"{row['turns']} turns, {last}{pending}"
+        )
+    if len(rows) > 1:
+        up = [row for row in rows if row["state"] != "down"]
+        average = sum(row["utilization"] for row in rows) / len(rows)
+        lines.append(f"pool: {len(up)}/{len(rows)} up, {average:.0%} busy")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="The Claude worker sessions and their health.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("names", help="print the worker session names")
+    p_status = sub.add_parser("status", help="health and utilization of each worker")
+    p_status.add_argument("--json", action="store_true")
+    p_status.add_argument("--window", type=session_log.parse_duration, default=WINDOW,
+                          help="utilization window, e.g. 15m or 1h")
+    args = parser.parse_args()
+
+    if args.command == "names":
+        print("\n".join(sessions()))
+        return
+
+    rows = pool_status(window=args.window)
+    if args.json:
+        print(json.dumps(rows))
+    else:
+        print(format_status(rows))
+    if all(row["state"] == "down" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
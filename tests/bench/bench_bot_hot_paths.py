@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks of the bot's hot paths (pytest-benchmark).
+
+Times the ingest path and the outbound send in-process, with the shared
+fixtures from tests/conftest.py (temporary mind directory, mocked updates
+and a mocked Bot):
+
+  queue_message     - one message written to the file queue
+  log_conversation  - one entry appended to the conversation log
+  handle_message    - the whole text handler (stage, queue, log)
+  handle_status     - /status with 10k files in the queue
+  send_message      - a short and a chunked reply through a mocked Bot
+
+Results are saved as JSON baselines in tests/bench/baselines/ (one folder
+per machine); `compare` runs the suite again and fails when a benchmark got
+slower than the latest baseline by more than the threshold.
+
+Usage:
+    python tests/bench/bench_bot_hot_paths.py save [--name before-change]
+    python tests/bench/bench_bot_hot_paths.py compare [--baseline 0001] [--threshold median:10%]
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+project_root = Path(__file__).resolve().parents[2]
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+# Queue size /status is measured against
+STATUS_BACKLOG = 10_000
+
+
+@pytest.fixture
+def loop():
+    """An event loop to drive the async handlers without per-call set-up cost."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture
+def backlog(temp_mind_dir):
+    """Fill the message queue with STATUS_BACKLOG pending files."""
+    from scripts.telegram import queue_writer
+
+    for i in range(STATUS_BACKLOG):
+        queue_writer.write_message(f"From: user\n\nbacklog {i}", queue_dir=temp_mind_dir["queue"])
+    return temp_mind_dir["queue"]
+
+
+class TestIngest:
+    """Benchmarks of the incoming message path."""
+
+    def test_queue_message(self, benchmark, temp_mind_dir, mock_env):
+        """Time writing one message to the queue."""
+        from scripts.telegram.bot import queue_message
+
+        name = benchmark(queue_message, "Hello Claude", "testuser", None, 12345)
+
+        assert (temp_mind_dir["queue"] / name).exists()
+
+    def test_log_conversation(self, benchmark, temp_mind_dir, mock_env):
+        """Time appending one entry to the conversation log."""
+        from scripts.telegram.bot import log_conversation
+
+        benchmark(log_conversation, "incoming", "Hello Claude", "testuser", 12345)
+
+        assert list(temp_mind_dir["conversations"].glob("*.md"))
+
+    def test_handle_message(self, benchmark, loop, mock_telegram_update, mock_context, temp_mind_dir, mock_env):
+        """Time the text handler end to end."""
+        from scripts.telegram.bot import handle_message
+
+        benchmark(lambda: loop.run_until_complete(handle_message(mock_telegram_update, mock_context)))
+
+        assert list(temp_mind_dir["queue"].glob("*.msg"))
+        mock_telegram_update.message.reply_text.assert_not_called()
+
+    def test_handle_status_with_backlog(
+        self, benchmark, loop, backlog, mock_telegram_update, mock_context, temp_mind_dir, mock_env
+    ):
+        """Time /status while 10k messages are waiting."""
+        from scripts.telegram.bot import handle_status
+
+        benchmark(lambda: loop.run_until_complete(handle_status(mock_telegram_update, mock_context)))
+
+        assert "Status:" in mock_telegram_update.message.reply_text.call_args[0][0]
+
+
+class TestSend:
+    """Benchmarks of the outbound path."""
+
+    @pytest.mark.parametrize("length", [100, 10_000], ids=["short", "chunked"])
+    def test_send_message(self, benchmark, loop, length, mock_telegram_bot, temp_mind_dir, mock_env):
+        """Time send_message with a mocked Bot (chunking, scheduling, logging)."""
+        from scripts.telegram.send_message import send_message
+
+        with patch('scripts.telegram.send_message.Bot', return_value=mock_telegram_bot):
+            sent = benchmark(lambda: loop.run_until_complete(send_message("x" * length)))
+
+        assert sent is True
+        assert mock_telegram_bot.send_message.called
+
+
+def pytest_args(extra: list[str]) -> list[str]:
+    """Arguments running only this file's benchmarks against the baseline store."""
+    return [
+        __file__,
+        "--rootdir", str(project_root),
+        "--no-cov",
+        "-p", "no:cacheprovider",
+        "--benchmark-only",
+        f"--benchmark-storage=file://{BASELINE_DIR}",
+        "--benchmark-columns=min,median,mean,stddev,rounds",
+        *extra,
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bot hot path benchmarks with JSON baselines")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    save = sub.add_parser("save", help="Run the benchmarks and store the results as a baseline")
+    save.add_argument("--name", default="baseline", help="Baseline name (default: baseline)")
+
+    compare = sub.add_parser("compare", help="Run the benchmarks and compare them with a baseline")
+    compare.add_argument("--baseline", help="Saved run number or name (default: the latest)")
+    compare.add_argument(
+        "--threshold", action="append",
+        help="Fail when EXPR regresses, e.g. median:10%% (default: median:10%%; repeatable)")
+
+    args = parser.parse_args()
+
+    if args.command == "save":
+        extra = [f"--benchmark-save={args.name}"]
+    else:
+        against = f"--benchmark-compare={args.baseline}" if args.baseline else "--benchmark-compare"
+        extra = [against] + [f"--benchmark-compare-fail={t}" for t in args.threshold or ["median:10%"]]
+
+    sys.exit(pytest.main(pytest_args(extra)))
+
+
+if __name__ == "__main__":
+    main()
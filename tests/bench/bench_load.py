@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Load test of the real python-telegram-bot stack against the fake Bot API.
+
+Starts fake_bot_api.py on 127.0.0.1, then:
+
+  inbound  - runs bot.py (polling, or --webhook) and pushes updates at
+             --rate per second for --duration seconds, spread over --chats
+             chats (--media of them documents, fetched through getFile).
+             Latency is from the update being available to its text showing
+             up in a queue file.
+  outbound - runs send_daemon.py and sends --send-rate messages per second
+             through send-telegram (the daemon socket, or --send-cli for a
+             send_client.py process per message). Latency is until the
+             client has the daemon's delivery confirmation.
+
+and reports sustained throughput, error rates and latency percentiles, plus
+what the fake API served (including the 429s and 502s it injected). The
+send daemon paces itself to Telegram's limits (TELEGRAM_CHAT_RATE per chat,
+TELEGRAM_GLOBAL_RATE overall), so outbound throughput per chat is capped by
+design; spread sends over more --chats to load the daemon itself.
+
+Everything runs offline in a temporary HOME.
+
+Usage:
+    python tests/bench/bench_load.py [--rate 20] [--duration 10] [--chats 4] [--media 0.1]
+                                     [--latency 0.05] [--error-rate 0.01] [--flood-rate 0.01]
+                                     [--send-rate 5] [--webhook] [--json]
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from scripts.telegram import send_client  # noqa: E402
+from tests.bench.fake_bot_api import FakeBotAPI, document_update, text_update  # noqa: E402
+
+TELEGRAM_DIR = project_root / "scripts" / "telegram"
+TOKEN = "123456:load-token"
+FIRST_CHAT = 4242
+
+# Queue files mention each message's text; this finds the load generator's ones
+LOAD_TEXT = re.compile(r"load (\d+)\b")
+
+
+def summarize(samples: list[float]) -> str:
+    if not samples:
+        return "no samples"
+    ms = sorted(s * 1000 for s in samples)
+
+    def pct(p):
+        return ms[min(len(ms) - 1, int(len(ms) * p))]
+
+    return (f"mean {statistics.mean(ms):7.1f} ms   p50 {pct(0.5):7.1f} ms   p95 {pct(0.95):7.1f} ms   "
+            f"p99 {pct(0.99):7.1f} ms   max {ms[-1]:7.1f} ms")
+
+
+def stats(samples: list[float]) -> dict:
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {}
+    return {
+        "mean_ms": statistics.mean(ms),
+        **{f"p{p}_ms": ms[min(len(ms) - 1, int(len(ms) * p / 100))] for p in (50, 95, 99)},
+        "max_ms": ms[-1],
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_for(predicate, timeout: float, process: subprocess.Popen) -> bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline or process.poll() is not None:
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def _stop(process: subprocess.Popen):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def paced(count: int, rate: float):
+    """Yield 0..count-1, each at its slot of a steady rate (no catching up in bursts)."""
+    start = time.perf_counter()
+    for i in range(count):
+        delay = start + i / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        yield i
+
+
+class QueueCollector(threading.Thread):
+    """Notes when each load message first appears in a queue file."""
+
+    def __init__(self, queue_dir: Path, interval: float = 0.005):
+        super().__init__(daemon=True)
+        self.queue_dir = queue_dir
+        self.interval = interval
+        self.seen: dict[int, float] = {}
+        self.files: set[str] = set()
+        self.stop = threading.Event()
+
+    def run(self):
+        while not self.stop.is_set():
+            self.scan()
+            time.sleep(self.interval)
+        self.scan()
+
+    def scan(self):
+        try:
+            names = [e.name for e in os.scandir(self.queue_dir) if e.name.endswith(".msg")]
+        except FileNotFoundError:
+            return
+        now = time.perf_counter()
+        for name in names:
+            if name.startswith(".") or name in self.files:
+                continue
+            try:
+                content = (self.queue_dir / name).read_text(errors="replace")
+            except FileNotFoundError:
+                continue
+            self.files.add(name)
+            for match in LOAD_TEXT.finditer(content):
+                self.seen.setdefault(int(match.group(1)), now)
+
+
+def run_inbound(api: FakeBotAPI, env: dict, home: Path, args) -> dict:
+    """Drive bot.py with updates; returns the inbound report."""
+    chats = [FIRST_CHAT + i for i in range(args.chats)]
+    command = [sys.executable, str(TELEGRAM_DIR / "bot.py")]
+    if args.webhook:
+        port = _free_port()
+        env = dict(env, TELEGRAM_WEBHOOK_URL=f"http://127.0.0.1:{port}/telegram/webhook",
+                   TELEGRAM_WEBHOOK_PORT=str(port))
+        command.append("--webhook")
+
+    log_path = home / "bot.log"
+    with open(log_path, "w") as log:
+        bot = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        if args.webhook:
+            ready = _wait_for(lambda: api.webhook is not None, 30, bot)
+        else:
+            ready = _wait_for(lambda: api.count("getUpdates") > 0, 30, bot)
+        if not ready:
+            sys.exit(f"bot.py did not start (see below)\n{log_path.read_text()}")
+
+        collector = QueueCollector(home / "workspace" / "mind" / "message_queue")
+        collector.start()
+
+        count = int(args.rate * args.duration)
+        pushed: dict[int, float] = {}
+        media_every = round(1 / args.media) if args.media else 0
+        for i in paced(count, args.rate):
+            chat = chats[i % len(chats)]
+            if media_every and i % media_every == 0:
+                update = document_update(f"load-file-{i}", chat, caption=f"load {i}", size=api.file_size)
+            else:
+                update = text_update(f"load {i}", chat)
+            pushed[i] = time.perf_counter()
+            api.push_update(update)
+        sent_for = time.perf_counter() - pushed[0]
+
+        deadline = time.monotonic() + args.drain
+        while len(collector.seen) < count and time.monotonic() < deadline and bot.poll() is None:
+            time.sleep(0.05)
+        collector.stop.set()
+        collector.join()
+    finally:
+        _stop(bot)
+
+    seen = collector.seen
+    latencies = [seen[i] - pushed[i] for i in seen if i in pushed]
+    log_text = log_path.read_text(errors="replace")
+    span = (max(seen.values()) - pushed[0]) if seen else 0.0
+    return {
+        "mode": "webhook" if args.webhook else "polling",
+        "updates": count,
+        "target_rate": args.rate,
+        "offered_rate": (count - 1) / sent_for if sent_for else 0.0,
+        "queued": len(seen),
+        "queue_files": len(collector.files),
+        "lost": count - len(seen),
+        "error_rate": (count - len(seen)) / count if count else 0.0,
+        "throughput": len(seen) / span if span else 0.0,
+        "latency": stats(latencies),
+        "latency_samples": latencies,
+        "log_errors": log_text.count(" - ERROR - "),
+        "log_warnings": log_text.count(" - WARNING - "),
+    }
+
+
+def run_outbound(api: FakeBotAPI, env: dict, home: Path, args) -> dict:
+    """Drive send-telegram through the send daemon; returns the outbound report."""
+    chats = [str(FIRST_CHAT + i) for i in range(args.chats)]
+    socket_path = Path(env["SEND_TELEGRAM_SOCKET"])
+    log_path = home / "send-daemon.log"
+    with open(log_path, "w") as log:
+        daemon = subprocess.Popen([sys.executable, str(TELEGRAM_DIR / "send_daemon.py")],
+                                  env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    def send(i: int) -> tuple[bool, float]:
+        text, chat = f"reply {i}", chats[i % len(chats)]
+        start = time.perf_counter()
+        if args.send_cli:
+            ok = subprocess.run(
+                [sys.executable, str(TELEGRAM_DIR / "send_client.py"), "--chat", chat, text],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            ).returncode == 0
+        else:
+            ok = send_client.send_via_daemon(text, socket_path, chat) is True
+        return ok, time.perf_counter() - start
+
+    count = int(args.send_rate * args.duration)
+    try:
+        if not _wait_for(socket_path.exists, 30, daemon):
+            sys.exit(f"send_daemon.py did not start (see below)\n{log_path.read_text()}")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.send_workers) as pool:
+            futures = [pool.submit(send, i) for i in paced(count, args.send_rate)]
+            results = [f.result() for f in futures]
+        elapsed = time.perf_counter() - start
+    finally:
+        _stop(daemon)
+
+    delivered = [latency for ok, latency in results if ok]
+    return {
+        "client": "send_client.py" if args.send_cli else "daemon socket",
+        "messages": count,
+        "target_rate": args.send_rate,
+        "delivered": len(delivered),
+        "failed": count - len(delivered),
+        "error_rate": (count - len(delivered)) / count if count else 0.0,
+        "throughput": len(delivered) / elapsed if elapsed else 0.0,
+        "latency": stats(delivered),
+        "latency_samples": delivered,
+        "log_errors": log_path.read_text(errors="replace").count(" - ERROR - "),
+    }
+
+
+def print_report(report: dict, args):
+    faults = (f"fake API latency {args.latency * 1000:.0f} ms, {args.error_rate:.1%} 502s, "
+              f"{args.flood_rate:.1%} 429s (retry_after {args.retry_after}s)")
+    print(faults)
+
+    inbound = report.get("inbound")
+    if inbound:
+        print(f"\ninbound  bot.py ({inbound['mode']}): {inbound['updates']} updates at {args.rate:g}/s "
+              f"(offered {inbound['offered_rate']:.1f}/s) over {args.chats} chat(s), {args.media:.0%} documents")
+        print(f"  queued     {inbound['queued']}/{inbound['updates']} in {inbound['queue_files']} queue files "
+              f"({inbound['error_rate']:.1%} lost)   sustained {inbound['throughput']:.1f}/s")
+        print(f"  latency    {summarize(inbound['latency_samples'])}")
+        print(f"  bot log    {inbound['log_errors']} errors, {inbound['log_warnings']} warnings")
+
+    outbound = report.get("outbound")
+    if outbound:
+        print(f"\noutbound send-telegram ({outbound['client']}): {outbound['messages']} messages at "
+              f"{args.send_rate:g}/s over {args.chats} chat(s)")
+        print(f"  delivered  {outbound['delivered']}/{outbound['messages']} ({outbound['error_rate']:.1%} failed)"
+              f"   sustained {outbound['throughput']:.1f}/s")
+        print(f"  latency    {summarize(outbound['latency_samples'])}")
+        print(f"  daemon log {outbound['log_errors']} errors")
+
+    print("\nfake Bot API served:")
+    for method, statuses in report["served"].items():
+        by_status = ", ".join(f"{status}: {n}" for status, n in statuses.items())
+        print(f"  {method:<16} {sum(statuses.values()):6d}  ({by_status})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bot.py / send-telegram load test against a fake Bot API")
+    parser.add_argument("--rate", type=float, default=20, help="incoming updates per second")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per phase")
+    parser.add_argument("--chats", type=int, default=4, help="chats the load is spread over")
+    parser.add_argument("--media", type=float, default=0.0, help="share of updates that are documents")
+    parser.add_argument("--webhook", action="store_true", help="receive updates by webhook instead of polling")
+    parser.add_argument("--coalesce", action="store_true",
+                        help="keep the bot's burst coalescing and inbound rate limit (off: one entry per message)")
+    parser.add_argument("--drain", type=float, default=30, help="seconds to wait for the last messages")
+    parser.add_argument("--send-rate", type=float, default=5, help="outgoing messages per second (0 skips)")
+    parser.add_argument("--send-workers", type=int, default=16, help="concurrent send-telegram clients")
+    parser.add_argument("--send-cli", action="store_true", help="one send_client.py process per message")
+    parser.add_argument("--no-inbound", action="store_true", help="skip the bot.py phase")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake API adds to each request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of send/file calls answered 502")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="share of send/file calls answered 429")
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--file-size", type=int, default=64 * 1024)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    api = FakeBotAPI(
+        latency=args.latency, error_rate=args.error_rate, flood_rate=args.flood_rate,
+        retry_after=args.retry_after, file_size=args.file_size, seed=args.seed,
+    ).start()
+    report = {}
+    try:
+        with tempfile.TemporaryDirectory(dir="/tmp") as home:
+            home = Path(home)
+            env = dict(
+                os.environ,
+                HOME=str(home),
+                TELEGRAM_BOT_TOKEN=TOKEN,
+                TELEGRAM_CHAT_ID=",".join(str(FIRST_CHAT + i) for i in range(args.chats)),
+                TELEGRAM_API_BASE_URL=api.base_url,
+                TELEGRAM_API_FILE_URL=api.file_url,
+                SEND_TELEGRAM_SOCKET=str(home / "send.sock"),
+                MIND_QUEUE_BACKEND="files",
+                MIND_METRICS_PORT="0",
+                PYTHONUNBUFFERED="1",
+            )
+            if not args.coalesce:
+                env.update(MIND_COALESCE_WINDOW="0", MIND_INBOUND_RATE="0")
+
+            if not args.no_inbound:
+                report["inbound"] = run_inbound(api, env, home, args)
+            if args.send_rate > 0:
+                report["outbound"] = run_outbound(api, env, home, args)
+    finally:
+        api.stop()
+    report["served"] = api.summary()
+
+    if args.json:
+        for phase in ("inbound", "outbound"):
+            report.get(phase, {}).pop("latency_samples", None)
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, args)
+
+    # Losses without injected faults mean the stack itself dropped messages
+    lossy = any(report[phase]["error_rate"] for phase in ("inbound", "outbound") if phase in report)
+    if lossy and not (args.error_rate or args.flood_rate):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
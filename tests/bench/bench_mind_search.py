@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for scripts/telegram/mind_search.py
+
+Generates a synthetic mind directory (one journal and one conversation file
+per day), then times a full rebuild, a no-op refresh, a refresh after one
+appended entry, and queries. Refresh and query times should stay in
+milliseconds however many days of history there are.
+
+Usage:
+    python tests/bench/bench_mind_search.py [--days 730] [--entries 20] [--jobs N]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from scripts.telegram import mind_search  # noqa: E402
+
+WORDS = [
+    "garden", "tomato", "sqlite", "index", "rust", "memory", "journal", "reflection", "river", "hike",
+    "weather", "project", "deploy", "docker", "telegram", "queue", "latency", "coffee", "book", "music",
+    "idea", "question",
+]
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60)))
+
+
+def generate(mind_dir: Path, days: int, entries: int, seed: int = 1):
+    rng = random.Random(seed)
+    for source in mind_search.SOURCES:
+        (mind_dir / source).mkdir(parents=True)
+    start = date.today() - timedelta(days=days)
+    for d in range(days):
+        name = (start + timedelta(days=d)).isoformat() + ".md"
+        journal = [f"## {8 + i // 4:02d}:{i % 4 * 15:02d}\n\n{_paragraph(rng)}\n" for i in range(entries)]
+        (mind_dir / "journal" / name).write_text("\n".join(journal))
+        conversation = [
+            f"\n## {8 + i // 4:02d}:{i % 4 * 15:02d}:00 - user (incoming)\n\n{_paragraph(rng)}\n"
+            for i in range(entries)
+        ]
+        (mind_dir / "conversations" / name).write_text("".join(conversation))
+
+
+def _timed(fn, repeat: int = 1) -> float:
+    """Median wall time of fn in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return sorted(samples)[len(samples) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--entries", type=int, default=20, help="entries per file")
+    parser.add_argument("--jobs", type=int, help="worker processes for the rebuild")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mind_dir = Path(tmp) / "mind"
+        generate(mind_dir, args.days, args.entries)
+        index = mind_search.MindIndex(mind_dir, mind_dir / "index" / "search.db")
+
+        rows = args.days * 2 * args.entries
+        print(f"{args.days * 2} files, {rows} entries")
+        print(f"rebuild (1 process):   {_timed(lambda: index.rebuild(jobs=1)):9.1f} ms")
+        print(f"rebuild (pool):        {_timed(lambda: index.rebuild(jobs=args.jobs)):9.1f} ms")
+        print(f"refresh (no changes):  {_timed(index.refresh, repeat=5):9.1f} ms")
+
+        latest = sorted((mind_dir / "journal").glob("*.md"))[-1]
+
+        def append_and_refresh():
+            with open(latest, "a") as f:
+                f.write(f"\n## 23:59\n\n{_paragraph(random.Random())}\n")
+            index.refresh()
+
+        print(f"refresh (one append):  {_timed(append_and_refresh, repeat=5):9.1f} ms")
+        for query in ["garden", "sqlite index", '"coffee book"', "rust NOT docker", "hik*"]:
+            print(f"query {query!r:18}  {_timed(lambda q=query: index.search(q), repeat=5):9.1f} ms")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Throughput and latency benchmark: message_queue/ files vs. the SQLite queue
+
+Fills each backend with --pending messages, then times:
+
+    enqueue   writing the backlog (messages per second)
+    next      taking the oldest entry and finishing it, with the backlog
+              still pending: list + sort + read + delete for files,
+              claim + ack for SQLite (p50/p99 per message)
+    depth     counting what is waiting (directory scan vs. stats())
+
+Usage:
+    python tests/bench/bench_queue_backends.py [--pending 10000] [--consume 500] [--fsync file]
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from scripts.telegram import mind_queue, queue_watcher, queue_writer  # noqa: E402
+
+
+def _message(i: int) -> dict:
+    return {"text": f"message {i} " + "x" * 200, "from": "bench", "time": "2025-01-15T12:30:45", "id": f"{i:012x}"}
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    ordered = sorted(samples)
+    return statistics.median(ordered), ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+
+
+def bench_files(root: Path, pending: int, consume: int, fsync: str) -> dict:
+    queue_dir = root / "message_queue"
+    began = time.perf_counter()
+    for i in range(pending):
+        queue_writer.write_message(queue_writer.format_batch([_message(i)]), queue_dir=queue_dir, fsync=fsync)
+    enqueue = time.perf_counter() - began
+
+    latencies = []
+    for _ in range(consume):
+        start = time.perf_counter()
+        oldest = queue_watcher.pending_messages(queue_dir)[0]
+        path = queue_dir / oldest
+        path.read_text()
+        path.unlink()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    depth = len(queue_watcher.pending_messages(queue_dir))
+    depth_time = time.perf_counter() - start
+    return {"enqueue": pending / enqueue, "next": _percentiles(latencies), "depth": depth_time, "left": depth}
+
+
+def bench_sqlite(root: Path, pending: int, consume: int, fsync: str) -> dict:
+    queue = mind_queue.SqliteQueue(root / "message_queue.db", fsync=fsync)
+    try:
+        began = time.perf_counter()
+        for i in range(pending):
+            queue.enqueue({"chat_id": 1, "messages": [_message(i)]})
+        enqueue = time.perf_counter() - began
+
+        latencies = []
+        for _ in range(consume):
+            start = time.perf_counter()
+            entry = queue.claim()
+            mind_queue.render(entry["envelope"])
+            queue.ack(entry["receipt"])
+            latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        depth = queue.stats()["ready"]
+        depth_time = time.perf_counter() - start
+    finally:
+        queue.close()
+    return {"enqueue": pending / enqueue, "next": _percentiles(latencies), "depth": depth_time, "left": depth}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="File queue vs. SQLite queue benchmark")
+    parser.add_argument("--pending", type=int, default=10000, help="backlog size")
+    parser.add_argument("--consume", type=int, default=500, help="entries taken while the backlog is pending")
+    parser.add_argument("--fsync", choices=queue_writer.FSYNC_POLICIES, default="file")
+    args = parser.parse_args()
+    if args.consume > args.pending:
+        parser.error("--consume must not exceed --pending")
+
+    print(f"{args.pending} pending, {args.consume} consumed, MIND_QUEUE_FSYNC={args.fsync}\n")
+    print(f"{'backend':<8} {'enqueue/s':>10} {'next p50':>10} {'next p99':>10} {'depth':>10}")
+    for name, bench in (("files", bench_files), ("sqlite", bench_sqlite)):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = bench(Path(tmp), args.pending, args.consume, args.fsync)
+        assert result["left"] == args.pending - args.consume, result
+        p50, p99 = result["next"]
+        print(
+            f"{name:<8} {result['enqueue']:>10.0f} {p50 * 1000:>8.2f}ms {p99 * 1000:>8.2f}ms "
+            f"{result['depth'] * 1000:>8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
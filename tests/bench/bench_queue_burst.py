@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Burst benchmark for scripts/telegram/queue_writer.py
+
+Several writer processes queue messages as fast as they can into one
+directory. Afterwards every message is read back and checked, so the run
+fails if a single message was lost, overwritten or left half-written.
+
+Usage:
+    python tests/bench/bench_queue_burst.py [--writers 4] [--messages 500] [--fsync file]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from scripts.telegram import queue_writer  # noqa: E402
+
+
+def _writer(queue_dir: Path, writer_id: int, count: int, fsync: str, start: multiprocessing.Event):
+    start.wait()
+    for i in range(count):
+        body = f"writer={writer_id} seq={i}"
+        queue_writer.write_message(
+            queue_writer.format_message(body, f"bench-{writer_id}"),
+            queue_dir=queue_dir,
+            fsync=fsync,
+        )
+
+
+def run_burst(queue_dir: Path, writers: int, messages: int, fsync: str) -> dict:
+    """Run one burst and return throughput and integrity results."""
+    start = multiprocessing.Event()
+    procs = [
+        multiprocessing.Process(target=_writer, args=(queue_dir, w, messages, fsync, start))
+        for w in range(writers)
+    ]
+    for p in procs:
+        p.start()
+
+    began = time.perf_counter()
+    start.set()
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - began
+
+    expected = {f"writer={w} seq={i}" for w in range(writers) for i in range(messages)}
+    seen = set()
+    corrupt = 0
+    for path in queue_dir.glob("*.msg"):
+        header, _, body = path.read_text().partition("\n\n")
+        if not header.startswith("From: bench-") or body not in expected:
+            corrupt += 1
+        seen.add(body)
+
+    return {
+        "sent": len(expected),
+        "found": len(list(queue_dir.glob("*.msg"))),
+        "lost": len(expected - seen),
+        "corrupt": corrupt,
+        "leftover_tmp": len(list(queue_dir.glob(".*.tmp"))),
+        "elapsed": elapsed,
+        "rate": len(expected) / elapsed if elapsed else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue writer burst benchmark")
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--messages", type=int, default=500, help="Messages per writer")
+    parser.add_argument("--fsync", choices=queue_writer.FSYNC_POLICIES + ("all",), default="all")
+    args = parser.parse_args()
+
+    policies = queue_writer.FSYNC_POLICIES if args.fsync == "all" else (args.fsync,)
+    failed = False
+
+    print(f"{'fsync':<6} {'sent':>7} {'found':>7} {'lost':>5} {'corrupt':>8} {'msg/s':>10}")
+    for policy in policies:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = run_burst(Path(tmp), args.writers, args.messages, policy)
+        print(
+            f"{policy:<6} {result['sent']:>7} {result['found']:>7} {result['lost']:>5} "
+            f"{result['corrupt']:>8} {result['rate']:>10.0f}"
+        )
+        if result["lost"] or result["corrupt"] or result["leftover_tmp"] or result["found"] != result["sent"]:
+            failed = True
+
+    if failed:
+        print("FAIL: messages were lost or corrupted", file=sys.stderr)
+        sys.exit(1)
+    print("OK: no messages lost")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Receipt latency of the bot: long polling vs. webhook.
+
+Starts the local stand-in for the Bot API (fake_bot_api.py), which holds
+getUpdates open until an update arrives like Telegram's long polling, then
+measures the time from "Telegram has the update" to the bot's message
+handler running:
+
+  polling - the update is handed to a waiting getUpdates request
+  webhook - the update is POSTed to webhook.py's receiver, as Telegram would
+
+Both modes use the same Application setup; everything runs offline against
+127.0.0.1, so the numbers show local overhead only (Telegram's own delivery
+delay comes on top).
+
+Usage:
+    python tests/bench/bench_receipt_latency.py [--messages 50]
+"""
+
+import argparse
+import asyncio
+import http.client
+import json
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from telegram.ext import Application, MessageHandler, filters  # noqa: E402
+
+from scripts.telegram import webhook  # noqa: E402
+from tests.bench.fake_bot_api import FakeBotAPI  # noqa: E402
+
+TOKEN = "123456:bench-token"
+CHAT_ID = 4242
+SECRET = "bench-secret"
+
+
+def make_update(update_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": CHAT_ID, "type": "private"},
+            "from": {"id": CHAT_ID, "is_bot": False, "first_name": "bench"},
+            "text": f"bench {update_id}",
+        },
+    }
+
+
+def summarize(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return f"mean {statistics.mean(ms):7.2f} ms   p50 {statistics.median(ms):7.2f} ms   p95 {p95:7.2f} ms"
+
+
+def build_app(base_url: str, handled: asyncio.Queue) -> Application:
+    async def record(update, context):
+        handled.put_nowait(time.perf_counter())
+
+    app = Application.builder().token(TOKEN).base_url(base_url).build()
+    app.add_handler(MessageHandler(filters.TEXT, record))
+    return app
+
+
+async def bench_polling(api: FakeBotAPI, count: int) -> list[float]:
+    handled: asyncio.Queue = asyncio.Queue()
+    app = build_app(api.base_url, handled)
+    samples = []
+    async with app:
+        await app.updater.start_polling(poll_interval=0, timeout=10)
+        await app.start()
+        await asyncio.sleep(0.2)  # let the first getUpdates reach the server
+        for i in range(1, count + 1):
+            start = time.perf_counter()
+            api.push_update(make_update(i))
+            samples.append(await handled.get() - start)
+        await app.updater.stop()
+        await app.stop()
+    return samples
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def bench_webhook(base_url: str, count: int) -> list[float]:
+    handled: asyncio.Queue = asyncio.Queue()
+    app = build_app(base_url, handled)
+    port = _free_port()
+    stop = asyncio.Event()
+    task = asyncio.create_task(webhook.serve(app, f"https://example.invalid{webhook.WEBHOOK_PATH}", stop,
+                                             secret=SECRET, port=port))
+    await asyncio.sleep(0.3)
+
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": SECRET}
+    samples = []
+    for i in range(1, count + 1):
+        body = json.dumps(make_update(10_000 + i))
+        start = time.perf_counter()
+        await asyncio.to_thread(conn.request, "POST", webhook.WEBHOOK_PATH, body, headers)
+        response = await asyncio.to_thread(conn.getresponse)
+        response.read()
+        samples.append(await handled.get() - start)
+    conn.close()
+    stop.set()
+    await task
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="bot receipt latency benchmark")
+    parser.add_argument("--messages", type=int, default=50)
+    args = parser.parse_args()
+
+    api = FakeBotAPI().start()
+    polling = asyncio.run(bench_polling(api, args.messages))
+    hooked = asyncio.run(bench_webhook(api.base_url, args.messages))
+    api.stop()
+
+    print(f"{args.messages} updates each, fake Bot API on 127.0.0.1 (no TLS, no nginx)")
+    print(f"polling  getUpdates  : {summarize(polling)}")
+    print(f"webhook  POST        : {summarize(hooked)}")
+
+
+if __name__ == "__main__":
+    main()
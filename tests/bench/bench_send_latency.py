@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Per-message latency of send-telegram: direct CLI vs. resident daemon.
+
+Starts the local stand-in for the Bot API (fake_bot_api.py), then measures
+the wall time of each send for:
+
+  direct  - `send_message.py "msg"` (new interpreter, telegram import, new Bot)
+  client  - `send_client.py "msg"` talking to a running send_daemon.py
+  socket  - the client round-trip alone (no interpreter start-up)
+
+Everything runs offline against 127.0.0.1.
+
+Usage:
+    python tests/bench/bench_send_latency.py [--messages 20]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from scripts.telegram import send_client  # noqa: E402
+from tests.bench.fake_bot_api import FakeBotAPI  # noqa: E402
+
+TELEGRAM_DIR = project_root / "scripts" / "telegram"
+TOKEN = "123456:bench-token"
+CHAT_ID = "4242"
+
+
+def summarize(samples: list[float]) -> str:
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return f"mean {statistics.mean(ms):8.1f} ms   p50 {statistics.median(ms):8.1f} ms   p95 {p95:8.1f} ms"
+
+
+def time_cli(script: Path, env: dict, count: int) -> list[float]:
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(script), f"bench {i}"], env=env, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="send-telegram latency benchmark")
+    parser.add_argument("--messages", type=int, default=20)
+    args = parser.parse_args()
+
+    api = FakeBotAPI().start()
+
+    with tempfile.TemporaryDirectory(dir="/tmp") as home:
+        socket_path = Path(home) / "send.sock"
+        env = dict(
+            os.environ,
+            HOME=home,
+            TELEGRAM_BOT_TOKEN=TOKEN,
+            TELEGRAM_CHAT_ID=CHAT_ID,
+            TELEGRAM_API_BASE_URL=api.base_url,
+            SEND_TELEGRAM_SOCKET=str(socket_path),
+        )
+
+        direct = time_cli(TELEGRAM_DIR / "send_message.py", env, args.messages)
+
+        daemon = subprocess.Popen(
+            [sys.executable, str(TELEGRAM_DIR / "send_daemon.py")],
+            env=env,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            deadline = time.monotonic() + 15
+            while not socket_path.exists():
+                if time.monotonic() > deadline or daemon.poll() is not None:
+                    sys.exit("send daemon did not start")
+                time.sleep(0.05)
+
+            client = time_cli(TELEGRAM_DIR / "send_client.py", env, args.messages)
+
+            round_trips = []
+            for i in range(args.messages):
+                start = time.perf_counter()
+                if not send_client.send_via_daemon(f"socket {i}", socket_path):
+                    sys.exit("daemon send failed")
+                round_trips.append(time.perf_counter() - start)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    api.stop()
+
+    print(f"{args.messages} messages each, fake Bot API on 127.0.0.1 (no TLS)")
+    print(f"direct  send_message.py : {summarize(direct)}")
+    print(f"client  send_client.py  : {summarize(client)}")
+    print(f"socket  round-trip only : {summarize(round_trips)}")
+    print(f"speed-up (mean, CLI)    : {statistics.mean(direct) / statistics.mean(client):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
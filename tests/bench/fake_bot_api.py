@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Telegram Bot API.
+
+Speaks enough of the Bot API for python-telegram-bot to run bot.py,
+send-telegram and the send daemon against 127.0.0.1, fully offline:
+
+  getMe, getUpdates       long polling (offset, timeout, limit)
+  setWebhook              updates are then POSTed to the webhook with the
+  deleteWebhook           secret token header, as Telegram does
+  getWebhookInfo
+  sendMessage             accepted messages are recorded
+  editMessageText
+  getFile                 files download from /file/bot<token>/<file_path>
+
+Every request can be slowed down (latency), and the send and file methods
+can fail at random with a 502 or with a 429 flood-control reply carrying
+retry_after. Counters of everything served are kept for the load generator
+(bench_load.py).
+
+Usage:
+    python tests/bench/fake_bot_api.py --port 8088 [--latency 0.05] [--error-rate 0.01] [--flood-rate 0.02]
+
+then point the bot at it:
+    TELEGRAM_API_BASE_URL=http://127.0.0.1:8088/bot
+    TELEGRAM_API_FILE_URL=http://127.0.0.1:8088/file/bot
+"""
+
+import argparse
+import collections
+import contextlib
+import hashlib
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Methods that fail at error_rate / flood_rate (the rest only get latency)
+FAULTY_METHODS = frozenset({"sendMessage", "editMessageText", "getFile", "file"})
+
+# Longest getUpdates long poll, as on Telegram
+MAX_POLL_TIMEOUT = 50
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "fake", "username": "fake_bot"}
+
+
+def text_update(text: str, chat_id: int) -> dict:
+    """An update with a text message (update_id and message_id are set by push_update)."""
+    return {
+        "message": {
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": _chat_type(chat_id)},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "load", "username": "load"},
+            "text": text,
+        },
+    }
+
+
+def document_update(file_id: str, chat_id: int, caption: str = "", size: int = 0) -> dict:
+    """An update with a document; the bot fetches it through getFile."""
+    update = text_update("", chat_id)
+    message = update["message"]
+    del message["text"]
+    message["document"] = {
+        "file_id": file_id,
+        "file_unique_id": file_id,
+        "file_name": f"{file_id}.bin",
+        "mime_type": "application/octet-stream",
+        "file_size": size,
+    }
+    if caption:
+        message["caption"] = caption
+    return update
+
+
+def _chat_type(chat_id) -> str:
+    try:
+        return "private" if int(chat_id) > 0 else "supergroup"
+    except ValueError:
+        return "channel"
+
+
+class FakeBotAPI(ThreadingHTTPServer):
+    """The fake Bot API server; start() serves it from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        flood_rate: float = 0.0,
+        retry_after: int = 1,
+        file_size: int = 64 * 1024,
+        seed: int | None = None,
+    ):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.flood_rate = flood_rate
+        self.retry_after = retry_after
+        self.file_size = file_size
+        self.random = random.Random(seed)
+
+        # Guards everything below; notified when updates arrive or the webhook changes
+        self.cond = threading.Condition()
+        self.updates: list[dict] = []
+        self.next_update_id = 1
+        self.next_message_id = 1
+        self.webhook: tuple[str, str] | None = None  # (url, secret_token)
+        self.messages: list[dict] = []
+        self.served: collections.Counter = collections.Counter()  # (method, HTTP status)
+        self.scripted: collections.deque = collections.deque()  # see fail_next()
+        self.closed = False
+        self._background: list[threading.Thread] = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/bot"
+
+    @property
+    def file_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/file/bot"
+
+    def start(self) -> "FakeBotAPI":
+        self._spawn(self.serve_forever)
+        return self
+
+    def stop(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.shutdown()
+        self.server_close()
+        for thread in self._background:
+            thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _spawn(self, target):
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._background.append(thread)
+
+    # ---- what the test or load generator drives ----
+
+    def push_update(self, update: dict) -> int:
+        """Make an update available to getUpdates (or the webhook); returns its update_id."""
+        with self.cond:
+            update_id = self.next_update_id
+            self.next_update_id += 1
+            update = {**update, "update_id": update_id}
+            if "message" in update:
+                update["message"] = {**update["message"], "message_id": self._message_id()}
+            self.updates.append(update)
+            self.cond.notify_all()
+        return update_id
+
+    def count(self, method: str, status: int | None = None) -> int:
+        """Requests served for a method (with that status, if given)."""
+        with self.cond:
+            return sum(n for (m, s), n in self.served.items() if m == method and status in (None, s))
+
+    def summary(self) -> dict:
+        """{method: {status: count}} of everything served so far."""
+        with self.cond:
+            result: dict = {}
+            for (method, status), n in sorted(self.served.items()):
+                result.setdefault(method, {})[str(status)] = n
+            return result
+
+    def _message_id(self) -> int:
+        message_id = self.next_message_id
+        self.next_message_id += 1
+        return message_id
+
+    # ---- request handling ----
+
+    def call(self, method: str, params: dict) -> tuple[int, dict]:
+        """Answer one Bot API call with (HTTP status, JSON body)."""
+        if self.latency:
+            time.sleep(self.latency)
+        status, body = self._fault(method) or self._dispatch(method, params)
+        with self.cond:
+            self.served[method, status] += 1
+        return status, body
+
+    def fail_next(self, *statuses: int):
+        """Answer the next send/file calls with these statuses (429 or 502) before rolling dice."""
+        with self.cond:
+            self.scripted.extend(statuses)
+
+    def _fault(self, method: str) -> tuple[int, dict] | None:
+        if method not in FAULTY_METHODS:
+            return None
+        with self.cond:
+            status = self.scripted.popleft() if self.scripted else None
+        if status is None:
+            roll = self.random.random()
+            if roll < self.flood_rate:
+                status = 429
+            elif roll < self.flood_rate + self.error_rate:
+                status = 502
+            else:
+                return None
+        if status == 429:
+            return 429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }
+        return status, {"ok": False, "error_code": status, "description": "Bad Gateway"}
+
+    def _dispatch(self, method: str, params: dict) -> tuple[int, dict]:
+        handler = getattr(self, f"_api_{method}", None)
+        if handler is None:
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+        result = handler(params)
+        if isinstance(result, tuple):
+            return result
+        return 200, {"ok": True, "result": result}
+
+    def _api_getMe(self, params):
+        return BOT_USER
+
+    def _api_getUpdates(self, params):
+        offset = int(params.get("offset", 0))
+        timeout = min(float(params.get("timeout", 0)), MAX_POLL_TIMEOUT)
+        limit = int(params.get("limit", 100))
+        with self.cond:
+            if self.webhook is not None:
+                return 409, {
+                    "ok": False,
+                    "error_code": 409,
+                    "description": "Conflict: can't use getUpdates method while webhook is active; "
+                                   "use deleteWebhook to delete the webhook first",
+                }
+            # Asking for an offset confirms every update before it
+            self.updates = [u for u in self.updates if u["update_id"] >= offset]
+            self.cond.wait_for(lambda: self.updates or self.closed or self.webhook is not None, timeout=timeout)
+            return self.updates[:limit]
+
+    def _api_setWebhook(self, params):
+        url = params.get("url", "")
+        if not url:
+            return self._api_deleteWebhook(params)
+        with self.cond:
+            if _flag(params.get("drop_pending_updates")):
+                self.updates.clear()
+            start = self.webhook is None
+            self.webhook = (url, params.get("secret_token", ""))
+            self.cond.notify_all()
+        if start:
+            self._spawn(self._deliver)
+        return True
+
+    def _api_deleteWebhook(self, params):
+        with self.cond:
+            if _flag(params.get("drop_pending_updates")):
+                self.updates.clear()
+            self.webhook = None
+            self.cond.notify_all()
+        return True
+
+    def _api_getWebhookInfo(self, params):
+        with self.cond:
+            url = self.webhook[0] if self.webhook else ""
+            return {"url": url, "has_custom_certificate": False, "pending_update_count": len(self.updates)}
+
+    def _api_sendMessage(self, params):
+        return self._record("sendMessage", params, self._message_id())
+
+    def _api_editMessageText(self, params):
+        return self._record("editMessageText", params, int(params.get("message_id", 0)))
+
+    def _record(self, method: str, params: dict, message_id: int) -> dict:
+        chat_id = params.get("chat_id", "")
+        now = time.time()
+        with self.cond:
+            self.messages.append({"method": method, "chat_id": chat_id, "text": params.get("text", ""), "at": now})
+        message = {
+            "message_id": message_id,
+            "date": int(now),
+            "chat": {"id": int(chat_id) if chat_id.lstrip("-").isdigit() else 0, "type": _chat_type(chat_id)},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        }
+        if method == "editMessageText":
+            message["edit_date"] = int(now)
+        return message
+
+    def _api_getFile(self, params):
+        file_id = params.get("file_id", "")
+        return {
+            "file_id": file_id,
+            "file_unique_id": file_id,
+            "file_size": self.file_size,
+            "file_path": f"documents/{file_id}.bin",
+        }
+
+    def _api_file(self, params):
+        return True  # the download itself; _Handler sends file_content()
+
+    def file_content(self, file_path: str) -> bytes:
+        """Bytes of a downloadable file (distinct per file, file_size long)."""
+        block = hashlib.sha256(file_path.encode()).digest()
+        return (block * (self.file_size // len(block) + 1))[:self.file_size]
+
+    def _deliver(self):
+        """POST updates to the webhook one at a time, retrying until it answers 200."""
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.updates or self.closed or self.webhook is None)
+                if self.closed or self.webhook is None:
+                    return
+                update = self.updates[0]
+                url, secret = self.webhook
+            status = _post_update(url, secret, update)
+            with self.cond:
+                self.served["webhook", status] += 1
+                if status == 200 and self.updates and self.updates[0] is update:
+                    self.updates.pop(0)
+            if status != 200:
+                time.sleep(0.1)
+
+
+def _post_update(url: str, secret: str, update: dict) -> int:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(update).encode(),
+        headers={"Content-Type": "application/json", "X-Telegram-Bot-Api-Secret-Token": secret},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0  # receiver not reachable
+
+
+def _flag(value) -> bool:
+    return value in (True, "true", "True", "1")
+
+
+def _params(raw: bytes, content_type: str, query: str) -> dict:
+    """Request parameters as strings (python-telegram-bot posts form fields)."""
+    if content_type.startswith("application/json") and raw:
+        return {k: v if isinstance(v, str) else json.dumps(v) for k, v in json.loads(raw).items()}
+    params = dict(urllib.parse.parse_qsl(query))
+    params.update(urllib.parse.parse_qsl(raw.decode()))
+    return params
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes /bot<token>/<method> and /file/bot<token>/<path> to the server."""
+
+    server: FakeBotAPI
+    # Keep connections open like the real API (httpx pools them)
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self._handle()
+
+    def do_GET(self):
+        self._handle()
+
+    def _handle(self):
+        length = int(self.headers.get("Content-Length", 0))
+        raw = self.rfile.read(length) if length else b""
+        parts = urllib.parse.urlsplit(self.path)
+
+        if parts.path.startswith("/file/bot"):
+            file_path = parts.path.split("/", 3)[-1]
+            status, body = self.server.call("file", {})
+            if status == 200:
+                self._reply(200, self.server.file_content(file_path), "application/octet-stream")
+            else:
+                self._reply(status, json.dumps(body).encode())
+            return
+
+        method = parts.path.rsplit("/", 1)[-1]
+        status, body = self.server.call(method, _params(raw, self.headers.get("Content-Type", ""), parts.query))
+        self._reply(status, json.dumps(body).encode())
+
+    def _reply(self, status: int, body: bytes, content_type: str = "application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        # The client may have given up, e.g. the long poll of a bot that is shutting down
+        with contextlib.suppress(BrokenPipeError, ConnectionResetError):
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Telegram Bot API")
+    parser.add_argument("--port", type=int, default=8088)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of send/file calls answered 502")
+    parser.add_argument("--flood-rate", type=float, default=0.0, help="share of send/file calls answered 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after of the 429 replies")
+    parser.add_argument("--file-size", type=int, default=64 * 1024, help="bytes per downloadable file")
+    parser.add_argument("--seed", type=int, help="seed for the fault dice")
+    args = parser.parse_args()
+
+    server = FakeBotAPI(
+        port=args.port, latency=args.latency, error_rate=args.error_rate, flood_rate=args.flood_rate,
+        retry_after=args.retry_after, file_size=args.file_size, seed=args.seed,
+    )
+    print(f"TELEGRAM_API_BASE_URL={server.base_url}")
+    print(f"TELEGRAM_API_FILE_URL={server.file_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(server.summary()))
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
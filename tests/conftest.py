@@ -81,12 +81,83 @@ def temp_mind_dir(tmp_path, monkeypatch):
     journal.mkdir(parents=True)
 
     # Patch module-level directory constants
+    import scripts.telegram.attachments as attachments_module
     import scripts.telegram.bot as bot_module
+    import scripts.telegram.coalescer as coalescer_module
+    import scripts.telegram.latency_trace as latency_trace_module
+    import scripts.telegram.log_writer as log_writer_module
+    import scripts.telegram.memory_compactor as memory_compactor_module
+    import scripts.telegram.mind_archive as mind_archive_module
+    import scripts.telegram.mind_note as mind_note_module
+    import scripts.telegram.mind_queue as mind_queue_module
+    import scripts.telegram.mind_search as mind_search_module
+    import scripts.telegram.queue_writer as queue_writer_module
+    import scripts.telegram.reflection_scheduler as reflection_scheduler_module
+    import scripts.telegram.send_client as send_client_module
     import scripts.telegram.send_message as send_module
+    import scripts.telegram.session_log as session_log_module
+    import scripts.telegram.update_checkpoint as update_checkpoint_module
 
     monkeypatch.setattr(bot_module, 'MIND_DIR', mind_dir)
     monkeypatch.setattr(bot_module, 'MESSAGE_QUEUE_DIR', message_queue)
     monkeypatch.setattr(bot_module, 'CONVERSATIONS_DIR', conversations)
+    monkeypatch.setattr(bot_module, 'stats', bot_module.metrics.BotMetrics())
+    monkeypatch.setattr(bot_module, 'tracer', bot_module.latency_trace.Tracer(
+        bot_module.latency_trace.TraceLog(mind_dir / "traces")))
+    monkeypatch.setattr(bot_module, 'checkpoint', bot_module.update_checkpoint.UpdateCheckpoint(
+        mind_dir / "state" / "telegram-updates.json"))
+    # Queue every message at once unless a test asks for coalescing
+    monkeypatch.setattr(bot_module, 'inbound', bot_module.coalescer.InboundCoalescer(
+        bot_module.queue_batch, mind_dir / "state" / "inbound", window=0, rate=0))
+
+    monkeypatch.setattr(queue_writer_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(queue_writer_module, 'MESSAGE_QUEUE_DIR', message_queue)
+
+    monkeypatch.setattr(log_writer_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(log_writer_module, 'CONVERSATIONS_DIR', conversations)
+    monkeypatch.setattr(log_writer_module, 'RUN_DIR', mind_dir / "run")
+    monkeypatch.setattr(log_writer_module, 'SOCKET_PATH', mind_dir / "run" / "conversation-log.sock")
+
+    monkeypatch.setattr(mind_search_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(mind_search_module, 'INDEX_PATH', mind_dir / "index" / "search.db")
+
+    monkeypatch.setattr(latency_trace_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(latency_trace_module, 'TRACE_DIR', mind_dir / "traces")
+
+    monkeypatch.setattr(update_checkpoint_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(update_checkpoint_module, 'CHECKPOINT_PATH', mind_dir / "state" / "telegram-updates.json")
+
+    monkeypatch.setattr(coalescer_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(coalescer_module, 'STAGING_DIR', mind_dir / "state" / "inbound")
+
+    monkeypatch.setattr(mind_queue_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(mind_queue_module, 'QUEUE_DB', mind_dir / "message_queue.db")
+
+    monkeypatch.setattr(reflection_scheduler_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(reflection_scheduler_module, 'MESSAGE_QUEUE_DIR', message_queue)
+    monkeypatch.setattr(reflection_scheduler_module, 'CONVERSATIONS_DIR', conversations)
+    monkeypatch.setattr(reflection_scheduler_module, 'STATE_PATH', mind_dir / "state" / "reflection.json")
+
+    monkeypatch.setattr(session_log_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(session_log_module, 'SESSION_LOG_DIR', mind_dir / "session")
+
+    monkeypatch.setattr(attachments_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(attachments_module, 'ATTACHMENTS_DIR', mind_dir / "attachments")
+
+    monkeypatch.setattr(mind_archive_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(mind_archive_module, 'ARCHIVE_DIR', mind_dir / "archive")
+
+    monkeypatch.setattr(memory_compactor_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(memory_compactor_module, 'MEMORY_FILE', mind_dir / "memory.md")
+    monkeypatch.setattr(memory_compactor_module, 'MEMORY_DIR', mind_dir / "memory")
+
+    monkeypatch.setattr(mind_note_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(mind_note_module, 'JOURNAL_DIR', journal)
+
+    # No send daemon listens here, so send-telegram uses the direct path
+    monkeypatch.setattr(send_client_module, 'MIND_DIR', mind_dir)
+    monkeypatch.setattr(send_client_module, 'RUN_DIR', mind_dir / "run")
+    monkeypatch.setattr(send_client_module, 'SOCKET_PATH', mind_dir / "run" / "send-telegram.sock")
 
     monkeypatch.setattr(send_module, 'MIND_DIR', mind_dir)
     monkeypatch.setattr(send_module, 'CONVERSATIONS_DIR', conversations)
@@ -107,6 +178,7 @@ def temp_mind_dir(tmp_path, monkeypatch):
 def mock_telegram_update():
     """Mock telegram.Update object with realistic data."""
     update = Mock()
+    update.update_id = 500
     update.effective_chat.id = 12345
     update.effective_user.username = "testuser"
     update.effective_user.first_name = "Test"
@@ -149,6 +221,7 @@ def mock_application():
     app_instance = Mock()
     builder_mock = Mock()
     builder_mock.token.return_value = builder_mock
+    builder_mock.concurrent_updates.return_value = builder_mock
     builder_mock.build.return_value = app_instance
 
     app_instance.add_handler = Mock()
@@ -168,6 +241,7 @@ def fixed_datetime(monkeypatch):
     """Freeze time to 2025-01-15 12:30:45 for predictable timestamps."""
     import scripts.telegram.bot as bot_module
     import scripts.telegram.send_message as send_module
+    import scripts.telegram.queue_writer as queue_writer_module
     from datetime import datetime as dt
 
     # Counter to generate unique timestamps for multiple calls in same test
@@ -187,6 +261,9 @@ def fixed_datetime(monkeypatch):
     monkeypatch.setattr(bot_module, 'datetime', FrozenDatetime)
     monkeypatch.setattr(send_module, 'datetime', FrozenDatetime)
 
+    # Queue names never go backwards; forget stamps left by earlier real-time tests
+    monkeypatch.setattr(queue_writer_module, '_last_stamp', None)
+
     return FrozenDatetime.now()
 
 
@@ -0,0 +1,75 @@
+"""
+Integration tests for scripts/telegram/attachments.py
+
+Tests streaming a download over real HTTP into the store.
+"""
+
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+BODY = bytes(range(256)) * 4096  # 1 MiB
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path != "/file/bot123/documents/file_7.bin":
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        for i in range(0, len(BODY), 100_000):
+            self.wfile.write(BODY[i:i + 100_000])
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def file_server():
+    """A stand-in for Telegram's file endpoint."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FileHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestDownload:
+    """Tests for download() against an HTTP server."""
+
+    @pytest.mark.asyncio
+    async def test_download_streams_into_the_store(self, temp_mind_dir, file_server):
+        """Test that a fetched file lands under its hash and a second fetch dedupes."""
+        from scripts.telegram.attachments import AttachmentStore, download
+
+        store = AttachmentStore()
+        telegram_file = SimpleNamespace(file_path=f"{file_server}/file/bot123/documents/file_7.bin")
+
+        first = await download(telegram_file, store, ".bin")
+        second = await download(telegram_file, store, ".bin")
+
+        assert first["sha256"] == hashlib.sha256(BODY).hexdigest()
+        assert first["size"] == len(BODY)
+        assert (first["stored"], second["stored"]) == (True, False)
+        assert store.stats() == {"files": 1, "bytes": len(BODY)}
+
+    @pytest.mark.asyncio
+    async def test_http_error_leaves_nothing_behind(self, temp_mind_dir, file_server):
+        """Test that a failed fetch raises and stores nothing."""
+        import httpx
+
+        from scripts.telegram.attachments import AttachmentStore, download
+
+        store = AttachmentStore()
+        with pytest.raises(httpx.HTTPStatusError):
+            await download(SimpleNamespace(file_path=f"{file_server}/file/bot123/missing"), store)
+
+        assert store.stats()["files"] == 0
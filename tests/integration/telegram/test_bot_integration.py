@@ -118,6 +118,7 @@ class TestApplicationSetup:
             builder_mock = Mock()
             app_mock = Mock()
             builder_mock.token.return_value = builder_mock
+            builder_mock.concurrent_updates.return_value = builder_mock
             builder_mock.build.return_value = app_mock
             mock_app_class.builder.return_value = builder_mock
 
@@ -141,6 +142,7 @@ class TestApplicationSetup:
             builder_mock = Mock()
             app_mock = Mock()
             builder_mock.token.return_value = builder_mock
+            builder_mock.concurrent_updates.return_value = builder_mock
             builder_mock.build.return_value = app_mock
             mock_app_class.builder.return_value = builder_mock
 
@@ -152,8 +154,8 @@ class TestApplicationSetup:
             except KeyboardInterrupt:
                 pass
 
-            # Verify handlers were added (3 handlers: start, status, message)
-            assert app_mock.add_handler.call_count == 3
+            # Verify handlers were added (4 handlers: start, status, message, media)
+            assert app_mock.add_handler.call_count == 4
 
     def test_bot_polling_starts(self, mock_env, temp_mind_dir):
         """Test that polling is started."""
@@ -163,6 +165,7 @@ class TestApplicationSetup:
             builder_mock = Mock()
             app_mock = Mock()
             builder_mock.token.return_value = builder_mock
+            builder_mock.concurrent_updates.return_value = builder_mock
             builder_mock.build.return_value = app_mock
             mock_app_class.builder.return_value = builder_mock
 
@@ -0,0 +1,94 @@
+"""
+Integration tests against tests/bench/fake_bot_api.py
+
+Runs the real python-telegram-bot stack (no mocked Bot) over HTTP against the
+local fake Bot API: sends, flood control, file downloads and getUpdates.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+TOKEN = "123456:test-token"
+
+
+@pytest.fixture
+def api():
+    """A running fake Bot API whose 429s ask for no wait."""
+    from tests.bench.fake_bot_api import FakeBotAPI
+
+    with FakeBotAPI(retry_after=0, file_size=1000, seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def live_send(api, mock_env, temp_mind_dir, monkeypatch):
+    """send_message.py pointed at the fake API with the real Bot."""
+    import scripts.telegram.send_message as send_module
+
+    monkeypatch.setattr(send_module, 'API_BASE_URL', api.base_url)
+    return send_module
+
+
+class TestSendMessage:
+    """Tests for send_message() over HTTP."""
+
+    async def test_send_message_reaches_the_api(self, api, live_send):
+        """Test that a reply is posted to sendMessage for the primary chat."""
+        assert await live_send.send_message("Hello from the mind") is True
+
+        assert [(m["method"], m["chat_id"], m["text"]) for m in api.messages] == [
+            ("sendMessage", "12345", "Hello from the mind"),
+        ]
+
+    async def test_long_message_is_split(self, api, live_send):
+        """Test that a long reply becomes several sendMessage calls."""
+        assert await live_send.send_message("word " * 2000) is True
+
+        assert api.count("sendMessage", 200) == len(api.messages) > 1
+
+    async def test_flood_and_server_errors_are_retried(self, api, live_send, monkeypatch):
+        """Test that a 429 and a 502 are retried until the message goes out."""
+        monkeypatch.setattr("scripts.telegram.outbound.NETWORK_BACKOFF", 0.01)
+        api.fail_next(429, 502)
+
+        assert await live_send.send_message("persistent") is True
+
+        assert api.count("sendMessage", 429) == 1
+        assert api.count("sendMessage", 502) == 1
+        assert [m["text"] for m in api.messages] == ["persistent"]
+
+
+class TestBot:
+    """Tests for receiving updates and files through telegram.Bot."""
+
+    async def test_get_file_streams_into_the_store(self, api, temp_mind_dir):
+        """Test getFile plus the download from the file URL."""
+        from telegram import Bot
+
+        from scripts.telegram.attachments import AttachmentStore, download
+
+        async with Bot(TOKEN, base_url=api.base_url, base_file_url=api.file_url) as bot:
+            telegram_file = await bot.get_file("doc-1")
+            stored = await download(telegram_file, AttachmentStore(), ".bin")
+
+        assert stored["size"] == 1000
+        assert (temp_mind_dir["mind"] / stored["path"]).read_bytes() == api.file_content("documents/doc-1.bin")
+
+    async def test_get_updates_then_webhook_conflict(self, api):
+        """Test long polling and that polling is refused while a webhook is set."""
+        from telegram import Bot
+        from telegram.error import Conflict
+
+        from tests.bench.fake_bot_api import text_update
+
+        api.push_update(text_update("hi", 12345))
+        async with Bot(TOKEN, base_url=api.base_url) as bot:
+            updates = await bot.get_updates(timeout=1)
+            assert [u.message.text for u in updates] == ["hi"]
+            assert await bot.get_updates(offset=updates[-1].update_id + 1, timeout=0) == ()
+
+            await bot.set_webhook("http://127.0.0.1:9/telegram/webhook", secret_token="s")
+            with pytest.raises(Conflict):
+                await bot.get_updates(timeout=0)
+            await bot.delete_webhook()
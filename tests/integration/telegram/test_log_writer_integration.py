@@ -0,0 +1,103 @@
+"""
+Integration tests for scripts/telegram/log_writer.py
+
+Tests concurrent writers, the log socket and shutdown draining.
+"""
+
+import multiprocessing
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def _append_many(conversations_dir: Path, writer_id: int, count: int):
+    from scripts.telegram.log_writer import append_entries
+
+    for i in range(count):
+        entry = f"\n## 12:00:00 - w{writer_id} (incoming)\n\n" + (f"w{writer_id}-{i} " * 200) + "\n"
+        append_entries(conversations_dir, [("2025-01-15", entry)])
+
+
+class TestConcurrentWriters:
+    """Tests that separate processes never interleave entries."""
+
+    @pytest.mark.slow
+    def test_direct_appends_from_processes_do_not_interleave(self, temp_mind_dir):
+        """Test large entries appended by several processes stay intact."""
+        procs = [
+            multiprocessing.Process(target=_append_many, args=(temp_mind_dir["conversations"], w, 50))
+            for w in range(4)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        content = (temp_mind_dir["conversations"] / "2025-01-15.md").read_text()
+        entries = content.split("\n## ")[1:]
+        assert len(entries) == 200
+        for entry in entries:
+            header, _, body = entry.partition("\n\n")
+            writer = header.split(" - ")[1].split(" ")[0]
+            assert set(body.split()) <= {f"{writer}-{i}" for i in range(50)}
+
+
+class TestLogSocket:
+    """Tests for entries arriving over the writer socket."""
+
+    def test_socket_entries_are_committed_by_writer(self, temp_mind_dir, monkeypatch):
+        """Test that log_entry from another 'process' reaches the single writer."""
+        import scripts.telegram.log_writer as log_writer_module
+        from scripts.telegram.log_writer import ConversationLog, LogSocketServer, log_entry
+
+        with tempfile.TemporaryDirectory(dir="/tmp") as short_dir:
+            socket_path = Path(short_dir) / "log.sock"
+            monkeypatch.setattr(log_writer_module, 'SOCKET_PATH', socket_path)
+
+            log = ConversationLog(temp_mind_dir["conversations"], flush_interval=3600)
+            server = LogSocketServer(log, socket_path)
+            server.start()
+            try:
+                log_entry("from socket", datetime(2025, 1, 15, 12, 0, 0))
+                for _ in range(200):
+                    if log._pending:
+                        break
+                    time.sleep(0.01)
+            finally:
+                server.stop()
+                log.close()
+
+            assert not socket_path.exists()
+
+        assert (temp_mind_dir["conversations"] / "2025-01-15.md").read_text() == "from socket"
+
+
+class TestBotShutdown:
+    """Tests that the bot drains the log when polling stops."""
+
+    def test_main_drains_buffered_entries_on_stop(self, mock_env, temp_mind_dir, fixed_datetime):
+        """Test entries logged during polling are on disk after run_polling returns."""
+        from scripts.telegram.bot import log_conversation, main
+
+        def fake_run_polling(**kwargs):
+            log_conversation("incoming", "Logged while running", "user")
+
+        with patch('scripts.telegram.bot.Application') as mock_app:
+            builder_mock = Mock()
+            app_mock = Mock()
+            builder_mock.token.return_value = builder_mock
+            builder_mock.concurrent_updates.return_value = builder_mock
+            builder_mock.build.return_value = app_mock
+            mock_app.builder.return_value = builder_mock
+            app_mock.run_polling.side_effect = fake_run_polling
+
+            main()
+
+        content = (temp_mind_dir["conversations"] / "2025-01-15.md").read_text()
+        assert "Logged while running" in content
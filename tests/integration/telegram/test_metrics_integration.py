@@ -0,0 +1,113 @@
+"""
+Integration tests for scripts/telegram/metrics.py
+
+Tests the HTTP metrics endpoint and queue depth tracking on a real directory.
+"""
+
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+class TestMetricsServer:
+    """Tests for MetricsServer."""
+
+    def test_serves_prometheus_text(self):
+        """Test GET /metrics on an ephemeral local port."""
+        from scripts.telegram.metrics import BotMetrics, MetricsServer
+
+        stats = BotMetrics()
+        stats.record_message("incoming", 42)
+        server = MetricsServer(stats.registry, port=0)
+        server.start()
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/other", timeout=5)
+        finally:
+            server.stop()
+
+        assert content_type.startswith("text/plain; version=0.0.4")
+        assert 'mind_messages_total{direction="incoming"} 1' in body
+        assert "mind_conversation_log_bytes_total 42" in body
+        assert "mind_queue_depth 0" in body
+
+
+class TestQueueDepthTracker:
+    """Tests for QueueDepthTracker."""
+
+    @pytest.mark.parametrize("backend", ["inotify", "scandir"])
+    def test_tracks_files_added_and_removed(self, temp_mind_dir, monkeypatch, backend):
+        """Test that the gauge follows files appearing and being consumed."""
+        from scripts.telegram import queue_watcher
+        from scripts.telegram.metrics import Gauge, QueueDepthTracker
+
+        monkeypatch.setattr(queue_watcher, "POLL_INTERVAL", 0.05)
+        queue = temp_mind_dir["queue"]
+        (queue / "a.msg").write_text("a")
+        gauge = Gauge("depth", "help")
+
+        try:
+            tracker = QueueDepthTracker(queue, gauge, backend=backend)
+        except OSError:
+            pytest.skip("inotify not available")
+        tracker.start()
+        try:
+            assert gauge.value() == 1
+            (queue / "b.msg").write_text("b")
+            (queue / ".c.msg.tmp").write_text("ignored")
+            assert _wait_for(lambda: gauge.value() == 2)
+
+            (queue / "a.msg").unlink()
+            (queue / "b.msg").rename(temp_mind_dir["mind"] / "b.msg")
+            assert _wait_for(lambda: gauge.value() == 0)
+        finally:
+            tracker.stop()
+
+    @pytest.mark.parametrize("backend", ["inotify", "scandir"])
+    def test_reports_pick_up(self, temp_mind_dir, monkeypatch, backend):
+        """Test that reading (inotify) or removing a queue file reports it picked up."""
+        from scripts.telegram import queue_watcher
+        from scripts.telegram.metrics import Gauge, QueueDepthTracker
+
+        monkeypatch.setattr(queue_watcher, "POLL_INTERVAL", 0.05)
+        queue = temp_mind_dir["queue"]
+        gauge = Gauge("depth", "help")
+        picked = []
+
+        try:
+            tracker = QueueDepthTracker(queue, gauge, backend=backend, on_picked_up=picked.append)
+        except OSError:
+            pytest.skip("inotify not available")
+        tracker.start()
+        try:
+            (queue / "a.msg").write_text("a")
+            (queue / "b.msg").write_text("b")
+            assert _wait_for(lambda: gauge.value() == 2)
+            (queue / "a.msg").read_text()
+            if backend == "inotify":
+                assert _wait_for(lambda: "a.msg" in picked)
+            (queue / "a.msg").unlink()
+            (queue / "b.msg").unlink()
+            assert _wait_for(lambda: "b.msg" in picked)
+        finally:
+            tracker.stop()
+
+        assert "a.msg" in picked
@@ -0,0 +1,164 @@
+"""
+Integration tests for scripts/telegram/mind_queue.py
+
+Tests concurrent consumers on one database and the SQLite backend wired
+through the bot, queue_writer.py, the queue watcher and the depth gauge.
+"""
+
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _envelope(text):
+    return {"messages": [{"text": text, "from": "alice", "time": "2025-01-15T12:30:45"}]}
+
+
+class TestConcurrentConsumers:
+    """Tests for several connections claiming from one queue."""
+
+    def test_every_entry_is_claimed_exactly_once(self, temp_mind_dir):
+        """Test that consumers racing on their own connections never share an entry."""
+        from scripts.telegram.mind_queue import SqliteQueue
+
+        producer = SqliteQueue()
+        for i in range(200):
+            producer.enqueue(_envelope(f"m{i}"))
+
+        claimed = []
+
+        def consume():
+            queue = SqliteQueue()
+            try:
+                while (entry := queue.claim()) is not None:
+                    claimed.append(entry["envelope"]["messages"][0]["text"])
+                    assert queue.ack(entry["receipt"])
+            finally:
+                queue.close()
+
+        threads = [threading.Thread(target=consume) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sorted(claimed) == sorted(f"m{i}" for i in range(200))
+        assert producer.stats()["ready"] == 0
+        producer.close()
+
+
+class TestSqliteBackend:
+    """Tests for MIND_QUEUE_BACKEND=sqlite."""
+
+    def test_bot_queues_envelope(self, temp_mind_dir, mock_env, monkeypatch):
+        """Test that the bot writes a row with chat and update ids instead of a .msg file."""
+        from scripts.telegram import bot
+        from scripts.telegram.mind_queue import SqliteQueue
+
+        queue = SqliteQueue()
+        monkeypatch.setattr(bot, "message_db", queue)
+        try:
+            name = bot.queue_batch([{
+                "text": "Hello", "from": "testuser", "time": "2025-01-15T12:30:45",
+                "id": "abc123", "chat_id": 12345, "message_id": 7, "update_id": 500,
+            }])
+
+            entry = queue.claim()
+        finally:
+            queue.close()
+
+        assert name == f"#{entry['id']}"
+        assert list(temp_mind_dir["queue"].glob("*.msg")) == []
+        assert entry["envelope"]["chat_id"] == 12345
+        assert entry["envelope"]["messages"][0]["update_id"] == 500
+        assert bot.tracer._files[name] == ["abc123"]
+
+    def test_queue_writer_cli_uses_database(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that reflection_cron.sh's writer call lands in the database."""
+        from scripts.telegram import mind_queue
+        from scripts.telegram.queue_writer import main
+
+        monkeypatch.setattr(mind_queue, "BACKEND", "sqlite")
+        monkeypatch.setattr("sys.argv", ["queue_writer.py", "--from", "system", "--suffix", "reflection", "Reflect"])
+
+        main()
+
+        assert capsys.readouterr().out.strip().endswith("message_queue.db#1@system")
+        queue = mind_queue.SqliteQueue()
+        [entry] = queue.peek()
+        queue.close()
+        assert entry["envelope"]["kind"] == "reflection"
+        assert entry["lane"] == "system"
+        assert list(temp_mind_dir["queue"].glob("*.msg")) == []
+
+    def test_watcher_notifies_about_new_entries(self, temp_mind_dir):
+        """Test that queue_watcher.watch() polls the database and points at mind-queue."""
+        from scripts.telegram.mind_queue import DatabaseWatcher, SqliteQueue
+        from scripts.telegram.queue_watcher import watch
+
+        queue = SqliteQueue()
+        watcher = DatabaseWatcher(queue, interval=0.05)
+        notifications = []
+        stop = threading.Event()
+        thread = threading.Thread(
+            target=watch,
+            args=(temp_mind_dir["queue"], watcher),
+            kwargs={
+                "notify": lambda text, count=1: notifications.append(text),
+                "debounce": 0.1,
+                "stop": stop,
+                "pending_fn": watcher.pending,
+            },
+        )
+        thread.start()
+        try:
+            queue.enqueue(_envelope("one"))
+            queue.enqueue(_envelope("two"))
+            assert _wait_for(lambda: notifications)
+        finally:
+            stop.set()
+            thread.join()
+            queue.close()
+
+        assert notifications[0].startswith("[queue] 2 new messages waiting (next: #1)")
+        assert "mind-queue next" in notifications[0]
+
+    def test_depth_gauge_follows_claims(self, temp_mind_dir):
+        """Test the depth gauge and pick-up callback on the database backend."""
+        from scripts.telegram.metrics import BotMetrics, QueueDepthTracker
+        from scripts.telegram.mind_queue import DatabaseWatcher, SqliteQueue
+
+        queue = SqliteQueue()
+        stats = BotMetrics()
+        picked = []
+        tracker = QueueDepthTracker(
+            temp_mind_dir["queue"], stats.queue_depth, on_picked_up=picked.append,
+            source=DatabaseWatcher(queue, interval=0.05), lane_gauge=stats.queue_lanes,
+        )
+        assert tracker.polling
+        tracker.start()
+        try:
+            queue.enqueue(_envelope("one"))
+            queue.enqueue(_envelope("two"), lane="background")
+            assert _wait_for(lambda: stats.queue_depth.value() == 2)
+            assert stats.queue_lanes.value(lane="background") == 1
+
+            queue.claim()
+            assert _wait_for(lambda: stats.queue_depth.value() == 1)
+        finally:
+            tracker.stop()
+            queue.close()
+
+        assert picked == ["#1"]
@@ -0,0 +1,61 @@
+"""
+Integration tests for scripts/telegram/mind_search.py
+
+Tests the index against files written by the real conversation log writer and
+a parallel rebuild across worker processes.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+class TestMindSearchIntegration:
+    """Tests for mind-search over a realistic mind directory."""
+
+    def test_indexes_conversation_log_entries(self, temp_mind_dir):
+        """Test that entries appended by log_writer become searchable as they arrive."""
+        from scripts.telegram import log_writer
+        from scripts.telegram.mind_search import MindIndex
+
+        now = datetime(2025, 1, 15, 9, 0, 0)
+        index = MindIndex()
+        try:
+            for i, text in enumerate(["Planning the hike", "Bring a raincoat", "Weather looks clear"]):
+                when = now + timedelta(minutes=i)
+                entry = log_writer.format_entry("incoming", text, "testuser", when)
+                log_writer.append_entries(temp_mind_dir["conversations"], [(when.strftime("%Y-%m-%d"), entry)])
+                index.refresh()
+
+            [result] = index.search("raincoat")
+            assert result["time"] == "09:01:00"
+            assert result["heading"] == "testuser (incoming)"
+            assert index.db.execute("SELECT count(*) FROM entries").fetchone()[0] == 3
+        finally:
+            index.close()
+
+    def test_parallel_rebuild_matches_sequential(self, temp_mind_dir):
+        """Test that a process-pool rebuild indexes exactly what a sequential one does."""
+        from scripts.telegram.mind_search import PARALLEL_THRESHOLD, MindIndex
+
+        day = datetime(2024, 1, 1)
+        for i in range(PARALLEL_THRESHOLD * 2):
+            name = (day + timedelta(days=i)).strftime("%Y-%m-%d") + ".md"
+            body = "".join(f"## {h:02d}:00\n\nday {i} hour {h} topic{i % 7}\n\n" for h in range(8, 12))
+            (temp_mind_dir["journal"] / name).write_text(body)
+
+        index = MindIndex()
+        try:
+            assert index.rebuild(jobs=2) == PARALLEL_THRESHOLD * 2
+            parallel = index.db.execute("SELECT path, offset, body FROM entries ORDER BY path, offset").fetchall()
+
+            index.rebuild(jobs=1)
+            sequential = index.db.execute("SELECT path, offset, body FROM entries ORDER BY path, offset").fetchall()
+
+            assert parallel == sequential
+            assert len(parallel) == PARALLEL_THRESHOLD * 2 * 4
+            assert len(index.search("topic3", limit=100)) == 4 * len(range(3, PARALLEL_THRESHOLD * 2, 7))
+        finally:
+            index.close()
@@ -0,0 +1,92 @@
+"""
+Integration tests for scripts/telegram/queue_watcher.py
+
+Tests both watcher backends against a real queue directory.
+"""
+
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def _inotify_available():
+    from scripts.telegram.queue_watcher import _load_libc
+
+    return _load_libc() is not None
+
+
+class TestWatcherBackends:
+    """Tests that real file writes are observed."""
+
+    @pytest.mark.skipif(not _inotify_available(), reason="inotify not available")
+    def test_inotify_watcher_sees_atomic_write(self, temp_mind_dir):
+        """Test that a queue_writer write produces an inotify event."""
+        from scripts.telegram.queue_watcher import InotifyWatcher
+        from scripts.telegram.queue_writer import write_message
+
+        watcher = InotifyWatcher(temp_mind_dir["queue"])
+        try:
+            filename = write_message("body", queue_dir=temp_mind_dir["queue"], fsync="none")
+            names = watcher.wait(2.0)
+        finally:
+            watcher.close()
+
+        assert names == [filename]
+
+    @pytest.mark.skipif(not _inotify_available(), reason="inotify not available")
+    def test_inotify_watcher_times_out_when_idle(self, temp_mind_dir):
+        """Test that an idle directory yields no events."""
+        from scripts.telegram.queue_watcher import InotifyWatcher
+
+        watcher = InotifyWatcher(temp_mind_dir["queue"])
+        try:
+            assert watcher.wait(0.05) == []
+        finally:
+            watcher.close()
+
+    def test_scandir_watcher_sees_new_file(self, temp_mind_dir):
+        """Test that the polling fallback reports new files once."""
+        from scripts.telegram.queue_watcher import ScandirWatcher
+        from scripts.telegram.queue_writer import write_message
+
+        watcher = ScandirWatcher(temp_mind_dir["queue"], interval=0.01)
+        filename = write_message("body", queue_dir=temp_mind_dir["queue"], fsync="none")
+
+        assert watcher.wait(0.01) == [filename]
+        assert watcher.wait(0.01) == []
+
+    def test_watch_end_to_end_notifies_once_per_burst(self, temp_mind_dir):
+        """Test a burst of bot messages produces a single session notification."""
+        from scripts.telegram.queue_watcher import make_watcher, watch
+        from scripts.telegram.queue_writer import write_message
+
+        notifications = []
+        stop = threading.Event()
+
+        def notify(text, count=1):
+            notifications.append(text)
+            stop.set()
+            return True
+
+        watcher = make_watcher(temp_mind_dir["queue"])
+        thread = threading.Thread(
+            target=watch,
+            args=(temp_mind_dir["queue"], watcher),
+            kwargs={"notify": notify, "debounce": 0.2, "stop": stop},
+        )
+        thread.start()
+        time.sleep(0.2)  # let the startup backlog check pass on the empty queue
+        try:
+            for i in range(5):
+                write_message(f"msg {i}", queue_dir=temp_mind_dir["queue"], fsync="none")
+            thread.join(timeout=10)
+        finally:
+            stop.set()
+            thread.join()
+            watcher.close()
+
+        assert len(notifications) == 1
+        assert "5 new messages" in notifications[0]
@@ -0,0 +1,64 @@
+"""
+Integration tests for scripts/telegram/queue_writer.py
+
+Tests bursts of concurrent writers against a real queue directory.
+"""
+
+import multiprocessing
+import threading
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def _write_burst(queue_dir: Path, writer_id: int, count: int):
+    from scripts.telegram.queue_writer import format_message, write_message
+
+    for i in range(count):
+        write_message(format_message(f"{writer_id}:{i}", "burst"), queue_dir=queue_dir, fsync="none")
+
+
+class TestBurstWrites:
+    """Tests that bursts of messages are never lost."""
+
+    def test_threaded_burst_loses_no_messages(self, temp_mind_dir):
+        """Test many threads queueing in the same second."""
+        threads = [
+            threading.Thread(target=_write_burst, args=(temp_mind_dir["queue"], t, 100))
+            for t in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        bodies = {p.read_text().partition("\n\n")[2] for p in temp_mind_dir["queue"].glob("*.msg")}
+        assert len(bodies) == 800
+
+    @pytest.mark.slow
+    def test_multiprocess_burst_loses_no_messages(self, temp_mind_dir):
+        """Test several writer processes sharing one queue directory."""
+        procs = [
+            multiprocessing.Process(target=_write_burst, args=(temp_mind_dir["queue"], p, 200))
+            for p in range(4)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        files = list(temp_mind_dir["queue"].glob("*.msg"))
+        assert len(files) == 800
+        assert list(temp_mind_dir["queue"].glob(".*.tmp")) == []
+
+    def test_bot_queue_message_burst_sorts_in_arrival_order(self, temp_mind_dir, mock_env):
+        """Test that bot.queue_message names sort in the order messages arrived."""
+        from scripts.telegram.bot import queue_message
+
+        filenames = [queue_message(f"Message {i}", "user") for i in range(50)]
+
+        assert sorted(filenames) == filenames
+        ordered = sorted(temp_mind_dir["queue"].glob("*.msg"))
+        assert [p.read_text().endswith(f"Message {i}") for i, p in enumerate(ordered)] == [True] * 50
@@ -0,0 +1,137 @@
+"""
+Integration tests for scripts/telegram/send_daemon.py and send_client.py
+
+Tests the client and daemon talking over a real Unix socket.
+"""
+
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture
+def running_daemon(request, mock_telegram_bot, temp_mind_dir):
+    """Run a SendDaemon with a mocked Bot on a short-path Unix socket.
+
+    Parametrize indirectly with a byte count to lower the request limit.
+    """
+    from scripts.telegram.send_client import MAX_REQUEST_BYTES
+    from scripts.telegram.send_daemon import SendDaemon, serve
+
+    limit = getattr(request, "param", MAX_REQUEST_BYTES)
+
+    short_dir = tempfile.TemporaryDirectory(dir="/tmp")
+    socket_path = Path(short_dir.name) / "send.sock"
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+    daemon = SendDaemon(mock_telegram_bot, "12345")
+    daemon.scheduler.chat_burst = 100  # keep the round-trip tests fast
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(serve(daemon, socket_path, stop, limit),))
+    thread.start()
+    for _ in range(200):
+        if socket_path.exists():
+            break
+        threading.Event().wait(0.01)
+
+    yield socket_path
+
+    loop.call_soon_threadsafe(stop.set)
+    thread.join()
+    loop.close()
+    short_dir.cleanup()
+
+
+class TestClientDaemonRoundTrip:
+    """Tests for messages going through the socket."""
+
+    def test_client_delivers_through_daemon(self, running_daemon, mock_telegram_bot, temp_mind_dir):
+        """Test that the client gets a confirmation and the bot sends once."""
+        from scripts.telegram.send_client import send_via_daemon
+
+        assert send_via_daemon("Through the socket", running_daemon) is True
+        mock_telegram_bot.send_message.assert_called_once_with(chat_id="12345", text="Through the socket")
+
+    def test_daemon_reuses_one_bot_for_many_messages(self, running_daemon, mock_telegram_bot, temp_mind_dir):
+        """Test that consecutive messages share the resident Bot and keep order."""
+        from scripts.telegram.send_client import send_via_daemon
+
+        for i in range(10):
+            assert send_via_daemon(f"msg {i}", running_daemon) is True
+
+        sent = [c.kwargs["text"] for c in mock_telegram_bot.send_message.call_args_list]
+        assert sent == [f"msg {i}" for i in range(10)]
+
+    def test_reply_over_64k_goes_through(self, running_daemon, mock_telegram_bot, temp_mind_dir):
+        """Test that a long non-ASCII reply (JSON-escaped to ~200 KiB) is delivered in chunks."""
+        from scripts.telegram.send_client import send_via_daemon
+
+        text = "Привет мир " * 3000  # 33k characters, 6 bytes each once escaped
+
+        assert send_via_daemon(text, running_daemon) is True
+        sent = [c.kwargs["text"] for c in mock_telegram_bot.send_message.call_args_list]
+        assert len(sent) > 1
+        assert "".join(sent).replace(" ", "").replace("\n", "") == text.replace(" ", "")
+
+    @pytest.mark.parametrize("running_daemon", [1024], indirect=True)
+    def test_request_over_limit_falls_back(self, running_daemon, mock_telegram_bot, temp_mind_dir):
+        """Test that the client is told to send directly when the daemon refuses the size."""
+        from scripts.telegram.send_client import send_via_daemon
+
+        assert send_via_daemon("x" * 4096, running_daemon) is None
+        assert send_via_daemon("still served", running_daemon) is True
+        mock_telegram_bot.send_message.assert_called_once_with(chat_id="12345", text="still served")
+
+    def test_daemon_api_error_reaches_client(self, running_daemon, mock_telegram_bot, temp_mind_dir):
+        """Test that a Bot API failure is reported back to the client."""
+        from scripts.telegram.send_client import send_via_daemon
+
+        mock_telegram_bot.send_message.side_effect = Exception("Bad Request")
+
+        assert send_via_daemon("fail", running_daemon) is False
+
+    def test_client_streams_through_daemon(self, running_daemon, mock_telegram_bot, temp_mind_dir):
+        """Test that a streamed reply is sent once and edited in place."""
+        from unittest.mock import AsyncMock
+
+        from scripts.telegram.send_client import stream_via_daemon
+
+        mock_telegram_bot.edit_message_text = AsyncMock()
+
+        assert stream_via_daemon(iter(["Line one\n", "Line two\n"]), running_daemon) is True
+        mock_telegram_bot.send_message.assert_called_once()
+        shown = mock_telegram_bot.send_message.call_args.kwargs["text"]
+        if mock_telegram_bot.edit_message_text.called:
+            shown = mock_telegram_bot.edit_message_text.call_args.kwargs["text"]
+        assert shown == "Line one\nLine two\n"
+
+    def test_stats_reports_queue_depth(self, running_daemon):
+        """Test the stats request over the socket."""
+        from scripts.telegram.send_client import daemon_stats
+
+        assert daemon_stats(running_daemon) == {"ok": True, "depth": 0, "chats": {}}
+
+    def test_socket_removed_on_shutdown(self, mock_telegram_bot, temp_mind_dir):
+        """Test that the daemon cleans up its socket file when stopped."""
+        from scripts.telegram.send_daemon import SendDaemon, serve
+
+        with tempfile.TemporaryDirectory(dir="/tmp") as short_dir:
+            socket_path = Path(short_dir) / "send.sock"
+            socket_path.touch()  # stale file from a crashed run
+
+            async def run_briefly():
+                stop = asyncio.Event()
+                task = asyncio.create_task(serve(SendDaemon(mock_telegram_bot, "1"), socket_path, stop))
+                await asyncio.sleep(0.05)
+                assert socket_path.is_socket()
+                stop.set()
+                await task
+
+            asyncio.run(run_briefly())
+
+            assert not socket_path.exists()
@@ -0,0 +1,149 @@
+"""
+Integration tests for scripts/telegram/session_broker.py
+
+Tests callers talking to a running broker over a real Unix socket.
+"""
+
+import asyncio
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+IDLE = "│ >                      │\n  ⏵⏵ bypass permissions on (shift+tab to cycle)\n"
+BUSY = "✻ Thinking… (esc to interrupt)\n"
+
+
+class FakePane:
+    """Records submissions; the session stays busy until the test says otherwise."""
+
+    def __init__(self):
+        self.screen = BUSY
+        self.submitted = []
+
+    async def capture(self):
+        return self.screen
+
+    async def submit(self, text):
+        self.submitted.append(text)
+
+
+@pytest.fixture
+def running_broker(request):
+    """Run a one-worker broker pool with a fake pane on a short-path Unix socket.
+
+    Parametrize indirectly to set the request size limit.
+    """
+    from scripts.telegram.session_broker import MAX_REQUEST_BYTES, BrokerPool, SessionBroker, serve
+
+    short_dir = tempfile.TemporaryDirectory(dir="/tmp")
+    socket_path = Path(short_dir.name) / "broker.sock"
+    pane = FakePane()
+    loop = asyncio.new_event_loop()
+    stop = asyncio.Event()
+    broker = SessionBroker(pane, poll_interval=0.01, settle=0)
+    limit = getattr(request, "param", MAX_REQUEST_BYTES)
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(serve(BrokerPool({"claude-mind": broker}), socket_path, stop, limit),))
+    thread.start()
+    for _ in range(200):
+        if socket_path.exists():
+            break
+        threading.Event().wait(0.01)
+
+    yield socket_path, pane
+
+    loop.call_soon_threadsafe(stop.set)
+    thread.join()
+    loop.close()
+    short_dir.cleanup()
+
+
+class TestBrokerSocket:
+    """Tests for concurrent callers."""
+
+    def test_concurrent_callers_are_batched(self, running_broker):
+        """Test that callers racing while Claude works end up in one submission."""
+        from scripts.telegram.session_broker import request
+
+        socket_path, pane = running_broker
+        replies = []
+        threads = [
+            threading.Thread(target=lambda i=i: replies.append(request({"text": f"input {i}"}, socket_path)))
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert all(r["ok"] for r in replies)
+
+        pane.screen = IDLE
+        waited = request({"text": "last", "wait": True, "timeout": 5}, socket_path)
+
+        assert waited["ok"] is True
+        assert len(pane.submitted) == 1
+        assert sorted(pane.submitted[0].splitlines()) == sorted([f"input {i}" for i in range(8)] + ["last"])
+        assert request({"op": "stats"}, socket_path)["delivered"] == 9
+
+    def test_malformed_request_and_no_broker(self, running_broker, tmp_path):
+        """Test error replies and the not-running signal send_to_claude.sh falls back on."""
+        from scripts.telegram.session_broker import request
+
+        socket_path, _ = running_broker
+
+        assert request({"op": "send", "text": ""}, socket_path) == {"ok": False, "error": "empty input"}
+        assert request({"op": "nope"}, socket_path)["ok"] is False
+        assert request({"text": "x"}, tmp_path / "missing.sock") is None
+
+    def test_input_over_64k_is_delivered(self, running_broker):
+        """Test that a long input is not cut off by the stream reader's default limit."""
+        from scripts.telegram.session_broker import request
+
+        socket_path, pane = running_broker
+        pane.screen = IDLE
+        text = "ж" * 70_000
+
+        assert request({"text": text, "wait": True, "timeout": 5}, socket_path)["ok"] is True
+        assert pane.submitted == [text]
+
+    @pytest.mark.parametrize("running_broker", [1024], indirect=True)
+    def test_request_over_limit_falls_back(self, running_broker):
+        """Test that a request over the limit is refused as if no broker were running."""
+        from scripts.telegram.session_broker import request
+
+        socket_path, pane = running_broker
+        pane.screen = IDLE
+
+        assert request({"text": "x" * 4096}, socket_path) is None
+        assert request({"text": "small", "wait": True, "timeout": 5}, socket_path)["ok"] is True
+        assert pane.submitted == ["small"]
+
+    def test_connection_closed_without_reply_falls_back(self):
+        """Test that a broker dropping the connection unanswered counts as not running."""
+        import socket
+
+        from scripts.telegram.session_broker import request
+
+        short_dir = tempfile.TemporaryDirectory(dir="/tmp")
+        socket_path = Path(short_dir.name) / "broker.sock"
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(socket_path))
+        server.listen(1)
+
+        def drop_one():
+            conn, _ = server.accept()
+            conn.recv(1024)
+            conn.close()
+
+        thread = threading.Thread(target=drop_one)
+        thread.start()
+        try:
+            assert request({"text": "x"}, socket_path) is None
+        finally:
+            thread.join()
+            server.close()
+            short_dir.cleanup()
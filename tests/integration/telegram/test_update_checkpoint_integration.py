@@ -0,0 +1,79 @@
+"""
+Integration tests for scripts/telegram/update_checkpoint.py
+
+Feeds updates through the bot's real Application to check that redelivered
+updates are queued once and failed ones are not checkpointed.
+"""
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(autouse=True)
+def offline_bot():
+    """Let Application.initialize() run without asking the Bot API who we are."""
+    from telegram import User
+    from telegram.ext import ExtBot
+
+    me = User(id=1, is_bot=True, first_name="mind", username="mind_bot")
+    with patch.object(ExtBot, "get_me", AsyncMock(return_value=me)):
+        yield
+
+
+def _update(app, update_id, text="Hello"):
+    from telegram import Update
+
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": 12345, "type": "private"},
+            "from": {"id": 12345, "is_bot": False, "first_name": "Test", "username": "testuser"},
+            "text": text,
+        },
+    }, app.bot)
+
+
+class TestRedelivery:
+    """Tests for duplicate updates after a restart."""
+
+    @pytest.mark.asyncio
+    async def test_redelivered_update_is_queued_once(self, temp_mind_dir, mock_env, monkeypatch):
+        """Test that an update seen before a restart is skipped after it."""
+        from scripts.telegram import bot
+        from scripts.telegram.update_checkpoint import UpdateCheckpoint
+
+        path = temp_mind_dir["mind"] / "state" / "telegram-updates.json"
+        async with bot.build_application() as app:
+            await app.process_update(_update(app, 500, "first"))
+            await app.process_update(_update(app, 500, "first"))
+
+        # Restart: a fresh checkpoint and application read the saved state
+        monkeypatch.setattr(bot, "checkpoint", UpdateCheckpoint(path))
+        async with bot.build_application() as app:
+            await app.process_update(_update(app, 500, "first"))
+            await app.process_update(_update(app, 501, "second"))
+
+        contents = sorted(p.read_text() for p in temp_mind_dir["queue"].glob("*.msg"))
+        assert len(contents) == 2
+        assert contents[0].endswith("first") and contents[1].endswith("second")
+        assert bot.checkpoint.last_update_id == 501
+
+    @pytest.mark.asyncio
+    async def test_failed_update_is_not_checkpointed(self, temp_mind_dir, mock_env):
+        """Test that an update whose handler raised can be delivered again."""
+        from scripts.telegram import bot
+
+        async with bot.build_application() as app:
+            with patch.object(bot.queue_writer, "write_message", side_effect=OSError("disk full")):
+                await app.process_update(_update(app, 600))
+
+            assert bot.checkpoint.last_update_id is None
+            await app.process_update(_update(app, 600))
+        assert len(list(temp_mind_dir["queue"].glob("*.msg"))) == 1
+        assert bot.checkpoint.last_update_id == 600
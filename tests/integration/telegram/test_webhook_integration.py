@@ -0,0 +1,124 @@
+"""
+Integration tests for scripts/telegram/webhook.py
+
+Runs the bot's real Application in webhook mode against a local fake Bot
+API and delivers updates to the receiver the way Telegram would.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytestmark = pytest.mark.integration
+
+
+def _decode(value):
+    # python-telegram-bot sends strings as-is and everything else JSON-encoded
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+class FakeBotAPI(BaseHTTPRequestHandler):
+    """Records Bot API calls and answers them successfully."""
+
+    calls: list[tuple[str, dict]] = []
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        method = self.path.rsplit("/", 1)[-1]
+        params = {k: _decode(v) for k, v in urllib.parse.parse_qsl(raw.decode())}
+        FakeBotAPI.calls.append((method, params))
+
+        result = {"id": 1, "is_bot": True, "first_name": "fake", "username": "fake_bot"} if method == "getMe" else True
+        body = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_bot_api(monkeypatch):
+    from scripts.telegram import bot
+
+    FakeBotAPI.calls = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeBotAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(bot, "API_BASE_URL", f"http://127.0.0.1:{server.server_port}/bot")
+    yield FakeBotAPI.calls
+    server.shutdown()
+    server.server_close()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.02)
+    return predicate()
+
+
+class TestWebhookMode:
+    """Tests for the bot running on webhook updates."""
+
+    @pytest.mark.asyncio
+    async def test_update_reaches_handlers(self, fake_bot_api, temp_mind_dir, mock_env):
+        """Test setWebhook registration and an update POSTed through to the message queue."""
+        from scripts.telegram import bot, webhook
+
+        port = _free_port()
+        stop = asyncio.Event()
+        task = asyncio.create_task(
+            webhook.serve(bot.build_application(), "https://example.invalid/telegram/webhook", stop, port=port)
+        )
+        try:
+            assert await _wait_for(lambda: any(m == "setWebhook" for m, _ in fake_bot_api))
+            params = next(p for m, p in fake_bot_api if m == "setWebhook")
+            assert params["url"] == "https://example.invalid/telegram/webhook"
+            secret = params["secret_token"]
+
+            update = {
+                "update_id": 100,
+                "message": {
+                    "message_id": 1,
+                    "date": int(time.time()),
+                    "chat": {"id": 12345, "type": "private"},
+                    "from": {"id": 12345, "is_bot": False, "first_name": "Test", "username": "testuser"},
+                    "text": "Hello over webhook",
+                },
+            }
+            body = json.dumps(update).encode()
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                f"POST /telegram/webhook HTTP/1.0\r\nContent-Length: {len(body)}\r\n"
+                f"X-Telegram-Bot-Api-Secret-Token: {secret}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            assert (await reader.read()).startswith(b"HTTP/1.1 200")
+            writer.close()
+
+            assert await _wait_for(lambda: list(temp_mind_dir["queue"].glob("*.msg")))
+            [queued] = temp_mind_dir["queue"].glob("*.msg")
+            assert "Hello over webhook" in queued.read_text()
+        finally:
+            stop.set()
+            await task
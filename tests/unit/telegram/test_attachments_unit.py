@@ -0,0 +1,141 @@
+"""
+Unit tests for scripts/telegram/attachments.py
+
+Tests the content-addressed store, media detection and local downloads.
+"""
+
+import hashlib
+from types import SimpleNamespace
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+class TestAttachmentStore:
+    """Tests for AttachmentStore.ingest()."""
+
+    @pytest.mark.asyncio
+    async def test_ingest_files_by_hash(self, temp_mind_dir):
+        """Test that a stream is stored under its sha256 with no temp file left."""
+        from scripts.telegram.attachments import AttachmentStore
+
+        store = AttachmentStore()
+        ref = await store.ingest(_chunks(b"hello ", b"world"), ".txt")
+
+        sha = hashlib.sha256(b"hello world").hexdigest()
+        assert ref == {"sha256": sha, "size": 11, "path": str(store.path_for(sha, ".txt")), "stored": True}
+        assert store.path_for(sha, ".txt").read_bytes() == b"hello world"
+        assert list((store.root / ".incoming").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_same_content_is_stored_once(self, temp_mind_dir):
+        """Test that re-sent files dedupe."""
+        from scripts.telegram.attachments import AttachmentStore
+
+        store = AttachmentStore()
+        first = await store.ingest(_chunks(b"same bytes"), ".jpg")
+        second = await store.ingest(_chunks(b"same ", b"bytes"), ".jpg")
+
+        assert second["path"] == first["path"]
+        assert second["stored"] is False
+        assert store.stats() == {"files": 1, "bytes": 10}
+
+    @pytest.mark.asyncio
+    async def test_too_large_is_refused(self, temp_mind_dir):
+        """Test that the size limit applies while streaming, closes the stream and leaves nothing behind."""
+        from scripts.telegram.attachments import AttachmentStore, AttachmentTooLarge
+
+        store = AttachmentStore(max_bytes=8)
+        closed = []
+
+        async def chunks():
+            try:
+                yield b"12345"
+                yield b"67890"
+                yield b"never read"
+            finally:
+                closed.append(True)
+
+        with pytest.raises(AttachmentTooLarge):
+            await store.ingest(chunks())
+
+        assert closed == [True]
+        assert store.stats()["files"] == 0
+        assert list((store.root / ".incoming").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_memory_stays_flat_for_large_files(self, temp_mind_dir):
+        """Test that ingesting many chunks never holds more than about one of them."""
+        import tracemalloc
+
+        from scripts.telegram.attachments import AttachmentStore
+
+        async def large():
+            chunk = b"x" * 65536
+            for _ in range(160):  # 10 MiB
+                yield chunk
+
+        tracemalloc.start()
+        try:
+            ref = await AttachmentStore().ingest(large())
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert ref["size"] == 160 * 65536
+        assert peak < 1024 * 1024
+
+
+class TestMedia:
+    """Tests for media_of() and suffix_for()."""
+
+    def test_media_of_picks_largest_photo(self):
+        """Test that the biggest photo size is downloaded."""
+        from scripts.telegram.attachments import media_of
+
+        small, large = SimpleNamespace(file_id="s"), SimpleNamespace(file_id="l")
+        message = SimpleNamespace(photo=(small, large), animation=None, document=None, audio=None,
+                                  voice=None, video=None, video_note=None)
+
+        assert media_of(message) == ("photo", large)
+        assert media_of(SimpleNamespace(photo=())) is None
+
+    def test_suffix_for(self):
+        """Test the stored extension for named, typed and bare media."""
+        from scripts.telegram.attachments import suffix_for
+
+        assert suffix_for("document", SimpleNamespace(file_name="Report.PDF", mime_type="application/pdf")) == ".pdf"
+        assert suffix_for("document", SimpleNamespace(file_name=None, mime_type="application/pdf")) == ".pdf"
+        assert suffix_for("voice", SimpleNamespace(mime_type=None)) == ".ogg"
+        assert suffix_for("document", SimpleNamespace(file_name="x.we!rd", mime_type=None)) == ""
+
+
+class TestDownload:
+    """Tests for download()."""
+
+    @pytest.mark.asyncio
+    async def test_local_bot_api_file_is_copied_in_chunks(self, temp_mind_dir, tmp_path):
+        """Test that a local-mode file path is read from disk instead of fetched."""
+        from scripts.telegram.attachments import AttachmentStore, download
+
+        source = tmp_path / "voice.oga"
+        source.write_bytes(b"ogg data")
+
+        ref = await download(SimpleNamespace(file_path=str(source)), AttachmentStore(), ".ogg")
+
+        assert ref["size"] == 8
+        assert ref["path"].endswith(".ogg")
+
+    @pytest.mark.asyncio
+    async def test_missing_file_path(self, temp_mind_dir):
+        """Test that a File without a path is an error, not a hang."""
+        from scripts.telegram.attachments import AttachmentStore, download
+
+        with pytest.raises(ValueError):
+            await download(SimpleNamespace(file_path=None), AttachmentStore())
@@ -31,6 +31,16 @@ class TestAuthorization:
 
         assert result is False
 
+    def test_is_authorized_checks_the_allow_list(self, mock_env, monkeypatch):
+        """Test that every chat on a comma-separated TELEGRAM_CHAT_ID is accepted."""
+        from scripts.telegram import bot
+
+        monkeypatch.setattr(bot, "ALLOWED_CHAT_ID", "12345, -100777")
+
+        assert bot.is_authorized(-100777) is True
+        assert bot.is_authorized(12345) is True
+        assert bot.is_authorized(777) is False
+
     def test_is_authorized_with_no_chat_id_set(self, mock_env_no_chat_id):
         """Test authorization accepts all when TELEGRAM_CHAT_ID not set."""
         from scripts.telegram.bot import is_authorized
@@ -157,6 +167,53 @@ class TestAsyncHandlers:
         assert "From: testuser" in content
         assert "Hello Claude" in content
 
+    @pytest.mark.asyncio
+    async def test_handle_message_traces_latency(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env
+    ):
+        """Test that a message gets a trace ID in its header and in the trace log."""
+        import json
+        from datetime import datetime, timezone
+
+        from scripts.telegram.bot import handle_message
+
+        mock_telegram_update.message.date = datetime(2025, 1, 15, 12, 30, tzinfo=timezone.utc)
+
+        await handle_message(mock_telegram_update, mock_context)
+
+        [queue_file] = temp_mind_dir["queue"].glob("*.msg")
+        [trace_file] = (temp_mind_dir["mind"] / "traces").glob("*.jsonl")
+        events = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        assert [e["stage"] for e in events] == ["received", "queued"]
+        assert f"Id: {events[0]['id']}\n" in queue_file.read_text()
+        assert events[0]["sent"] == 1736944200.0
+        assert events[1]["file"] == queue_file.name
+
+    @pytest.mark.asyncio
+    async def test_handle_message_burst_is_one_queue_entry(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env, monkeypatch
+    ):
+        """Test that a quick run of messages is queued once, with every trace ID."""
+        from scripts.telegram import bot
+
+        monkeypatch.setattr(bot, "inbound", bot.coalescer.InboundCoalescer(
+            bot.queue_batch, temp_mind_dir["mind"] / "state" / "inbound", window=60, rate=0))
+
+        for text in ("Hello", "are you there?"):
+            mock_telegram_update.message.text = text
+            await bot.handle_message(mock_telegram_update, mock_context)
+        assert list(temp_mind_dir["queue"].glob("*.msg")) == []
+
+        assert bot.inbound.flush_staged() == 1
+
+        [queue_file] = temp_mind_dir["queue"].glob("*.msg")
+        content = queue_file.read_text()
+        assert "Messages: 2\n" in content
+        assert "] Hello\n\n[" in content and content.endswith("] are you there?")
+        ids = next(line for line in content.splitlines() if line.startswith("Id: ")).split()[1:]
+        assert len(ids) == 2
+        assert bot.stats.summary()["queue_depth"] == 1
+
     @pytest.mark.asyncio
     async def test_handle_message_unauthorized_user(
         self, mock_telegram_update_unauthorized, mock_context, temp_mind_dir, mock_env
@@ -191,6 +248,80 @@ class TestAsyncHandlers:
         assert "testuser (incoming)" in content
         assert "Hello Claude" in content
 
+    @pytest.mark.asyncio
+    async def test_handle_message_from_another_chat_is_sharded(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env, fixed_datetime, monkeypatch
+    ):
+        """Test that a second allowed chat gets its own queue shard and conversation log."""
+        from scripts.telegram import bot
+
+        monkeypatch.setattr(bot, "ALLOWED_CHAT_ID", "12345,-100777")
+        mock_telegram_update.effective_chat.id = -100777
+
+        await bot.handle_message(mock_telegram_update, mock_context)
+
+        [queue_file] = temp_mind_dir["queue"].glob("*.msg")
+        assert queue_file.name.endswith("+-100777.msg")
+        assert "Chat: -100777\n" in queue_file.read_text()
+        assert not (temp_mind_dir["conversations"] / "2025-01-15.md").exists()
+        log_file = temp_mind_dir["conversations"] / "chat--100777" / "2025-01-15.md"
+        assert "Hello Claude" in log_file.read_text()
+
+    @pytest.mark.asyncio
+    async def test_handle_media_queues_a_reference(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env, tmp_path
+    ):
+        """Test that a document is stored by hash and only its path goes into the queue."""
+        from types import SimpleNamespace
+        from unittest.mock import AsyncMock
+
+        from scripts.telegram import attachments
+        from scripts.telegram.bot import handle_media
+
+        source = tmp_path / "downloaded"
+        source.write_bytes(b"%PDF-1.7 report")
+        message = mock_telegram_update.message
+        for kind in attachments.MEDIA_KINDS:
+            setattr(message, kind, None)
+        message.document = SimpleNamespace(file_id="doc-1", file_name="report.pdf", mime_type="application/pdf")
+        message.caption = "Quarterly numbers"
+        mock_context.bot.get_file = AsyncMock(return_value=SimpleNamespace(file_path=str(source)))
+
+        await handle_media(mock_telegram_update, mock_context)
+        await handle_media(mock_telegram_update, mock_context)
+
+        mock_context.bot.get_file.assert_awaited_with("doc-1")
+        [stored] = (temp_mind_dir["mind"] / "attachments").glob("??/*.pdf")
+        assert stored.read_bytes() == b"%PDF-1.7 report"
+        entries = sorted(temp_mind_dir["queue"].glob("*.msg"))
+        assert len(entries) == 2
+        content = entries[0].read_text()
+        assert f"[document: {stored} (report.pdf, 15 bytes)]\nQuarterly numbers" in content
+
+    @pytest.mark.asyncio
+    async def test_handle_media_download_failure_is_reported(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env
+    ):
+        """Test that a failed download is told to the sender and nothing is queued."""
+        from types import SimpleNamespace
+        from unittest.mock import AsyncMock
+
+        from telegram.error import TelegramError
+
+        from scripts.telegram import attachments
+        from scripts.telegram.bot import handle_media
+
+        message = mock_telegram_update.message
+        for kind in attachments.MEDIA_KINDS:
+            setattr(message, kind, None)
+        message.voice = SimpleNamespace(file_id="v-1", mime_type="audio/ogg")
+        mock_context.bot.get_file = AsyncMock(side_effect=TelegramError("File is too big"))
+
+        await handle_media(mock_telegram_update, mock_context)
+
+        assert list(temp_mind_dir["queue"].glob("*.msg")) == []
+        assert "Couldn't save that voice: File is too big" in message.reply_text.call_args[0][0]
+
     @pytest.mark.asyncio
     async def test_handle_start_authorized(
         self, mock_telegram_update, mock_context, mock_env
@@ -254,6 +385,62 @@ class TestAsyncHandlers:
         assert "conversation log:" in call_args[0][0]
         assert "bytes" in call_args[0][0]
 
+    @pytest.mark.asyncio
+    async def test_handle_status_reads_live_counters(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env, fixed_datetime
+    ):
+        """Test that /status reports counters without scanning the queue directory."""
+        from scripts.telegram import bot
+
+        bot.stats.queue_depth.set(7)
+        bot.stats.queue_lanes.set(5, lane="interactive")
+        bot.stats.queue_lanes.set(2, lane="system")
+        bot.stats.record_message("incoming", 100)
+        bot.stats.record_message("outgoing", 50)
+
+        with patch.object(Path, 'glob', side_effect=AssertionError("scanned the filesystem")):
+            await bot.handle_status(mock_telegram_update, mock_context)
+
+        reply = mock_telegram_update.message.reply_text.call_args[0][0]
+        assert "Messages in queue: 7 (interactive 5, system 2, background 0)" in reply
+        assert "Messages in/out: 1/1" in reply
+        assert "Written to conversation log: 150 bytes" in reply
+        assert "Last activity: 0s ago" in reply
+        assert "Session: no output captured" in reply
+
+    @pytest.mark.asyncio
+    async def test_handle_status_shows_session_activity(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env, fixed_datetime
+    ):
+        """Test that /status reports the captured session's last output and turns."""
+        import time
+
+        from scripts.telegram import bot
+        from scripts.telegram.session_log import SessionLog
+
+        log = SessionLog(capacity=1024, index_entries=16)
+        log.open()
+        log.append(b"Thinking (esc to interrupt)", now=time.time() - 30)
+        log.close()
+
+        await bot.handle_status(mock_telegram_update, mock_context)
+
+        reply = mock_telegram_update.message.reply_text.call_args[0][0]
+        assert "Session: output 30s ago, 1 turns (last 30s ago)" in reply
+
+    @pytest.mark.asyncio
+    async def test_handlers_record_latency(
+        self, mock_telegram_update, mock_context, temp_mind_dir, mock_env, fixed_datetime
+    ):
+        """Test that handler run times land in the latency histogram."""
+        from scripts.telegram import bot
+
+        await bot.handle_message(mock_telegram_update, mock_context)
+        await bot.handle_status(mock_telegram_update, mock_context)
+
+        assert bot.stats.handler_latency.count(handler="message") == 1
+        assert bot.stats.handler_latency.count(handler="status") == 1
+
 
 class TestMainFunction:
     """Tests for main() function and application setup."""
@@ -283,6 +470,7 @@ class TestMainFunction:
             builder_mock = Mock()
             app_mock = Mock()
             builder_mock.token.return_value = builder_mock
+            builder_mock.concurrent_updates.return_value = builder_mock
             builder_mock.build.return_value = app_mock
             mock_app.builder.return_value = builder_mock
 
@@ -297,3 +485,32 @@ class TestMainFunction:
         # Directories should have been created before bot startup
         assert temp_mind_dir["queue"].exists()
         assert temp_mind_dir["conversations"].exists()
+
+    def test_webhook_mode_falls_back_to_polling(self, mock_env, mock_application, monkeypatch):
+        """Test that a webhook Telegram refuses leaves the bot polling."""
+        from telegram.error import TelegramError
+
+        from scripts.telegram import bot
+
+        monkeypatch.setattr(bot.webhook, "WEBHOOK_URL", "https://example.invalid/telegram/webhook")
+        run = Mock(side_effect=TelegramError("bad webhook"))
+        monkeypatch.setattr(bot.webhook, "run", run)
+
+        bot.run_updates(use_webhook=True)
+
+        run.assert_called_once_with(mock_application)
+        mock_application.run_polling.assert_called_once()
+        assert bot.Application.builder.call_count == 1
+
+    def test_webhook_mode_without_url_polls(self, mock_env, mock_application, monkeypatch):
+        """Test that --webhook without TELEGRAM_WEBHOOK_URL polls instead."""
+        from scripts.telegram import bot
+
+        monkeypatch.setattr(bot.webhook, "WEBHOOK_URL", "")
+        run = Mock()
+        monkeypatch.setattr(bot.webhook, "run", run)
+
+        bot.run_updates(use_webhook=True)
+
+        run.assert_not_called()
+        mock_application.run_polling.assert_called_once()
@@ -0,0 +1,111 @@
+"""
+Unit tests for scripts/telegram/chats.py
+
+Tests the chat allow-list and the per-chat round-robin update processor.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _update(update_id, chat_id):
+    return SimpleNamespace(update_id=update_id, effective_chat=SimpleNamespace(id=chat_id))
+
+
+class TestAllowList:
+    """Tests for parse_chat_ids() and shard()."""
+
+    def test_parse_chat_ids(self):
+        """Test that ids are split, trimmed and de-duplicated in order."""
+        from scripts.telegram.chats import parse_chat_ids
+
+        assert parse_chat_ids("12345, -100777,,12345") == ["12345", "-100777"]
+        assert parse_chat_ids(None) == []
+        with pytest.raises(ValueError):
+            parse_chat_ids("12345,@team")
+
+    def test_primary_chat_has_no_shard(self):
+        """Test that the first chat keeps the unsharded queue and log."""
+        from scripts.telegram.chats import shard
+
+        assert shard(12345, "12345,-100777") == ""
+        assert shard(-100777, "12345,-100777") == "-100777"
+        assert shard(None, "12345") == ""
+
+
+class TestChatUpdateProcessor:
+    """Tests for ChatUpdateProcessor."""
+
+    async def _process(self, processor, updates, work):
+        """Feed updates in order, like the Application does, and wait for all of them."""
+        tasks = [asyncio.create_task(processor.process_update(u, work(u))) for u in updates]
+        await asyncio.gather(*tasks)
+
+    async def test_chats_run_concurrently_in_order(self):
+        """Test that a chat's updates never overlap or reorder, while other chats proceed."""
+        from scripts.telegram.chats import ChatUpdateProcessor
+
+        processor = ChatUpdateProcessor(workers=4)
+        log, running = [], set()
+
+        async def work(update):
+            chat = update.effective_chat.id
+            assert chat not in running
+            running.add(chat)
+            log.append(("start", update.update_id))
+            await asyncio.sleep(0.01 if chat == 1 else 0)
+            running.discard(chat)
+            log.append(("end", update.update_id))
+
+        await self._process(processor, [_update(1, 1), _update(2, 1), _update(3, 2)], work)
+
+        assert log.index(("end", 1)) < log.index(("start", 2))
+        assert log.index(("end", 3)) < log.index(("end", 1))  # chat 2 did not wait for chat 1
+
+    async def test_busy_chat_does_not_starve_others(self):
+        """Test that waiting chats take turns with one worker."""
+        from scripts.telegram.chats import ChatUpdateProcessor
+
+        processor = ChatUpdateProcessor(workers=1)
+        order = []
+
+        async def work(update):
+            order.append(update.update_id)
+            await asyncio.sleep(0)
+
+        # Chat 1 floods first; chats 2 and 3 each send one update behind the flood
+        updates = [_update(i, 1) for i in range(1, 6)] + [_update(6, 2), _update(7, 3)]
+        await self._process(processor, updates, work)
+
+        assert order.index(6) < 3 and order.index(7) < 4
+        assert [i for i in order if i <= 5] == [1, 2, 3, 4, 5]
+
+    async def test_checkpoint_sees_updates_in_flight(self, tmp_path):
+        """Test that a fast later update is not confirmed ahead of a slow earlier one."""
+        from scripts.telegram.chats import ChatUpdateProcessor
+        from scripts.telegram.update_checkpoint import UpdateCheckpoint
+
+        checkpoint = UpdateCheckpoint(tmp_path / "updates.json")
+        processor = ChatUpdateProcessor(workers=2, checkpoint=checkpoint)
+        slow_started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def work(update):
+            if update.update_id == 10:
+                slow_started.set()
+                await release.wait()
+            checkpoint.mark(update.update_id)
+
+        slow = asyncio.create_task(processor.process_update(_update(10, 1), work(_update(10, 1))))
+        await slow_started.wait()
+        await processor.process_update(_update(11, 2), work(_update(11, 2)))
+
+        assert json.loads(checkpoint.path.read_text())["last_update_id"] == 9
+        release.set()
+        await slow
+        assert json.loads(checkpoint.path.read_text())["last_update_id"] == 11
@@ -0,0 +1,181 @@
+"""
+Unit tests for scripts/telegram/chunking.py
+
+Tests message splitting and progressive edit-in-place streaming.
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class FakeScheduler:
+    """Records sends and edits the way OutboundScheduler would perform them."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def send(self, chat_id, text, method="send_message", **kwargs):
+        self.calls.append((method, text, kwargs.get("message_id")))
+        return Mock(message_id=len(self.calls))
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTextLength:
+    """Tests for text_length."""
+
+    def test_counts_utf16_code_units(self):
+        """Test that characters outside the BMP count twice, like Telegram does."""
+        from scripts.telegram.chunking import text_length
+
+        assert text_length("abc") == 3
+        assert text_length("é") == 1
+        assert text_length("😀") == 2
+
+
+class TestSplitMessage:
+    """Tests for split_message."""
+
+    def test_short_message_unchanged(self):
+        """Test that a message under the limit is sent as-is."""
+        from scripts.telegram.chunking import split_message
+
+        assert split_message("hello\n\nworld", limit=100) == ["hello\n\nworld"]
+
+    def test_splits_on_paragraph_boundaries(self):
+        """Test that paragraphs are packed into chunks without being cut."""
+        from scripts.telegram.chunking import split_message
+
+        paragraphs = [f"paragraph {i} " + "x" * 30 for i in range(6)]
+        chunks = split_message("\n\n".join(paragraphs), limit=100)
+
+        assert len(chunks) == 3
+        assert all(len(c) <= 100 for c in chunks)
+        assert "\n\n".join(chunks) == "\n\n".join(paragraphs)
+
+    def test_keeps_code_block_whole_when_it_fits(self):
+        """Test that blank lines inside a fenced block do not split it."""
+        from scripts.telegram.chunking import split_message
+
+        code = "```python\ndef f():\n\n    return 1\n```"
+        text = "intro " + "x" * 60 + "\n\n" + code
+        chunks = split_message(text, limit=70)
+
+        assert chunks[-1] == code
+
+    def test_reopens_fence_around_cut_code_block(self):
+        """Test that an oversized code block stays valid Markdown in each chunk."""
+        from scripts.telegram.chunking import split_message
+
+        code = "```python\n" + "\n".join(f"line_{i} = {i}" for i in range(40)) + "\n```"
+        chunks = split_message(code, limit=200)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert len(chunk) <= 200
+            assert chunk.startswith("```python\n")
+            assert chunk.endswith("```")
+
+    def test_hard_wraps_single_long_line(self):
+        """Test that a line with no break points is cut at the limit."""
+        from scripts.telegram.chunking import split_message
+
+        chunks = split_message("y" * 250, limit=100)
+
+        assert "".join(chunks) == "y" * 250
+        assert all(len(c) <= 100 for c in chunks)
+
+    def test_respects_utf16_limit(self):
+        """Test that emoji-heavy text is split by UTF-16 length, not len()."""
+        from scripts.telegram.chunking import split_message, text_length
+
+        chunks = split_message("😀" * 80, limit=100)
+
+        assert all(text_length(c) <= 100 for c in chunks)
+        assert "".join(chunks) == "😀" * 80
+
+
+class TestStreamingReply:
+    """Tests for StreamingReply."""
+
+    def test_first_delta_sent_then_edited(self):
+        """Test that the reply appears immediately and later text edits it."""
+        from scripts.telegram.chunking import StreamingReply
+
+        scheduler, clock = FakeScheduler(), FakeClock()
+        reply = StreamingReply(scheduler, "1", edit_interval=1.0, clock=clock)
+
+        async def run():
+            await reply.append("Hello")
+            clock.now = 1.5
+            await reply.append(", world")
+            return await reply.finish()
+
+        assert asyncio.run(run()) == "Hello, world"
+        assert scheduler.calls == [
+            ("send_message", "Hello", None),
+            ("edit_message_text", "Hello, world", 1),
+        ]
+        assert reply.messages_sent == 1
+
+    def test_edits_are_throttled(self):
+        """Test that deltas within the edit interval are batched into one edit."""
+        from scripts.telegram.chunking import StreamingReply
+
+        scheduler, clock = FakeScheduler(), FakeClock()
+        reply = StreamingReply(scheduler, "1", edit_interval=1.0, clock=clock)
+
+        async def run():
+            for word in ["a ", "b ", "c ", "d"]:
+                await reply.append(word)
+                clock.now += 0.1
+            await reply.finish()
+
+        asyncio.run(run())
+
+        assert [c[0] for c in scheduler.calls] == ["send_message", "edit_message_text"]
+        assert scheduler.calls[-1][1] == "a b c d"
+
+    def test_full_message_rolls_over(self):
+        """Test that a new message is started once the current one is full."""
+        from scripts.telegram.chunking import StreamingReply
+
+        scheduler, clock = FakeScheduler(), FakeClock()
+        reply = StreamingReply(scheduler, "1", edit_interval=0, limit=50, clock=clock)
+
+        async def run():
+            for i in range(10):
+                await reply.append(f"paragraph {i}\n\n")
+            return await reply.finish()
+
+        text = asyncio.run(run())
+
+        sends = [c for c in scheduler.calls if c[0] == "send_message"]
+        assert reply.messages_sent == len(sends) > 1
+        assert all(len(c[1]) <= 50 for c in scheduler.calls)
+        assert text.startswith("paragraph 0")
+
+    def test_whitespace_only_sends_nothing(self):
+        """Test that an empty stream never creates a message."""
+        from scripts.telegram.chunking import StreamingReply
+
+        scheduler = FakeScheduler()
+        reply = StreamingReply(scheduler, "1")
+
+        async def run():
+            await reply.append("  \n")
+            return await reply.finish()
+
+        asyncio.run(run())
+
+        assert scheduler.calls == []
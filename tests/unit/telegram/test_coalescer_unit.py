@@ -0,0 +1,196 @@
+"""
+Unit tests for scripts/telegram/coalescer.py
+
+Tests burst merging, the per-chat bucket and staging recovery on a fake clock.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    """Monotonic clock whose sleeps end only when the test advances it."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._sleepers = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        future = asyncio.get_running_loop().create_future()
+        self._sleepers.append((self.now + seconds, future))
+        await future
+
+    async def advance(self, seconds):
+        self.now += seconds
+        for deadline, future in list(self._sleepers):
+            if deadline <= self.now and not future.done():
+                future.set_result(None)
+        # Let woken timers run (flushes hop through a worker thread)
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        await asyncio.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def entries():
+    return []
+
+
+@pytest.fixture
+def make_coalescer(tmp_path, clock, entries):
+    from scripts.telegram.coalescer import InboundCoalescer
+
+    def write_entry(messages):
+        entries.append([m["text"] for m in messages])
+        return f"{len(entries)}.msg"
+
+    def make(**kwargs):
+        kwargs.setdefault("window", 3)
+        kwargs.setdefault("max_wait", 15)
+        kwargs.setdefault("rate", 0)
+        return InboundCoalescer(write_entry, tmp_path / "inbound", clock=clock, sleep=clock.sleep, **kwargs)
+
+    return make
+
+
+def _message(text):
+    return {"text": text, "from": "alice", "time": "2025-01-15T12:30:45", "id": text}
+
+
+class TestInboundCoalescer:
+    """Tests for InboundCoalescer."""
+
+    @pytest.mark.asyncio
+    async def test_zero_window_queues_each_message(self, make_coalescer, entries):
+        """Test that window 0 without a bucket queues every message before add() returns."""
+        coalescer = make_coalescer(window=0)
+
+        await coalescer.add(1, _message("one"))
+        await coalescer.add(1, _message("two"))
+
+        assert entries == [["one"], ["two"]]
+        assert list(coalescer.staging_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_burst_is_merged_after_quiet_period(self, make_coalescer, clock, entries):
+        """Test that messages closer together than the window become one entry."""
+        coalescer = make_coalescer()
+
+        await coalescer.add(1, _message("one"))
+        await clock.advance(1)
+        await coalescer.add(1, _message("two"))
+        await clock.advance(2)
+        await coalescer.add(1, _message("three"))
+        await clock.advance(2)
+        assert entries == []
+        assert coalescer.pending() == 3
+
+        await clock.advance(1)
+
+        assert await _wait_for(lambda: entries)
+        assert entries == [["one", "two", "three"]]
+        assert coalescer.pending() == 0
+        assert list(coalescer.staging_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_max_wait_caps_a_long_burst(self, make_coalescer, clock, entries):
+        """Test that a chat that never goes quiet is still queued after max_wait."""
+        coalescer = make_coalescer(window=3, max_wait=5)
+
+        await coalescer.add(1, _message("one"))
+        await clock.advance(2)
+        await coalescer.add(1, _message("two"))
+        await clock.advance(2)
+        await coalescer.add(1, _message("three"))
+        assert entries == []
+
+        await clock.advance(1)
+
+        assert await _wait_for(lambda: entries)
+        assert entries == [["one", "two", "three"]]
+
+    @pytest.mark.asyncio
+    async def test_chats_are_coalesced_separately(self, make_coalescer, clock, entries):
+        """Test that bursts from different chats never share an entry."""
+        coalescer = make_coalescer()
+
+        await coalescer.add(1, _message("a1"))
+        await coalescer.add(2, _message("b1"))
+        await coalescer.add(1, _message("a2"))
+        await clock.advance(3)
+
+        assert await _wait_for(lambda: len(entries) == 2)
+        assert sorted(entries) == [["a1", "a2"], ["b1"]]
+
+    @pytest.mark.asyncio
+    async def test_empty_bucket_spills_into_next_entry(self, make_coalescer, clock, entries):
+        """Test that messages over the rate are held and queued together once a token is back."""
+        coalescer = make_coalescer(window=0, rate=0.5, burst=1)
+
+        await coalescer.add(1, _message("one"))
+        await coalescer.add(1, _message("two"))
+        await coalescer.add(1, _message("three"))
+        await clock.advance(1)
+        assert entries == [["one"]]
+
+        await clock.advance(1)
+
+        assert await _wait_for(lambda: len(entries) == 2)
+        assert entries == [["one"], ["two", "three"]]
+
+    @pytest.mark.asyncio
+    async def test_messages_are_staged_before_add_returns(self, make_coalescer):
+        """Test that a held message is already on disk."""
+        coalescer = make_coalescer()
+
+        await coalescer.add(42, _message("one"))
+
+        staged = (coalescer.staging_dir / "42.jsonl").read_text().splitlines()
+        assert [json.loads(line)["text"] for line in staged] == ["one"]
+
+    @pytest.mark.asyncio
+    async def test_flush_staged_recovers_held_messages(self, make_coalescer, entries):
+        """Test that a restart queues what an earlier run had staged."""
+        await make_coalescer().add(42, _message("one"))
+        await make_coalescer().add(42, _message("two"))
+
+        assert make_coalescer().flush_staged() == 1
+
+        assert entries == [["one", "two"]]
+        assert list((make_coalescer().staging_dir).iterdir()) == []
+
+    def test_flush_staged_skips_torn_lines(self, make_coalescer, entries):
+        """Test that a half-written last line does not block the rest of the burst."""
+        coalescer = make_coalescer()
+        coalescer.staging_dir.mkdir(parents=True)
+        (coalescer.staging_dir / "42.jsonl").write_text(json.dumps(_message("one")) + '\n{"text": "tw')
+
+        assert coalescer.flush_staged() == 1
+
+        assert entries == [["one"]]
+
+    def test_flush_staged_without_staging_dir(self, make_coalescer, entries):
+        """Test that nothing happens when no burst was ever staged."""
+        assert make_coalescer().flush_staged() == 0
+        assert entries == []
@@ -0,0 +1,236 @@
+"""
+Unit tests for scripts/telegram/latency_trace.py
+
+Tests stage correlation, the append-only trace log and the percentile report.
+"""
+
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self, now=1736944200.0):  # 2025-01-15 12:30 UTC
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _events(trace_dir):
+    return [json.loads(line) for path in sorted(trace_dir.glob("*.jsonl")) for line in path.read_text().splitlines()]
+
+
+class TestTracer:
+    """Tests for Tracer."""
+
+    def test_records_every_stage(self, temp_mind_dir):
+        """Test received, queued, picked up and replied for one message."""
+        from scripts.telegram.latency_trace import TraceLog, Tracer
+
+        clock = FakeClock()
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        tracer = Tracer(TraceLog(trace_dir), clock)
+
+        trace_id = tracer.received(datetime.fromtimestamp(clock.now - 1, timezone.utc))
+        clock.now += 0.01
+        tracer.queued(trace_id, "a.msg")
+        clock.now += 2
+        tracer.picked_up("a.msg")
+        tracer.picked_up("a.msg")
+        clock.now += 30
+        tracer.on_entry("incoming", 10)
+        tracer.on_entry("outgoing", 10)
+
+        events = _events(trace_dir)
+        assert [e["stage"] for e in events] == ["received", "queued", "picked_up", "replied"]
+        assert {e["id"] for e in events} == {trace_id}
+        assert events[0]["sent"] == pytest.approx(1736944199.0)
+        assert events[1]["file"] == "a.msg"
+
+    def test_reply_answers_only_picked_up_messages(self, temp_mind_dir):
+        """Test that a message still waiting unread is not marked replied."""
+        from scripts.telegram.latency_trace import TraceLog, Tracer
+
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        tracer = Tracer(TraceLog(trace_dir), FakeClock())
+        first, second = tracer.received(), tracer.received()
+        tracer.queued(first, "a.msg")
+        tracer.queued(second, "b.msg")
+        tracer.picked_up("a.msg")
+        tracer.replied()
+
+        replied = [e["id"] for e in _events(trace_dir) if e["stage"] == "replied"]
+        assert replied == [first]
+
+        tracer.picked_up("b.msg")
+        tracer.replied()
+        tracer.replied()
+        replied = [e["id"] for e in _events(trace_dir) if e["stage"] == "replied"]
+        assert replied == [first, second]
+
+    def test_reply_to_unread_when_polling(self, temp_mind_dir):
+        """Test that without read events a reply answers every waiting message."""
+        from scripts.telegram.latency_trace import TraceLog, Tracer
+
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        tracer = Tracer(TraceLog(trace_dir), FakeClock(), reply_to_unread=True)
+        trace_id = tracer.received()
+        tracer.queued(trace_id, "a.msg")
+        tracer.replied()
+        tracer.picked_up("a.msg")  # removed after the reply: too late to count
+
+        assert [e["stage"] for e in _events(trace_dir)] == ["received", "queued", "replied"]
+
+    def test_adopt_reads_id_headers(self, temp_mind_dir):
+        """Test that messages queued before a restart keep being traced."""
+        from scripts.telegram.latency_trace import TraceLog, Tracer
+        from scripts.telegram.queue_writer import format_message
+
+        (temp_mind_dir["queue"] / "a.msg").write_text(format_message("hi", "alice", message_id="abc123"))
+        (temp_mind_dir["queue"] / "b.msg").write_text(format_message("Id: not a header", "alice"))
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        tracer = Tracer(TraceLog(trace_dir), FakeClock())
+
+        tracer.adopt(temp_mind_dir["queue"])
+        tracer.picked_up("a.msg")
+        tracer.picked_up("b.msg")
+
+        assert [(e["id"], e["stage"]) for e in _events(trace_dir)] == [("abc123", "picked_up")]
+
+    def test_reply_answers_only_its_chat(self, temp_mind_dir):
+        """Test that a reply logged to one chat's day file leaves other chats' messages waiting."""
+        from scripts.telegram.latency_trace import TraceLog, Tracer
+
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        tracer = Tracer(TraceLog(trace_dir), FakeClock())
+        primary, other = tracer.received(), tracer.received()
+        tracer.queued(primary, "a.msg")
+        tracer.queued(other, "b+67890.msg", "67890")
+        tracer.picked_up("a.msg")
+        tracer.picked_up("b+67890.msg")
+
+        tracer.on_entry("outgoing", 10, "chat-67890/2025-01-15")
+        assert [e["id"] for e in _events(trace_dir) if e["stage"] == "replied"] == [other]
+
+        tracer.on_entry("outgoing", 10, "2025-01-15")
+        assert [e["id"] for e in _events(trace_dir) if e["stage"] == "replied"] == [other, primary]
+
+    def test_unanswered_messages_expire(self, temp_mind_dir):
+        """Test that messages waiting longer than the timeout are forgotten."""
+        from scripts.telegram.latency_trace import TraceLog, Tracer
+
+        clock = FakeClock()
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        tracer = Tracer(TraceLog(trace_dir), clock, timeout=60)
+        old = tracer.received()
+        tracer.queued(old, "a.msg")
+        clock.now += 61
+        new = tracer.received()
+        tracer.queued(new, "b.msg")
+
+        assert list(tracer._awaiting) == [new]
+        assert list(tracer._files) == ["b.msg"]
+        tracer.picked_up("a.msg")
+        tracer.picked_up("b.msg")
+        tracer.replied()
+        stages = [(e["id"], e["stage"]) for e in _events(trace_dir) if e["stage"] != "received"]
+        assert stages == [(old, "queued"), (new, "queued"), (new, "picked_up"), (new, "replied")]
+
+
+class TestReport:
+    """Tests for loading and summarizing traces."""
+
+    def _write(self, trace_dir, clock, sent, stages):
+        from scripts.telegram.latency_trace import TraceLog, Tracer
+
+        tracer = Tracer(TraceLog(trace_dir), clock)
+        start = clock.now
+        trace_id = tracer.received(datetime.fromtimestamp(start - sent, timezone.utc))
+        for name, offset in stages:
+            clock.now = start + offset
+            if name == "queued":
+                tracer.queued(trace_id, f"{trace_id}.msg")
+            elif name == "picked_up":
+                tracer.picked_up(f"{trace_id}.msg")
+            else:
+                tracer.replied()
+        clock.now = start
+        return trace_id
+
+    def test_percentiles_per_stage_and_day(self, temp_mind_dir):
+        """Test interval durations, nearest-rank percentiles and unanswered messages."""
+        from scripts.telegram.latency_trace import load_traces, percentile, summarize
+
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        clock = FakeClock()
+        for i in range(1, 11):
+            self._write(trace_dir, clock, 1, [("queued", 0.01), ("picked_up", i), ("replied", i + 20)])
+        self._write(trace_dir, clock, 1, [("queued", 0.01)])
+
+        traces = load_traces(trace_dir)
+        summary = summarize(traces)
+        day = f"{date.fromtimestamp(clock.now)}"
+
+        assert len(traces) == 11
+        assert len(summary[day]["queue"]) == 11
+        assert summary[day]["wait"] == pytest.approx([i - 0.01 for i in range(1, 11)])
+        assert summary[day]["respond"] == pytest.approx([20.0] * 10)
+        assert summary[day]["total"] == pytest.approx([i + 21.0 for i in range(1, 11)])
+        assert percentile(summary[day]["total"], 50) == pytest.approx(26.0)
+        assert percentile(summary[day]["total"], 99) == pytest.approx(31.0)
+        assert summary["all"] == summary[day]
+
+    def test_since_filters_by_received_day(self, temp_mind_dir):
+        """Test that older messages are left out and torn lines skipped."""
+        from scripts.telegram.latency_trace import load_traces
+
+        trace_dir = temp_mind_dir["mind"] / "traces"
+        old = self._write(trace_dir, FakeClock(1736944200.0 - 5 * 86400), 1, [("queued", 0.1)])
+        new = self._write(trace_dir, FakeClock(), 1, [("queued", 0.1)])
+        with open(next(trace_dir.glob("*.jsonl")), "a") as f:
+            f.write('{"id": "torn", "sta')
+
+        since = date.fromtimestamp(1736944200.0 - 86400)
+        assert set(load_traces(trace_dir, since)) == {new}
+        assert set(load_traces(trace_dir)) == {old, new}
+
+    def test_format_report(self):
+        """Test the report table layout."""
+        from scripts.telegram.latency_trace import format_report
+
+        text = format_report({
+            "2025-01-15": {"queue": [0.002, 0.004], "total": [45.0, 150.0]},
+            "all": {"queue": [0.002, 0.004], "total": [45.0, 150.0]},
+        })
+        lines = text.splitlines()
+
+        assert lines[0].split() == ["day", "stage", "count", "p50", "p95", "p99"]
+        assert lines[1].split() == ["2025-01-15", "queue", "2", "2ms", "4ms", "4ms"]
+        assert lines[2].split() == ["2025-01-15", "total", "2", "45.0s", "2.5m", "2.5m"]
+        assert lines[-1].startswith("all")
+
+    def test_main_without_traces_exits(self, temp_mind_dir, monkeypatch, capsys):
+        """Test the CLI when nothing has been traced yet."""
+        from scripts.telegram import latency_trace
+
+        monkeypatch.setattr("sys.argv", ["mind-latency"])
+        with pytest.raises(SystemExit) as exc:
+            latency_trace.main()
+
+        assert exc.value.code == 1
+        assert "No traced messages" in capsys.readouterr().err
+
+    def test_main_rejects_malformed_since(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that a bad --since day is a usage error, not a traceback."""
+        from scripts.telegram import latency_trace
+
+        monkeypatch.setattr("sys.argv", ["mind-latency", "--since", "last week"])
+        with pytest.raises(SystemExit) as exc:
+            latency_trace.main()
+
+        assert exc.value.code == 2
+        assert "expected a day like 2025-01-15" in capsys.readouterr().err
@@ -0,0 +1,156 @@
+"""
+Unit tests for scripts/telegram/log_writer.py
+
+Tests entry formatting, group commits and routing to the single writer.
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+NOW = datetime(2025, 1, 15, 12, 30, 45)
+
+
+class TestFormatEntry:
+    """Tests for format_entry()."""
+
+    def test_format_entry_incoming(self):
+        """Test the incoming entry layout."""
+        from scripts.telegram.log_writer import format_entry
+
+        assert format_entry("incoming", "Hi", "bob", NOW) == "\n## 12:30:45 - bob (incoming)\n\nHi\n"
+
+    def test_format_entry_outgoing(self):
+        """Test the outgoing entry layout."""
+        from scripts.telegram.log_writer import format_entry
+
+        assert format_entry("outgoing", "Hello", now=NOW) == "\n## 12:30:45 - Claude (outgoing)\n\nHello\n"
+
+
+class TestAppendEntries:
+    """Tests for append_entries()."""
+
+    def test_append_entries_groups_by_day(self, temp_mind_dir):
+        """Test that entries land in their own day files."""
+        from scripts.telegram.log_writer import append_entries
+
+        append_entries(temp_mind_dir["conversations"], [
+            ("2025-01-15", "a"), ("2025-01-16", "b"), ("2025-01-15", "c"),
+        ])
+
+        assert (temp_mind_dir["conversations"] / "2025-01-15.md").read_text() == "ac"
+        assert (temp_mind_dir["conversations"] / "2025-01-16.md").read_text() == "b"
+
+    def test_append_entries_one_write_per_day(self, temp_mind_dir):
+        """Test that a batch is committed with a single write per file."""
+        from scripts.telegram.log_writer import append_entries
+
+        with patch('scripts.telegram.log_writer.open', create=True) as mock_open, \
+                patch('scripts.telegram.log_writer.fcntl.flock'):
+            append_entries(temp_mind_dir["conversations"], [("2025-01-15", "a"), ("2025-01-15", "b")])
+
+        handle = mock_open.return_value.__enter__.return_value
+        handle.write.assert_called_once_with("ab")
+
+    def test_append_entries_returns_bytes_written(self, temp_mind_dir):
+        """Test the byte count used for accounting."""
+        from scripts.telegram.log_writer import append_entries
+
+        assert append_entries(temp_mind_dir["conversations"], [("2025-01-15", "héllo")]) == 6
+
+
+class TestConversationLog:
+    """Tests for the buffered ConversationLog."""
+
+    def test_submit_does_not_write_until_flush(self, temp_mind_dir):
+        """Test that submit only buffers."""
+        from scripts.telegram.log_writer import ConversationLog
+
+        log = ConversationLog(temp_mind_dir["conversations"])
+        log.submit("2025-01-15", "entry")
+
+        assert not (temp_mind_dir["conversations"] / "2025-01-15.md").exists()
+        assert log.flush() == 1
+        assert (temp_mind_dir["conversations"] / "2025-01-15.md").read_text() == "entry"
+
+    def test_close_drains_pending_entries(self, temp_mind_dir):
+        """Test that nothing buffered is lost on shutdown."""
+        from scripts.telegram.log_writer import ConversationLog
+
+        log = ConversationLog(temp_mind_dir["conversations"], flush_interval=3600)
+        log.start()
+        for i in range(100):
+            log.submit("2025-01-15", f"{i};")
+        log.close()
+
+        content = (temp_mind_dir["conversations"] / "2025-01-15.md").read_text()
+        assert content == "".join(f"{i};" for i in range(100))
+        assert log.bytes_written == len(content)
+
+    def test_failed_flush_keeps_entries_for_the_next_one(self, temp_mind_dir):
+        """Test that entries survive a write error (e.g. a full disk) and keep their order."""
+        import scripts.telegram.log_writer as log_writer
+        from scripts.telegram.log_writer import ConversationLog
+
+        real_append = log_writer.append_entries
+        calls = []
+
+        def flaky_append(conversations_dir, entries):
+            calls.append(entries)
+            if len(calls) == 2:
+                raise OSError(28, "No space left on device")
+            return real_append(conversations_dir, entries)
+
+        log = ConversationLog(temp_mind_dir["conversations"])
+        log.submit("2025-01-14", "a;")
+        log.submit("2025-01-15", "b;")
+        with patch.object(log_writer, "append_entries", flaky_append):
+            with pytest.raises(OSError):
+                log.flush()
+            log.submit("2025-01-15", "c;")
+            assert log.flush() == 2
+
+        assert (temp_mind_dir["conversations"] / "2025-01-14.md").read_text() == "a;"
+        assert (temp_mind_dir["conversations"] / "2025-01-15.md").read_text() == "b;c;"
+
+    def test_start_routes_log_entry_to_buffer(self, temp_mind_dir):
+        """Test that log_entry uses the running in-process writer."""
+        from scripts.telegram.log_writer import ConversationLog, log_entry
+
+        log = ConversationLog(temp_mind_dir["conversations"], flush_interval=3600)
+        log.start()
+        try:
+            log_entry("buffered", NOW)
+            assert not (temp_mind_dir["conversations"] / "2025-01-15.md").exists()
+        finally:
+            log.close()
+
+        assert (temp_mind_dir["conversations"] / "2025-01-15.md").read_text() == "buffered"
+
+
+class TestLogEntry:
+    """Tests for log_entry() routing without an in-process writer."""
+
+    def test_log_entry_direct_append_without_writer(self, temp_mind_dir):
+        """Test the locked direct append fallback."""
+        from scripts.telegram.log_writer import log_entry
+
+        log_entry("direct", NOW)
+
+        assert (temp_mind_dir["conversations"] / "2025-01-15.md").read_text() == "direct"
+
+    def test_log_entry_prefers_socket(self, temp_mind_dir):
+        """Test that a reachable writer socket takes the entry."""
+        from scripts.telegram.log_writer import log_entry
+
+        with patch('scripts.telegram.log_writer._send_to_socket', return_value=True) as mock_send, \
+                patch('scripts.telegram.log_writer.append_entries') as mock_append:
+            log_entry("via socket", NOW)
+
+        mock_send.assert_called_once()
+        assert mock_send.call_args[0][:2] == ("2025-01-15", "via socket")
+        mock_append.assert_not_called()
@@ -0,0 +1,213 @@
+"""
+Unit tests for scripts/telegram/memory_compactor.py
+
+Tests memory.md parsing and moving items between hot, warm and cold tiers.
+"""
+
+import json
+import sys
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+TEMPLATE = (Path(__file__).parents[3] / "mind" / "memory.md").read_text()
+TODAY = date(2025, 6, 1)
+
+
+def _memory(*sections: tuple[str, list[str]]) -> str:
+    text = "# Persistent Memory\n\nLong-term memories.\n"
+    for name, items in sections:
+        text += f"\n## {name}\n\n<!-- {name} notes -->\n\n" + "\n".join(items) + "\n"
+    return text
+
+
+@pytest.fixture
+def memory_file(temp_mind_dir):
+    return temp_mind_dir["mind"] / "memory.md"
+
+
+def _compactor(**kwargs):
+    from scripts.telegram.memory_compactor import MemoryCompactor
+
+    return MemoryCompactor(**kwargs)
+
+
+class TestMemoryDocument:
+    """Tests for MemoryDocument parsing and rendering."""
+
+    def test_template_round_trips(self):
+        """Test that the shipped memory.md template renders back unchanged."""
+        from scripts.telegram.memory_compactor import MemoryDocument
+
+        doc = MemoryDocument.parse(TEMPLATE)
+
+        assert doc.render() == TEMPLATE
+        assert list(doc.sections)[:2] == ["User Preferences", "Ongoing Projects"]
+        assert doc.count() == 0  # only comments
+
+    def test_items_are_bullets_with_continuations_or_paragraphs(self):
+        """Test how lines are grouped into items."""
+        from scripts.telegram.memory_compactor import MemoryDocument
+
+        doc = MemoryDocument.parse(
+            "## Projects\n\n- alpha\n  still alpha\n- beta\n\nA paragraph\nspanning lines.\n\n### Sub\n\n- gamma\n"
+        )
+
+        texts = [item.text for _, item in doc.movable_items()]
+        assert texts == ["- alpha\n  still alpha", "- beta", "A paragraph\nspanning lines.", "- gamma"]
+        assert doc.sections["Projects"][3].fixed  # "### Sub"
+
+    def test_pinned_items_are_not_movable(self):
+        """Test the [pinned] marker."""
+        from scripts.telegram.memory_compactor import MemoryDocument
+
+        doc = MemoryDocument.parse("## Prefs\n\n- likes tea [pinned]\n- likes cake\n")
+
+        assert [item.text for _, item in doc.movable_items()] == ["- likes cake"]
+
+    def test_written_date_is_newest_date_in_item(self):
+        """Test the explicit item date."""
+        from scripts.telegram.memory_compactor import Item
+
+        assert Item(["- started 2025-01-02, updated 2025-03-04"]).written_date() == date(2025, 3, 4)
+        assert Item(["- no date, bad 2025-13-45"]).written_date() is None
+
+
+class TestCompact:
+    """Tests for MemoryCompactor.compact()."""
+
+    def test_within_budget_leaves_memory_untouched(self, memory_file):
+        """Test that nothing moves when the file fits and nothing is stale."""
+        memory_file.write_text(TEMPLATE)
+
+        result = _compactor(hot_budget=10_000).compact(TODAY)
+
+        assert result["to_warm"] == [] and result["to_cold"] == []
+        assert memory_file.read_text() == TEMPLATE
+
+    def test_over_budget_moves_oldest_items_to_warm(self, memory_file, temp_mind_dir):
+        """Test that the oldest items leave and memory.md ends up within budget."""
+        old = [f"- 2025-0{m}-01 decided thing {m} " + "x" * 200 for m in range(1, 6)]
+        memory_file.write_text(_memory(("Key Decisions", old), ("User Preferences", ["- likes tea [pinned]"])))
+
+        result = _compactor(hot_budget=1500).compact(TODAY)
+
+        text = memory_file.read_text()
+        assert len(text.encode()) <= 1500
+        assert result["to_warm"][0].startswith("- 2025-01-01")
+        assert "decided thing 5" in text
+        assert "likes tea [pinned]" in text
+        assert "<!-- Key Decisions notes -->" in text
+        warm = (temp_mind_dir["mind"] / "memory" / "warm.md").read_text()
+        assert "## Key Decisions" in warm and "decided thing 1" in warm
+        assert "## Archived Memory" in text
+        assert f"- memory/warm.md: {len(result['to_warm'])} items (Key Decisions)" in text
+
+    def test_stale_items_move_even_within_budget(self, memory_file):
+        """Test the stale-days limit."""
+        memory_file.write_text(_memory(("Ongoing Projects", ["- 2024-01-01 old project", "- 2025-05-20 new project"])))
+
+        result = _compactor(hot_budget=10_000, stale_days=90).compact(TODAY)
+
+        assert result["to_warm"] == ["- 2024-01-01 old project"]
+        assert "new project" in memory_file.read_text()
+
+    def test_undated_items_age_from_first_seen(self, memory_file, temp_mind_dir):
+        """Test that the first-seen day recorded in state.json orders undated items."""
+        memory_file.write_text(_memory(("Ideas to Explore", ["- idea one " + "x" * 1000])))
+        _compactor(hot_budget=10_000).compact(date(2025, 1, 1))
+
+        text = memory_file.read_text().rstrip("\n") + "\n- idea two " + "y" * 1000 + "\n"
+        memory_file.write_text(text)
+        result = _compactor(hot_budget=len(text.encode()) - 100, stale_days=1000).compact(TODAY)
+
+        assert [t[:10] for t in result["to_warm"]] == ["- idea one"]
+        state = json.loads((temp_mind_dir["mind"] / "memory" / "state.json").read_text())
+        assert list(state["hot"].values()) == [TODAY.isoformat()]
+
+    def test_warm_overflow_goes_to_monthly_cold_file(self, memory_file, temp_mind_dir):
+        """Test that warm keeps its own budget and spills into cold/YYYY-MM.md."""
+        items = [f"- 2025-0{m}-01 note {m} " + "z" * 300 for m in range(1, 6)]
+        memory_file.write_text(_memory(("Important Context", items)))
+
+        result = _compactor(hot_budget=10_000, warm_budget=800, stale_days=0).compact(TODAY)
+
+        cold = (temp_mind_dir["mind"] / "memory" / "cold" / "2025-06.md").read_text()
+        assert "note 1" in cold
+        assert result["to_cold"][0].startswith("- 2025-01-01")
+        assert len((temp_mind_dir["mind"] / "memory" / "warm.md").read_bytes()) <= 800
+        assert "- memory/cold/2025-06.md:" in memory_file.read_text()
+
+    def test_dry_run_writes_nothing(self, memory_file, temp_mind_dir):
+        """Test --dry-run."""
+        memory_file.write_text(_memory(("Key Decisions", ["- 2020-01-01 ancient"])))
+
+        result = _compactor(stale_days=90).compact(TODAY, dry_run=True)
+
+        assert result["to_warm"] == ["- 2020-01-01 ancient"]
+        assert "ancient" in memory_file.read_text()
+        assert not (temp_mind_dir["mind"] / "memory").exists()
+
+    def test_concurrent_edit_is_not_overwritten(self, memory_file, temp_mind_dir):
+        """Test that an edit made during compaction wins and nothing is archived."""
+        from scripts.telegram.memory_compactor import MemoryCompactor
+
+        memory_file.write_text(_memory(("Key Decisions", ["- 2020-01-01 ancient"])))
+        compactor = MemoryCompactor(stale_days=90)
+        real_evict = compactor._evict
+
+        def evict_then_edit(*args):
+            moved = real_evict(*args)
+            memory_file.write_text(memory_file.read_text() + "- 2025-06-01 written meanwhile\n")
+            return moved
+
+        with patch.object(compactor, "_evict", side_effect=evict_then_edit):
+            result = compactor.compact(TODAY)
+
+        assert result["skipped"] is True
+        assert "written meanwhile" in memory_file.read_text()
+        assert not (temp_mind_dir["mind"] / "memory" / "warm.md").exists()
+
+    def test_repeated_runs_are_stable(self, memory_file):
+        """Test that a compacted file does not change on the next run."""
+        items = [f"- 2025-0{m}-01 thing {m} " + "x" * 200 for m in range(1, 6)]
+        memory_file.write_text(_memory(("Key Decisions", items)))
+        _compactor(hot_budget=1500).compact(TODAY)
+        first = memory_file.read_text()
+
+        result = _compactor(hot_budget=1500).compact(TODAY)
+
+        assert result["to_warm"] == []
+        assert memory_file.read_text() == first
+
+
+class TestMainFunction:
+    """Tests for the command-line entry point."""
+
+    def test_main_reports_summary(self, memory_file, monkeypatch, capsys):
+        """Test the printed summary with a token budget."""
+        from scripts.telegram.memory_compactor import main
+
+        memory_file.write_text(_memory(("Key Decisions", ["- 2020-01-01 ancient"])))
+        monkeypatch.setattr(sys, 'argv', ['memory_compactor.py', '--budget-tokens', '2000'])
+
+        main()
+
+        out = capsys.readouterr().out
+        assert "warm <- - 2020-01-01 ancient" in out
+        assert "1 to warm, 0 to cold" in out
+
+    def test_main_missing_memory_file(self, temp_mind_dir, monkeypatch):
+        """Test the error when there is no memory.md."""
+        from scripts.telegram.memory_compactor import main
+
+        monkeypatch.setattr(sys, 'argv', ['memory_compactor.py'])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
@@ -0,0 +1,129 @@
+"""
+Unit tests for scripts/telegram/metrics.py
+
+Tests the counter primitives, Prometheus rendering and the bot's live counters.
+"""
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestPrimitives:
+    """Tests for Counter, Gauge and Histogram."""
+
+    def test_counter_with_labels(self):
+        """Test that label sets are counted separately."""
+        from scripts.telegram.metrics import Counter
+
+        counter = Counter("c_total", "help")
+        counter.inc(direction="incoming")
+        counter.inc(2, direction="incoming")
+        counter.inc(direction="outgoing")
+
+        assert counter.value(direction="incoming") == 3
+        assert counter.value(direction="outgoing") == 1
+        assert counter.value() == 0
+
+    def test_gauge_set_and_inc(self):
+        """Test that a gauge can be set and then moved."""
+        from scripts.telegram.metrics import Gauge
+
+        gauge = Gauge("g", "help")
+        gauge.set(5)
+        gauge.inc()
+        assert gauge.value() == 6
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket placement, sum and count."""
+        from scripts.telegram.metrics import Histogram
+
+        hist = Histogram("h_seconds", "help", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            hist.observe(value, handler="message")
+
+        samples = {(s[0], s[3] if len(s) > 3 else ""): s[2] for s in hist.samples()}
+        assert samples[("h_seconds_bucket", 'le="0.1"')] == 2
+        assert samples[("h_seconds_bucket", 'le="1"')] == 3
+        assert samples[("h_seconds_bucket", 'le="+Inf"')] == 4
+        assert samples[("h_seconds_count", "")] == 4
+        assert hist.mean(handler="message") == pytest.approx(3.65 / 4)
+        assert hist.mean(handler="other") == 0.0
+
+
+class TestRegistry:
+    """Tests for Prometheus text rendering."""
+
+    def test_render_text_format(self):
+        """Test HELP/TYPE lines, labels and histogram series."""
+        from scripts.telegram.metrics import Counter, Histogram, Registry
+
+        registry = Registry()
+        registry.register(Counter("mind_messages_total", "Messages.")).inc(direction="incoming")
+        registry.register(Histogram("lat_seconds", "Latency.", buckets=(0.5,))).observe(0.25, handler="status")
+
+        text = registry.render()
+
+        assert "# HELP mind_messages_total Messages.\n# TYPE mind_messages_total counter\n" in text
+        assert 'mind_messages_total{direction="incoming"} 1\n' in text
+        assert 'lat_seconds_bucket{handler="status",le="0.5"} 1\n' in text
+        assert 'lat_seconds_bucket{handler="status",le="+Inf"} 1\n' in text
+        assert 'lat_seconds_sum{handler="status"} 0.25\n' in text
+
+
+class TestBotMetrics:
+    """Tests for BotMetrics."""
+
+    def test_record_message_updates_counters(self):
+        """Test that logging an entry updates messages, bytes and last activity."""
+        from scripts.telegram.metrics import BotMetrics
+
+        clock = FakeClock()
+        stats = BotMetrics(clock)
+        clock.now = 1010.0
+        stats.record_message("incoming", 120)
+        stats.record_message("outgoing", 80)
+        clock.now = 1015.0
+
+        summary = stats.summary()
+
+        assert summary["incoming"] == 1
+        assert summary["outgoing"] == 1
+        assert summary["log_bytes"] == 200
+        assert summary["last_activity_ago"] == 5.0
+        assert summary["uptime"] == 15.0
+
+    def test_summary_before_any_activity(self):
+        """Test the initial summary."""
+        from scripts.telegram.metrics import BotMetrics
+
+        summary = BotMetrics(FakeClock()).summary()
+
+        assert summary["queue_depth"] == 0
+        assert summary["last_activity_ago"] is None
+        assert summary["message_latency"] == 0.0
+
+    def test_conversation_log_feeds_counters(self, temp_mind_dir):
+        """Test the ConversationLog on_entry hook, including socket-style records."""
+        from scripts.telegram.log_writer import ConversationLog
+        from scripts.telegram.metrics import BotMetrics
+
+        stats = BotMetrics(FakeClock())
+        log = ConversationLog(
+            temp_mind_dir["conversations"],
+            on_entry=lambda direction, nbytes, day: stats.record_message(direction, nbytes),
+        )
+        log.submit("2025-01-15", "hello", "incoming")
+        log.submit("2025-01-15", "héllo", "outgoing")
+        log.submit("2025-01-15", "untracked")
+
+        assert stats.messages.value(direction="incoming") == 1
+        assert stats.log_bytes.value() == 11
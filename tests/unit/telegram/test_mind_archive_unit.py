@@ -0,0 +1,194 @@
+"""
+Unit tests for scripts/telegram/mind_archive.py
+
+Tests day-file archival, log rotation, retention and the transparent readers.
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+NOW = datetime(2025, 3, 10, 3, 17)
+
+
+def _day(directory, day, text=None):
+    path = directory / f"{day}.md"
+    path.write_text(text if text is not None else f"# {day}\n\n## 12:00\n\nentry for {day}\n" * 20)
+    return path
+
+
+def _cat(*files):
+    return {name: b"".join(chunks) for name, chunks in files}
+
+
+def _run(monkeypatch, capsys, *argv):
+    from scripts.telegram.mind_archive import main
+
+    monkeypatch.setattr("sys.argv", ["mind_archive.py", *argv])
+    try:
+        main()
+        code = 0
+    except SystemExit as e:
+        code = e.code
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+class TestArchiveDays:
+    """Tests for moving closed day files into monthly archives."""
+
+    def test_closed_days_move_and_recent_days_stay(self, temp_mind_dir):
+        """Test that only days older than ARCHIVE_AFTER_DAYS are archived."""
+        from scripts.telegram.mind_archive import Archive, run
+
+        old = _day(temp_mind_dir["conversations"], "2025-02-27")
+        before = old.read_bytes()
+        recent = _day(temp_mind_dir["conversations"], "2025-03-05")
+
+        summary = run(now=NOW)
+
+        assert summary["archived"] == {"conversations": ["2025-02-27.md"]}
+        assert not old.exists() and recent.exists()
+        archive = Archive()
+        assert archive.members("conversations") == {"2025-02-27.md": "2025-02"}
+        assert b"".join(archive.iter_chunks("conversations", "2025-02-27.md")) == before
+
+    def test_month_is_a_plain_gzip_stream(self, temp_mind_dir):
+        """Test that an archive month decompresses with standard tools, days in order."""
+        for day in ("2025-01-02", "2025-01-03"):
+            _day(temp_mind_dir["journal"], day)
+        from scripts.telegram.mind_archive import run
+
+        run(now=NOW)
+
+        with gzip.open(temp_mind_dir["mind"] / "archive" / "journal" / "2025-01.gz") as f:
+            data = f.read()
+        assert data.index(b"entry for 2025-01-02") < data.index(b"entry for 2025-01-03")
+
+    def test_interrupted_run_is_finished(self, temp_mind_dir):
+        """Test that a day already in the archive (crash before unlink) is not stored twice."""
+        from scripts.telegram.mind_archive import Archive, run
+
+        path = _day(temp_mind_dir["journal"], "2025-01-02")
+        archive = Archive()
+        archive.append("journal", "2025-01", path.name, path)
+        size = (archive.root / "journal" / "2025-01.gz").stat().st_size
+
+        run(now=NOW)
+
+        assert not path.exists()
+        assert (archive.root / "journal" / "2025-01.gz").stat().st_size == size
+
+    def test_dry_run_changes_nothing(self, temp_mind_dir):
+        """Test that --dry-run only reports."""
+        from scripts.telegram.mind_archive import run
+
+        path = _day(temp_mind_dir["journal"], "2025-01-02")
+
+        assert run(now=NOW, dry_run=True)["archived"] == {"journal": ["2025-01-02.md"]}
+        assert path.exists()
+        assert not (temp_mind_dir["mind"] / "archive").exists()
+
+
+class TestReaders:
+    """Tests for iter_files() and read_file()."""
+
+    def test_iter_files_spans_archive_and_live(self, temp_mind_dir):
+        """Test that readers see archived and live days as one ordered source."""
+        from scripts.telegram.mind_archive import iter_files, read_file, run
+
+        for day in ("2025-02-01", "2025-02-20", "2025-03-09"):
+            _day(temp_mind_dir["conversations"], day, f"day {day}\n")
+        run(now=NOW)
+
+        files = _cat(*iter_files("conversations"))
+        assert list(files) == ["2025-02-01.md", "2025-02-20.md", "2025-03-09.md"]
+        assert files["2025-02-01.md"] == b"day 2025-02-01\n"
+        assert list(_cat(*iter_files("conversations", since="2025-02-10", until="2025-02-28"))) == ["2025-02-20.md"]
+        assert read_file("conversations", "2025-02-20.md") == b"day 2025-02-20\n"
+        assert read_file("conversations", "2025-03-09.md") == b"day 2025-03-09\n"
+
+    def test_large_member_streams_in_chunks(self, temp_mind_dir):
+        """Test that a big archived file comes back in bounded pieces."""
+        from scripts.telegram.mind_archive import CHUNK_SIZE, Archive
+
+        path = temp_mind_dir["mind"] / "big.log"
+        path.write_bytes(os.urandom(CHUNK_SIZE * 5))
+        archive = Archive()
+        archive.append("logs/big", "2025-03", "big.20250310-031700.log", path)
+
+        chunks = list(archive.iter_chunks("logs/big", "big.20250310-031700.log"))
+        assert b"".join(chunks) == path.read_bytes()
+        assert len(chunks) > 1
+
+
+class TestLogsAndRetention:
+    """Tests for log rotation, retention and the log quota."""
+
+    def test_large_log_is_rotated(self, temp_mind_dir, monkeypatch):
+        """Test copy-truncate rotation and reading the log back across the rotation."""
+        from scripts.telegram import mind_archive
+
+        monkeypatch.setattr(mind_archive, "LOG_ROTATE_BYTES", 100)
+        log = temp_mind_dir["mind"] / "telegram-bot.log"
+        log.write_text("2025-03-10 03:00 - bot - INFO - polling\n" * 10)
+        small = temp_mind_dir["mind"] / "cron.log"
+        small.write_text("tiny\n")
+
+        assert mind_archive.run(now=NOW)["rotated"] == ["telegram-bot.log"]
+        assert log.stat().st_size == 0 and small.read_text() == "tiny\n"
+
+        with open(log, "a") as f:
+            f.write("after rotation\n")
+        text = b"".join(b"".join(c) for _, c in mind_archive.iter_files("logs/telegram-bot")).decode()
+        assert text.count("polling") == 10
+        assert text.endswith("after rotation\n")
+
+    def test_retention_and_quota(self, temp_mind_dir, monkeypatch):
+        """Test that old log months go, oldest first past the quota, and history stays."""
+        from scripts.telegram import mind_archive
+
+        archive = mind_archive.Archive()
+        source = temp_mind_dir["mind"] / "payload"
+        source.write_bytes(os.urandom(4000))
+        for month in ("2024-10", "2025-01", "2025-02", "2025-03"):
+            archive.append("logs/telegram-bot", month, f"telegram-bot.{month.replace('-', '')}01-000000.log", source)
+        archive.append("conversations", "2024-01", "2024-01-05.md", source)
+        monkeypatch.setattr(mind_archive, "LOG_QUOTA_BYTES", 9000)
+
+        dropped = mind_archive.enforce_retention(NOW.date(), archive)
+
+        assert dropped == ["logs/telegram-bot/2024-10", "logs/telegram-bot/2025-01"]
+        assert archive.months("logs/telegram-bot") == ["2025-02", "2025-03"]
+        assert archive.months("conversations") == ["2024-01"]
+
+
+class TestMainFunction:
+    """Tests for the mind-archive CLI."""
+
+    def test_run_cat_and_stats(self, temp_mind_dir, monkeypatch, capsys):
+        """Test the three subcommands end to end."""
+        _day(temp_mind_dir["journal"], "2025-01-02")
+        monkeypatch.setattr("scripts.telegram.mind_archive.datetime", type("D", (datetime,), {
+            "now": classmethod(lambda cls, tz=None: NOW)}))
+
+        code, out, _ = _run(monkeypatch, capsys, "run")
+        assert code == 0
+        assert "Archived 1 day files" in out
+
+        _, out, _ = _run(monkeypatch, capsys, "cat", "journal")
+        assert out.count("entry for 2025-01-02") == 20
+
+        _, out, _ = _run(monkeypatch, capsys, "stats", "--json")
+        journal = json.loads(out)["journal"]
+        assert journal["archived_files"] == 1
+        assert journal["compressed_bytes"] * 5 < journal["archived_bytes"]
+
+        code, _, err = _run(monkeypatch, capsys, "cat", "nope")
+        assert code == 2
+        assert "unknown source" in err
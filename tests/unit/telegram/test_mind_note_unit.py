@@ -0,0 +1,149 @@
+"""
+Unit tests for scripts/telegram/mind_note.py
+
+Tests locked journal appends and memory.md edits from concurrent workers.
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+MEMORY = """# Persistent Memory
+
+## User Preferences
+
+<!-- Things learned about the user's preferences -->
+
+- Likes short answers (2025-01-10)
+
+## Ideas to Explore
+
+- Sourdough hydration
+"""
+
+
+def _run(monkeypatch, capsys, *argv):
+    from scripts.telegram.mind_note import main
+
+    monkeypatch.setattr("sys.argv", ["mind-note", *argv])
+    try:
+        main()
+        code = 0
+    except SystemExit as e:
+        code = e.code
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+class TestJournal:
+    """Tests for journal()."""
+
+    def test_entry_names_the_worker_and_is_searchable(self, temp_mind_dir):
+        """Test the heading format and that mind-search picks the entry up."""
+        from scripts.telegram.mind_note import journal
+        from scripts.telegram.mind_search import parse_entries
+
+        path = journal("Thinking about leases.", worker="claude-mind-1", now=datetime(2025, 1, 15, 9, 30))
+        journal("And locks.", worker="", now=datetime(2025, 1, 15, 9, 45))
+
+        assert path == temp_mind_dir["journal"] / "2025-01-15.md"
+        entries = parse_entries(path.read_bytes())
+        assert [(t, h, body) for _, t, h, body in entries] == [
+            ("09:30", "claude-mind-1", "Thinking about leases."),
+            ("09:45", "", "And locks."),
+        ]
+
+    def test_concurrent_appends_all_land(self, temp_mind_dir):
+        """Test that entries from parallel writers are neither lost nor interleaved."""
+        from scripts.telegram.mind_note import journal
+
+        now = datetime(2025, 1, 15, 9, 30)
+        threads = [
+            threading.Thread(target=journal, args=(f"note {i} " + "x" * 5000,), kwargs={"worker": f"w{i}", "now": now})
+            for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        text = (temp_mind_dir["journal"] / "2025-01-15.md").read_text()
+        assert text.count("## 09:30 - w") == 8
+        assert all(f"note {i} " + "x" * 5000 + "\n" in text for i in range(8))
+
+
+class TestRemember:
+    """Tests for remember()."""
+
+    def test_add_to_existing_and_new_sections(self, temp_mind_dir):
+        """Test that items are appended to their section and duplicates are skipped."""
+        from scripts.telegram.mind_note import remember
+
+        memory = temp_mind_dir["mind"] / "memory.md"
+        memory.write_text(MEMORY)
+
+        assert remember("- Rye starter (2025-01-15)", section="Ideas to Explore") is True
+        assert remember("- Rye starter (2025-01-15)", section="Ideas to Explore") is False
+        assert remember("- Ships on Fridays", section="Ongoing Projects") is True
+
+        text = memory.read_text()
+        assert "- Sourdough hydration\n- Rye starter (2025-01-15)\n" in text
+        assert text.rstrip().endswith("## Ongoing Projects\n\n- Ships on Fridays")
+        assert "<!-- Things learned about the user's preferences -->" in text
+
+    def test_replace_needs_exactly_one_match(self, temp_mind_dir):
+        """Test that --replace swaps one item and refuses ambiguous or missing text."""
+        from scripts.telegram.mind_note import remember
+
+        memory = temp_mind_dir["mind"] / "memory.md"
+        memory.write_text(MEMORY)
+
+        assert remember("- Likes detailed answers (2025-01-15)", replace="short answers") is True
+        assert "short answers" not in memory.read_text()
+        assert "- Likes detailed answers (2025-01-15)" in memory.read_text()
+
+        with pytest.raises(ValueError, match="0 memory items"):
+            remember("- x", replace="nowhere")
+        with pytest.raises(ValueError, match="2 memory items"):
+            remember("- x", replace="- ")
+
+    def test_concurrent_workers_keep_every_item(self, temp_mind_dir):
+        """Test that parallel remember() calls never drop each other's items."""
+        from scripts.telegram.mind_note import remember
+
+        memory = temp_mind_dir["mind"] / "memory.md"
+        memory.write_text(MEMORY)
+
+        threads = [
+            threading.Thread(target=remember, args=(f"- idea {i}",), kwargs={"section": "Ideas to Explore"})
+            for i in range(10)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        text = memory.read_text()
+        assert all(f"- idea {i}\n" in text for i in range(10))
+
+
+class TestMainFunction:
+    """Tests for the mind-note CLI."""
+
+    def test_journal_and_remember(self, temp_mind_dir, monkeypatch, capsys):
+        """Test both subcommands and the error exits."""
+        monkeypatch.setenv("MIND_WORKER", "claude-mind-0")
+        (temp_mind_dir["mind"] / "memory.md").write_text(MEMORY)
+
+        code, out, _ = _run(monkeypatch, capsys, "journal", "Quiet", "morning.")
+        assert code == 0
+        assert " - claude-mind-0\n\nQuiet morning.\n" in Path(out.strip()).read_text()
+
+        assert _run(monkeypatch, capsys, "remember", "- Tea over coffee", "--section", "User Preferences")[0] == 0
+        assert "Already in memory.md" in _run(
+            monkeypatch, capsys, "remember", "- Tea over coffee", "--section", "User Preferences")[2]
+        assert _run(monkeypatch, capsys, "remember", "- y", "--replace", "nowhere")[0] == 1
@@ -0,0 +1,391 @@
+"""
+Unit tests for scripts/telegram/mind_queue.py
+
+Tests claim order, leases, ack/nack, failed entries and the mind-queue CLI.
+"""
+
+import json
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def queue(temp_mind_dir):
+    from scripts.telegram.mind_queue import SqliteQueue
+
+    q = SqliteQueue(max_attempts=3)
+    yield q
+    q.close()
+
+
+def _envelope(text, sender="alice", **extra):
+    return {"messages": [{"text": text, "from": sender, "time": "2025-01-15T12:30:45"}], **extra}
+
+
+def _run(monkeypatch, capsys, *argv):
+    from scripts.telegram.mind_queue import main
+
+    monkeypatch.setattr("sys.argv", ["mind-queue", *argv])
+    try:
+        main()
+        code = 0
+    except SystemExit as e:
+        code = e.code
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+class TestSqliteQueue:
+    """Tests for SqliteQueue."""
+
+    def test_claim_order_is_lane_then_age(self, queue):
+        """Test that interactive entries go first and ties go oldest first."""
+        queue.enqueue(_envelope("late"), lane="system")
+        queue.enqueue(_envelope("first"))
+        queue.enqueue(_envelope("second"))
+
+        entries = [queue.claim() for _ in range(3)]
+
+        assert [e["envelope"]["messages"][0]["text"] for e in entries] == ["first", "second", "late"]
+        assert entries[2]["lane"] == "system"
+        assert queue.claim() is None
+
+    def test_starved_lane_is_served(self, queue, monkeypatch):
+        """Test that an entry past its lane's max wait goes ahead of newer user messages."""
+        from scripts.telegram import queue_writer
+
+        monkeypatch.setitem(queue_writer.LANE_MAX_WAIT, "background", 0.0)
+        queue.enqueue(_envelope("digest"), lane="background")
+        queue.enqueue(_envelope("user"))
+
+        assert queue.claim()["envelope"]["messages"][0]["text"] == "digest"
+
+    def test_unknown_lane_raises(self, queue):
+        """Test that enqueue rejects a lane that does not exist."""
+        with pytest.raises(ValueError):
+            queue.enqueue(_envelope("x"), lane="urgent")
+
+    def test_claimed_entry_is_hidden_until_acked(self, queue):
+        """Test that a claim hides the entry and ack removes it."""
+        queue.enqueue(_envelope("hello"))
+
+        entry = queue.claim()
+        assert queue.claim() is None
+        assert queue.peek() == []
+        assert queue.ack(entry["receipt"]) is True
+
+        assert queue.stats()["ready"] == 0
+        assert queue.stats()["claimed"] == 0
+
+    def test_expired_lease_redelivers(self, queue):
+        """Test that an unacked entry comes back and the stale receipt stops working."""
+        queue.enqueue(_envelope("hello"))
+
+        stale = queue.claim(visibility_timeout=0)
+        fresh = queue.claim()
+
+        assert fresh["id"] == stale["id"]
+        assert fresh["attempts"] == 2
+        assert queue.ack(stale["receipt"]) is False
+        assert queue.ack(fresh["receipt"]) is True
+
+    def test_nack_returns_entry(self, queue):
+        """Test that nack makes the entry claimable again, after an optional delay."""
+        queue.enqueue(_envelope("hello"))
+
+        assert queue.nack(queue.claim()["receipt"], delay=60) is True
+        assert queue.claim() is None
+        assert queue.stats()["delayed"] == 1
+
+        queue.enqueue(_envelope("other"))
+        assert queue.nack(queue.claim()["receipt"]) is True
+        assert queue.claim()["envelope"]["messages"][0]["text"] == "other"
+
+    def test_entry_fails_after_max_attempts(self, queue):
+        """Test that an entry claimed max_attempts times without an ack is parked."""
+        queue.enqueue(_envelope("poison"))
+
+        for _ in range(3):
+            queue.nack(queue.claim()["receipt"])
+
+        assert queue.claim() is None
+        stats = queue.stats()
+        assert stats["failed"] == 1
+        assert stats["ready"] == 0
+        assert stats["oldest_age"] is None
+
+    def test_bad_receipt_raises(self, queue):
+        """Test that a malformed receipt is an error, not a lost lease."""
+        with pytest.raises(ValueError):
+            queue.ack("not-a-receipt")
+
+    def test_peek_and_ready_do_not_claim(self, queue):
+        """Test that peek lists entries in claim order and leaves them waiting."""
+        first = queue.enqueue(_envelope("a"), lane="system")
+        second = queue.enqueue(_envelope("b"))
+
+        assert [e["id"] for e in queue.peek()] == [second, first]
+        assert queue.ready() == [(second, "interactive"), (first, "system")]
+        assert queue.last_id() == second
+        assert queue.stats()["lanes"] == {"interactive": 1, "system": 1, "background": 0}
+        assert queue.claim()["id"] == second
+
+    def test_chats_take_turns(self, queue):
+        """Test that a chat with a backlog alternates with a chat that has one entry."""
+        for text in ("a1", "a2", "a3"):
+            queue.enqueue(_envelope(text))
+        queue.enqueue(_envelope("b1", chat="-100777"))
+
+        texts = [queue.claim()["envelope"]["messages"][0]["text"] for _ in range(4)]
+
+        assert texts == ["a1", "b1", "a2", "a3"]
+
+    def test_database_without_chat_column_is_migrated(self, temp_mind_dir):
+        """Test that a queue created before chat shards keeps its entries."""
+        import sqlite3
+
+        from scripts.telegram.mind_queue import QUEUE_DB, SqliteQueue
+
+        db = sqlite3.connect(QUEUE_DB)
+        db.executescript(
+            "CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, priority INTEGER NOT NULL DEFAULT 0,"
+            " enqueued_at REAL NOT NULL, visible_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+            " lease TEXT, envelope TEXT NOT NULL);"
+            f"INSERT INTO messages (enqueued_at, visible_at, envelope) VALUES (0, 0, '{json.dumps(_envelope('old'))}');"
+        )
+        db.commit()
+        db.close()
+
+        queue = SqliteQueue()
+        try:
+            assert queue.claim()["envelope"]["messages"][0]["text"] == "old"
+        finally:
+            queue.close()
+
+    def test_render_matches_queue_file(self):
+        """Test that an envelope prints like the .msg file it replaces."""
+        from scripts.telegram.mind_queue import render
+        from scripts.telegram.queue_writer import format_batch
+
+        envelope = _envelope("hello", chat_id=1)
+
+        assert render(envelope) == format_batch(envelope["messages"])
+
+
+class TestDatabaseWatcher:
+    """Tests for DatabaseWatcher."""
+
+    def test_wait_reports_new_entries(self, queue):
+        """Test that wait() names entries enqueued since the last call."""
+        from scripts.telegram.mind_queue import DatabaseWatcher
+
+        queue.enqueue(_envelope("old"))
+        watcher = DatabaseWatcher(queue, interval=0)
+        new = queue.enqueue(_envelope("new"))
+
+        assert watcher.wait(0) == [f"#{new}"]
+        assert watcher.wait(0) == []
+        assert watcher.pending() == [f"#{new - 1}", f"#{new}"]
+
+    def test_pending_labels_carry_lane(self, queue):
+        """Test that pending() tags lower-lane entries the way file names do."""
+        from scripts.telegram.mind_queue import DatabaseWatcher
+        from scripts.telegram.queue_writer import lane_of
+
+        entry_id = queue.enqueue(_envelope("cron"), lane="system")
+
+        [name] = DatabaseWatcher(queue, interval=0).pending()
+
+        assert name == f"#{entry_id}@system"
+        assert lane_of(name) == "system"
+
+
+class TestMainFunction:
+    """Tests for the mind-queue CLI on the SQLite backend."""
+
+    @pytest.fixture(autouse=True)
+    def sqlite_backend(self, monkeypatch):
+        monkeypatch.setattr("scripts.telegram.mind_queue.BACKEND", "sqlite")
+
+    def test_next_prints_receipt_and_message(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that next claims and prints the entry with its receipt."""
+        from scripts.telegram.mind_queue import enqueue_text
+
+        enqueue_text("Hourly reflection", "system", kind="reflection", lane="system")
+
+        code, out, _ = _run(monkeypatch, capsys, "next")
+
+        assert code == 0
+        receipt = out.splitlines()[0].removeprefix("Receipt: ")
+        assert "From: system\n" in out and out.endswith("\nHourly reflection\n")
+        assert _run(monkeypatch, capsys, "ack", receipt)[0] == 0
+        assert _run(monkeypatch, capsys, "ack", receipt)[0] == 1
+
+    def test_next_on_empty_queue_exits(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that next fails when nothing is waiting."""
+        code, _, err = _run(monkeypatch, capsys, "next")
+
+        assert code == 1
+        assert "No messages waiting" in err
+
+    def test_peek_and_stats(self, temp_mind_dir, monkeypatch, capsys):
+        """Test the listing and count commands, plain and JSON."""
+        from scripts.telegram.mind_queue import enqueue_text
+
+        enqueue_text("first line\nsecond line", "alice")
+
+        _, out, _ = _run(monkeypatch, capsys, "peek")
+        assert out.startswith("#1  interactive  ") and out.rstrip().endswith("alice: first line")
+        _, out, _ = _run(monkeypatch, capsys, "stats", "--json")
+        assert json.loads(out)["ready"] == 1
+        _, out, _ = _run(monkeypatch, capsys, "stats")
+        assert out.startswith("ready 1, claimed 0, delayed 0, failed 0, oldest ")
+        assert out.splitlines()[1] == "lanes: interactive 1, system 0, background 0"
+
+    def test_nack_json_and_bad_receipt(self, temp_mind_dir, monkeypatch, capsys):
+        """Test next --json, nack, and a malformed receipt."""
+        from scripts.telegram.mind_queue import enqueue_text
+
+        enqueue_text("hello", "alice")
+
+        _, out, _ = _run(monkeypatch, capsys, "next", "--json")
+        entry = json.loads(out)
+        assert entry["envelope"]["messages"][0]["text"] == "hello"
+        assert _run(monkeypatch, capsys, "nack", entry["receipt"])[0] == 0
+        assert _run(monkeypatch, capsys, "nack", "garbage")[0] == 2
+
+
+class TestFileBackend:
+    """Tests for the mind-queue CLI on message_queue/."""
+
+    def test_next_and_ack_follow_lane_order(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that next shows the user message before an older cron entry and ack deletes it."""
+        from datetime import datetime, timedelta
+
+        from scripts.telegram.queue_writer import format_message, write_message
+
+        now = datetime.now()
+        write_message(format_message("Reflect", "system"), now=now - timedelta(seconds=30), lane="system")
+        name = write_message(format_message("Hello", "alice"), now=now)
+
+        code, out, _ = _run(monkeypatch, capsys, "next")
+
+        assert code == 0
+        receipt = out.splitlines()[0].removeprefix("Receipt: ")
+        assert receipt.startswith(f"{name}:")
+        assert "Hello" in out
+        assert not (temp_mind_dir["queue"] / name).exists()
+        assert _run(monkeypatch, capsys, "ack", receipt)[0] == 0
+        assert _run(monkeypatch, capsys, "ack", receipt)[0] == 1
+        assert _run(monkeypatch, capsys, "ack", "../memory.md")[0] == 2
+
+        _, out, _ = _run(monkeypatch, capsys, "stats")
+        assert out.startswith("ready 1, claimed 0")
+        assert out.splitlines()[1] == "lanes: interactive 0, system 1, background 0"
+        _, out, _ = _run(monkeypatch, capsys, "peek")
+        assert "@system.msg  system  " in out and out.rstrip().endswith("system: Reflect")
+
+    def test_ack_sends_the_chat_to_the_back(self, temp_mind_dir):
+        """Test that after a chat is served, a waiting chat goes before its next entry."""
+        from datetime import datetime, timedelta
+
+        from scripts.telegram.mind_queue import FileQueue
+        from scripts.telegram.queue_writer import format_message, write_message
+
+        now = datetime.now()
+        b1 = write_message(format_message("b1", "bob"), now=now - timedelta(seconds=3), chat="-100777")
+        write_message(format_message("b2", "bob"), now=now - timedelta(seconds=2), chat="-100777")
+        a1 = write_message(format_message("a1", "alice"), now=now - timedelta(seconds=1))
+        queue = FileQueue()
+
+        entry = queue.claim()
+        assert entry["id"] == b1
+        assert queue.ack(entry["receipt"])
+
+        assert queue.claim()["id"] == a1
+
+    def test_workers_never_share_a_file(self, temp_mind_dir):
+        """Test that claimed files are hidden from other workers until acked or released."""
+        from datetime import datetime, timedelta
+
+        from scripts.telegram.mind_queue import FileQueue
+        from scripts.telegram.queue_writer import format_message, write_message
+
+        now = datetime.now()
+        first = write_message(format_message("one", "alice"), now=now - timedelta(seconds=2))
+        second = write_message(format_message("two", "alice"), now=now - timedelta(seconds=1))
+        worker_a, worker_b = FileQueue(), FileQueue()
+
+        a = worker_a.claim()
+        b = worker_b.claim()
+        assert (a["id"], b["id"]) == (first, second)
+        assert worker_a.claim() is None
+        assert worker_a.stats()["claimed"] == 2
+
+        assert worker_b.nack(b["receipt"])
+        assert worker_a.claim()["id"] == second
+        assert not worker_b.ack(b["receipt"])  # its lease is gone
+        assert worker_a.ack(a["receipt"])
+
+    def test_expired_lease_is_handed_out_again(self, temp_mind_dir):
+        """Test that a file whose worker never acked returns to the queue."""
+        import time
+
+        from scripts.telegram.mind_queue import FileQueue
+        from scripts.telegram.queue_writer import format_message, write_message
+
+        name = write_message(format_message("Hello", "alice"))
+        queue = FileQueue()
+        stale = queue.claim(visibility_timeout=60)
+
+        assert queue.release_expired(now=time.time() + 30) == 0
+        assert queue.release_expired(now=time.time() + 61) == 1
+        assert [e["id"] for e in queue.peek()] == [name]
+        assert not queue.ack(stale["receipt"])
+
+    def test_entry_fails_after_max_attempts(self, temp_mind_dir):
+        """Test that a file claimed max_attempts times without an ack is parked in failed/."""
+        import time
+
+        from scripts.telegram.mind_queue import FileQueue
+        from scripts.telegram.queue_writer import format_message, write_message
+
+        name = write_message(format_message("poison", "alice"))
+        queue = FileQueue(max_attempts=3)
+
+        assert queue.nack(queue.claim()["receipt"])
+        entry = queue.claim(visibility_timeout=60)
+        assert entry["attempts"] == 2
+        assert queue.release_expired(now=time.time() + 61) == 1
+        assert queue.nack(queue.claim()["receipt"], delay=30)  # out of attempts: no delay
+
+        assert queue.claim() is None
+        assert (temp_mind_dir["queue"] / "failed" / name).exists()
+        assert queue.stats()["failed"] == 1
+        assert queue.stats()["ready"] == 0
+
+    def test_delayed_nack_revokes_the_receipt(self, temp_mind_dir):
+        """Test that a file nacked with a delay comes back later under a lease the old receipt lacks."""
+        import time
+
+        from scripts.telegram.mind_queue import FileQueue
+        from scripts.telegram.queue_writer import format_message, write_message
+
+        name = write_message(format_message("later", "alice"))
+        queue = FileQueue()
+        stale = queue.claim()
+
+        assert queue.nack(stale["receipt"], delay=60)
+        assert not queue.ack(stale["receipt"])
+        assert queue.claim() is None
+        assert queue.stats()["delayed"] == 1
+        assert queue.stats()["claimed"] == 0
+
+        assert queue.release_expired(now=time.time() + 61) == 1
+        entry = queue.claim()
+        assert (entry["id"], entry["attempts"]) == (name, 2)
+        assert not queue.ack(stale["receipt"])
+        assert queue.ack(entry["receipt"])
+        assert not (temp_mind_dir["queue"] / "claimed" / ".attempts" / name).exists()
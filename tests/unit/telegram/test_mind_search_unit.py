@@ -0,0 +1,272 @@
+"""
+Unit tests for scripts/telegram/mind_search.py
+
+Tests entry parsing, incremental index refresh and queries.
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+JOURNAL = b"# Journal\n\n## 09:15\n\nThinking about sqlite indexes.\n\n## 10:00\n\nRust ownership.\n"
+CONVERSATION = (
+    b"\n## 12:30:45 - testuser (incoming)\n\nHow is the garden?\n"
+    b"\n## 12:31:02 - Claude (outgoing)\n\nThe tomatoes are ripe.\n"
+)
+
+
+@pytest.fixture
+def index(temp_mind_dir):
+    from scripts.telegram.mind_search import MindIndex
+
+    (temp_mind_dir["journal"] / "2025-01-14.md").write_bytes(JOURNAL)
+    (temp_mind_dir["conversations"] / "2025-01-15.md").write_bytes(CONVERSATION)
+    idx = MindIndex()
+    yield idx
+    idx.close()
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestParseEntries:
+    """Tests for parse_entries()."""
+
+    def test_parses_journal_and_conversation_headings(self):
+        """Test that both heading styles start an entry."""
+        from scripts.telegram.mind_search import parse_entries
+
+        journal = parse_entries(JOURNAL)
+        conversation = parse_entries(CONVERSATION)
+
+        assert [(t, body) for _, t, _, body in journal] == [
+            ("", "# Journal"),
+            ("09:15", "Thinking about sqlite indexes."),
+            ("10:00", "Rust ownership."),
+        ]
+        assert [(t, h) for _, t, h, _ in conversation] == [
+            ("12:30:45", "testuser (incoming)"),
+            ("12:31:02", "Claude (outgoing)"),
+        ]
+
+    def test_offsets_are_absolute(self):
+        """Test that offsets point at the heading in the file."""
+        from scripts.telegram.mind_search import parse_entries
+
+        base = 100
+        for offset, _, _, _ in parse_entries(CONVERSATION, base)[:1]:
+            assert CONVERSATION[offset - base:].startswith(b"## 12:30:45")
+
+    def test_ignores_other_headings(self):
+        """Test that markdown headings without a time stay inside the entry."""
+        from scripts.telegram.mind_search import parse_entries
+
+        entries = parse_entries(b"## 08:00\n\nplan\n\n## Notes\n\nmore\n")
+
+        assert len(entries) == 1
+        assert "## Notes" in entries[0][3]
+
+
+class TestRefresh:
+    """Tests for MindIndex.refresh()."""
+
+    def test_first_refresh_indexes_all_files(self, index):
+        """Test that a new index picks up every file."""
+        assert index.refresh() == 2
+        assert index.db.execute("SELECT count(*) FROM entries").fetchone()[0] == 5
+
+    def test_unchanged_files_are_skipped(self, index):
+        """Test that a second refresh with no changes parses nothing."""
+        index.refresh()
+
+        assert index.refresh() == 0
+
+    def test_append_reparses_only_the_tail(self, index, temp_mind_dir):
+        """Test that appended entries are indexed without re-parsing earlier ones."""
+        from scripts.telegram import mind_search
+
+        index.refresh()
+        before = dict(index.db.execute("SELECT offset, id FROM entries WHERE path LIKE 'journal/%'"))
+
+        with open(temp_mind_dir["journal"] / "2025-01-14.md", "ab") as f:
+            f.write(b"More on borrowing.\n\n## 11:30\n\nLunch by the river.\n")
+        _bump_mtime(temp_mind_dir["journal"] / "2025-01-14.md")
+
+        with patch("scripts.telegram.mind_search.scan_file", wraps=mind_search.scan_file) as scan:
+            assert index.refresh() == 1
+        offset = scan.call_args.args[1]
+        assert offset == JOURNAL.index(b"## 10:00")
+
+        after = dict(index.db.execute("SELECT offset, id FROM entries WHERE path LIKE 'journal/%'"))
+        assert after[0] == before[0]  # untouched rows keep their ids
+        assert [r["time"] for r in index.search("borrowing")] == ["10:00"]
+        assert [r["time"] for r in index.search("river")] == ["11:30"]
+
+    def test_rewritten_file_is_reparsed(self, index, temp_mind_dir):
+        """Test that an edit before the tail drops stale entries."""
+        index.refresh()
+        path = temp_mind_dir["journal"] / "2025-01-14.md"
+        path.write_bytes(JOURNAL.replace(b"sqlite", b"postgres") + b"extra\n")
+        _bump_mtime(path)
+
+        index.refresh()
+
+        assert index.search("sqlite") == []
+        assert len(index.search("postgres")) == 1
+
+    def test_truncated_file_is_reparsed(self, index, temp_mind_dir):
+        """Test that a file that shrank is indexed from scratch."""
+        index.refresh()
+        path = temp_mind_dir["journal"] / "2025-01-14.md"
+        path.write_bytes(b"## 07:00\n\nshort\n")
+
+        index.refresh()
+
+        assert index.search("sqlite") == []
+        assert index.db.execute("SELECT count(*) FROM entries WHERE path LIKE 'journal/%'").fetchone()[0] == 1
+
+    def test_deleted_file_is_removed(self, index, temp_mind_dir):
+        """Test that entries of deleted files disappear."""
+        index.refresh()
+        (temp_mind_dir["conversations"] / "2025-01-15.md").unlink()
+
+        index.refresh()
+
+        assert index.search("tomatoes") == []
+
+    def test_archived_file_stays_searchable(self, index, temp_mind_dir):
+        """Test that a day moved into the archive keeps its entries, and a rebuild reads it back."""
+        from datetime import datetime
+
+        from scripts.telegram import mind_archive
+
+        index.refresh()
+        mind_archive.run(now=datetime(2025, 3, 1), mind_dir=temp_mind_dir["mind"])
+        assert list(temp_mind_dir["journal"].glob("*.md")) == []
+
+        assert index.refresh() == 0
+        assert len(index.search("sqlite")) == 1
+
+        assert index.rebuild(jobs=1) == 2
+        assert len(index.search("tomatoes")) == 1
+
+    def test_other_chats_are_indexed_as_conversations(self, index, temp_mind_dir):
+        """Test that a second chat's log is searched live and after archival."""
+        from datetime import datetime
+
+        from scripts.telegram import mind_archive
+
+        chat_dir = temp_mind_dir["conversations"] / "chat--100777"
+        chat_dir.mkdir()
+        (chat_dir / "2025-01-16.md").write_bytes(CONVERSATION.replace(b"tomatoes", b"cucumbers"))
+
+        assert index.refresh() == 3
+        [result] = index.search("cucumbers")
+        assert (result["source"], result["day"]) == ("conversations", "2025-01-16")
+
+        mind_archive.run(now=datetime(2025, 3, 1), mind_dir=temp_mind_dir["mind"])
+        assert not (chat_dir / "2025-01-16.md").exists()
+        assert index.rebuild(jobs=1) == 3
+        assert len(index.search("cucumbers")) == 1
+
+
+class TestSearch:
+    """Tests for MindIndex.search()."""
+
+    def test_search_returns_snippet_and_location(self, index):
+        """Test the fields of a result."""
+        index.refresh()
+
+        [result] = index.search("tomatoes")
+
+        assert result["source"] == "conversations"
+        assert result["day"] == "2025-01-15"
+        assert result["time"] == "12:31:02"
+        assert result["heading"] == "Claude (outgoing)"
+        assert "[tomatoes]" in result["snippet"]
+
+    def test_search_filters(self, index):
+        """Test --source and --since filters."""
+        index.refresh()
+
+        assert index.search("sqlite OR tomatoes", source="journal")[0]["source"] == "journal"
+        assert [r["day"] for r in index.search("sqlite OR tomatoes", since="2025-01-15")] == ["2025-01-15"]
+
+    def test_invalid_fts_syntax_falls_back_to_literal_words(self, index):
+        """Test that stray quotes or operators do not raise."""
+        index.refresh()
+
+        assert len(index.search('tomatoes "ripe')) == 1
+
+
+class TestRebuild:
+    """Tests for MindIndex.rebuild()."""
+
+    def test_rebuild_matches_incremental_index(self, index):
+        """Test that a rebuild produces the same entries as refreshing."""
+        index.refresh()
+        incremental = index.db.execute("SELECT path, offset, body FROM entries ORDER BY path, offset").fetchall()
+
+        assert index.rebuild(jobs=1) == 2
+
+        rebuilt = index.db.execute("SELECT path, offset, body FROM entries ORDER BY path, offset").fetchall()
+        assert rebuilt == incremental
+        assert index.refresh() == 0
+        assert len(index.search("sqlite")) == 1
+
+
+class TestMainFunction:
+    """Tests for the mind-search entry point."""
+
+    def test_main_prints_results(self, temp_mind_dir, monkeypatch, capsys):
+        """Test a query from the command line."""
+        from scripts.telegram.mind_search import main
+
+        (temp_mind_dir["journal"] / "2025-01-14.md").write_bytes(JOURNAL)
+        monkeypatch.setattr(sys, 'argv', ['mind-search', 'sqlite'])
+
+        main()
+
+        out = capsys.readouterr().out
+        assert out.startswith("2025-01-14 09:15 [journal]")
+        assert "[sqlite]" in out
+
+    def test_main_no_matches_exits_one(self, temp_mind_dir, monkeypatch):
+        """Test the exit code when nothing matches."""
+        from scripts.telegram.mind_search import main
+
+        monkeypatch.setattr(sys, 'argv', ['mind-search', 'nothing'])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
+
+    def test_main_requires_query(self, temp_mind_dir, monkeypatch):
+        """Test that a bare call is a usage error."""
+        from scripts.telegram.mind_search import main
+
+        monkeypatch.setattr(sys, 'argv', ['mind-search'])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 2
+
+    def test_main_rebuild(self, temp_mind_dir, monkeypatch, capsys):
+        """Test --rebuild without a query."""
+        from scripts.telegram.mind_search import main
+
+        (temp_mind_dir["journal"] / "2025-01-14.md").write_bytes(JOURNAL)
+        monkeypatch.setattr(sys, 'argv', ['mind-search', '--rebuild'])
+
+        main()
+
+        assert "Indexed 1 files" in capsys.readouterr().err
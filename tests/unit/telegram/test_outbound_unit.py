@@ -0,0 +1,247 @@
+"""
+Unit tests for scripts/telegram/outbound.py
+
+Tests token buckets and the flood-limit-aware scheduler on a fake clock.
+"""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the scheduler sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def recording_bot(clock):
+    """Bot whose send_message records (time, chat, text)."""
+    bot = Mock()
+    bot.sent = []
+
+    async def send_message(chat_id, text, **kwargs):
+        bot.sent.append((clock.now, chat_id, text))
+        return Mock(message_id=len(bot.sent))
+
+    bot.send_message = AsyncMock(side_effect=send_message)
+    return bot
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    def test_token_bucket_allows_burst_then_waits(self, clock):
+        """Test that capacity tokens are free and the next one costs 1/rate."""
+        from scripts.telegram.outbound import TokenBucket
+
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+        for _ in range(3):
+            assert bucket.wait_time() == 0
+            bucket.consume()
+
+        assert bucket.wait_time() == pytest.approx(0.5)
+
+    def test_token_bucket_refills_up_to_capacity(self, clock):
+        """Test that idle time never banks more than capacity."""
+        from scripts.telegram.outbound import TokenBucket
+
+        bucket = TokenBucket(rate=1, capacity=2, clock=clock)
+        bucket.consume()
+        bucket.consume()
+        clock.now += 100
+
+        assert bucket.wait_time() == 0
+        assert bucket.tokens == 2
+
+
+class TestOutboundScheduler:
+    """Tests for OutboundScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_send_returns_bot_result(self, clock, recording_bot):
+        """Test that send() resolves with the Bot's return value."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        scheduler = OutboundScheduler(recording_bot, clock=clock, sleep=clock.sleep)
+        message = await scheduler.send(1, "hello")
+
+        assert message.message_id == 1
+        assert scheduler.depth() == 0
+
+    @pytest.mark.asyncio
+    async def test_per_chat_rate_is_respected(self, clock, recording_bot):
+        """Test that a burst to one chat is paced at chat_rate after chat_burst."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        scheduler = OutboundScheduler(recording_bot, chat_rate=1, chat_burst=2, clock=clock, sleep=clock.sleep)
+        await asyncio.gather(*(scheduler.send(1, f"m{i}") for i in range(5)))
+
+        times = [t for t, _, _ in recording_bot.sent]
+        assert times[:2] == [0.0, 0.0]
+        assert times[2:] == pytest.approx([1.0, 2.0, 3.0])
+
+    @pytest.mark.asyncio
+    async def test_fifo_order_per_chat(self, clock, recording_bot):
+        """Test that messages to one chat go out in submission order."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        scheduler = OutboundScheduler(recording_bot, clock=clock, sleep=clock.sleep)
+        await asyncio.gather(*(scheduler.send(chat, f"{chat}-{i}") for i in range(4) for chat in (1, 2)))
+
+        for chat in (1, 2):
+            texts = [text for _, c, text in recording_bot.sent if c == chat]
+            assert texts == [f"{chat}-{i}" for i in range(4)]
+
+    @pytest.mark.asyncio
+    async def test_global_rate_is_respected(self, clock, recording_bot):
+        """Test that many chats together stay under the global rate."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        scheduler = OutboundScheduler(
+            recording_bot, global_rate=5, chat_burst=1, clock=clock, sleep=clock.sleep
+        )
+        await asyncio.gather(*(scheduler.send(chat, "hi") for chat in range(15)))
+
+        times = sorted(t for t, _, _ in recording_bot.sent)
+        # Never more than burst + rate * elapsed messages by any point in time
+        assert all(i + 1 <= 5 + 5 * t + 1e-9 for i, t in enumerate(times))
+        assert times[-1] == pytest.approx(2.0)
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_and_retries(self, clock, recording_bot):
+        """Test that RetryAfter delays the retry instead of dropping the message."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        original = recording_bot.send_message.side_effect
+        failures = [RetryAfter(7)]
+
+        async def flaky(chat_id, text, **kwargs):
+            if failures:
+                raise failures.pop()
+            return await original(chat_id, text, **kwargs)
+
+        recording_bot.send_message.side_effect = flaky
+        scheduler = OutboundScheduler(recording_bot, clock=clock, sleep=clock.sleep)
+
+        await scheduler.send(1, "eventually")
+
+        assert recording_bot.sent == [(pytest.approx(7.0), 1, "eventually")]
+
+    @pytest.mark.asyncio
+    async def test_retry_after_pauses_other_chats(self, clock, recording_bot):
+        """Test that a flood wait applies to every chat, not just the offender."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        original = recording_bot.send_message.side_effect
+        failures = [RetryAfter(timedelta(seconds=5))]
+
+        async def flaky(chat_id, text, **kwargs):
+            if chat_id == 1 and failures:
+                raise failures.pop()
+            return await original(chat_id, text, **kwargs)
+
+        recording_bot.send_message.side_effect = flaky
+        scheduler = OutboundScheduler(recording_bot, clock=clock, sleep=clock.sleep)
+
+        first = asyncio.create_task(scheduler.send(1, "a"))
+        await asyncio.sleep(0)
+        await asyncio.gather(first, scheduler.send(2, "b"))
+
+        assert all(t >= 5.0 for t, _, _ in recording_bot.sent)
+
+    @pytest.mark.asyncio
+    async def test_network_error_is_retried_with_backoff(self, clock, recording_bot):
+        """Test that transient network errors are retried."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        original = recording_bot.send_message.side_effect
+        failures = [NetworkError("reset"), NetworkError("reset")]
+
+        async def flaky(chat_id, text, **kwargs):
+            if failures:
+                raise failures.pop()
+            return await original(chat_id, text, **kwargs)
+
+        recording_bot.send_message.side_effect = flaky
+        scheduler = OutboundScheduler(recording_bot, clock=clock, sleep=clock.sleep)
+
+        await scheduler.send(1, "after errors")
+
+        assert clock.sleeps[:2] == [1.0, 2.0]
+        assert len(recording_bot.sent) == 1
+
+    @pytest.mark.asyncio
+    async def test_bad_request_fails_without_retry(self, clock, recording_bot):
+        """Test that invalid messages are not retried."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        recording_bot.send_message.side_effect = BadRequest("Message is too long")
+        scheduler = OutboundScheduler(recording_bot, clock=clock, sleep=clock.sleep)
+
+        with pytest.raises(BadRequest):
+            await scheduler.send(1, "x" * 5000)
+
+        assert recording_bot.send_message.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_timed_out_send_is_not_retried(self, clock, recording_bot):
+        """Test that a timed-out send is not repeated, as it may have arrived."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        recording_bot.send_message.side_effect = TimedOut()
+        scheduler = OutboundScheduler(recording_bot, clock=clock, sleep=clock.sleep)
+
+        with pytest.raises(TimedOut):
+            await scheduler.send(1, "maybe delivered")
+
+        assert recording_bot.send_message.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self, clock, recording_bot):
+        """Test that persistent flood errors eventually fail the message."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        recording_bot.send_message.side_effect = RetryAfter(1)
+        scheduler = OutboundScheduler(recording_bot, max_retries=2, clock=clock, sleep=clock.sleep)
+
+        with pytest.raises(RuntimeError):
+            await scheduler.send(1, "never")
+
+        assert recording_bot.send_message.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_depth_reports_waiting_messages(self, clock, recording_bot):
+        """Test queue depth while a chat is backed up."""
+        from scripts.telegram.outbound import OutboundScheduler
+
+        scheduler = OutboundScheduler(recording_bot, chat_burst=1, clock=clock, sleep=clock.sleep)
+        tasks = [asyncio.create_task(scheduler.send(1, f"m{i}")) for i in range(4)]
+        await asyncio.sleep(0)
+
+        assert scheduler.depth() == 4
+        assert scheduler.depths() == {"1": 4}
+
+        await asyncio.gather(*tasks)
+        assert scheduler.depth() == 0
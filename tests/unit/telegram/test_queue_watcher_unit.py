@@ -0,0 +1,226 @@
+"""
+Unit tests for scripts/telegram/queue_watcher.py
+
+Tests event parsing, debouncing and session notification with fake watchers.
+"""
+
+import struct
+import subprocess
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class FakeWatcher:
+    """Watcher that replays scripted batches of file names."""
+
+    def __init__(self, batches, stop, queue_dir=None):
+        self.batches = list(batches)
+        self.stop = stop
+        self.queue_dir = queue_dir
+
+    def wait(self, timeout):
+        if not self.batches:
+            self.stop.set()
+            return []
+        names = self.batches.pop(0)
+        if self.queue_dir is not None:
+            for name in names:
+                (self.queue_dir / name).write_text("From: x\n\nbody")
+        return names
+
+
+class TestHelpers:
+    """Tests for queue listing helpers."""
+
+    def test_is_queue_file_ignores_temp_files(self):
+        """Test that hidden temp files are not treated as messages."""
+        from scripts.telegram.queue_watcher import is_queue_file
+
+        assert is_queue_file("20250115-123045-000000-0000-1.msg") is True
+        assert is_queue_file(".20250115-123045-000000-0000-1.msg.tmp") is False
+        assert is_queue_file("notes.txt") is False
+
+    def test_pending_messages_sorted(self, temp_mind_dir):
+        """Test that pending messages are listed oldest first."""
+        from scripts.telegram.queue_watcher import pending_messages
+
+        for name in ["b.msg", "a.msg", ".c.msg.tmp"]:
+            (temp_mind_dir["queue"] / name).write_text("x")
+
+        assert pending_messages(temp_mind_dir["queue"]) == ["a.msg", "b.msg"]
+
+    def test_pending_messages_lane_order(self, temp_mind_dir):
+        """Test that user messages go first unless a lower lane has waited too long."""
+        from datetime import datetime, timedelta
+
+        from scripts.telegram.queue_watcher import pending_messages
+
+        def name(age, lane=""):
+            # Built by hand: next_message_name() never goes back in time
+            stamp = datetime.now() - timedelta(seconds=age)
+            return f"{stamp:%Y%m%d-%H%M%S-%f}-0000-1" + (f"@{lane}" if lane else "") + ".msg"
+
+        names = {
+            "stale_background": name(3600, "background"),
+            "system": name(20, "system"),
+            "user": name(10),
+            "background": name(5, "background"),
+        }
+        for name in names.values():
+            (temp_mind_dir["queue"] / name).write_text("x")
+
+        order = pending_messages(temp_mind_dir["queue"])
+
+        assert order == [names["stale_background"], names["user"], names["system"], names["background"]]
+
+    def test_pending_messages_missing_dir(self, tmp_path):
+        """Test that a missing queue directory counts as empty."""
+        from scripts.telegram.queue_watcher import pending_messages
+
+        assert pending_messages(tmp_path / "missing") == []
+
+    def test_parse_events_decodes_names(self):
+        """Test decoding of raw inotify_event records."""
+        from scripts.telegram.queue_watcher import _parse_masked_events
+
+        name = b"a.msg\0\0\0"
+        data = struct.pack("iIII", 1, 0x100, 0, len(name)) + name
+        data += struct.pack("iIII", 1, 0x8, 0, 0)
+
+        assert _parse_masked_events(data) == [(0x100, "a.msg")]
+
+    def test_format_notification_mentions_count_and_next(self):
+        """Test the notification text."""
+        from scripts.telegram.queue_watcher import format_notification
+
+        text = format_notification(["a.msg", "b.msg"])
+
+        assert text.startswith("[queue] 2 new messages")
+        assert "next: a.msg" in text
+        assert "mind-queue next" in text
+
+
+class TestWatch:
+    """Tests for the watch() loop."""
+
+    def test_watch_debounces_burst_into_one_notification(self, temp_mind_dir):
+        """Test that a burst of events produces a single notification."""
+        from scripts.telegram.queue_watcher import watch
+
+        stop = threading.Event()
+        watcher = FakeWatcher([["a.msg"], ["b.msg"], ["c.msg"]], stop, temp_mind_dir["queue"])
+        notify = Mock(return_value=True)
+
+        watch(temp_mind_dir["queue"], watcher, notify=notify, debounce=60, stop=stop)
+
+        notify.assert_called_once()
+        assert "3 new messages" in notify.call_args[0][0]
+
+    def test_watch_notifies_for_backlog_on_startup(self, temp_mind_dir):
+        """Test that messages queued while the watcher was down are announced."""
+        from scripts.telegram.queue_watcher import watch
+
+        (temp_mind_dir["queue"] / "old.msg").write_text("x")
+        stop = threading.Event()
+        notify = Mock(return_value=True)
+
+        watch(temp_mind_dir["queue"], FakeWatcher([], stop), notify=notify, stop=stop)
+
+        notify.assert_called_once()
+        assert "next: old.msg" in notify.call_args[0][0]
+
+    def test_watch_wakes_one_worker_per_entry(self, temp_mind_dir):
+        """Test that a pool gets as many nudges as entries wait, capped at its size."""
+        from scripts.telegram.queue_watcher import watch
+
+        for name in ("a.msg", "b.msg", "c.msg"):
+            (temp_mind_dir["queue"] / name).write_text("x")
+        notify = Mock(return_value=True)
+
+        stop = threading.Event()
+        watch(temp_mind_dir["queue"], FakeWatcher([], stop), notify=notify, stop=stop, workers=2)
+        assert notify.call_args[0][1] == 2
+
+        stop = threading.Event()
+        watch(temp_mind_dir["queue"], FakeWatcher([], stop), notify=notify, stop=stop, workers=4)
+        assert notify.call_args[0][1] == 3
+
+    def test_watch_idle_queue_sends_nothing(self, temp_mind_dir):
+        """Test that an idle queue never touches the session."""
+        from scripts.telegram.queue_watcher import watch
+
+        stop = threading.Event()
+        notify = Mock(return_value=True)
+
+        watch(temp_mind_dir["queue"], FakeWatcher([[], []], stop), notify=notify, stop=stop)
+
+        notify.assert_not_called()
+
+
+class TestNotifySession:
+    """Tests for notify_session()."""
+
+    def test_notify_session_success(self):
+        """Test that a zero exit status counts as delivered."""
+        from scripts.telegram.queue_watcher import notify_session
+
+        with patch('scripts.telegram.queue_watcher.subprocess.run') as mock_run:
+            mock_run.return_value = Mock(returncode=0, stderr="")
+            assert notify_session("hi") is True
+
+        assert mock_run.call_args[0][0][1:] == ["--count", "1", "hi"]
+
+    def test_notify_session_session_down(self):
+        """Test that a failing send_to_claude.sh is reported."""
+        from scripts.telegram.queue_watcher import notify_session
+
+        with patch('scripts.telegram.queue_watcher.subprocess.run') as mock_run:
+            mock_run.return_value = Mock(returncode=1, stderr="Error: Claude session is not running")
+            assert notify_session("hi") is False
+
+    def test_notify_session_missing_script(self):
+        """Test that a missing script does not crash the daemon."""
+        from scripts.telegram.queue_watcher import notify_session
+
+        with patch('scripts.telegram.queue_watcher.subprocess.run', side_effect=FileNotFoundError()):
+            assert notify_session("hi") is False
+
+    def test_notify_session_timeout(self):
+        """Test that a hung tmux call is abandoned."""
+        from scripts.telegram.queue_watcher import notify_session
+
+        with patch(
+            'scripts.telegram.queue_watcher.subprocess.run',
+            side_effect=subprocess.TimeoutExpired("send_to_claude.sh", 30),
+        ):
+            assert notify_session("hi") is False
+
+
+class TestMakeWatcher:
+    """Tests for backend selection."""
+
+    def test_make_watcher_scandir_backend(self, temp_mind_dir):
+        """Test that the scandir backend can be forced."""
+        from scripts.telegram.queue_watcher import ScandirWatcher, make_watcher
+
+        assert isinstance(make_watcher(temp_mind_dir["queue"], "scandir"), ScandirWatcher)
+
+    def test_make_watcher_falls_back_without_inotify(self, temp_mind_dir):
+        """Test the automatic fallback when inotify is missing."""
+        from scripts.telegram.queue_watcher import ScandirWatcher, make_watcher
+
+        with patch('scripts.telegram.queue_watcher._load_libc', return_value=None):
+            watcher = make_watcher(temp_mind_dir["queue"], "auto")
+
+        assert isinstance(watcher, ScandirWatcher)
+
+    def test_make_watcher_inotify_required_raises(self, temp_mind_dir):
+        """Test that forcing inotify fails loudly when unavailable."""
+        from scripts.telegram.queue_watcher import make_watcher
+
+        with patch('scripts.telegram.queue_watcher._load_libc', return_value=None), pytest.raises(OSError):
+            make_watcher(temp_mind_dir["queue"], "inotify")
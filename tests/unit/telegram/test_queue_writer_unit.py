@@ -0,0 +1,260 @@
+"""
+Unit tests for scripts/telegram/queue_writer.py
+
+Tests queue file naming, atomic writes and the fsync policy.
+"""
+
+import sys
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def reset_name_state(monkeypatch):
+    """Start every test with a fresh monotonic name generator."""
+    import scripts.telegram.queue_writer as queue_writer_module
+
+    monkeypatch.setattr(queue_writer_module, '_last_stamp', None)
+    monkeypatch.setattr(queue_writer_module, '_sequence', 0)
+
+
+class TestNextMessageName:
+    """Tests for next_message_name()."""
+
+    def test_next_message_name_same_instant_is_unique(self):
+        """Test that names generated for the same instant never collide."""
+        from scripts.telegram.queue_writer import next_message_name
+
+        now = datetime(2025, 1, 15, 12, 30, 45)
+        names = [next_message_name(now) for _ in range(500)]
+
+        assert len(set(names)) == 500
+
+    def test_next_message_name_sorts_in_generation_order(self):
+        """Test that names sort in the order they were generated."""
+        from scripts.telegram.queue_writer import next_message_name
+
+        now = datetime(2025, 1, 15, 12, 30, 45)
+        names = [next_message_name(now) for _ in range(20)]
+        names.append(next_message_name(datetime(2025, 1, 15, 12, 30, 46)))
+
+        assert sorted(names) == names
+
+    def test_next_message_name_never_goes_backwards(self):
+        """Test that a clock stepping backwards does not reorder names."""
+        from scripts.telegram.queue_writer import next_message_name
+
+        first = next_message_name(datetime(2025, 1, 15, 12, 30, 45))
+        second = next_message_name(datetime(2025, 1, 15, 12, 0, 0))
+
+        assert second > first
+        assert second.startswith("20250115-123045-")
+
+    def test_next_message_name_with_suffix(self):
+        """Test that the suffix is appended before the extension."""
+        from scripts.telegram.queue_writer import next_message_name
+
+        name = next_message_name(datetime(2025, 1, 15, 12, 30, 45), suffix="reflection")
+
+        assert name.startswith("20250115-123045-000000-0000-")
+        assert name.endswith("-reflection.msg")
+
+    def test_lane_tag_round_trips(self):
+        """Test that lower lanes are tagged in the name and read back by lane_of()."""
+        from scripts.telegram.queue_writer import lane_of, name_time, next_message_name
+
+        now = datetime(2025, 1, 15, 12, 30, 45)
+        name = next_message_name(now, suffix="reflection", lane="system")
+
+        assert name.endswith("-reflection@system.msg")
+        assert lane_of(name) == "system"
+        assert lane_of(next_message_name(now)) == "interactive"
+        assert lane_of("#7@background") == "background"
+        assert lane_of("odd@name.msg") == "interactive"
+        assert name_time(name) == now
+        assert name_time("notes.msg") is None
+
+    def test_chat_tag_round_trips(self):
+        """Test that a chat shard is tagged before the lane and read back by chat_of()."""
+        from scripts.telegram.queue_writer import chat_of, lane_of, next_message_name
+
+        name = next_message_name(datetime(2025, 1, 15, 12, 30, 45), lane="system", chat="-100777")
+
+        assert name.endswith("+-100777@system.msg")
+        assert (chat_of(name), lane_of(name)) == ("-100777", "system")
+        assert chat_of(next_message_name()) == ""
+
+    def test_fair_order_lets_chats_take_turns(self):
+        """Test that chats alternate within a rank, least recently served first, in order per chat."""
+        from scripts.telegram.queue_writer import fair_order
+
+        entries = [(0, "", "a1"), (0, "", "a2"), (0, "", "a3"), (0, "7", "b1"), (0, "7", "b2"), (1, "8", "c1")]
+
+        assert fair_order(entries) == ["a1", "b1", "a2", "b2", "a3", "c1"]
+        assert fair_order(entries, {"": 100.0, "7": 50.0}) == ["b1", "a1", "b2", "a2", "a3", "c1"]
+
+    def test_lane_rank_ages_into_first_place(self, monkeypatch):
+        """Test that a lower lane ranks with interactive once it has waited its max wait."""
+        from scripts.telegram import queue_writer
+
+        monkeypatch.setitem(queue_writer.LANE_MAX_WAIT, "system", 300.0)
+
+        assert queue_writer.lane_rank("interactive", 0) == 0
+        assert queue_writer.lane_rank("system", 10) == 1
+        assert queue_writer.lane_rank("system", 300) == 0
+
+
+class TestWriteMessage:
+    """Tests for write_message()."""
+
+    def test_write_message_creates_complete_file(self, temp_mind_dir):
+        """Test that the queued file contains the full content."""
+        from scripts.telegram.queue_writer import write_message
+
+        filename = write_message("From: a\nTime: t\n\nbody", queue_dir=temp_mind_dir["queue"])
+
+        assert (temp_mind_dir["queue"] / filename).read_text() == "From: a\nTime: t\n\nbody"
+
+    def test_write_message_leaves_no_temp_files(self, temp_mind_dir):
+        """Test that the hidden temp file is removed after the rename."""
+        from scripts.telegram.queue_writer import write_message
+
+        write_message("body", queue_dir=temp_mind_dir["queue"])
+
+        assert [p.name for p in temp_mind_dir["queue"].iterdir() if p.name.startswith(".")] == []
+
+    def test_write_message_does_not_overwrite_existing_file(self, temp_mind_dir, monkeypatch):
+        """Test that a name collision picks a fresh name instead of clobbering."""
+        import scripts.telegram.queue_writer as queue_writer_module
+
+        now = datetime(2025, 1, 15, 12, 30, 45)
+        taken = queue_writer_module.next_message_name(now)
+        (temp_mind_dir["queue"] / taken).write_text("original")
+        monkeypatch.setattr(queue_writer_module, '_last_stamp', None)
+
+        filename = queue_writer_module.write_message("new", queue_dir=temp_mind_dir["queue"], now=now)
+
+        assert filename != taken
+        assert (temp_mind_dir["queue"] / taken).read_text() == "original"
+
+    def test_write_message_default_queue_dir(self, temp_mind_dir):
+        """Test that MESSAGE_QUEUE_DIR is used when no directory is given."""
+        from scripts.telegram.queue_writer import write_message
+
+        filename = write_message("body")
+
+        assert (temp_mind_dir["queue"] / filename).exists()
+
+    @pytest.mark.parametrize("policy,expected_calls", [("none", 0), ("file", 1), ("full", 2)])
+    def test_write_message_fsync_policy(self, temp_mind_dir, policy, expected_calls):
+        """Test how many fsync calls each policy makes."""
+        from scripts.telegram.queue_writer import write_message
+
+        with patch('scripts.telegram.queue_writer.os.fsync') as mock_fsync:
+            write_message("body", queue_dir=temp_mind_dir["queue"], fsync=policy)
+
+        assert mock_fsync.call_count == expected_calls
+
+    def test_write_message_unknown_policy_raises(self, temp_mind_dir):
+        """Test that an unknown fsync policy is rejected."""
+        from scripts.telegram.queue_writer import write_message
+
+        with pytest.raises(ValueError):
+            write_message("body", queue_dir=temp_mind_dir["queue"], fsync="sometimes")
+
+
+class TestFormatMessage:
+    """Tests for format_message()."""
+
+    def test_format_message_headers(self):
+        """Test the From/Time header layout."""
+        from scripts.telegram.queue_writer import format_message
+
+        content = format_message("Hi", "alice", datetime(2025, 1, 15, 12, 30, 45))
+
+        assert content == "From: alice\nTime: 2025-01-15T12:30:45\n\nHi"
+
+    def test_format_message_with_id(self):
+        """Test that a trace ID is added as an Id header."""
+        from scripts.telegram.queue_writer import format_message
+
+        content = format_message("Hi", "alice", datetime(2025, 1, 15, 12, 30, 45), message_id="abc123")
+
+        assert content == "From: alice\nTime: 2025-01-15T12:30:45\nId: abc123\n\nHi"
+
+
+class TestFormatBatch:
+    """Tests for format_batch()."""
+
+    def test_format_batch_single_message_matches_format_message(self):
+        """Test that a one-message batch is an ordinary queue entry."""
+        from scripts.telegram.queue_writer import format_batch
+
+        content = format_batch([{"text": "Hi", "from": "alice", "time": "2025-01-15T12:30:45", "id": "abc"}])
+
+        assert content == "From: alice\nTime: 2025-01-15T12:30:45\nId: abc\n\nHi"
+
+    def test_format_batch_keeps_every_timestamp(self):
+        """Test that a burst lists all IDs and prefixes each message with its time."""
+        from scripts.telegram.queue_writer import format_batch
+
+        content = format_batch([
+            {"text": "first", "from": "alice", "time": "2025-01-15T12:30:45", "id": "a1"},
+            {"text": "second\nline", "from": "alice", "time": "2025-01-15T12:30:47", "id": "b2"},
+        ])
+
+        assert content == (
+            "From: alice\nTime: 2025-01-15T12:30:45\nId: a1 b2\nMessages: 2\n\n"
+            "[12:30:45] first\n\n[12:30:47] second\nline"
+        )
+
+    def test_format_batch_references_attachments(self):
+        """Test that an attachment is rendered as a path reference above its caption."""
+        from scripts.telegram.queue_writer import format_batch
+
+        photo = {"kind": "photo", "path": "/m/attachments/ab/ab12.jpg", "size": 2048}
+        document = dict(photo, kind="document", path="/m/attachments/cd/cd34.pdf", name="report.pdf")
+        content = format_batch([
+            {"text": "look", "from": "alice", "time": "2025-01-15T12:30:45", "attachment": photo},
+            {"text": "", "from": "alice", "time": "2025-01-15T12:30:47", "attachment": document},
+        ])
+
+        assert content.endswith(
+            "[12:30:45] [photo: /m/attachments/ab/ab12.jpg (2048 bytes)]\nlook\n\n"
+            "[12:30:47] [document: /m/attachments/cd/cd34.pdf (report.pdf, 2048 bytes)]"
+        )
+
+
+class TestMainFunction:
+    """Tests for the queue_writer CLI."""
+
+    def test_main_reads_stdin(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that the CLI queues stdin with the given sender and suffix."""
+        from scripts.telegram.queue_writer import main
+
+        monkeypatch.setattr(sys, 'stdin', StringIO("Reflect now"))
+        monkeypatch.setattr(sys, 'argv', ['queue_writer.py', '--from', 'system', '--suffix', 'reflection'])
+
+        main()
+
+        files = list(temp_mind_dir["queue"].glob("*-reflection@system.msg"))
+        assert len(files) == 1
+        assert files[0].read_text().startswith("From: system\n")
+        assert str(files[0]) in capsys.readouterr().out
+
+    def test_main_empty_message_exits_with_error(self, temp_mind_dir, monkeypatch):
+        """Test that an empty body is rejected."""
+        from scripts.telegram.queue_writer import main
+
+        monkeypatch.setattr(sys, 'stdin', StringIO("   "))
+        monkeypatch.setattr(sys, 'argv', ['queue_writer.py'])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
@@ -0,0 +1,223 @@
+"""
+Unit tests for scripts/telegram/reflection_scheduler.py
+
+Tests when reflections are queued, deferred, collapsed and spaced out, with
+a fake clock, queue and session.
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+HOUR = 3600.0
+
+
+class FakeMind:
+    """Clock, queue listing, session state and conversation activity."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.pending = []
+        self.alive = True
+        self.activity = 0.0
+        self.queued = []
+
+    def trigger(self):
+        name = f"{len(self.queued)}-reflection@system.msg"
+        self.queued.append(name)
+        self.pending.append(name)
+        return name
+
+    def scheduler(self, state_path, **kwargs):
+        from scripts.telegram.reflection_scheduler import ReflectionScheduler
+
+        return ReflectionScheduler(
+            lambda: list(self.pending),
+            trigger=self.trigger,
+            alive=lambda: self.alive,
+            activity=lambda: self.activity,
+            state_path=state_path,
+            interval=HOUR,
+            max_interval=4 * HOUR,
+            clock=lambda: self.now,
+            **kwargs,
+        )
+
+
+@pytest.fixture
+def mind():
+    return FakeMind()
+
+
+@pytest.fixture
+def state_path(temp_mind_dir):
+    return temp_mind_dir["mind"] / "state" / "reflection.json"
+
+
+def _started(mind, state_path):
+    """A scheduler whose first reflection is due now."""
+    scheduler = mind.scheduler(state_path)
+    assert scheduler.check() == "not_due"
+    mind.now += HOUR
+    return scheduler
+
+
+class TestCheck:
+    """Tests for ReflectionScheduler.check()."""
+
+    def test_first_start_waits_one_interval(self, mind, state_path):
+        """Test that a fresh install counts from startup instead of firing at once."""
+        scheduler = mind.scheduler(state_path)
+
+        assert scheduler.check() == "not_due"
+        mind.now += HOUR - 1
+        assert scheduler.check() == "not_due"
+        mind.now += 1
+        assert scheduler.check() == "queued"
+        assert mind.queued == ["0-reflection@system.msg"]
+
+    def test_session_down_defers_and_missed_ticks_collapse(self, mind, state_path):
+        """Test that hours without a session produce a single reflection afterwards."""
+        scheduler = _started(mind, state_path)
+        mind.alive = False
+
+        for _ in range(5):
+            assert scheduler.check() == "session_down"
+            mind.now += HOUR
+
+        mind.alive = True
+        assert scheduler.check() == "queued"
+        mind.pending.clear()
+        assert scheduler.check() == "not_due"
+        assert len(mind.queued) == 1
+
+    def test_user_messages_go_first(self, mind, state_path):
+        """Test that a reflection waits while interactive messages are queued."""
+        scheduler = _started(mind, state_path)
+        mind.pending = ["20250115-123045-000000-0000-1.msg", "#4@background"]
+
+        assert scheduler.check() == "busy"
+
+        mind.pending = ["#4@background"]
+        assert scheduler.check() == "queued"
+
+    def test_unread_reflection_blocks_the_next(self, mind, state_path):
+        """Test that prompts do not pile up while the last one is still queued."""
+        scheduler = _started(mind, state_path)
+        assert scheduler.check() == "queued"
+
+        mind.now += 3 * HOUR
+        assert scheduler.check() == "pending"
+
+        mind.pending.clear()
+        assert scheduler.check() == "queued"
+        assert len(mind.queued) == 2
+
+    def test_idle_interval_doubles_and_activity_resets_it(self, mind, state_path):
+        """Test that quiet periods space reflections out up to the ceiling."""
+        scheduler = _started(mind, state_path)
+        intervals = []
+        for _ in range(4):
+            mind.now = scheduler.due()
+            assert scheduler.check() == "queued"
+            mind.pending.clear()
+            intervals.append(scheduler.interval)
+
+        assert intervals == [2 * HOUR, 4 * HOUR, 4 * HOUR, 4 * HOUR]
+
+        mind.now += 10
+        mind.activity = mind.now
+        assert scheduler.check() == "not_due"
+        assert scheduler.interval == HOUR
+
+    def test_failed_trigger_retries(self, mind, state_path):
+        """Test that a failing reflection_cron.sh is tried again on the next check."""
+        scheduler = _started(mind, state_path)
+        scheduler.trigger = Mock(return_value=None)
+
+        assert scheduler.check() == "failed"
+        assert scheduler.check() == "failed"
+        assert scheduler.trigger.call_count == 2
+
+    def test_state_survives_restart(self, mind, state_path):
+        """Test that a restarted scheduler keeps the schedule and the queued prompt."""
+        scheduler = _started(mind, state_path)
+        scheduler.check()
+
+        restarted = mind.scheduler(state_path)
+
+        assert restarted.due() == scheduler.due()
+        assert restarted.queued == "0-reflection@system.msg"
+        assert json.loads(state_path.read_text())["interval"] == 2 * HOUR
+
+    def test_unreadable_state_is_ignored(self, mind, state_path):
+        """Test that a corrupt state file starts a fresh schedule."""
+        state_path.parent.mkdir(parents=True)
+        state_path.write_text("{not json")
+
+        assert mind.scheduler(state_path).last is None
+
+
+class TestHelpers:
+    """Tests for the module helpers."""
+
+    def test_queued_name_for_both_backends(self):
+        """Test mapping queue_writer.py output to queue names."""
+        from scripts.telegram.reflection_scheduler import queued_name
+
+        assert queued_name("/home/dev/workspace/mind/message_queue/a-reflection@system.msg\n") == \
+            "a-reflection@system.msg"
+        assert queued_name("/home/dev/workspace/mind/message_queue.db#12@system") == "#12@system"
+
+    def test_run_reflection_parses_script_output(self):
+        """Test that the queued name is taken from reflection_cron.sh's last line."""
+        from scripts.telegram.reflection_scheduler import run_reflection
+
+        with patch('scripts.telegram.reflection_scheduler.subprocess.run') as mock_run:
+            mock_run.return_value = Mock(
+                returncode=0, stdout="Reflection prompt queued: /mind/message_queue/x@system.msg\n", stderr="",
+            )
+            assert run_reflection() == "x@system.msg"
+
+            mock_run.return_value = Mock(returncode=1, stdout="", stderr="Error: failed")
+            assert run_reflection() is None
+
+    def test_session_alive_without_tmux(self):
+        """Test that a missing tmux binary counts as no session."""
+        from scripts.telegram.reflection_scheduler import session_alive
+
+        with patch('scripts.telegram.reflection_scheduler.subprocess.run', side_effect=FileNotFoundError()):
+            assert session_alive() is False
+
+    def test_last_activity_is_newest_conversation_write(self, temp_mind_dir):
+        """Test that activity comes from the conversation logs' mtimes."""
+        import os
+
+        from scripts.telegram.reflection_scheduler import last_activity
+
+        assert last_activity() == 0.0
+        log = temp_mind_dir["conversations"] / "2025-01-15.md"
+        log.write_text("x")
+        os.utime(log, (1000, 1000))
+
+        assert last_activity() == 1000
+
+    def test_last_activity_includes_secondary_chats(self, temp_mind_dir):
+        """Test that a write to another chat's chat-<id>/ log counts as activity."""
+        import os
+
+        from scripts.telegram.reflection_scheduler import last_activity
+
+        primary = temp_mind_dir["conversations"] / "2025-01-15.md"
+        primary.write_text("x")
+        os.utime(primary, (1000, 1000))
+        chat_dir = temp_mind_dir["conversations"] / "chat-67890"
+        chat_dir.mkdir()
+        log = chat_dir / "2025-01-15.md"
+        log.write_text("y")
+        os.utime(log, (2000, 2000))
+
+        assert last_activity() == 2000
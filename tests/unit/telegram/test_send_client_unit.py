@@ -0,0 +1,173 @@
+"""
+Unit tests for scripts/telegram/send_client.py
+
+Tests the thin send-telegram client and its fallback to the direct path.
+"""
+
+import sys
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class TestSendViaDaemon:
+    """Tests for send_via_daemon()."""
+
+    def test_send_via_daemon_no_socket_returns_none(self, temp_mind_dir):
+        """Test that a missing daemon is reported as unreachable."""
+        from scripts.telegram.send_client import send_via_daemon
+
+        assert send_via_daemon("Hello") is None
+
+    def test_send_via_daemon_stale_socket_returns_none(self, tmp_path):
+        """Test that a leftover socket file without a listener is unreachable."""
+        import socket
+        import tempfile
+        from pathlib import Path
+
+        from scripts.telegram.send_client import send_via_daemon
+
+        with tempfile.TemporaryDirectory(dir="/tmp") as short_dir:
+            path = Path(short_dir) / "s.sock"
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.bind(str(path))
+            sock.close()  # bound but never listening
+
+            assert send_via_daemon("Hello", path) is None
+
+
+    def test_stream_via_daemon_no_socket_leaves_input_unread(self, temp_mind_dir):
+        """Test that stdin is not consumed when the daemon is unreachable."""
+        from scripts.telegram.send_client import stream_via_daemon
+
+        chunks = iter(["a", "b"])
+
+        assert stream_via_daemon(chunks) is None
+        assert list(chunks) == ["a", "b"]
+
+
+class TestMainFunction:
+    """Tests for the send-telegram entry point."""
+
+    def test_main_uses_daemon_when_available(self, mock_env, temp_mind_dir, monkeypatch):
+        """Test that the daemon path is used and the direct path is skipped."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', 'Hello', 'daemon'])
+
+        with patch('scripts.telegram.send_client.send_via_daemon', return_value=True) as mock_daemon, \
+                patch('scripts.telegram.send_client.send_direct') as mock_direct, \
+                pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 0
+        mock_daemon.assert_called_once_with("Hello daemon", chat=None)
+        mock_direct.assert_not_called()
+
+    def test_main_chat_option_names_the_chat(self, mock_env, temp_mind_dir, monkeypatch):
+        """Test that --chat sends to another chat, through the daemon or directly."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', '--chat', '-100777', 'Hello', 'group'])
+
+        with patch('scripts.telegram.send_client.send_via_daemon', return_value=None) as mock_daemon, \
+                patch('scripts.telegram.send_client.send_direct', return_value=True) as mock_direct, \
+                pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 0
+        mock_daemon.assert_called_once_with("Hello group", chat="-100777")
+        mock_direct.assert_called_once_with("Hello group", "-100777")
+
+    def test_main_daemon_failure_does_not_fall_back(self, mock_env, temp_mind_dir, monkeypatch):
+        """Test that a failed daemon send is not retried directly (no duplicates)."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', 'Hello'])
+
+        with patch('scripts.telegram.send_client.send_via_daemon', return_value=False), \
+                patch('scripts.telegram.send_client.send_direct') as mock_direct, \
+                pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
+        mock_direct.assert_not_called()
+
+    def test_main_falls_back_to_direct_send(
+        self, mock_env, mock_telegram_bot, temp_mind_dir, monkeypatch
+    ):
+        """Test the direct Bot path when no daemon is running."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', 'Fallback'])
+
+        with patch('scripts.telegram.send_message.Bot', return_value=mock_telegram_bot), \
+                pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 0
+        mock_telegram_bot.send_message.assert_called_once_with(chat_id="12345", text="Fallback")
+
+    def test_main_stream_falls_back_to_direct(self, temp_mind_dir, monkeypatch):
+        """Test that --stream uses the direct path only when no daemon is running."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', '--stream'])
+
+        with patch('scripts.telegram.send_client.stream_via_daemon', return_value=None), \
+                patch('scripts.telegram.send_client.stream_direct', return_value=True) as mock_direct, \
+                pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 0
+        mock_direct.assert_called_once()
+
+    def test_main_stats_prints_depth(self, temp_mind_dir, monkeypatch, capsys):
+        """Test the --stats flag."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', '--stats'])
+        stats = {"ok": True, "depth": 2, "chats": {"12345": 2}}
+
+        with patch('scripts.telegram.send_client.daemon_stats', return_value=stats), \
+                pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 0
+        assert "Outbound queue depth: 2" in capsys.readouterr().out
+
+    def test_main_stats_without_daemon(self, temp_mind_dir, monkeypatch):
+        """Test --stats when the daemon is down."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', '--stats'])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
+
+    def test_main_no_input_exits_with_error(self, monkeypatch):
+        """Test usage error without arguments or piped input."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram'])
+        monkeypatch.setattr(sys.stdin, 'isatty', lambda: True)
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
+
+    def test_main_empty_message_exits_with_error(self, monkeypatch):
+        """Test that an empty message is rejected."""
+        from scripts.telegram.send_client import main
+
+        monkeypatch.setattr(sys, 'argv', ['send-telegram', ''])
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
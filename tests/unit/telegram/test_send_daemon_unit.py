@@ -0,0 +1,203 @@
+"""
+Unit tests for scripts/telegram/send_daemon.py
+
+Tests message delivery and the line-based JSON protocol with a mocked Bot.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _client(request: bytes, limit: int = 2 ** 16):
+    reader = asyncio.StreamReader(limit=limit)
+    reader.feed_data(request)
+    reader.feed_eof()
+    writer = Mock()
+    writer.drain = AsyncMock()
+    return reader, writer
+
+
+def _reply(writer) -> dict:
+    return json.loads(writer.write.call_args[0][0])
+
+
+class TestDeliver:
+    """Tests for SendDaemon.deliver()."""
+
+    @pytest.mark.asyncio
+    async def test_deliver_sends_and_logs(self, mock_telegram_bot, temp_mind_dir, fixed_datetime):
+        """Test that a delivered message is sent once and logged."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        daemon = SendDaemon(mock_telegram_bot, "12345")
+        result = await daemon.deliver("Hello")
+
+        assert result == {"ok": True}
+        mock_telegram_bot.send_message.assert_called_once_with(chat_id="12345", text="Hello")
+        content = (temp_mind_dir["conversations"] / "2025-01-15.md").read_text()
+        assert "Hello" in content
+
+    @pytest.mark.asyncio
+    async def test_deliver_reports_api_error(self, mock_telegram_bot, temp_mind_dir):
+        """Test that API errors are returned instead of raised."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        mock_telegram_bot.send_message.side_effect = Exception("Network error")
+        daemon = SendDaemon(mock_telegram_bot, "12345")
+
+        result = await daemon.deliver("Hello")
+
+        assert result == {"ok": False, "error": "Network error"}
+
+    @pytest.mark.asyncio
+    async def test_deliver_to_another_allowed_chat(self, mock_telegram_bot, temp_mind_dir, fixed_datetime):
+        """Test that a named chat must be allowed and is logged to its own conversation file."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        daemon = SendDaemon(mock_telegram_bot, "12345", ["12345", "-100777"])
+
+        assert await daemon.deliver("Hi team", chat="-100777") == {"ok": True}
+        result = await daemon.deliver("Hi stranger", chat="999")
+
+        assert result == {"ok": False, "error": "chat 999 is not in TELEGRAM_CHAT_ID"}
+        mock_telegram_bot.send_message.assert_called_once_with(chat_id="-100777", text="Hi team")
+        assert "Hi team" in (temp_mind_dir["conversations"] / "chat--100777" / "2025-01-15.md").read_text()
+        assert not (temp_mind_dir["conversations"] / "2025-01-15.md").exists()
+
+
+class TestStream:
+    """Tests for the streaming request."""
+
+    @pytest.mark.asyncio
+    async def test_handle_client_stream_request(self, mock_telegram_bot, temp_mind_dir, fixed_datetime):
+        """Test that streamed chunks become one message edited in place."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        mock_telegram_bot.edit_message_text = AsyncMock()
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'{"op": "stream"}\n{"text": "Hello"}\n{"text": ", world"}\n')
+        reader.feed_eof()
+        writer = Mock()
+        writer.drain = AsyncMock()
+
+        await SendDaemon(mock_telegram_bot, "12345").handle_client(reader, writer)
+
+        assert _reply(writer) == {"ok": True}
+        mock_telegram_bot.send_message.assert_called_once_with(chat_id="12345", text="Hello")
+        content = (temp_mind_dir["conversations"] / "2025-01-15.md").read_text()
+        assert "Hello, world" in content
+
+    @pytest.mark.asyncio
+    async def test_stream_malformed_chunk(self, mock_telegram_bot, temp_mind_dir):
+        """Test that a bad chunk ends the stream with an error."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'not json\n')
+        reader.feed_eof()
+
+        result = await SendDaemon(mock_telegram_bot, "12345").stream(reader)
+
+        assert result == {"ok": False, "error": "malformed request"}
+        mock_telegram_bot.send_message.assert_not_called()
+
+
+class TestHandleClient:
+    """Tests for SendDaemon.handle_client()."""
+
+    @pytest.mark.asyncio
+    async def test_handle_client_valid_request(self, mock_telegram_bot, temp_mind_dir):
+        """Test a well-formed request round-trip."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        reader, writer = _client(b'{"text": "Hi"}\n')
+        await SendDaemon(mock_telegram_bot, "12345").handle_client(reader, writer)
+
+        assert _reply(writer) == {"ok": True}
+        writer.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_handle_client_malformed_request(self, mock_telegram_bot, temp_mind_dir):
+        """Test that garbage input gets an error reply and sends nothing."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        reader, writer = _client(b'not json\n')
+        await SendDaemon(mock_telegram_bot, "12345").handle_client(reader, writer)
+
+        assert _reply(writer)["ok"] is False
+        mock_telegram_bot.send_message.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_handle_client_empty_text(self, mock_telegram_bot, temp_mind_dir):
+        """Test that an empty message is rejected."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        reader, writer = _client(b'{"text": ""}\n')
+        await SendDaemon(mock_telegram_bot, "12345").handle_client(reader, writer)
+
+        assert _reply(writer) == {"ok": False, "error": "empty message"}
+
+    @pytest.mark.asyncio
+    async def test_handle_client_request_over_limit(self, mock_telegram_bot, temp_mind_dir):
+        """Test that a request longer than the stream limit is refused, not dropped."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        reader, writer = _client(b'{"text": "' + b"x" * 100 + b'"}\n', limit=32)
+        await SendDaemon(mock_telegram_bot, "12345").handle_client(reader, writer)
+
+        assert _reply(writer) == {"ok": False, "error": "request too large"}
+        mock_telegram_bot.send_message.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_handle_client_stats_request(self, mock_telegram_bot, temp_mind_dir):
+        """Test that the stats op reports the outbound queue depth."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        reader, writer = _client(b'{"op": "stats"}\n')
+        await SendDaemon(mock_telegram_bot, "12345").handle_client(reader, writer)
+
+        assert _reply(writer) == {"ok": True, "depth": 0, "chats": {}}
+        mock_telegram_bot.send_message.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_handle_client_unknown_op(self, mock_telegram_bot, temp_mind_dir):
+        """Test that unknown operations are rejected."""
+        from scripts.telegram.send_daemon import SendDaemon
+
+        reader, writer = _client(b'{"op": "explode"}\n')
+        await SendDaemon(mock_telegram_bot, "12345").handle_client(reader, writer)
+
+        assert _reply(writer)["ok"] is False
+
+
+class TestMainFunction:
+    """Tests for send_daemon main()."""
+
+    def test_main_missing_token_exits(self, monkeypatch):
+        """Test that the daemon refuses to start without a token."""
+        import scripts.telegram.send_message as send_module
+        from scripts.telegram.send_daemon import main
+
+        monkeypatch.setattr(send_module, 'BOT_TOKEN', None)
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
+
+    def test_main_missing_chat_id_exits(self, mock_env, monkeypatch):
+        """Test that the daemon refuses to start without a chat ID."""
+        import scripts.telegram.send_message as send_module
+        from scripts.telegram.send_daemon import main
+
+        monkeypatch.setattr(send_module, 'CHAT_ID', None)
+
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+
+        assert exc_info.value.code == 1
@@ -6,7 +6,7 @@ Tests CLI utility for sending Telegram messages.
 
 import pytest
 import sys
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 from io import StringIO
 
 pytestmark = pytest.mark.unit
@@ -89,6 +89,71 @@ class TestSendMessage:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_send_message_splits_long_text(self, mock_env, mock_telegram_bot, temp_mind_dir, fixed_datetime):
+        """Test that text over Telegram's limit goes out as several messages, logged once."""
+        from scripts.telegram.send_message import send_message
+
+        text = "\n\n".join(f"paragraph {i} " + "x" * 1000 for i in range(6))
+
+        with patch('scripts.telegram.send_message.Bot', return_value=mock_telegram_bot):
+            result = await send_message(text)
+
+        assert result is True
+        sent = [c.kwargs["text"] for c in mock_telegram_bot.send_message.call_args_list]
+        assert len(sent) == 2
+        assert "\n\n".join(sent) == text
+        content = (temp_mind_dir["conversations"] / "2025-01-15.md").read_text()
+        assert content.count("(outgoing)") == 1
+
+
+class TestStreamMessage:
+    """Tests for stream_message() async function."""
+
+    @staticmethod
+    async def _deltas(*parts):
+        for part in parts:
+            yield part
+
+    @pytest.mark.asyncio
+    async def test_stream_message_sends_and_logs(self, mock_env, mock_telegram_bot, temp_mind_dir, fixed_datetime):
+        """Test that streamed text is sent and the full text logged once."""
+        from scripts.telegram.send_message import stream_message
+
+        mock_telegram_bot.edit_message_text = AsyncMock()
+
+        with patch('scripts.telegram.send_message.Bot', return_value=mock_telegram_bot):
+            result = await stream_message(self._deltas("Hello", ", ", "world"))
+
+        assert result is True
+        mock_telegram_bot.send_message.assert_called_once_with(chat_id="12345", text="Hello")
+        assert mock_telegram_bot.edit_message_text.call_args.kwargs["text"] == "Hello, world"
+        content = (temp_mind_dir["conversations"] / "2025-01-15.md").read_text()
+        assert "Hello, world" in content
+
+    @pytest.mark.asyncio
+    async def test_stream_message_empty_input(self, mock_env, mock_telegram_bot, temp_mind_dir):
+        """Test that an empty stream fails without sending anything."""
+        from scripts.telegram.send_message import stream_message
+
+        with patch('scripts.telegram.send_message.Bot', return_value=mock_telegram_bot):
+            result = await stream_message(self._deltas("", "  "))
+
+        assert result is False
+        mock_telegram_bot.send_message.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_stream_message_api_error(self, mock_env, mock_telegram_bot, temp_mind_dir):
+        """Test handling of Telegram API errors while streaming."""
+        from scripts.telegram.send_message import stream_message
+
+        mock_telegram_bot.send_message.side_effect = Exception("Network error")
+
+        with patch('scripts.telegram.send_message.Bot', return_value=mock_telegram_bot):
+            result = await stream_message(self._deltas("Hello"))
+
+        assert result is False
+
 
 class TestMainFunction:
     """Tests for main() CLI function."""
@@ -0,0 +1,191 @@
+"""
+Unit tests for scripts/telegram/session_broker.py
+
+Tests idle detection, batching, backpressure and session loss with a fake
+pane instead of tmux.
+"""
+
+import asyncio
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+IDLE = "│ >                      │\n  ⏵⏵ bypass permissions on (shift+tab to cycle)\n"
+BUSY = "✻ Thinking… (3s · esc to interrupt)\n│ >                      │\n  ⏵⏵ bypass permissions on\n"
+
+
+class FakePane:
+    """A pane whose screen the test sets; submissions turn it busy."""
+
+    def __init__(self, screen=IDLE):
+        self.screen = screen
+        self.submitted = []
+
+    async def capture(self):
+        return self.screen
+
+    async def submit(self, text):
+        self.submitted.append(text)
+        self.screen = BUSY
+
+
+def _broker(pane, **kwargs):
+    from scripts.telegram.session_broker import SessionBroker
+
+    kwargs.setdefault("poll_interval", 0.01)
+    kwargs.setdefault("settle", 0.05)
+    return SessionBroker(pane, **kwargs)
+
+
+async def _until(predicate, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate() and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+    return predicate()
+
+
+class TestIsIdle:
+    """Tests for is_idle()."""
+
+    def test_screens(self):
+        """Test that only the idle input line without a running turn counts as idle."""
+        from scripts.telegram.session_broker import is_idle
+
+        assert is_idle(IDLE) is True
+        assert is_idle(BUSY) is False
+        assert is_idle("WARNING: Bypass Permissions mode\n ❯ 1. No, exit\n   2. Yes, I accept") is False
+        assert is_idle("Select login method:") is False
+
+
+class TestSessionBroker:
+    """Tests for SessionBroker."""
+
+    @pytest.mark.asyncio
+    async def test_inputs_wait_for_idle_and_go_as_one_batch(self):
+        """Test that inputs queued during a turn are submitted together once it ends."""
+        pane = FakePane(BUSY)
+        broker = _broker(pane)
+        stop = asyncio.Event()
+        runner = asyncio.create_task(broker.run(stop))
+
+        for text in ("[queue] 1 new message", "[queue] 2 new messages", "[queue] 2 new messages"):
+            assert (await broker.submit(text))["ok"] is True
+        await asyncio.sleep(0.1)
+        assert pane.submitted == []
+
+        pane.screen = IDLE
+        assert await _until(lambda: pane.submitted)
+        stop.set()
+        await runner
+
+        assert pane.submitted == ["[queue] 1 new message\n[queue] 2 new messages"]
+        assert broker.stats() == {"ok": True, "pending": 0, "delivered": 3, "batches": 1}
+
+    @pytest.mark.asyncio
+    async def test_wait_returns_after_delivery(self):
+        """Test that a waiting caller is answered once its input was typed."""
+        pane = FakePane()
+        broker = _broker(pane)
+        stop = asyncio.Event()
+        runner = asyncio.create_task(broker.run(stop))
+
+        reply = await broker.submit("hello", wait=True, timeout=2)
+        stop.set()
+        await runner
+
+        assert reply["ok"] is True
+        assert pane.submitted == ["hello"]
+
+    @pytest.mark.asyncio
+    async def test_next_batch_waits_for_the_turn(self):
+        """Test that input arriving right after a submission is not typed into the new turn."""
+        pane = FakePane()
+        broker = _broker(pane)
+        stop = asyncio.Event()
+        runner = asyncio.create_task(broker.run(stop))
+
+        await broker.submit("first", wait=True, timeout=2)
+        await broker.submit("second")
+        await asyncio.sleep(0.1)
+        assert pane.submitted == ["first"]
+
+        pane.screen = IDLE
+        assert await _until(lambda: len(pane.submitted) == 2)
+        stop.set()
+        await runner
+
+    @pytest.mark.asyncio
+    async def test_backpressure_when_full(self):
+        """Test that callers beyond max_pending are held back and then refused."""
+        broker = _broker(FakePane(BUSY), max_pending=2)
+
+        assert (await broker.submit("a"))["ok"] is True
+        assert (await broker.submit("b"))["ok"] is True
+        reply = await broker.submit("c", timeout=0.05)
+
+        assert reply["ok"] is False
+        assert "broker busy" in reply["error"]
+        assert broker.pending() == 2
+
+    @pytest.mark.asyncio
+    async def test_session_down(self):
+        """Test that input for a missing session is refused and pending input is failed."""
+        pane = FakePane(None)
+        broker = _broker(pane)
+
+        assert (await broker.submit("x"))["error"] == "Claude session is not running"
+
+        pane.screen = BUSY
+        stop = asyncio.Event()
+        runner = asyncio.create_task(broker.run(stop))
+        waiting = asyncio.create_task(broker.submit("y", wait=True, timeout=2))
+        await _until(lambda: broker.pending() == 1)
+        pane.screen = None
+        reply = await waiting
+        stop.set()
+        await runner
+
+        assert reply == {"ok": False, "error": "Claude session is not running"}
+        assert broker.pending() == 0
+
+
+class TestBrokerPool:
+    """Tests for BrokerPool (one broker per worker session)."""
+
+    @pytest.mark.asyncio
+    async def test_idle_workers_are_chosen_first(self):
+        """Test that a notification for two entries goes to the two idle workers."""
+        from scripts.telegram.session_broker import BrokerPool
+
+        panes = {"claude-mind-0": FakePane(BUSY), "claude-mind-1": FakePane(), "claude-mind-2": FakePane()}
+        pool = BrokerPool({name: _broker(pane) for name, pane in panes.items()})
+        stop = asyncio.Event()
+        runner = asyncio.create_task(pool.run(stop))
+
+        reply = await pool.submit("[queue] 2 new messages", count=2, wait=True, timeout=2)
+        stop.set()
+        await runner
+
+        assert reply["ok"] is True
+        assert reply["sessions"] == ["claude-mind-1", "claude-mind-2"]
+        assert panes["claude-mind-0"].submitted == []
+        stats = pool.stats()
+        assert stats["delivered"] == 2
+        assert stats["sessions"]["claude-mind-1"] == {"pending": 0, "delivered": 1, "batches": 1}
+
+    @pytest.mark.asyncio
+    async def test_named_and_missing_sessions(self):
+        """Test that input can target one worker, and that down workers are skipped."""
+        from scripts.telegram.session_broker import BrokerPool
+
+        panes = {"claude-mind-0": FakePane(None), "claude-mind-1": FakePane(BUSY)}
+        pool = BrokerPool({name: _broker(pane) for name, pane in panes.items()})
+
+        assert (await pool.submit("x"))["sessions"] == ["claude-mind-1"]
+        assert (await pool.submit("x", session="claude-mind-0"))["error"] == "Claude session is not running"
+        assert (await pool.submit("x", session="claude-mind-7"))["error"] == "unknown session: claude-mind-7"
+
+        panes["claude-mind-1"].screen = None
+        assert (await pool.submit("x"))["error"] == "Claude session is not running"
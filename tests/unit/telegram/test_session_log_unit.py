@@ -0,0 +1,182 @@
+"""
+Unit tests for scripts/telegram/session_log.py
+
+Tests the ring buffer, the time index, turn counting and the tail CLI.
+"""
+
+import argparse
+import json
+import os
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def log(temp_mind_dir):
+    from scripts.telegram.session_log import SessionLog
+
+    log = SessionLog(capacity=64, index_entries=8)
+    log.open()
+    yield log
+    log.close()
+
+
+def _run(monkeypatch, capsys, *argv):
+    from scripts.telegram.session_log import main
+
+    monkeypatch.setattr("sys.argv", ["session_log.py", *argv])
+    try:
+        main()
+        code = 0
+    except SystemExit as e:
+        code = e.code
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+class TestRingBuffer:
+    """Tests for SessionLog writes and reads."""
+
+    def test_ring_keeps_the_last_capacity_bytes(self, log):
+        """Test that the files stay bounded and hold the newest output."""
+        for i in range(20):
+            log.append(f"line {i:02d}\n".encode(), now=1000.0 + i)
+
+        assert os.path.getsize(log.ring_path) == 64
+        assert log.read(0) == b"".join(f"line {i:02d}\n".encode() for i in range(12, 20))[-64:]
+        assert log.length == 160
+
+    def test_oversized_write_keeps_its_tail(self, log):
+        """Test a single write larger than the ring."""
+        log.append(b"x" * 100 + b"END", now=1000.0)
+
+        assert log.read(0).endswith(b"END")
+        assert len(log.read(0)) == 64
+
+    def test_tail_since_reads_only_newer_output(self, log):
+        """Test that --since maps to an offset through the index."""
+        log.append(b"old\n", now=1000.0)
+        log.append(b"middle\n", now=1010.0)
+        log.append(b"new\n", now=1020.0)
+
+        assert log.tail(since=1005.0) == b"middle\nnew\n"
+        assert log.tail(since=1020.0) == b"new\n"
+        assert log.tail(since=2000.0) == b""
+        assert log.tail(since=1005.0, nbytes=4) == b"new\n"
+
+    def test_output_within_one_index_interval_is_included(self, log):
+        """Test that unindexed writes just after an entry are not lost to --since."""
+        log.append(b"a\n", now=1000.0)
+        log.append(b"b\n", now=1000.5)  # same index second
+
+        assert log.tail(since=1000.4) == b"a\nb\n"
+
+    def test_index_ring_wraps(self, log):
+        """Test that the index keeps working after more entries than it holds."""
+        for i in range(30):
+            log.append(f"{i:02d}\n".encode(), now=1000.0 + i * 2)
+
+        assert log.tail(since=1000.0 + 28 * 2) == b"28\n29\n"
+        assert log.tail(since=0) == log.read(0)
+
+    def test_reopen_continues_the_stream(self, temp_mind_dir):
+        """Test that a new recorder (session restart) appends instead of starting over."""
+        from scripts.telegram.session_log import SessionLog, read_header
+
+        first = SessionLog(capacity=64, index_entries=8)
+        first.open()
+        first.append(b"before\n", now=1000.0)
+        first.close()
+        second = SessionLog(capacity=64, index_entries=8)
+        second.open()
+        second.append(b"after\n", now=1001.0)
+        second.close()
+
+        assert second.read(0) == b"before\nafter\n"
+        assert read_header()["length"] == 13
+
+
+class TestTurns:
+    """Tests for derived session signals."""
+
+    def test_turns_count_busy_periods(self, log):
+        """Test that repeated spinner redraws in one turn count once."""
+        from scripts.telegram.session_log import read_header
+
+        log.append(b"Thinking (esc to ", now=1000.0)
+        log.append(b"interrupt)", now=1000.5)
+        log.append(b"Thinking (esc to interrupt)", now=1002.0)
+        log.append(b"> ", now=1010.0)
+        log.append(b"Working (esc to interrupt)", now=1020.0)
+
+        header = read_header()
+        assert header["turns"] == 2
+        assert header["last_turn"] == 1020.0
+        assert header["last_output"] == 1020.0
+
+    def test_active_seconds_counts_output_seconds(self, log):
+        """Test that only seconds with output since the given time count as active."""
+        for t in (1000.0, 1000.3, 1001.0, 1002.0, 1050.0, 1051.0):
+            log.append(b"x", now=t)
+
+        assert log.active_seconds(1000.0) == 5.0  # 1000.3 shares the 1000 entry
+        assert log.active_seconds(1010.0) == 2.0
+        assert log.active_seconds(2000.0) == 0.0
+
+    def test_workers_log_to_their_own_directory(self, temp_mind_dir):
+        """Test that the single session keeps session/ and pool workers get subdirectories."""
+        from scripts.telegram.session_log import log_dir
+
+        assert log_dir() == log_dir("claude-mind") == temp_mind_dir["mind"] / "session"
+        assert log_dir("claude-mind-2") == temp_mind_dir["mind"] / "session" / "claude-mind-2"
+
+
+class TestMainFunction:
+    """Tests for the session_log.py CLI."""
+
+    def test_record_then_tail_strips_escapes(self, temp_mind_dir, monkeypatch, capsys):
+        """Test the pipe-pane recorder and a plain tail."""
+        from scripts.telegram.session_log import SessionLog, record
+
+        r, w = os.pipe()
+        os.write(w, b"\x1b[2K\x1b[1;32mHello\x1b[0m\r\nworld\n")
+        os.close(w)
+        with os.fdopen(r, "rb") as stream:
+            record(SessionLog(), stream)
+
+        code, out, _ = _run(monkeypatch, capsys, "tail")
+        assert code == 0
+        assert out == "Hello\nworld\n"
+
+        _, out, _ = _run(monkeypatch, capsys, "tail", "--raw")
+        assert out.startswith("\x1b[2K")
+
+        _, out, _ = _run(monkeypatch, capsys, "stats", "--json")
+        assert json.loads(out)["length"] == 28
+
+    def test_stats_without_capture(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that stats reports when nothing was captured yet."""
+        code, _, err = _run(monkeypatch, capsys, "stats")
+
+        assert code == 1
+        assert "No session output captured" in err
+
+    def test_parse_since(self):
+        """Test relative and absolute --since values."""
+        from scripts.telegram.session_log import parse_since
+
+        assert parse_since("10m", now=10_000) == 9_400
+        assert parse_since("2h", now=10_000) == 2_800
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_since("yesterday-ish")
+
+    def test_parse_duration(self):
+        """Test that durations are read as seconds and ISO times are refused."""
+        from scripts.telegram.session_log import parse_duration
+
+        assert parse_duration("90s") == 90
+        assert parse_duration("1.5h") == 5_400
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_duration("2025-01-15T10:00:00")
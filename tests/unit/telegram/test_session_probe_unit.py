@@ -0,0 +1,150 @@
+"""
+Unit tests for scripts/telegram/session_probe.py
+
+Tests screen matching, polling with timeouts and the CLI with scripted
+pane captures.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+DIALOG = """\
+ WARNING: Claude Code running in Bypass Permissions mode
+
+ ❯ 1. No, exit
+   2. Yes, I accept
+"""
+
+ACCEPTED = DIALOG.replace("❯ 1.", "  1.").replace("   2. Yes", " ❯ 2. Yes")
+
+READY = """\
+╭──────────────────────────────────────────────╮
+│ >                                            │
+╰──────────────────────────────────────────────╯
+  ⏵⏵ bypass permissions on (shift+tab to cycle)
+"""
+
+
+class FakePane:
+    """Replays screens, one per capture, repeating the last; counts fake time."""
+
+    def __init__(self, *screens):
+        self.screens = list(screens)
+        self.now = 0.0
+
+    def capture(self):
+        return self.screens.pop(0) if len(self.screens) > 1 else self.screens[0]
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestMatchState:
+    """Tests for match_state()."""
+
+    def test_screens_map_to_states(self):
+        """Test that each startup screen is recognised."""
+        from scripts.telegram.session_probe import match_state
+
+        assert match_state(DIALOG, ["dialog", "ready"]) == "dialog"
+        assert match_state(DIALOG, ["accepted"]) is None
+        assert match_state(ACCEPTED, ["accepted"]) == "accepted"
+        assert match_state(READY, ["dialog", "ready"]) == "ready"
+        assert match_state("$ cd mind && claude", ["dialog", "ready"]) is None
+
+    def test_dialog_is_never_ready(self):
+        """Test that the dialog's option lines are not taken for the input line."""
+        from scripts.telegram.session_probe import match_state
+
+        assert match_state("│ > 1. No, exit\n│   2. Yes, I accept", ["ready"]) is None
+
+    def test_failure_screen_raises(self):
+        """Test that a missing claude binary is reported, not waited out."""
+        from scripts.telegram.session_probe import ProbeError, match_state
+
+        with pytest.raises(ProbeError, match="not installed"):
+            match_state("zsh: command not found: claude\nclaude: command not found", ["ready"])
+
+
+class TestWaitFor:
+    """Tests for wait_for() and wait_stopped()."""
+
+    def test_returns_as_soon_as_state_shows(self):
+        """Test that the wait ends on the first matching capture."""
+        from scripts.telegram.session_probe import wait_for
+
+        pane = FakePane("$ claude", "$ claude", DIALOG)
+
+        state = wait_for(["dialog", "ready"], 60, capture=pane.capture, clock=pane.clock, sleep=pane.sleep)
+
+        assert state == "dialog"
+        assert pane.now == pytest.approx(0.2)
+
+    def test_timeout_reports_last_screen(self):
+        """Test that a screen that never changes times out with its content."""
+        from scripts.telegram.session_probe import ProbeError, wait_for
+
+        pane = FakePane("Loading...")
+
+        with pytest.raises(ProbeError, match="timed out after 5s waiting for ready") as exc_info:
+            wait_for(["ready"], 5, capture=pane.capture, clock=pane.clock, sleep=pane.sleep)
+
+        assert exc_info.value.screen == "Loading..."
+
+    def test_session_exit_is_an_error(self):
+        """Test that a pane that disappears fails the wait immediately."""
+        from scripts.telegram.session_probe import ProbeError, wait_for
+
+        pane = FakePane("$ claude", None)
+
+        with pytest.raises(ProbeError, match="exited"):
+            wait_for(["ready"], 60, capture=pane.capture, clock=pane.clock, sleep=pane.sleep)
+
+    def test_wait_stopped(self):
+        """Test waiting for a killed session to go away, and giving up."""
+        from scripts.telegram.session_probe import ProbeError, wait_stopped
+
+        pane = FakePane("x", "x", None)
+        wait_stopped(10, capture=pane.capture, clock=pane.clock, sleep=pane.sleep)
+        assert pane.now == pytest.approx(0.2)
+
+        pane = FakePane("x")
+        with pytest.raises(ProbeError, match="still running"):
+            wait_stopped(1, capture=pane.capture, clock=pane.clock, sleep=pane.sleep)
+
+
+class TestMainFunction:
+    """Tests for the session_probe.py CLI."""
+
+    def test_wait_prints_state(self, monkeypatch, capsys):
+        """Test that the matched state is printed for the shell script."""
+        from scripts.telegram.session_probe import main
+
+        monkeypatch.setattr("sys.argv", ["session_probe.py", "wait", "dialog", "ready"])
+        with patch("scripts.telegram.session_probe.subprocess.run") as mock_run:
+            mock_run.return_value = Mock(returncode=0, stdout=READY)
+            main()
+
+        assert capsys.readouterr().out == "ready\n"
+        assert mock_run.call_args[0][0] == ["tmux", "capture-pane", "-p", "-t", "claude-mind"]
+
+    def test_failure_exits_with_screen(self, monkeypatch, capsys):
+        """Test that a failure screen exits non-zero and shows what was on screen."""
+        from scripts.telegram.session_probe import main
+
+        monkeypatch.setattr("sys.argv", ["session_probe.py", "wait", "ready"])
+        with patch("scripts.telegram.session_probe.subprocess.run") as mock_run:
+            mock_run.return_value = Mock(returncode=0, stdout="Select login method:\n 1. Claude account")
+            with pytest.raises(SystemExit) as exc_info:
+                main()
+
+        assert exc_info.value.code == 1
+        err = capsys.readouterr().err
+        assert "not logged in" in err
+        assert "Last screen:\nSelect login method:" in err
@@ -0,0 +1,67 @@
+"""
+Unit tests for scripts/telegram/unix_socket.py
+
+Tests the private socket set-up and request line reading shared by the daemons.
+"""
+
+import asyncio
+import socket
+import stat
+import tempfile
+from pathlib import Path
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+def _reader(data: bytes, limit: int = 2 ** 16) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader(limit=limit)
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+class TestBindPrivateUnixSocket:
+    """Tests for bind_private_unix_socket()."""
+
+    def test_replaces_stale_socket_and_is_private(self):
+        """Test that a leftover file is replaced and the socket is owner-only."""
+        from scripts.telegram.unix_socket import bind_private_unix_socket
+
+        with tempfile.TemporaryDirectory(dir="/tmp") as short_dir:
+            path = Path(short_dir) / "run" / "daemon.sock"
+            path.parent.mkdir()
+            path.write_text("stale")
+
+            server = bind_private_unix_socket(path)
+            try:
+                assert stat.S_ISSOCK(path.stat().st_mode)
+                assert stat.S_IMODE(path.stat().st_mode) == 0o600
+                client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                client.connect(str(path))
+                client.close()
+            finally:
+                server.close()
+
+
+class TestReadRequest:
+    """Tests for read_request()."""
+
+    @pytest.mark.asyncio
+    async def test_reads_one_line(self):
+        """Test a request with and without its newline."""
+        from scripts.telegram.unix_socket import read_request
+
+        assert await read_request(_reader(b'{"op": "stats"}\nrest')) == b'{"op": "stats"}\n'
+        assert await read_request(_reader(b'{"op": "stats"}')) == b'{"op": "stats"}'
+
+    @pytest.mark.asyncio
+    async def test_line_over_limit_is_drained(self):
+        """Test that an oversized line gives None and is read to its end."""
+        from scripts.telegram.unix_socket import read_request
+
+        reader = _reader(b"x" * 100 + b"\n", limit=32)
+
+        assert await read_request(reader) is None
+        assert reader.at_eof()
@@ -0,0 +1,96 @@
+"""
+Unit tests for scripts/telegram/update_checkpoint.py
+
+Tests the persisted update_id checkpoint and its bounded duplicate window.
+"""
+
+import json
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+
+class TestUpdateCheckpoint:
+    """Tests for UpdateCheckpoint."""
+
+    def test_survives_restart(self, tmp_path):
+        """Test that handled update_ids are still known after reloading."""
+        from scripts.telegram.update_checkpoint import UpdateCheckpoint
+
+        path = tmp_path / "state" / "updates.json"
+        checkpoint = UpdateCheckpoint(path)
+        assert not checkpoint.is_duplicate(10)
+        checkpoint.mark(10)
+        checkpoint.mark(12)
+        checkpoint.mark(11)
+
+        restarted = UpdateCheckpoint(path)
+
+        assert restarted.is_duplicate(10)
+        assert restarted.is_duplicate(11)
+        assert not restarted.is_duplicate(13)
+        assert restarted.last_update_id == 12
+        assert json.loads(path.read_text()) == {"last_update_id": 12, "recent": [10, 12, 11]}
+
+    def test_window_is_bounded(self, tmp_path):
+        """Test that old ids leave the window but still count as handled."""
+        from scripts.telegram.update_checkpoint import UpdateCheckpoint
+
+        path = tmp_path / "updates.json"
+        checkpoint = UpdateCheckpoint(path, window=3)
+        for update_id in range(1, 6):
+            checkpoint.mark(update_id)
+
+        assert json.loads(path.read_text())["recent"] == [3, 4, 5]
+        restarted = UpdateCheckpoint(path, window=3)
+        assert restarted.is_duplicate(1)
+        assert restarted.is_duplicate(5)
+        assert not restarted.is_duplicate(6)
+
+    def test_unreadable_file_starts_fresh(self, tmp_path):
+        """Test that a corrupt checkpoint is ignored rather than fatal."""
+        from scripts.telegram.update_checkpoint import UpdateCheckpoint
+
+        path = tmp_path / "updates.json"
+        path.write_text("{not json")
+        checkpoint = UpdateCheckpoint(path)
+
+        assert not checkpoint.is_duplicate(1)
+        assert checkpoint.last_update_id is None
+
+
+class TestResume:
+    """Tests for the polling start-up hook."""
+
+    @pytest.mark.asyncio
+    async def test_confirms_handled_updates(self, tmp_path):
+        """Test that start-up acknowledges everything up to the checkpoint."""
+        from scripts.telegram.update_checkpoint import UpdateCheckpoint
+
+        checkpoint = UpdateCheckpoint(tmp_path / "updates.json")
+        checkpoint.mark(41)
+        app = Mock()
+        app.bot.get_updates = AsyncMock(return_value=[])
+
+        await UpdateCheckpoint(tmp_path / "updates.json").resume(app)
+
+        app.bot.get_updates.assert_awaited_once_with(offset=42, limit=1, timeout=0)
+
+    @pytest.mark.asyncio
+    async def test_nothing_to_confirm_on_first_start(self, tmp_path):
+        """Test that a fresh install does not call getUpdates."""
+        from telegram.error import Conflict
+
+        from scripts.telegram.update_checkpoint import UpdateCheckpoint
+
+        app = Mock()
+        app.bot.get_updates = AsyncMock(side_effect=Conflict("webhook is active"))
+
+        await UpdateCheckpoint(tmp_path / "updates.json").resume(app)
+        app.bot.get_updates.assert_not_awaited()
+
+        UpdateCheckpoint(tmp_path / "updates.json").mark(1)
+        await UpdateCheckpoint(tmp_path / "updates.json").resume(app)  # error is logged, not raised
+        app.bot.get_updates.assert_awaited_once()
@@ -0,0 +1,123 @@
+"""
+Unit tests for scripts/telegram/webhook.py
+
+Tests the webhook receiver's HTTP handling and secret-token validation.
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+SECRET = "s3cret"
+
+
+async def _request(port, body=b"{}", secret=SECRET, path="/telegram/webhook", method="POST", extra=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"{method} {path} HTTP/1.1\r\nHost: x\r\nContent-Length: {len(body)}\r\nConnection: close\r\n"
+    if secret is not None:
+        head += f"X-Telegram-Bot-Api-Secret-Token: {secret}\r\n"
+    writer.write((head + extra + "\r\n").encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split()[1])
+
+
+async def _started(received):
+    from scripts.telegram.webhook import WebhookServer
+
+    async def on_update(data):
+        received.append(data)
+
+    server = WebhookServer(on_update, SECRET, path="/telegram/webhook", port=0)
+    await server.start()
+    return server
+
+
+class TestWebhookServer:
+    """Tests for WebhookServer."""
+
+    @pytest.mark.asyncio
+    async def test_accepts_update_with_secret(self):
+        """Test that a valid POST is decoded and handed on."""
+        received = []
+        server = await _started(received)
+        try:
+            status = await _request(server.port, json.dumps({"update_id": 7}).encode())
+        finally:
+            await server.stop()
+
+        assert status == 200
+        assert received == [{"update_id": 7}]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kwargs,expected", [
+        ({"secret": "wrong"}, 403),
+        ({"secret": None}, 403),
+        ({"path": "/other"}, 404),
+        ({"method": "GET"}, 405),
+        ({"body": b"not json"}, 400),
+        ({"body": b"[1, 2]"}, 400),
+    ])
+    async def test_rejects_bad_requests(self, kwargs, expected):
+        """Test that nothing reaches the bot without the right path, method, secret and body."""
+        received = []
+        server = await _started(received)
+        try:
+            status = await _request(server.port, **kwargs)
+        finally:
+            await server.stop()
+
+        assert status == expected
+        assert received == []
+
+    @pytest.mark.asyncio
+    async def test_keep_alive_serves_several_updates(self):
+        """Test that one HTTP/1.1 connection can carry a stream of updates."""
+        received = []
+        server = await _started(received)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            for update_id in (1, 2, 3):
+                body = json.dumps({"update_id": update_id}).encode()
+                writer.write(
+                    f"POST /telegram/webhook HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+                    f"X-Telegram-Bot-Api-Secret-Token: {SECRET}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                status_line = await reader.readline()
+                while (await reader.readline()) != b"\r\n":
+                    pass
+                assert status_line.startswith(b"HTTP/1.1 200")
+            writer.close()
+        finally:
+            await server.stop()
+
+        assert [u["update_id"] for u in received] == [1, 2, 3]
+
+
+class TestServe:
+    """Tests for serve()."""
+
+    @pytest.mark.asyncio
+    async def test_refused_webhook_stops_receiver_once(self):
+        """Test that a webhook Telegram refuses stops the receiver and raises."""
+        from telegram.error import TelegramError
+
+        from scripts.telegram import webhook
+
+        app = MagicMock(running=False)
+        app.bot.set_webhook = AsyncMock(side_effect=TelegramError("bad webhook"))
+        app.stop = AsyncMock()
+        server = MagicMock(start=AsyncMock(), stop=AsyncMock())
+
+        with patch.object(webhook, "WebhookServer", return_value=server), \
+                pytest.raises(TelegramError):
+            await webhook.serve(app, "https://example.invalid/telegram/webhook", asyncio.Event(), secret=SECRET)
+
+        server.stop.assert_awaited_once()
+        app.stop.assert_not_called()
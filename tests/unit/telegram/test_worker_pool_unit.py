@@ -0,0 +1,114 @@
+"""
+Unit tests for scripts/telegram/worker_pool.py
+
+Tests worker naming, per-worker health and utilization, and the status CLI.
+"""
+
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+IDLE = "│ >                      │\n  ⏵⏵ bypass permissions on (shift+tab to cycle)\n"
+BUSY = "✻ Thinking… (3s · esc to interrupt)\n│ >                      │\n  ⏵⏵ bypass permissions on\n"
+
+
+def _record(session, seconds, now):
+    """Capture one burst of output per second for the last `seconds` seconds."""
+    from scripts.telegram.session_log import SessionLog, log_dir
+
+    log = SessionLog(log_dir(session))
+    log.open()
+    try:
+        for i in range(seconds, 0, -1):
+            log.append(b"spinner", now=now - i)
+    finally:
+        log.close()
+
+
+class TestSessions:
+    """Tests for sessions()."""
+
+    def test_single_worker_keeps_the_classic_name(self):
+        """Test that one worker is claude-mind and a pool is numbered."""
+        from scripts.telegram.worker_pool import sessions
+
+        assert sessions(1) == ["claude-mind"]
+        assert sessions(3) == ["claude-mind-0", "claude-mind-1", "claude-mind-2"]
+
+
+class TestWorkerStatus:
+    """Tests for worker_status() and pool_status()."""
+
+    def test_state_and_utilization(self, temp_mind_dir):
+        """Test that utilization is the share of the window with output."""
+        from scripts.telegram.worker_pool import worker_status
+
+        now = time.time()
+        _record("claude-mind-1", 30, now)
+
+        busy = worker_status("claude-mind-1", BUSY, now=now, window=120)
+        assert busy["state"] == "busy"
+        assert busy["utilization"] == pytest.approx(0.25)
+        assert busy["last_output_age"] == pytest.approx(1.0)
+
+        idle = worker_status("claude-mind-0", IDLE, now=now, window=120)
+        assert (idle["state"], idle["utilization"], idle["last_output_age"]) == ("idle", 0.0, None)
+        assert worker_status("claude-mind-2", None, now=now)["state"] == "down"
+
+    def test_pool_status_and_format(self, temp_mind_dir):
+        """Test one line per worker plus the pool summary, with broker backlog."""
+        from scripts.telegram.worker_pool import format_status, pool_status
+
+        screens = {"claude-mind-0": BUSY, "claude-mind-1": IDLE, "claude-mind-2": None}
+        broker_stats = {"ok": True, "sessions": {"claude-mind-0": {"pending": 2}}}
+        with patch("scripts.telegram.session_broker.request", return_value=broker_stats):
+            rows = pool_status(3, window=60, capture=screens.get)
+
+        assert [row["pending"] for row in rows] == [2, None, None]
+        lines = format_status(rows).splitlines()
+        assert lines[0].startswith("claude-mind-0: busy, 0% busy, 0 turns, no output yet, 2 pending")
+        assert lines[2].startswith("claude-mind-2: down")
+        assert lines[3] == "pool: 2/3 up, 0% busy"
+
+
+class TestMainFunction:
+    """Tests for the worker_pool.py CLI."""
+
+    def test_names_and_status(self, temp_mind_dir, monkeypatch, capsys):
+        """Test the names listing and the exit code when every worker is down."""
+        from scripts.telegram import worker_pool
+
+        monkeypatch.setattr(worker_pool, "WORKERS", 2)
+        monkeypatch.setattr("sys.argv", ["worker_pool.py", "names"])
+        worker_pool.main()
+        assert capsys.readouterr().out.split() == ["claude-mind-0", "claude-mind-1"]
+
+        monkeypatch.setattr("sys.argv", ["worker_pool.py", "status", "--json"])
+        with patch("scripts.telegram.session_probe.capture_pane", return_value=None), \
+                patch("scripts.telegram.session_broker.request", return_value=None), \
+                pytest.raises(SystemExit) as exc_info:
+            worker_pool.main()
+
+        assert exc_info.value.code == 1
+        assert [row["state"] for row in json.loads(capsys.readouterr().out)] == ["down", "down"]
+
+    def test_status_window_is_a_duration(self, temp_mind_dir, monkeypatch, capsys):
+        """Test that --window takes a length of time and refuses an ISO time."""
+        from scripts.telegram import worker_pool
+
+        monkeypatch.setattr("sys.argv", ["worker_pool.py", "status", "--window", "1h"])
+        with patch.object(worker_pool, "pool_status", return_value=[]) as pool_status, \
+                pytest.raises(SystemExit):
+            worker_pool.main()
+        pool_status.assert_called_once_with(window=3600)
+
+        monkeypatch.setattr("sys.argv", ["worker_pool.py", "status", "--window", "2025-01-15T10:00"])
+        with pytest.raises(SystemExit) as exc_info:
+            worker_pool.main()
+
+        assert exc_info.value.code == 2
+        assert "expected a duration" in capsys.readouterr().err